@@ -0,0 +1,165 @@
+"""
+Benchmarks for the hot paths of managers and micro, measured on synthetic scenes of 50, 150 and 300 units.
+
+Run with: python -m pytest benchmarks
+
+Every benchmark is compared to its time in baseline.json and fails when it is slower than
+SHARPY_BENCHMARK_RATIO (default 2.0) times the baseline, lower it on a quiet machine.
+Baseline times are scaled by a short calibration workload measured next to every benchmark,
+so that a baseline recorded on a different machine is still roughly comparable.
+Set SHARPY_BENCHMARK_UPDATE=1 to write the measured times as the new baseline.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pytest
+
+from .scene import SCENE_SIZES, SceneBot, start_scene
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_RATIO = 2.0
+
+
+def calibrate(rounds: int = 5) -> float:
+    """Time in milliseconds of a fixed mix of python and numpy work, used to scale baseline times."""
+    rng = np.random.default_rng(0)
+    points = rng.random((2000, 2))
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        values = {}
+        for index in range(20000):
+            values[index % 97] = values.get(index % 97, 0) + index
+        np.sort(rng.random(100000))
+        np.linalg.norm(points[:, None, :] - points[None, :200, :], axis=2).min(axis=1)
+        best = min(best, (time.perf_counter_ns() - start) / 1e6)
+    return best
+
+
+class Benchmark:
+    """Measures functions and compares the results to the baseline."""
+
+    def __init__(self, baseline: dict, ratio: float, update: bool):
+        self.baseline_results: Dict[str, float] = baseline.get("results", {})
+        self.baseline_calibration: Optional[float] = baseline.get("calibration_ms")
+        self.ratio = ratio
+        self.update = update
+        self.results: Dict[str, float] = {}
+        # Calibration measured next to every benchmark, as machine speed can change during the run
+        self.calibrations: Dict[str, float] = {}
+
+    def scale(self, name: str) -> float:
+        """Multiplier from baseline time to the expected time of the benchmark on this machine."""
+        if not self.baseline_calibration:
+            return 1.0
+        return self.calibrations[name] / self.baseline_calibration
+
+    def measure(self, name: str, func: Callable, number: int = 10, rounds: int = 5, setup: Optional[Callable] = None):
+        """
+        Runs func number times in each round and records the best round average in milliseconds.
+        Coroutine functions are awaited in a single event loop. Setup is called before every call and is not timed.
+        """
+        self.calibrations[name] = calibrate()
+
+        if inspect.iscoroutinefunction(func):
+
+            async def run_rounds():
+                times = []
+                for _ in range(rounds):
+                    total = 0
+                    for _ in range(number):
+                        if setup:
+                            setup()
+                        start = time.perf_counter_ns()
+                        await func()
+                        total += time.perf_counter_ns() - start
+                    times.append(total)
+                return times
+
+            times = asyncio.run(run_rounds())
+        else:
+            times = []
+            for _ in range(rounds):
+                total = 0
+                for _ in range(number):
+                    if setup:
+                        setup()
+                    start = time.perf_counter_ns()
+                    func()
+                    total += time.perf_counter_ns() - start
+                times.append(total)
+
+        ms = min(times) / number / 1e6
+        self.results[name] = ms
+        self.check(name, ms)
+        return ms
+
+    def check(self, name: str, ms: float):
+        baseline_ms = self.baseline_results.get(name)
+        if self.update or baseline_ms is None:
+            return
+        limit = baseline_ms * self.scale(name) * self.ratio
+        if ms > limit:
+            pytest.fail(f"{name} took {ms:.3f} ms, limit is {limit:.3f} ms (baseline {baseline_ms:.3f} ms)")
+
+    def save(self, file_name: str = BASELINE_FILE):
+        """Writes results normalized to the median calibration of the run as the new baseline."""
+        calibration_ms = float(np.median(list(self.calibrations.values())))
+        # Benchmarks that were not run keep their earlier baseline
+        scale = calibration_ms / self.baseline_calibration if self.baseline_calibration else 1.0
+        results = {name: ms * scale for name, ms in self.baseline_results.items()}
+        for name, ms in self.results.items():
+            results[name] = ms * calibration_ms / self.calibrations[name]
+
+        data = {"calibration_ms": round(calibration_ms, 4), "results": {}}
+        for name in sorted(results):
+            data["results"][name] = round(results[name], 4)
+        with open(file_name, "w") as handle:
+            json.dump(data, handle, indent=2)
+            handle.write("\n")
+
+
+_benchmark: Optional[Benchmark] = None
+
+
+def load_baseline(file_name: str = BASELINE_FILE) -> dict:
+    if not os.path.isfile(file_name):
+        return {}
+    with open(file_name, "r") as handle:
+        return json.load(handle)
+
+
+@pytest.fixture(scope="session")
+def benchmark() -> Benchmark:
+    global _benchmark
+    if _benchmark is None:
+        ratio = float(os.environ.get("SHARPY_BENCHMARK_RATIO", DEFAULT_RATIO))
+        update = os.environ.get("SHARPY_BENCHMARK_UPDATE", "") not in ("", "0")
+        _benchmark = Benchmark(load_baseline(), ratio, update)
+    return _benchmark
+
+
+@pytest.fixture(scope="session", params=SCENE_SIZES, ids=lambda size: f"{size}units")
+def scene(request) -> SceneBot:
+    return start_scene(request.param)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _benchmark is None or not _benchmark.results:
+        return
+    terminalreporter.section("benchmarks")
+    for name, ms in _benchmark.results.items():
+        baseline_ms = _benchmark.baseline_results.get(name)
+        compared = f"{ms / (baseline_ms * _benchmark.scale(name)):5.2f}x" if baseline_ms else "  new"
+        terminalreporter.write_line(f"{name:<60} {ms:10.3f} ms {compared}")
+
+
+def pytest_sessionfinish(session):
+    if _benchmark is not None and _benchmark.update and _benchmark.results:
+        _benchmark.save()
@@ -0,0 +1,110 @@
+import asyncio
+from typing import Dict
+
+import numpy as np
+
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.units import Units
+from sharpy.combat import Action, MicroStep, MoveType
+from sharpy.managers.core import BuildingSolver, UnitCacheManager
+from sharpy.plans.acts import GridBuilding
+from sharpy.sc2math import geometric_median
+from .scene import SceneBot
+
+
+def scene_name(name: str, bot: SceneBot) -> str:
+    return f"{name}[{bot.scene_size}]"
+
+
+def army(bot: SceneBot) -> Units:
+    return bot.units.not_structure.exclude_type(UnitTypeId.PROBE)
+
+
+def enemy_target(bot: SceneBot) -> Point2:
+    return bot.enemy_units.not_structure.center
+
+
+def clear_actions(bot: SceneBot):
+    bot.actions.clear()
+    bot.unit_tags_received_action.clear()
+
+
+class TestManagers:
+    def test_unit_cache_update(self, benchmark, scene):
+        cache = scene.knowledge.get_manager(UnitCacheManager)
+        benchmark.measure(scene_name("UnitCacheManager.update", scene), cache.update)
+
+    def test_zone_update(self, benchmark, scene):
+        benchmark.measure(scene_name("ZoneManager.update", scene), scene.knowledge.zone_manager.update)
+
+    def test_influence_rebuild(self, benchmark, scene):
+        pathing = scene.knowledge.pathing_manager
+        benchmark.measure(
+            scene_name("PathingManager.update_influence", scene),
+            pathing.update_influence,
+            number=2,
+            setup=pathing.invalidate_influence,
+        )
+
+    def test_influence_unchanged(self, benchmark, scene):
+        pathing = scene.knowledge.pathing_manager
+        benchmark.measure(scene_name("PathingManager.update_influence/unchanged", scene), pathing.update_influence)
+
+    def test_building_solver(self, benchmark, scene):
+        async def solve():
+            solver = BuildingSolver()
+            await solver.start(scene.knowledge)
+            await solver.solve_grid()
+
+        benchmark.measure(scene_name("BuildingSolver.start", scene), solve, number=1, rounds=3)
+
+    def test_grid_building_position(self, benchmark, scene):
+        gateway = GridBuilding(UnitTypeId.GATEWAY, allow_wall=False)
+        asyncio.run(gateway.start(scene.knowledge))
+        benchmark.measure(
+            scene_name("GridBuilding.position_protoss", scene), lambda: gateway.position_protoss(1), number=100
+        )
+
+
+class TestCombat:
+    def test_group_enemy_units(self, benchmark, scene):
+        combat = scene.knowledge.combat_manager
+        benchmark.measure(scene_name("GroupCombatManager.group_enemy_units", scene), combat.group_enemy_units)
+
+    def test_geometric_median(self, benchmark, scene):
+        positions = np.array([unit.position for unit in scene.all_units])
+        benchmark.measure(scene_name("sc2math.geometric_median", scene), lambda: geometric_median(positions))
+
+    def test_combat_execute(self, benchmark, scene):
+        combat = scene.knowledge.combat_manager
+        units = army(scene)
+        target = enemy_target(scene)
+
+        def execute():
+            combat.add_units(units)
+            combat.execute(target, MoveType.Assault)
+
+        benchmark.measure(scene_name("GroupCombatManager.execute", scene), execute, setup=lambda: clear_actions(scene))
+
+    def test_micro_steps(self, benchmark, scene):
+        combat = scene.knowledge.combat_manager
+        combat.rules = combat.default_rules
+        groups = combat.group_own_units(army(scene))
+        group = max(groups, key=lambda g: len(g.units))
+        target = enemy_target(scene)
+
+        type_units: Dict[UnitTypeId, Units] = {}
+        for unit in group.units:
+            type_units.setdefault(unit.type_id, Units([], scene)).append(unit)
+
+        for type_id, units in type_units.items():
+            micro: MicroStep = combat.unit_micros.get(type_id, combat.generic_micro)
+
+            def solve():
+                micro.init_group(combat.rules, group, units, combat.enemy_groups, MoveType.Assault, target)
+                action = micro.group_solve_combat(units, Action(target, True))
+                for unit in units:
+                    micro.unit_solve_combat(unit, action)
+
+            benchmark.measure(scene_name(f"{type(micro).__name__}.solve_combat/{type_id.name.lower()}", scene), solve)
@@ -0,0 +1,375 @@
+"""
+Synthetic game states for benchmarks.
+
+Game data, game info and observations are built as protobufs, so that benchmarks run real python-sc2 units and
+sharpy managers without SC2. Unit stats are close enough to the real ones for the code paths to be realistic,
+but the scenes are not meant to be exact.
+"""
+
+import asyncio
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from s2clientprotocol import common_pb2, data_pb2, raw_pb2, sc2api_pb2 as sc_pb
+
+from sc2.bot_ai import BotAI
+from sc2.data import Race
+from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
+from sc2.game_data import GameData
+from sc2.game_info import GameInfo
+from sc2.game_state import GameState
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.ids.upgrade_id import UpgradeId
+from sc2.position import Point2
+from sharpy.general.observation_file import ObservationRecording, OBSERVATION_FILE_VERSION
+from sharpy.knowledges import KnowledgeBot
+from sharpy.managers.core.map_cache_manager import MapCacheManager
+from sharpy.managers.core.version_manager import GameVersion
+from sharpy.plans import BuildOrder
+from sharpy.tools.observation_player import ObservationPlayer, ReplayClient
+
+MAP_SIZE = 144
+PLAYABLE_MARGIN = 8
+# Total unit counts of the scenes, split evenly between own and enemy army
+SCENE_SIZES = (50, 150, 300)
+
+LIGHT = data_pb2.Light
+ARMORED = data_pb2.Armored
+BIOLOGICAL = data_pb2.Biological
+MECHANICAL = data_pb2.Mechanical
+STRUCTURE = data_pb2.Structure
+GROUND = data_pb2.Weapon.Ground
+AIR = data_pb2.Weapon.Air
+ANY = data_pb2.Weapon.Any
+
+
+class UnitStats(NamedTuple):
+    race: Race
+    health: float
+    shield: float
+    radius: float
+    speed: float
+    food: float
+    minerals: int
+    gas: int
+    attributes: List[int]
+    # Weapons as (target type, damage, range, cooldown)
+    weapons: List[Tuple[int, float, float, float]]
+
+
+P = Race.Protoss
+Z = Race.Zerg
+N = Race.NoRace
+
+UNIT_STATS: Dict[UnitTypeId, UnitStats] = {
+    UnitTypeId.NEXUS: UnitStats(P, 1000, 1000, 2.75, 0, 0, 400, 0, [ARMORED, STRUCTURE], []),
+    UnitTypeId.PYLON: UnitStats(P, 200, 200, 1.125, 0, 0, 100, 0, [ARMORED, STRUCTURE], []),
+    UnitTypeId.GATEWAY: UnitStats(P, 500, 500, 1.8125, 0, 0, 150, 0, [ARMORED, STRUCTURE], []),
+    UnitTypeId.PROBE: UnitStats(P, 20, 20, 0.375, 3.94, 1, 50, 0, [LIGHT, MECHANICAL], [(GROUND, 5, 0.1, 1.07)]),
+    UnitTypeId.ZEALOT: UnitStats(P, 100, 50, 0.5, 3.15, 2, 100, 0, [LIGHT, BIOLOGICAL], [(GROUND, 16, 0.1, 0.86)]),
+    UnitTypeId.STALKER: UnitStats(P, 80, 80, 0.625, 4.13, 2, 125, 50, [ARMORED, MECHANICAL], [(ANY, 13, 6, 1.34)]),
+    UnitTypeId.IMMORTAL: UnitStats(P, 200, 100, 0.75, 3.15, 4, 275, 100, [ARMORED, MECHANICAL], [(GROUND, 20, 6, 1)]),
+    UnitTypeId.COLOSSUS: UnitStats(P, 200, 150, 1, 3.15, 6, 300, 200, [ARMORED, MECHANICAL], [(GROUND, 20, 7, 1)]),
+    UnitTypeId.HATCHERY: UnitStats(Z, 1500, 0, 2.75, 0, 0, 300, 0, [ARMORED, BIOLOGICAL, STRUCTURE], []),
+    UnitTypeId.DRONE: UnitStats(Z, 40, 0, 0.375, 3.94, 1, 50, 0, [LIGHT, BIOLOGICAL], [(GROUND, 5, 0.1, 1.07)]),
+    UnitTypeId.ZERGLING: UnitStats(Z, 35, 0, 0.375, 5.37, 0.5, 25, 0, [LIGHT, BIOLOGICAL], [(GROUND, 5, 0.1, 0.5)]),
+    UnitTypeId.ROACH: UnitStats(Z, 145, 0, 0.625, 4.2, 2, 75, 25, [ARMORED, BIOLOGICAL], [(GROUND, 16, 4, 1.43)]),
+    UnitTypeId.HYDRALISK: UnitStats(Z, 90, 0, 0.625, 3.94, 2, 100, 50, [LIGHT, BIOLOGICAL], [(ANY, 12, 5, 0.59)]),
+    UnitTypeId.MUTALISK: UnitStats(Z, 120, 0, 0.5, 5.6, 2, 100, 100, [LIGHT, BIOLOGICAL], [(ANY, 9, 3, 1.09)]),
+    UnitTypeId.MINERALFIELD: UnitStats(N, 0, 0, 1.125, 0, 0, 0, 0, [STRUCTURE], []),
+    UnitTypeId.VESPENEGEYSER: UnitStats(N, 0, 0, 1.8125, 0, 0, 0, 0, [STRUCTURE], []),
+}
+
+OWN_ARMY = [UnitTypeId.ZEALOT, UnitTypeId.STALKER, UnitTypeId.STALKER, UnitTypeId.IMMORTAL, UnitTypeId.COLOSSUS]
+ENEMY_ARMY = [UnitTypeId.ZERGLING, UnitTypeId.ZERGLING, UnitTypeId.ROACH, UnitTypeId.HYDRALISK, UnitTypeId.MUTALISK]
+FLYING = {UnitTypeId.MUTALISK}
+
+# Bases as (townhall position, direction of the mineral line)
+OWN_BASES = [((32.5, 32.5), (-1, -1)), ((32.5, 72.5), (-1, 0))]
+ENEMY_BASES = [((111.5, 111.5), (1, 1)), ((111.5, 71.5), (1, 0))]
+NEUTRAL_BASES = [((72.5, 32.5), (0, -1)), ((72.5, 111.5), (0, 1))]
+
+ALLIANCE_SELF = 1
+ALLIANCE_NEUTRAL = 3
+ALLIANCE_ENEMY = 4
+
+
+# Commands that micro can give to the units in the scene, with their ability target types
+COMMAND_ABILITIES = [
+    (AbilityId.ATTACK, data_pb2.AbilityData.PointOrUnit),
+    (AbilityId.MOVE, data_pb2.AbilityData.PointOrUnit),
+    (AbilityId.SMART, data_pb2.AbilityData.PointOrUnit),
+    (AbilityId.STOP, data_pb2.AbilityData.Target.Value("None")),
+    (AbilityId.HOLDPOSITION, data_pb2.AbilityData.Target.Value("None")),
+    (AbilityId.EFFECT_BLINK_STALKER, data_pb2.AbilityData.Point),
+]
+
+
+def creation_abilities() -> Dict[UnitTypeId, int]:
+    abilities = {}
+    for produced in TRAIN_INFO.values():
+        for unit_type, info in produced.items():
+            abilities[unit_type] = info["ability"].value
+    return abilities
+
+
+def game_data() -> sc_pb.ResponseData:
+    data = sc_pb.ResponseData()
+    abilities = creation_abilities()
+    for type_id, stats in UNIT_STATS.items():
+        unit_data = data.units.add(
+            unit_id=type_id.value,
+            name=type_id.name.title().replace("field", "Field").replace("geyser", "Geyser"),
+            available=True,
+            mineral_cost=stats.minerals,
+            vespene_cost=stats.gas,
+            food_required=stats.food,
+            food_provided=15 if type_id in {UnitTypeId.NEXUS, UnitTypeId.HATCHERY} else 0,
+            ability_id=abilities.get(type_id, 0),
+            race=stats.race.value,
+            sight_range=9,
+            movement_speed=stats.speed,
+            armor=1,
+            has_minerals=type_id == UnitTypeId.MINERALFIELD,
+            has_vespene=type_id == UnitTypeId.VESPENEGEYSER,
+        )
+        unit_data.attributes.extend(stats.attributes)
+        for target, damage, weapon_range, cooldown in stats.weapons:
+            unit_data.weapons.add(type=target, damage=damage, attacks=1, range=weapon_range, speed=cooldown)
+
+    for type_id, ability_id in abilities.items():
+        if type_id in UNIT_STATS:
+            data.abilities.add(ability_id=ability_id, link_name=type_id.name, button_name=type_id.name, available=True)
+    for ability_id, target in COMMAND_ABILITIES:
+        data.abilities.add(
+            ability_id=ability_id.value,
+            link_name=ability_id.name,
+            button_name=ability_id.name,
+            available=True,
+            target=target,
+        )
+    # Upgrades are known but never researched
+    for upgrade_id in UpgradeId:
+        data.upgrades.add(upgrade_id=upgrade_id.value, name=upgrade_id.name)
+    return data
+
+
+def _image(grid: np.ndarray, bits: int) -> common_pb2.ImageData:
+    """Image data from a [y][x] grid, bit images are packed from non-zero cells."""
+    image = common_pb2.ImageData(bits_per_pixel=bits)
+    image.size.x = grid.shape[1]
+    image.size.y = grid.shape[0]
+    if bits == 1:
+        image.data = np.packbits(grid.astype(bool)).tobytes()
+    else:
+        image.data = grid.astype(np.uint8).tobytes()
+    return image
+
+
+def _resource_positions(base: Tuple[float, float], direction: Tuple[int, int]) -> Tuple[list, list]:
+    """Mineral and geyser positions for a base with the mineral line towards direction."""
+    x, y = base
+    dx, dy = direction
+    minerals = []
+    geysers = []
+    if dx != 0 and dy != 0:
+        # Diagonal mineral line
+        for i in range(-4, 4):
+            minerals.append((x + dx * 6.5 - dy * i * 0.75 + (i % 2) * dx * 0.5, y + dy * 6.5 + dx * i * 0.75))
+        geysers.append((x + dx * 7.5 - dy * -5.5 * 0.75 * dx * dy + 0.0, y - dy * 0.5))
+        geysers.append((x - dx * 0.5, y + dy * 7.5))
+        return minerals, geysers
+
+    # Straight mineral line, perpendicular to direction
+    px, py = -dy, dx
+    for i in range(-4, 4):
+        offset = 7 + (i % 2)
+        minerals.append((x + dx * offset + px * (i + 0.5), y + dy * offset + py * (i + 0.5)))
+    geysers.append((x + dx * 3 + px * 7, y + dy * 3 + py * 7))
+    geysers.append((x + dx * 3 - px * 7, y + dy * 3 - py * 7))
+    return minerals, geysers
+
+
+def game_info() -> sc_pb.ResponseGameInfo:
+    size = MAP_SIZE
+    pathing = np.zeros((size, size), dtype=bool)
+    pathing[PLAYABLE_MARGIN:-PLAYABLE_MARGIN, PLAYABLE_MARGIN:-PLAYABLE_MARGIN] = True
+    # Low ridges split the map into areas so that there is something to path around
+    pathing[46:50, 40:100] = False
+    pathing[94:98, 44:104] = False
+    placement = pathing.copy()
+    height = np.full((size, size), 160, dtype=np.uint8)
+    height[:, :] = np.where(pathing, 160, 120)
+
+    info = sc_pb.ResponseGameInfo(map_name="Benchmark Scene")
+    info.start_raw.map_size.x = size
+    info.start_raw.map_size.y = size
+    info.start_raw.pathing_grid.CopyFrom(_image(pathing, 1))
+    info.start_raw.placement_grid.CopyFrom(_image(placement, 1))
+    info.start_raw.terrain_height.CopyFrom(_image(height, 8))
+    info.start_raw.playable_area.p0.x = PLAYABLE_MARGIN
+    info.start_raw.playable_area.p0.y = PLAYABLE_MARGIN
+    info.start_raw.playable_area.p1.x = size - PLAYABLE_MARGIN
+    info.start_raw.playable_area.p1.y = size - PLAYABLE_MARGIN
+    info.player_info.add(player_id=1, type=sc_pb.Participant, race_requested=Race.Protoss.value)
+    info.player_info.add(player_id=2, type=sc_pb.Participant, race_requested=Race.Zerg.value)
+    return info
+
+
+class SceneBuilder:
+    def __init__(self, seed: int = 0):
+        self.rng = np.random.default_rng(seed)
+        self.observation = sc_pb.ResponseObservation()
+        self.next_tag = 1
+        self.observation.observation.game_loop = 22 * 60 * 8
+        common = self.observation.observation.player_common
+        common.player_id = 1
+        common.minerals = 1000
+        common.vespene = 500
+        common.food_cap = 200
+
+    def add_unit(self, type_id: UnitTypeId, position: Tuple[float, float], alliance: int, owner: int) -> raw_pb2.Unit:
+        stats = UNIT_STATS[type_id]
+        unit = self.observation.observation.raw_data.units.add(
+            display_type=raw_pb2.Visible,
+            alliance=alliance,
+            tag=self.next_tag,
+            unit_type=type_id.value,
+            owner=owner,
+            facing=float(self.rng.uniform(0, 6.28)),
+            radius=stats.radius,
+            build_progress=1,
+            health=stats.health,
+            health_max=stats.health,
+            shield=stats.shield,
+            shield_max=stats.shield,
+            is_flying=type_id in FLYING,
+            is_powered=True,
+        )
+        unit.pos.x, unit.pos.y = position
+        unit.pos.z = 12 if type_id in FLYING else 10
+        self.next_tag += 1
+        if type_id == UnitTypeId.MINERALFIELD:
+            unit.mineral_contents = 1500
+        elif type_id == UnitTypeId.VESPENEGEYSER:
+            unit.vespene_contents = 2250
+        return unit
+
+    def add_resources(self, base: Tuple[float, float], direction: Tuple[int, int]):
+        minerals, geysers = _resource_positions(base, direction)
+        for position in minerals:
+            self.add_unit(UnitTypeId.MINERALFIELD, position, ALLIANCE_NEUTRAL, 16)
+        for position in geysers:
+            self.add_unit(UnitTypeId.VESPENEGEYSER, position, ALLIANCE_NEUTRAL, 16)
+
+    def add_townhall(self, location: Point2, alliance: int, workers: int):
+        """Adds a townhall and workers between it and the closest mineral fields."""
+        own = alliance == ALLIANCE_SELF
+        owner = 1 if own else 2
+        self.add_unit(UnitTypeId.NEXUS if own else UnitTypeId.HATCHERY, location, alliance, owner)
+
+        minerals = [
+            Point2((unit.pos.x, unit.pos.y))
+            for unit in self.observation.observation.raw_data.units
+            if unit.unit_type == UnitTypeId.MINERALFIELD.value
+        ]
+        minerals.sort(key=lambda mineral: mineral.distance_to(location))
+        for mineral in minerals[:workers]:
+            self.add_unit(UnitTypeId.PROBE if own else UnitTypeId.DRONE, (mineral + location) / 2, alliance, owner)
+
+    def add_army(self, types: List[UnitTypeId], count: int, center: Tuple[float, float], alliance: int, owner: int):
+        """Adds count units in a few clumps around the center."""
+        clumps = self.rng.normal(center, 6, size=(max(1, count // 20), 2))
+        for index in range(count):
+            clump = clumps[index % len(clumps)]
+            position = self.rng.normal(clump, 2)
+            self.add_unit(types[index % len(types)], (float(position[0]), float(position[1])), alliance, owner)
+
+    def set_visibility(self):
+        size = MAP_SIZE
+        visibility = np.full((size, size), 1, dtype=np.uint8)
+        # Everything near own units is visible
+        for unit in self.observation.observation.raw_data.units:
+            if unit.alliance == ALLIANCE_SELF:
+                x, y = int(unit.pos.x), int(unit.pos.y)
+                visibility[max(0, y - 9) : y + 10, max(0, x - 9) : x + 10] = 2
+        map_state = self.observation.observation.raw_data.map_state
+        map_state.visibility.CopyFrom(_image(visibility, 8))
+        map_state.creep.CopyFrom(_image(np.zeros((size, size), dtype=bool), 1))
+
+
+def expansion_locations(info: sc_pb.ResponseGameInfo, data: sc_pb.ResponseData, observation) -> List[Point2]:
+    """Expansion locations that python-sc2 finds for the resources in the observation."""
+    bot = BotAI()
+    bot._initialize_variables()
+    bot._prepare_start(ReplayClient(4), 1, GameInfo(info), GameData(data))
+    response = sc_pb.Response()
+    response.game_info.CopyFrom(info)
+    bot._prepare_step(GameState(observation), response)
+    bot._find_expansion_locations()
+    return bot.expansion_locations_list
+
+
+def scene_recording(unit_count: int, steps: int = 1, seed: int = 0) -> ObservationRecording:
+    """
+    Recording of a scene with own and enemy bases and armies of unit_count units in total fighting in the middle.
+    Same observation is repeated for steps, with game loop advancing between frames.
+    """
+    recording = ObservationRecording()
+    recording.header = {
+        "version": OBSERVATION_FILE_VERSION,
+        "player_id": 1,
+        "base_build": GameVersion.V_5_0_6.value,
+        "game_version": f"5.0.6.{GameVersion.V_5_0_6.value}",
+        "game_step": 4,
+    }
+    recording.game_data = game_data()
+    recording.game_info = game_info()
+    recording._pathing_grids.append(recording.game_info.start_raw.pathing_grid)
+
+    builder = SceneBuilder(seed)
+    for base, direction in OWN_BASES + ENEMY_BASES + NEUTRAL_BASES:
+        builder.add_resources(base, direction)
+
+    # Townhalls need to be exactly at the expansion locations for zones to work
+    locations = expansion_locations(recording.game_info, recording.game_data, builder.observation)
+    for index, (base, _) in enumerate(OWN_BASES + ENEMY_BASES):
+        location = Point2(base).closest(locations)
+        alliance = ALLIANCE_SELF if index < len(OWN_BASES) else ALLIANCE_ENEMY
+        builder.add_townhall(location, alliance, 8)
+        if index == len(OWN_BASES):
+            enemy_start = recording.game_info.start_raw.start_locations.add()
+            enemy_start.x, enemy_start.y = location
+
+    builder.add_army(OWN_ARMY, unit_count // 2, (66, 66), ALLIANCE_SELF, 1)
+    builder.add_army(ENEMY_ARMY, unit_count - unit_count // 2, (80, 76), ALLIANCE_ENEMY, 2)
+    builder.set_visibility()
+
+    observation = builder.observation
+    for step in range(steps + 1):
+        observation.observation.game_loop += 4
+        recording._frames.append((observation.SerializeToString(), 0))
+    return recording
+
+
+class SceneBot(KnowledgeBot):
+    """Bot with all default managers and an empty plan. Map analysis is never cached on disk."""
+
+    def __init__(self):
+        super().__init__("Scene")
+        self.map_cache_manager = MapCacheManager(None)
+        self.scene_size = 0
+        self.realtime_worker = False
+        self.realtime_split = False
+
+    async def create_plan(self) -> BuildOrder:
+        return BuildOrder([])
+
+
+def start_scene(unit_count: int, steps: int = 1, seed: int = 0) -> SceneBot:
+    """Starts SceneBot with the scene and plays steps so that the managers have up to date state."""
+    bot = SceneBot()
+    bot.scene_size = unit_count
+    asyncio.run(ObservationPlayer(scene_recording(unit_count, steps, seed)).play(bot))
+    return bot
@@ -1,3 +1,4 @@
 from .path_finder import PathFinder
 from .map import Sc2Map
-from .mappings import MapType, MapsType
\ No newline at end of file
+from .mappings import MapType, MapsType
+from .backend import NATIVE_BACKEND
@@ -0,0 +1,15 @@
+"""
+Selects the path finding backend.
+
+The compiled sc2pathlib extension is used when it can be loaded for the running platform and Python version,
+otherwise the pure Python / NumPy implementation in fallback.py is used.
+"""
+try:
+    # noinspection PyUnresolvedReferences
+    from .sc2pathlib import PathFind, Map, VisionUnit
+
+    NATIVE_BACKEND = True
+except ImportError:
+    from .fallback import PathFind, Map, VisionUnit
+
+    NATIVE_BACKEND = False
@@ -0,0 +1,977 @@
+"""
+Pure Python / NumPy implementation of the native sc2pathlib objects.
+
+This backend is selected automatically when the compiled extension can not be loaded, for example on Linux hosts
+where only the Windows and macOS binaries are available. It implements the same API as the native `PathFind`, `Map`
+and `VisionUnit` objects that `PathFinder` and `Sc2Map` wrap. Grids are indexed [x][y] like the native objects.
+
+Results are close to, but not identical with the native implementation:
+- zones are assigned by walking distance to the closest base on the same height level instead of by chokes
+- reaper and colossus climbing is estimated from narrow cliffs between pathable cells
+- chokes are narrow passages between unpathable cells, found from pathable run lengths in 8 directions
+"""
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import ndimage
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from .choke import Choke
+
+SQRT2 = math.sqrt(2)
+NEIGHBOURS = (
+    (1, 0, 1.0),
+    (-1, 0, 1.0),
+    (0, 1, 1.0),
+    (0, -1, 1.0),
+    (1, 1, SQRT2),
+    (1, -1, SQRT2),
+    (-1, 1, SQRT2),
+    (-1, -1, SQRT2),
+)
+EIGHT_CONNECTED = np.ones((3, 3), dtype=bool)
+
+# Maximum walking distance from a base for a cell to be included in the zone of the base
+ZONE_MAX_DISTANCE = 30
+# Maximum terrain height difference (0 - 255) between a base and a cell in the zone of the base
+ZONE_MAX_HEIGHT_DIFFERENCE = 8
+# Smallest area of unpathable terrain that is considered for overlord spots
+OVERLORD_SPOT_MIN_AREA = 16
+# Widest gap between unpathable cells that is considered a choke
+CHOKE_MAX_WIDTH = 10
+# A choke must open to at least this many times its width in some other direction, and the unpathable cells on
+# its sides must be at least this many times its width apart when walking around through unpathable cells
+CHOKE_MIN_OPENING = 2
+# Smallest number of cells in a choke
+CHOKE_MIN_CELLS = 4
+
+# Values match MapType, MapsType and VisionStatus in mappings.py
+MAP_GROUND = 0
+MAP_REAPER = 1
+MAP_COLOSSUS = 2
+MAP_AIR = 3
+
+MAPS_PURE_GROUND = 0
+MAPS_GROUND = 1
+MAPS_AIR = 2
+MAPS_BOTH = 3
+
+
+def block_rect(center: Tuple[float, float], size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """Returns x, y, x2, y2 cell bounds of a block with the specified size centered at center."""
+    w, h = size
+    x = int(math.floor(center[0] - w / 2 + 0.5))
+    y = int(math.floor(center[1] - h / 2 + 0.5))
+    return x, y, x + w, y + h
+
+
+def octile(x: int, y: int, x2: int, y2: int) -> float:
+    dx = abs(x - x2)
+    dy = abs(y - y2)
+    return dx + dy + (SQRT2 - 2) * min(dx, dy)
+
+
+class InfluenceGrid:
+    """Single pathing grid with influence. Cells with value 0 are not pathable."""
+
+    def __init__(self, pathable: np.ndarray):
+        self.original = np.where(pathable, 1, 0).astype(np.float32)
+        self.values = self.original.copy()
+        self.normal_influence = 1.0
+        self.width, self.height = self.values.shape
+        # Cells touched by the latest influence and block operations, reset by the caller
+        self.cells_touched = 0
+
+    def reset(self):
+        np.copyto(self.values, self.original)
+        self.normal_influence = 1.0
+
+    def normalize(self, value: float):
+        self.values[self.values > 0] = value
+        self.normal_influence = float(value)
+
+    def clip(self, x: int, y: int, x2: int, y2: int) -> Tuple[int, int, int, int]:
+        return max(0, x), max(0, y), min(self.width, x2), min(self.height, y2)
+
+    def create_block(self, center: Tuple[float, float], size: Tuple[int, int]):
+        x, y, x2, y2 = self.clip(*block_rect(center, size))
+        if x < x2 and y < y2:
+            self.values[x:x2, y:y2] = 0
+            self.cells_touched += (x2 - x) * (y2 - y)
+
+    def remove_block(self, center: Tuple[float, float], size: Tuple[int, int]):
+        x, y, x2, y2 = self.clip(*block_rect(center, size))
+        if x < x2 and y < y2:
+            area = self.values[x:x2, y:y2]
+            area[self.original[x:x2, y:y2] > 0] = self.normal_influence
+            self.cells_touched += (x2 - x) * (y2 - y)
+
+    def window(self, point: Tuple[float, float], radius: float):
+        """Returns slices and distances from the point to cell centers inside the radius."""
+        x, y, x2, y2 = self.clip(
+            int(math.floor(point[0] - radius)),
+            int(math.floor(point[1] - radius)),
+            int(math.ceil(point[0] + radius)) + 1,
+            int(math.ceil(point[1] + radius)) + 1,
+        )
+        if x >= x2 or y >= y2:
+            return None
+        xs = np.arange(x, x2, dtype=np.float32) + 0.5 - point[0]
+        ys = np.arange(y, y2, dtype=np.float32) + 0.5 - point[1]
+        distances = np.hypot(xs[:, None], ys[None, :])
+        return (slice(x, x2), slice(y, y2)), distances
+
+    def add_fading(self, points, influence: float, full_range: float, fade_max_range: float):
+        fade_max_range = max(full_range, fade_max_range)
+        for point in points:
+            result = self.window(point, fade_max_range)
+            if result is None:
+                continue
+            area_slice, distances = result
+            if fade_max_range > full_range:
+                weight = np.clip((fade_max_range - distances) / (fade_max_range - full_range), 0, 1)
+            else:
+                weight = (distances <= full_range).astype(np.float32)
+            area = self.values[area_slice]
+            mask = (area > 0) & (weight > 0)
+            area[mask] += influence * weight[mask]
+            self.cells_touched += int(np.count_nonzero(mask))
+
+    def add_flat(self, points, influence: float, min_range: float, max_range: float):
+        for point in points:
+            result = self.window(point, max_range)
+            if result is None:
+                continue
+            area_slice, distances = result
+            area = self.values[area_slice]
+            mask = (area > 0) & (distances >= min_range) & (distances <= max_range)
+            area[mask] += influence
+            self.cells_touched += int(np.count_nonzero(mask))
+
+    def add_walk(self, points, influence: float, distance: float, flat: bool = False):
+        for point in points:
+            start = self.nearest_pathable((int(point[0]), int(point[1])))
+            if start is None:
+                continue
+            area_slice, distances = self.walk_distances(start, distance)
+            reached = np.isfinite(distances)
+            area = self.values[area_slice]
+            if flat:
+                area[reached] += influence
+            else:
+                area[reached] += influence * (1 - distances[reached] / distance)
+            self.cells_touched += int(np.count_nonzero(reached))
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def nearest_pathable(self, cell: Tuple[int, int], radius: int = 3) -> Optional[Tuple[int, int]]:
+        x, y = cell
+        if self.in_bounds(x, y) and self.values[x, y] > 0:
+            return x, y
+        return nearest_cell(self.values > 0, cell, radius)
+
+    def walk_distances(
+        self, start: Tuple[int, int], max_distance: float, influence: bool = False
+    ) -> Tuple[Tuple[slice, slice], np.ndarray]:
+        """
+        Dijkstra from start, limited to max_distance and to the window of cells that can be reached.
+        Returns slices of the window and distances [x][y] inside it, infinite for cells that are not reached.
+        """
+        radius = max_distance
+        if influence:
+            # Cells with less than normal influence are cheaper to walk through than their distance
+            radius *= self.normal_influence / min(self.normal_influence, float(self.values[self.values > 0].min()))
+
+        x, y, x2, y2 = self.clip(
+            start[0] - int(math.ceil(radius)),
+            start[1] - int(math.ceil(radius)),
+            start[0] + int(math.ceil(radius)) + 1,
+            start[1] + int(math.ceil(radius)) + 1,
+        )
+        values = self.values[x:x2, y:y2]
+        graph, node_index = grid_graph(values, influence, self.normal_influence)
+        node_distances = dijkstra(graph, indices=node_index[start[0] - x, start[1] - y], limit=max_distance)
+
+        distances = np.full(values.shape, np.inf)
+        distances[node_index >= 0] = node_distances
+        return (slice(x, x2), slice(y, y2)), distances
+
+    def large_values(self) -> np.ndarray:
+        """Values where cells are only pathable if a 2x2 unit fits in them."""
+        pathable = self.values > 0
+        fits = pathable.copy()
+        fits[:-1, :] &= pathable[1:, :]
+        fits[:, :-1] &= pathable[:, 1:]
+        fits[:-1, :-1] &= pathable[1:, 1:]
+        return np.where(fits, self.values, 0)
+
+    def find_path(
+        self,
+        start: Tuple[int, int],
+        end: Tuple[int, int],
+        large: bool = False,
+        influence: bool = False,
+        window: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None,
+        distance_from_target: Optional[float] = None,
+    ) -> Tuple[List[Tuple[int, int]], float]:
+        start = self.nearest_pathable(start)
+        end = self.nearest_pathable(end)
+        if start is None or end is None:
+            return [], 0.0
+
+        values = self.large_values() if large else self.values
+        height = self.height
+        cells = values.ravel().tolist()
+        normal = self.normal_influence
+
+        if window is not None:
+            min_x = max(0, min(window[0][0], window[1][0]))
+            min_y = max(0, min(window[0][1], window[1][1]))
+            max_x = min(self.width, max(window[0][0], window[1][0]) + 1)
+            max_y = min(self.height, max(window[0][1], window[1][1]) + 1)
+        else:
+            min_x, min_y, max_x, max_y = 0, 0, self.width, self.height
+
+        ex, ey = end
+        start_index = start[0] * height + start[1]
+        end_index = ex * height + ey
+        target_distance = None if distance_from_target is None else distance_from_target ** 2
+
+        g_score = {start_index: 0.0}
+        came_from: Dict[int, int] = {}
+        closed = set()
+        heap = [(octile(start[0], start[1], ex, ey), 0.0, start_index)]
+        found: Optional[int] = None
+
+        while heap:
+            _, g, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            x, y = divmod(current, height)
+
+            if current == end_index or (
+                target_distance is not None and (x - ex) ** 2 + (y - ey) ** 2 <= target_distance
+            ):
+                found = current
+                break
+
+            closed.add(current)
+
+            for dx, dy, step in NEIGHBOURS:
+                nx = x + dx
+                ny = y + dy
+                if nx < min_x or nx >= max_x or ny < min_y or ny >= max_y:
+                    continue
+                neighbour = nx * height + ny
+                value = cells[neighbour]
+                if value <= 0 or neighbour in closed:
+                    continue
+                if dx and dy and (cells[x * height + ny] <= 0 or cells[nx * height + y] <= 0):
+                    # No cutting corners
+                    continue
+                ng = g + (step * value / normal if influence else step)
+                if ng < g_score.get(neighbour, math.inf):
+                    g_score[neighbour] = ng
+                    came_from[neighbour] = current
+                    heapq.heappush(heap, (ng + octile(nx, ny, ex, ey), ng, neighbour))
+
+        if found is None:
+            return [], 0.0
+
+        path = [divmod(found, height)]
+        current = found
+        while current in came_from:
+            current = came_from[current]
+            path.append(divmod(current, height))
+        path.reverse()
+        return path, g_score[found]
+
+    def lowest_influence_walk(self, center: Tuple[int, int], walk_distance: float) -> Tuple[Tuple[int, int], float]:
+        start = self.nearest_pathable(center)
+        if start is None:
+            return center, 0.0
+        area_slice, distances = self.walk_distances(start, walk_distance)
+        # Lowest influence first, shortest walk second
+        values = np.where(np.isfinite(distances), self.values[area_slice], np.inf)
+        lowest = values.min()
+        candidates = np.where(values == lowest, distances, np.inf)
+        index = np.unravel_index(np.argmin(candidates), candidates.shape)
+        return (int(area_slice[0].start + index[0]), int(area_slice[1].start + index[1])), float(lowest)
+
+    def lowest_influence(self, center: Tuple[int, int], radius: int) -> Tuple[Tuple[int, int], float]:
+        x, y, x2, y2 = self.clip(center[0] - radius, center[1] - radius, center[0] + radius + 1, center[1] + radius + 1)
+        if x >= x2 or y >= y2:
+            return center, 0.0
+        area = self.values[x:x2, y:y2]
+        xs = np.arange(x, x2) - center[0]
+        ys = np.arange(y, y2) - center[1]
+        distances = np.hypot(xs[:, None], ys[None, :])
+        valid = (area > 0) & (distances <= radius)
+        if not valid.any():
+            return center, 0.0
+        # Lowest influence first, closest to center second
+        score = np.where(valid, area, np.inf)
+        lowest = score.min()
+        candidates = np.where(score == lowest, distances, np.inf)
+        index = np.unravel_index(np.argmin(candidates), candidates.shape)
+        return (int(x + index[0]), int(y + index[1])), float(lowest)
+
+    def find_low_inside_walk(
+        self, start: Tuple[float, float], target: Tuple[float, float], distance: float
+    ) -> Tuple[Tuple[float, float], float]:
+        start_cell = self.nearest_pathable((int(start[0]), int(start[1])))
+        if start_cell is None:
+            return (start[0], start[1]), 0.0
+
+        max_distance = math.hypot(start[0] - target[0], start[1] - target[1]) + distance + 5
+        max_cost = max_distance * self.values.max() / self.normal_influence
+
+        area_slice, costs = self.walk_distances(start_cell, max_cost, True)
+        xs = np.arange(area_slice[0].start, area_slice[0].stop) + 0.5 - target[0]
+        ys = np.arange(area_slice[1].start, area_slice[1].stop) + 0.5 - target[1]
+        costs[np.hypot(xs[:, None], ys[None, :]) > distance] = np.inf
+
+        index = np.unravel_index(np.argmin(costs), costs.shape)
+        best_cost = costs[index]
+        if not np.isfinite(best_cost):
+            return (start[0], start[1]), 0.0
+        return (area_slice[0].start + index[0] + 0.5, area_slice[1].start + index[1] + 0.5), float(best_cost)
+
+
+def climbable(pathable: np.ndarray, max_gap: int) -> np.ndarray:
+    """Unpathable cells that have pathable cells on opposite sides within max_gap cells."""
+    width, height = pathable.shape
+    padded = np.pad(pathable, max_gap, constant_values=False)
+    result = np.zeros_like(pathable)
+
+    def shifted(dx: int, dy: int) -> np.ndarray:
+        return padded[max_gap + dx : max_gap + dx + width, max_gap + dy : max_gap + dy + height]
+
+    for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+        side1 = np.zeros_like(pathable)
+        side2 = np.zeros_like(pathable)
+        for k in range(1, max_gap + 1):
+            side1 |= shifted(dx * k, dy * k)
+            side2 |= shifted(-dx * k, -dy * k)
+        result |= side1 & side2
+
+    return result & ~pathable
+
+
+class PathFind:
+    def __init__(self, maze):
+        self._grid = InfluenceGrid(np.asarray(maze) > 0)
+
+    @property
+    def width(self) -> int:
+        return self._grid.width
+
+    @property
+    def height(self) -> int:
+        return self._grid.height
+
+    @property
+    def map(self) -> List[List[int]]:
+        return self._grid.values.astype(np.int64).tolist()
+
+    @map.setter
+    def map(self, data: List[List[int]]):
+        self._grid.values = np.asarray(data, dtype=np.float32)
+
+    @property
+    def cells_touched(self) -> int:
+        return self._grid.cells_touched
+
+    @cells_touched.setter
+    def cells_touched(self, value: int):
+        self._grid.cells_touched = value
+
+    def normalize_influence(self, value: int):
+        self._grid.normalize(value)
+
+    def reset(self):
+        self._grid.reset()
+
+    def create_block(self, center: Tuple[float, float], size: Tuple[int, int]):
+        self._grid.create_block(center, size)
+
+    def create_blocks(self, centers: List[Tuple[float, float]], size: Tuple[int, int]):
+        for center in centers:
+            self._grid.create_block(center, size)
+
+    def remove_block(self, center: Tuple[float, float], size: Tuple[int, int]):
+        self._grid.remove_block(center, size)
+
+    def remove_blocks(self, centers: List[Tuple[float, float]], size: Tuple[int, int]):
+        for center in centers:
+            self._grid.remove_block(center, size)
+
+    def find_path(self, start, end, large=False, influence=False, heuristic_accuracy=1, window=None,
+                  distance_from_target=None) -> Tuple[List[Tuple[int, int]], float]:
+        return self._grid.find_path(start, end, large, influence, window, distance_from_target)
+
+    def lowest_influence_walk(self, center: Tuple[int, int], walk_distance: float) -> Tuple[Tuple[int, int], float]:
+        return self._grid.lowest_influence_walk(center, walk_distance)
+
+    def lowest_influence(self, center: Tuple[int, int], radius: int) -> Tuple[Tuple[int, int], float]:
+        return self._grid.lowest_influence(center, radius)
+
+    def add_influence(self, points: List[Tuple[int, int]], value: float, distance: float):
+        self._grid.add_fading(points, value, 0, distance)
+
+    def add_influence_flat(self, points: List[Tuple[int, int]], value: float, distance: float):
+        self._grid.add_flat(points, value, 0, distance)
+
+    def add_walk_influence(self, points: List[Tuple[int, int]], value: float, distance: float):
+        self._grid.add_walk(points, value, distance)
+
+    def add_walk_influence_flat(self, points: List[Tuple[int, int]], value: float, distance: float):
+        self._grid.add_walk(points, value, distance, flat=True)
+
+    def find_low_inside_walk(self, start, target, distance) -> Tuple[Tuple[float, float], float]:
+        return self._grid.find_low_inside_walk(start, target, distance)
+
+
+class VisionUnit:
+    def __init__(self, detector: bool, flying: bool, position: Tuple[float, float], sight_range: float):
+        self.detector = detector
+        self.flying = flying
+        self.position = position
+        self.sight_range = sight_range
+
+
+class Map:
+    def __init__(self, pathing, placement, height_map, x_start: int, y_start: int, x_end: int, y_end: int):
+        pathing = np.asarray(pathing) > 0
+        placement = np.asarray(placement) > 0
+        self.height_map = np.asarray(height_map).astype(np.int16)
+
+        playable = np.zeros(pathing.shape, dtype=bool)
+        playable[x_start:x_end, y_start:y_end] = True
+        self.playable = playable
+
+        ground = (pathing | placement) & playable
+        self.ground_grid = InfluenceGrid(ground)
+        self.air_grid = InfluenceGrid(playable)
+        self.reaper_grid = InfluenceGrid(ground | (climbable(ground, 2) & playable))
+        self.colossus_grid = InfluenceGrid(ground | (climbable(ground, 3) & playable))
+
+        self.influence_colossus_map = False
+        self.influence_reaper_map = False
+
+        self.zones = np.zeros(pathing.shape, dtype=np.int16)
+        self.connections = np.zeros(pathing.shape, dtype=bool)
+        self.vision_units: List[VisionUnit] = []
+        self._vision_map = np.zeros(pathing.shape, dtype=np.uint8)
+        self._overlord_spots: Optional[List[Tuple[float, float]]] = None
+        self._chokes: Optional[List[Choke]] = None
+
+    # region Grids
+
+    @property
+    def all_grids(self) -> List[InfluenceGrid]:
+        return [self.ground_grid, self.air_grid, self.reaper_grid, self.colossus_grid]
+
+    def get_grid(self, map_type: int) -> InfluenceGrid:
+        if map_type == MAP_REAPER:
+            return self.reaper_grid
+        if map_type == MAP_COLOSSUS:
+            return self.colossus_grid
+        if map_type == MAP_AIR:
+            return self.air_grid
+        return self.ground_grid
+
+    def grids_for(self, maps_type: int) -> List[InfluenceGrid]:
+        grids: List[InfluenceGrid] = []
+        if maps_type in (MAPS_PURE_GROUND, MAPS_GROUND, MAPS_BOTH):
+            grids.append(self.ground_grid)
+            if self.influence_reaper_map:
+                grids.append(self.reaper_grid)
+        if maps_type in (MAPS_AIR, MAPS_BOTH):
+            grids.append(self.air_grid)
+        if maps_type != MAPS_PURE_GROUND and self.influence_colossus_map:
+            grids.append(self.colossus_grid)
+        return grids
+
+    def ground_grids(self) -> List[InfluenceGrid]:
+        return [self.ground_grid, self.reaper_grid, self.colossus_grid]
+
+    @property
+    def cells_touched(self) -> int:
+        return sum(grid.cells_touched for grid in self.all_grids)
+
+    @cells_touched.setter
+    def cells_touched(self, value: int):
+        for grid in self.all_grids:
+            grid.cells_touched = value
+
+    @property
+    def ground_pathing(self) -> List[List[int]]:
+        return self.ground_grid.values.astype(np.int64).tolist()
+
+    @property
+    def air_pathing(self) -> List[List[int]]:
+        return self.air_grid.values.astype(np.int64).tolist()
+
+    @property
+    def reaper_pathing(self) -> List[List[int]]:
+        return self.reaper_grid.values.astype(np.int64).tolist()
+
+    @property
+    def colossus_pathing(self) -> List[List[int]]:
+        return self.colossus_grid.values.astype(np.int64).tolist()
+
+    def reset(self):
+        for grid in self.all_grids:
+            grid.reset()
+
+    def normalize_influence(self, value: int):
+        for grid in self.all_grids:
+            grid.normalize(value)
+
+    def create_block(self, center: Tuple[float, float], size: Tuple[int, int]):
+        for grid in self.ground_grids():
+            grid.create_block(center, size)
+
+    def create_blocks(self, centers: List[Tuple[float, float]], size: Tuple[int, int]):
+        for center in centers:
+            self.create_block(center, size)
+
+    def remove_block(self, center: Tuple[float, float], size: Tuple[int, int]):
+        for grid in self.ground_grids():
+            grid.remove_block(center, size)
+
+    def remove_blocks(self, centers: List[Tuple[float, float]], size: Tuple[int, int]):
+        for center in centers:
+            self.remove_block(center, size)
+
+    # endregion
+
+    # region Influence
+
+    def add_influence_walk(self, points, influence: float, distance: float):
+        self.ground_grid.add_walk(points, influence, distance)
+
+    def add_influence_flat_hollow(self, points, influence: float, min_range: float, max_range: float):
+        for grid in self.grids_for(MAPS_PURE_GROUND):
+            grid.add_flat(points, influence, min_range, max_range)
+
+    def add_influence_fading(self, maps_type: int, points, influence: float, full_range: float,
+                             fade_max_range: float):
+        for grid in self.grids_for(int(maps_type)):
+            grid.add_fading(points, influence, full_range, fade_max_range)
+
+    def current_influence(self, map_type: int, position: Tuple[float, float]) -> float:
+        grid = self.get_grid(int(map_type))
+        x, y = int(position[0]), int(position[1])
+        if not grid.in_bounds(x, y):
+            return 0
+        return float(grid.values[x, y])
+
+    def add_influence_without_zones(self, zones: List[int], value: int):
+        outside = ~np.isin(self.zones, zones)
+        for grid in self.grids_for(MAPS_GROUND):
+            mask = outside & (grid.values > 0)
+            grid.values[mask] += value
+            grid.cells_touched += int(np.count_nonzero(mask))
+
+    # endregion
+
+    # region Path finding
+
+    def find_path(self, map_type: int, start: Tuple[float, float], end: Tuple[float, float], large: bool = False,
+                  influence: bool = False, heuristic_accuracy: int = 1, window=None, distance_from_target=None
+                  ) -> Tuple[List[Tuple[int, int]], float]:
+        start_int = (int(round(start[0])), int(round(start[1])))
+        end_int = (int(round(end[0])), int(round(end[1])))
+        if window is not None:
+            window = ((int(round(window[0][0])), int(round(window[0][1]))),
+                      (int(round(window[1][0])), int(round(window[1][1]))))
+        return self.get_grid(int(map_type)).find_path(start_int, end_int, large, influence, window,
+                                                      distance_from_target)
+
+    def lowest_influence_walk(self, map_type: int, center: Tuple[float, float], walk_distance: float):
+        center_int = (int(round(center[0])), int(round(center[1])))
+        return self.get_grid(int(map_type)).lowest_influence_walk(center_int, walk_distance)
+
+    def lowest_influence(self, map_type: int, center: Tuple[float, float], radius: int):
+        center_int = (int(round(center[0])), int(round(center[1])))
+        return self.get_grid(int(map_type)).lowest_influence(center_int, radius)
+
+    def find_low_inside_walk(self, map_type: int, start, target, distance):
+        return self.get_grid(int(map_type)).find_low_inside_walk(start, target, distance)
+
+    # endregion
+
+    # region Zones and connections
+
+    def calculate_zones(self, sorted_base_locations: List[Tuple[float, float]]):
+        self.zones[:] = 0
+        pathable = self.ground_grid.original > 0
+        graph, node_index = grid_graph(pathable)
+        sources = []
+        source_zones = []
+
+        for i, location in enumerate(sorted_base_locations):
+            cell = self.ground_grid.nearest_pathable((int(location[0]), int(location[1])), 5)
+            if cell is not None and node_index[cell] >= 0:
+                sources.append(node_index[cell])
+                source_zones.append(i + 1)
+
+        if not sources:
+            return
+
+        distances, _, closest = dijkstra(
+            graph, directed=False, indices=sources, min_only=True, limit=ZONE_MAX_DISTANCE,
+            return_predecessors=True
+        )
+        source_to_zone = np.zeros(graph.shape[0], dtype=np.int16)
+        source_heights = np.zeros(graph.shape[0], dtype=np.int16)
+        cells = np.argwhere(pathable)
+
+        for source, zone in zip(sources, source_zones):
+            source_to_zone[source] = zone
+            source_heights[source] = self.height_map[tuple(cells[source])]
+
+        reached = closest >= 0
+        node_zones = np.zeros(graph.shape[0], dtype=np.int16)
+        node_zones[reached] = source_to_zone[closest[reached]]
+        heights = self.height_map[cells[:, 0], cells[:, 1]]
+        same_level = np.zeros(graph.shape[0], dtype=bool)
+        same_level[reached] = np.abs(heights[reached] - source_heights[closest[reached]]) <= ZONE_MAX_HEIGHT_DIFFERENCE
+        node_zones[~same_level] = 0
+        self.zones[cells[:, 0], cells[:, 1]] = node_zones
+
+    def get_zone(self, position: Tuple[float, float]) -> int:
+        x, y = int(position[0]), int(position[1])
+        if 0 <= x < self.zones.shape[0] and 0 <= y < self.zones.shape[1]:
+            return int(self.zones[x, y])
+        return 0
+
+    def calculate_connections(self, start: Tuple[float, float]):
+        labels, _ = ndimage.label(self.ground_grid.values > 0, structure=EIGHT_CONNECTED)
+        cell = self.ground_grid.nearest_pathable((int(start[0]), int(start[1])))
+        if cell is None:
+            self.connections[:] = False
+            return
+        self.connections = labels == labels[cell]
+
+    def is_connected(self, position: Tuple[float, float]) -> bool:
+        x, y = int(position[0]), int(position[1])
+        if 0 <= x < self.connections.shape[0] and 0 <= y < self.connections.shape[1]:
+            return bool(self.connections[x, y])
+        return False
+
+    def remove_connection(self, position: Tuple[float, float]) -> bool:
+        x, y = int(position[0]), int(position[1])
+        was_connected = self.is_connected(position)
+        self.connections[max(0, x - 1) : x + 2, max(0, y - 1) : y + 2] = False
+        return was_connected
+
+    # endregion
+
+    # region Terrain analysis
+
+    @property
+    def chokes(self) -> List[Choke]:
+        if self._chokes is None:
+            self._chokes = find_chokes(self.ground_grid.original > 0)
+        return self._chokes
+
+    @property
+    def overlord_spots(self) -> List[Tuple[float, float]]:
+        if self._overlord_spots is None:
+            self._overlord_spots = self._calculate_overlord_spots()
+        return self._overlord_spots
+
+    def _calculate_overlord_spots(self) -> List[Tuple[float, float]]:
+        """Centers of large unpathable areas inside the playable area, such as high ground pillars and chasms."""
+        unpathable = self.playable & (self.ground_grid.original <= 0)
+        labels, count = ndimage.label(unpathable, structure=EIGHT_CONNECTED)
+        if count == 0:
+            return []
+        depth = ndimage.distance_transform_edt(unpathable)
+        areas = ndimage.sum(unpathable, labels, index=np.arange(1, count + 1))
+        spots = ndimage.maximum_position(depth, labels, index=np.arange(1, count + 1))
+        return [
+            (spot[0] + 0.5, spot[1] + 0.5) for spot, area in zip(spots, areas) if area >= OVERLORD_SPOT_MIN_AREA
+        ]
+
+    # endregion
+
+    # region Vision
+
+    def clear_vision(self):
+        self.vision_units.clear()
+
+    def add_vision_unit(self, unit: VisionUnit):
+        self.vision_units.append(unit)
+
+    def calculate_vision_map(self):
+        vision = np.zeros(self.ground_grid.values.shape, dtype=np.uint8)
+        width, height = vision.shape
+
+        for unit in self.vision_units:
+            x, y = unit.position[0], unit.position[1]
+            r = unit.sight_range
+            x0, y0 = max(0, int(x - r)), max(0, int(y - r))
+            x1, y1 = min(width, int(x + r) + 1), min(height, int(y + r) + 1)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            xs = np.arange(x0, x1) + 0.5 - x
+            ys = np.arange(y0, y1) + 0.5 - y
+            seen = np.hypot(xs[:, None], ys[None, :]) <= r
+
+            if not unit.flying:
+                ux = min(width - 1, max(0, int(x)))
+                uy = min(height - 1, max(0, int(y)))
+                # Ground units can't see to higher ground
+                seen &= self.height_map[x0:x1, y0:y1] <= self.height_map[ux, uy] + ZONE_MAX_HEIGHT_DIFFERENCE
+
+            area = vision[x0:x1, y0:y1]
+            np.maximum(area, seen.astype(np.uint8) * (2 if unit.detector else 1), out=area)
+
+        self._vision_map = vision
+
+    @property
+    def vision_map(self) -> List[List[int]]:
+        return self._vision_map.tolist()
+
+    def vision_status(self, position: Tuple[float, float]) -> int:
+        x, y = int(position[0]), int(position[1])
+        if 0 <= x < self._vision_map.shape[0] and 0 <= y < self._vision_map.shape[1]:
+            return int(self._vision_map[x, y])
+        return 0
+
+    def add_influence_to_vision(self, map_type: int, seen_value: int, detection_value: int):
+        grid = self.get_grid(int(map_type))
+        pathable = grid.values > 0
+        grid.values[pathable & (self._vision_map == 1)] += seen_value
+        grid.values[pathable & (self._vision_map == 2)] += detection_value
+
+    # endregion
+
+    # region Drawing
+
+    def draw_climbs(self) -> np.ndarray:
+        ground = self.ground_grid.values > 0
+        image = ground.astype(np.uint8)
+        image[(self.reaper_grid.values > 0) & ~ground] = 2
+        image[(self.colossus_grid.values > 0) & ~ground & ~(self.reaper_grid.values > 0)] = 3
+        return image
+
+    def draw_chokes(self) -> np.ndarray:
+        image = (self.ground_grid.values > 0).astype(np.uint8) * 100
+        for choke in self.chokes:
+            for pixel in choke.pixels:
+                image[pixel] = 200
+        return image
+
+    def draw_zones(self) -> np.ndarray:
+        return (self.zones * 20 % 255).astype(np.uint8)
+
+    # endregion
+
+
+def grid_graph(values: np.ndarray, influence: bool = False, normal_influence: float = 1) -> Tuple[csr_matrix, np.ndarray]:
+    """
+    Creates a directed 8-connected graph of pathable cells without corner cutting.
+    Moving to a cell costs the step length, multiplied by cell value / normal_influence when influence is used.
+    Returns the graph and an array that maps cell [x, y] to node index, -1 for unpathable cells.
+    """
+    pathable = values > 0
+    width, height = pathable.shape
+    node_index = np.full(pathable.shape, -1, dtype=np.int64)
+    node_index[pathable] = np.arange(np.count_nonzero(pathable))
+    rows = []
+    cols = []
+    weights = []
+
+    for dx, dy, step in ((1, 0, 1.0), (0, 1, 1.0), (1, 1, SQRT2), (1, -1, SQRT2)):
+        x_from = slice(0, width - dx)
+        x_to = slice(dx, width)
+        if dy >= 0:
+            y_from = slice(0, height - dy)
+            y_to = slice(dy, height)
+        else:
+            y_from = slice(-dy, height)
+            y_to = slice(0, height + dy)
+
+        valid = pathable[x_from, y_from] & pathable[x_to, y_to]
+        if dx and dy:
+            # No cutting corners
+            valid &= pathable[x_to, y_from] & pathable[x_from, y_to]
+
+        a = node_index[x_from, y_from][valid]
+        b = node_index[x_to, y_to][valid]
+        if influence:
+            weight_to_b = step * values[x_to, y_to][valid] / normal_influence
+            weight_to_a = step * values[x_from, y_from][valid] / normal_influence
+        else:
+            weight_to_b = weight_to_a = np.full(len(a), step)
+
+        rows.extend((a, b))
+        cols.extend((b, a))
+        weights.extend((weight_to_b, weight_to_a))
+
+    count = int(np.count_nonzero(pathable))
+    graph = csr_matrix((np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))), shape=(count, count))
+    return graph, node_index
+
+
+def nearest_cell(valid: np.ndarray, position: Tuple[float, float], radius: int = 3) -> Optional[Tuple[int, int]]:
+    """Closest cell to position where valid is True, within radius."""
+    x, y = int(position[0]), int(position[1])
+    width, height = valid.shape
+    if 0 <= x < width and 0 <= y < height and valid[x, y]:
+        return x, y
+
+    best = None
+    best_distance = math.inf
+
+    for dx in range(-radius, radius + 1):
+        for dy in range(-radius, radius + 1):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and valid[nx, ny]:
+                distance = dx * dx + dy * dy
+                if distance < best_distance:
+                    best_distance = distance
+                    best = (nx, ny)
+    return best
+
+
+def run_lengths(pathable: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    """Number of consecutive pathable cells that end at each cell when moving in direction dx, dy."""
+    if dx == 0:
+        return run_lengths(pathable.T, dy, dx).T
+
+    width, height = pathable.shape
+    runs = np.zeros(pathable.shape, dtype=np.int32)
+    previous = np.zeros(height, dtype=np.int32)
+    for x in range(width) if dx > 0 else range(width - 1, -1, -1):
+        shifted = np.zeros(height, dtype=np.int32)
+        if dy > 0:
+            shifted[1:] = previous[:-1]
+        elif dy < 0:
+            shifted[:-1] = previous[1:]
+        else:
+            shifted = previous
+        runs[x] = pathable[x] * (shifted + 1)
+        previous = runs[x]
+    return runs
+
+
+def walls_connected(
+    pathable: np.ndarray, line: Tuple[Tuple[int, int], Tuple[int, int]], max_distance: float
+) -> bool:
+    """Whether the unpathable cells at the ends of the line are within max_distance through unpathable cells."""
+    (x1, y1), (x2, y2) = line
+    reach = int(math.ceil(max_distance))
+    x0 = max(0, min(x1, x2) - reach)
+    y0 = max(0, min(y1, y2) - reach)
+    window = (slice(x0, max(x1, x2) + reach + 1), slice(y0, max(y1, y2) + reach + 1))
+    graph, node_index = grid_graph(~pathable[window])
+    distances = dijkstra(graph, indices=node_index[x1 - x0, y1 - y0], limit=max_distance)
+    return bool(np.isfinite(distances[node_index[x2 - x0, y2 - y0]]))
+
+
+def find_chokes(pathable: np.ndarray) -> List[Choke]:
+    """
+    Finds narrow passages between unpathable cells.
+
+    Every pathable cell is measured in 4 directions for the gap between the unpathable cells on both sides.
+    Cells where the narrowest gap is at most CHOKE_MAX_WIDTH and some other direction is at least
+    CHOKE_MIN_OPENING times wider are choke cells, and connected choke cells form a choke.
+    The main line of a choke goes through its narrowest gap, between the unpathable cells on both sides.
+    Corners also have narrow gaps, so chokes are only kept when the unpathable cells at the ends of the main line
+    are not close to each other through unpathable cells.
+    """
+    width, height = pathable.shape
+    directions = ((1, 0, 1.0), (0, 1, 1.0), (1, 1, SQRT2), (1, -1, SQRT2))
+    gaps = np.full((len(directions), width, height), np.inf)
+    backs = np.zeros((len(directions), width, height), dtype=np.int32)
+    forwards = np.zeros((len(directions), width, height), dtype=np.int32)
+    xs, ys = np.indices(pathable.shape)
+
+    for i, (dx, dy, step) in enumerate(directions):
+        back = run_lengths(pathable, dx, dy)
+        forward = run_lengths(pathable, -dx, -dy)
+        # Passages that continue to the edge of the map are not closed from both sides
+        closed = (
+            (xs - back * dx >= 0)
+            & (xs - back * dx < width)
+            & (ys - back * dy >= 0)
+            & (ys - back * dy < height)
+            & (xs + forward * dx >= 0)
+            & (xs + forward * dx < width)
+            & (ys + forward * dy >= 0)
+            & (ys + forward * dy < height)
+        )
+        gaps[i] = np.where(pathable & closed, (back + forward - 1) * step, np.inf)
+        backs[i] = back
+        forwards[i] = forward
+
+    narrowest = gaps.argmin(axis=0)
+    min_gap = gaps.min(axis=0)
+    max_gap = gaps.max(axis=0)
+    choke_cells = pathable & (min_gap <= CHOKE_MAX_WIDTH) & (max_gap >= CHOKE_MIN_OPENING * min_gap)
+
+    labels, count = ndimage.label(choke_cells, structure=EIGHT_CONNECTED)
+    chokes: List[Choke] = []
+
+    for label, area in enumerate(ndimage.find_objects(labels), start=1):
+        cells = np.argwhere(labels[area] == label) + (area[0].start, area[1].start)
+        if len(cells) < CHOKE_MIN_CELLS:
+            continue
+
+        cell_gaps = min_gap[cells[:, 0], cells[:, 1]]
+        corners: Dict[Tuple[Tuple[int, int], Tuple[int, int]], bool] = {}
+        candidates = []
+        for x, y in cells[np.argsort(cell_gaps, kind="stable")]:
+            i = narrowest[x, y]
+            dx, dy, _ = directions[i]
+            back = backs[i, x, y]
+            forward = forwards[i, x, y]
+            line = ((int(x - back * dx), int(y - back * dy)), (int(x + forward * dx), int(y + forward * dy)))
+            if line not in corners:
+                gap = float(min_gap[x, y])
+                if candidates and gap > candidates[0][1] + 1:
+                    break
+                corners[line] = walls_connected(pathable, line, CHOKE_MIN_OPENING * gap + 2)
+                if not corners[line]:
+                    candidates.append((line, gap))
+
+        if not candidates:
+            continue
+        lines = [line for line, _ in candidates]
+        (x1, y1), (x2, y2) = lines[0]
+
+        side1 = []
+        side2 = []
+        # Window around the choke with room for the border cells
+        x0 = max(0, area[0].start - 1)
+        y0 = max(0, area[1].start - 1)
+        window = (slice(x0, area[0].stop + 1), slice(y0, area[1].stop + 1))
+        inside = labels[window] == label
+        border = ndimage.binary_dilation(inside, structure=EIGHT_CONNECTED) & pathable[window] & ~inside
+        for x, y in (np.argwhere(border) + (x0, y0)).tolist():
+            # Sides are separated by the main line
+            if (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1) > 0:
+                side1.append((x, y))
+            else:
+                side2.append((x, y))
+
+        choke = Choke()
+        choke.main_line = ((x1 + 0.5, y1 + 0.5), (x2 + 0.5, y2 + 0.5))
+        choke.lines = lines
+        choke.side1 = side1
+        choke.side2 = side2
+        choke.pixels = [(int(x), int(y)) for x, y in cells]
+        choke.min_length = candidates[0][1]
+        chokes.append(choke)
+
+    return chokes
@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+import pytest
+
+from .fallback import InfluenceGrid, Map, PathFind, find_chokes
+
+
+def two_rooms(gap_width: int = 3) -> np.ndarray:
+    """20x10 room [x][y] split by a wall at x = 10 with a gap in the middle of the wall."""
+    pathable = np.zeros((22, 12), dtype=bool)
+    pathable[1:21, 1:11] = True
+    pathable[10, :] = False
+    gap_start = 6 - gap_width // 2
+    pathable[10, gap_start : gap_start + gap_width] = True
+    return pathable
+
+
+class TestFindPath:
+    def test_straight_path(self):
+        grid = InfluenceGrid(two_rooms())
+        path, distance = grid.find_path((2, 2), (8, 2))
+        assert path[0] == (2, 2) and path[-1] == (8, 2)
+        assert distance == pytest.approx(6)
+
+    def test_path_goes_through_gap(self):
+        grid = InfluenceGrid(two_rooms())
+        path, distance = grid.find_path((5, 6), (15, 6))
+        assert (10, 6) in path
+        assert distance == pytest.approx(10)
+
+    def test_large_unit_does_not_fit_narrow_gap(self):
+        path_finder = PathFind(two_rooms(1).astype(int).tolist())
+        assert path_finder.find_path((5, 6), (15, 6))[0]
+        assert path_finder.find_path((5, 6), (15, 6), large=True) == ([], 0.0)
+
+    def test_influence_makes_path_avoid_cells(self):
+        grid = InfluenceGrid(two_rooms())
+        grid.add_flat([(8.5, 6.5)], 100, 0, 1.5)
+        path, _ = grid.find_path((5, 6), (15, 6), influence=True)
+        assert (8, 6) not in path
+        assert (10, 6) not in path or (9, 6) not in path
+
+
+class TestInfluence:
+    def test_walk_influence_fades_with_walking_distance(self):
+        grid = InfluenceGrid(two_rooms())
+        grid.add_walk([(5.5, 6.5)], 10, 4)
+        assert grid.values[5, 6] == pytest.approx(11)
+        assert grid.values[7, 6] == pytest.approx(6)
+        assert grid.values[9, 6] == 1
+        assert grid.values[10, 10] == 0
+
+    def test_walk_influence_does_not_go_through_walls(self):
+        grid = InfluenceGrid(two_rooms())
+        grid.add_walk([(9.5, 2.5)], 10, 3, flat=True)
+        # Cell behind the wall is close, but the walk around the wall is long
+        assert grid.values[11, 2] == 1
+        assert grid.values[8, 2] == 11
+        assert grid.cells_touched == np.count_nonzero(grid.values > 1)
+
+    def test_walk_distances_match_steps(self):
+        grid = InfluenceGrid(two_rooms())
+        area, distances = grid.walk_distances((2, 2), 5)
+        assert distances[3 - area[0].start, 2 - area[1].start] == pytest.approx(1)
+        assert distances[5 - area[0].start, 5 - area[1].start] == pytest.approx(3 * math.sqrt(2))
+        assert np.isinf(distances[0 - area[0].start, 0 - area[1].start])
+
+    def test_lowest_influence_walk(self):
+        grid = InfluenceGrid(two_rooms())
+        grid.add_fading([(5, 6)], 10, 0, 6)
+        cell, value = grid.lowest_influence_walk((5, 6), 5)
+        assert value == grid.values[cell]
+        assert value < grid.values[6, 6]
+        assert math.hypot(cell[0] - 5, cell[1] - 6) <= 5
+
+
+class TestMap:
+    def create_map(self, height_split: bool = False) -> Map:
+        pathable = two_rooms()
+        heights = np.full(pathable.shape, 100)
+        if height_split:
+            heights[11:, :] = 150
+        return Map(pathable, np.zeros(pathable.shape), heights, 1, 1, 21, 11)
+
+    def test_zones_by_closest_base(self):
+        game_map = self.create_map()
+        game_map.calculate_zones([(4, 6), (16, 6)])
+        assert game_map.get_zone((3, 3)) == 1
+        assert game_map.get_zone((18, 9)) == 2
+        assert game_map.get_zone((10, 0)) == 0
+
+    def test_zones_do_not_cross_height_levels(self):
+        game_map = self.create_map(height_split=True)
+        game_map.calculate_zones([(4, 6)])
+        assert game_map.get_zone((9, 6)) == 1
+        assert game_map.get_zone((12, 6)) == 0
+
+    def test_chokes(self):
+        chokes = self.create_map().chokes
+        assert len(chokes) == 1
+        choke = chokes[0]
+        assert choke.min_length == 3
+        assert (10, 6) in choke.pixels
+        (x1, y1), (x2, y2) = choke.main_line
+        assert x1 == x2 == 10.5
+        assert {y1, y2} == {4.5, 8.5}
+        assert choke.side1 and choke.side2
+
+
+class TestFindChokes:
+    def test_open_area_has_no_chokes(self):
+        pathable = np.zeros((30, 30), dtype=bool)
+        pathable[1:29, 1:29] = True
+        assert find_chokes(pathable) == []
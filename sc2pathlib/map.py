@@ -1,6 +1,6 @@
 # noinspection PyUnresolvedReferences
-from .sc2pathlib import VisionUnit
-from .sc2pathlib import Map
+from .backend import VisionUnit
+from .backend import Map
 import numpy as np
 from typing import List, Optional, Tuple, Union
 from .choke import Choke
@@ -74,6 +74,26 @@ class Sc2Map:
         """
         return self._map.get_zone(position)
 
+    def zone_grid(self) -> np.ndarray:
+        """
+        Zone of every cell as int16 [x][y] array, so zones of many positions can be looked up at once.
+        Zones start from 1 onwards.
+        Zone 0 is empty zone.
+
+        The compiled backend doesn't expose its zone array, so with it the grid is built with one get_zone call
+        per cell, which takes tens of milliseconds on a full size map. Call this once after `calculate_zones`
+        and keep the result instead of calling it every frame.
+        """
+        zones = getattr(self._map, "zones", None)
+        if zones is not None:
+            return np.array(zones, dtype=np.int16)
+
+        height, width = self.height_map.shape
+        get_zone = self._map.get_zone
+        cells = ((x, y) for x in range(width) for y in range(height))
+        zones = np.fromiter((get_zone(cell) for cell in cells), dtype=np.int16, count=width * height)
+        return zones.reshape((width, height))
+
     def calculate_connections(self, start: Tuple[float, float]):
         """
         Calculates ground connections to a single point in the map.
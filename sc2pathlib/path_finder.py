@@ -1,4 +1,4 @@
-from .sc2pathlib import PathFind
+from .backend import PathFind
 
 import numpy as np
 from typing import Union, List, Tuple, Optional
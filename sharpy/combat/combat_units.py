@@ -1,36 +1,102 @@
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
 from sharpy import sc2math
-from sharpy.general.extended_power import ExtendedPower
+from sharpy.combat.engagement import Engagement, RangeArrays
+from sharpy.general.extended_power import ExtendedPower, PowerValues
 
 from sc2.unit import Unit
 from sc2.units import Units
 
 
 class CombatUnits:
-    def __init__(self, units: Units, knowledge: "Knowledge"):
+    """
+    Group of units that fight together.
+
+    Groups made by GroupCombatManager keep their identity across frames, `update` only recalculates power of units that
+    joined, left or changed health, and the center is solved starting from the previous center.
+    Speed is recalculated every update, as it depends on creep under the unit and game time.
+    """
+
+    def __init__(self, units: Units, knowledge: "Knowledge", group_id: int = -1):
         self.knowledge = knowledge
+        # Id of the group that stays the same across frames, -1 if the group is not tracked
+        self.group_id = group_id
         self.unit_values = knowledge.unit_values
+        self.power = ExtendedPower(self.unit_values)
+        self.debug_index = 0
+        self.average_speed = 0
+        self._median: Optional[np.ndarray] = None
+        # tag: ((type, health, max health), power of the unit)
+        self._unit_powers: Dict[int, Tuple[Tuple[UnitTypeId, float, float], PowerValues]] = {}
+        self.update(units)
+
+    def update(self, units: Units):
+        """Updates the group to contain units of the current frame."""
         self.units = units
-        self.center: Point2 = sc2math.unit_geometric_median(units)
+        self._total_distance: Optional[float] = None
+        self._area_by_circles: float = 0
+        self._range_arrays: Optional[RangeArrays] = None
+
+        if units:
+            positions = np.array([unit.position for unit in units])
+            self._median = sc2math.geometric_median(positions, 0.5, self._median)
+            self.center: Point2 = Point2(self._median)
+        else:
+            self._median = None
+            self.center = Point2((0, 0))
+
         self.ground_units = self.units.not_flying
         if self.ground_units:
             self.center: Point2 = self.ground_units.closest_to((self.center)).position
 
-        self.power = ExtendedPower(self.unit_values)
-        self.power.add_units(self.units)
-        self.debug_index = 0
-        self._total_distance: Optional[float] = None
-        self._area_by_circles: float = 0
-        self.average_speed = 0
+        self._update_power()
+        self._update_speed()
+
+    def _update_power(self):
+        old_powers = self._unit_powers
+        new_powers = {}
 
         for unit in self.units:
-            self.average_speed += knowledge.unit_values.real_speed(unit)
+            key = (unit.type_id, unit.health + unit.shield, unit.health_max + unit.shield_max)
+            old = old_powers.pop(unit.tag, None)
+            if old is not None and old[0] == key:
+                new_powers[unit.tag] = old
+                continue
+
+            if old is not None:
+                self.power.substract_values(old[1])
+            unit_power = self.unit_values.power_values(unit)
+            self.power.add_values(unit_power)
+            new_powers[unit.tag] = (key, unit_power)
+
+        for key, unit_power in old_powers.values():
+            # Units that left the group
+            self.power.substract_values(unit_power)
+
+        if not new_powers:
+            # Don't let rounding errors accumulate
+            self.power.clear()
+        self._unit_powers = new_powers
+
+    def _update_speed(self):
+        total_speed = 0
+        for unit in self.units:
+            total_speed += self.unit_values.real_speed(unit)
 
+        self.average_speed = total_speed
         if len(self.units) > 1:
             self.average_speed /= len(self.units)
 
+    @property
+    def range_arrays(self) -> RangeArrays:
+        """Positions and ranges of the units as arrays, calculated once per update."""
+        if self._range_arrays is None:
+            self._range_arrays = RangeArrays(self.unit_values, self.units)
+        return self._range_arrays
+
     def is_too_spread_out(self) -> bool:
         if self._total_distance is None:
             self._total_distance = 0
@@ -59,20 +125,12 @@ class CombatUnits:
         ):
             return True
 
-        engaged_power = 0
-        total_power = 0
-
-        for unit in self.units:  # type: Unit
-            power = self.unit_values.power(unit)
-            total_power += power
-
-            for enemy_near in closest_enemies.units:
-                d = enemy_near.distance_to(unit)
-                if d < self.unit_values.real_range(unit, enemy_near):
-                    engaged_power += power
-                    break
-
-        return engaged_power > total_power * 0.15
+        engagement = Engagement(self.range_arrays, closest_enemies.range_arrays)
+        powers = np.fromiter(
+            (self._unit_powers[unit.tag][1].power for unit in self.units), dtype=float, count=len(self.units)
+        )
+        engaged_power = powers[engagement.can_engage].sum()
+        return engaged_power > powers.sum() * 0.15
 
     def closest_target_group(self, combat_groups: List["CombatUnits"]) -> Optional["CombatUnits"]:
         group = None
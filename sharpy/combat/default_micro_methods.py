@@ -1,6 +1,6 @@
-from typing import List, Optional, Dict, Callable
+from typing import List, Optional, Dict
 
-from sc2.data import Race
+import numpy as np
 from sc2.ids.ability_id import AbilityId
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
@@ -8,22 +8,12 @@ from sc2.unit import Unit
 from sc2.units import Units
 from sharpy.general.extended_power import ExtendedPower
 from sharpy.combat import CombatUnits, MoveType, MicroStep, Action
+from sharpy.combat.engagement import Engagement
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from sharpy.combat.group_combat_manager import GroupCombatManager
 
-ignored_types = {UnitTypeId.LARVA, UnitTypeId.EGG}
-
-changelings = {
-    UnitTypeId.CHANGELING,
-    UnitTypeId.CHANGELINGMARINE,
-    UnitTypeId.CHANGELINGMARINESHIELD,
-    UnitTypeId.CHANGELINGZEALOT,
-    UnitTypeId.CHANGELINGZERGLING,
-    UnitTypeId.CHANGELINGZERGLINGWINGS,
-}
-
 
 class DefaultMicroMethods:
     @staticmethod
@@ -123,46 +113,20 @@ class DefaultMicroMethods:
 
         step.engaged_power.add_units(step.enemies_near_by)
 
-        engage_count = 0
-        can_engage_count = 0
-        step.attack_range = 0
-        step.enemy_attack_range = 0
-        attack_range_count = 0
-        enemy_attack_range_count = 0
+        engagement = Engagement.from_units(step.unit_values, units, step.enemies_near_by)
+        step.attack_range = engagement.attack_range
+        step.enemy_attack_range = engagement.enemy_attack_range
 
-        for unit in units:
-            closest_distance = 1000
+        for index, unit in enumerate(units):
             if step.ready_to_shoot(unit):
                 ready_to_attack += 1
 
-            engage_added = False
-            can_engage_added = False
-            for enemy_near in step.enemies_near_by:  # type: Unit
-                d = enemy_near.distance_to(unit)
-                if d < closest_distance:
-                    step.closest_units[unit.tag] = enemy_near
-                    closest_distance = d
-
-                att_range = step.unit_values.real_range(enemy_near, unit)
-                step.enemy_attack_range += att_range
-                enemy_attack_range_count += 1
-                if not engage_added and d < att_range:
-                    engage_count += 1
-                    engage_added = True
-
-                att_range = step.unit_values.real_range(unit, enemy_near)
-                step.attack_range += att_range
-                attack_range_count += 1
+            closest = engagement.closest[index]
+            if closest >= 0:
+                step.closest_units[unit.tag] = step.enemies_near_by[closest]
 
-                if not can_engage_added and d < att_range:
-                    can_engage_count += 1
-                    can_engage_added = True
-
-        if attack_range_count > 0:
-            step.attack_range = step.attack_range / attack_range_count
-
-        if enemy_attack_range_count > 0:
-            step.enemy_attack_range = step.enemy_attack_range / enemy_attack_range_count
+        engage_count = int(np.count_nonzero(engagement.engaged))
+        can_engage_count = int(np.count_nonzero(engagement.can_engage))
 
         step.ready_to_attack_ratio = ready_to_attack / len(units)
         step.engage_ratio = engage_count / len(units)
@@ -172,78 +136,8 @@ class DefaultMicroMethods:
     def focus_fire(
         step: MicroStep, unit: Unit, current_command: Action, prio: Optional[Dict[UnitTypeId, int]]
     ) -> Action:
-        shoot_air = step.unit_values.can_shoot_air(unit)
-        shoot_ground = step.unit_values.can_shoot_ground(unit)
-
-        lookup = step.min_range(unit) + 3
-        enemies = step.cache.enemy_in_range(unit.position, lookup)
-
-        last_target = step.last_targeted(unit)
-
-        if step.move_type == MoveType.Push:
-            # If MoveType.Push don't attack anything behind us unless it's in range.
-            distance_to_target = unit.distance_to(current_command.target)
-
-            def valid_push_target(enemy):
-                if enemy.is_flying:
-                    r = step.unit_values.air_range(unit)
-                else:
-                    r = step.unit_values.ground_range(unit)
-                behind = enemy.distance_to(current_command.target) > distance_to_target
-                return not behind or enemy.distance_to(unit) <= r
-
-            # If we're in range of the target we can attack behind
-            if distance_to_target > lookup - 3:
-                enemies = enemies.filter(valid_push_target)
-
-        if not enemies:
-            # No enemies to shoot at
-            return current_command
-
-        value_func: Callable[[Unit], float]
-        if prio:
-            value_func = (
-                lambda u: 1 if u.type_id in changelings else prio.get(u.type_id, -1) * (1 - u.shield_health_percentage)
-            )
-        else:
-            value_func = (
-                lambda u: 1
-                if u.type_id in changelings
-                else 2 * step.unit_values.power_by_type(u.type_id, 1 - u.shield_health_percentage)
-            )
-
-        best_target: Optional[Unit] = None
-        best_score: float = 0
-        for enemy in enemies:  # type: Unit
-            if enemy.type_id in ignored_types:
-                continue
-
-            if not step.is_target(enemy):
-                continue
-
-            if not shoot_air and enemy.is_flying:
-                continue
-
-            if not shoot_ground and not enemy.is_flying:
-                continue
-
-            pos: Point2 = enemy.position
-            score = value_func(enemy) + (1 - pos.distance_to(unit) / lookup)
-            if enemy.tag == last_target:
-                score += 3
-
-            if step.focus_fired.get(enemy.tag, 0) > enemy.health:
-                score *= 0.1
-
-            if score > best_score:
-                best_target = enemy
-                best_score = score
-
+        best_target = step.target_assignment.target(unit, current_command, prio, False)
         if best_target:
-            step.focus_fired[best_target.tag] = (
-                step.focus_fired.get(best_target.tag, 0) + unit.calculate_damage_vs_target(best_target)[0]
-            )
-
             return Action(best_target, True)
 
         return current_command
@@ -252,67 +146,8 @@ class DefaultMicroMethods:
     def melee_focus_fire(
         step: MicroStep, unit: Unit, current_command: Action, prio: Optional[Dict[UnitTypeId, int]]
     ) -> Action:
-        ground_range = step.unit_values.ground_range(unit)
-        lookup = ground_range + 3
-        enemies = step.cache.enemy_in_range(unit.position, lookup)
-
-        last_target = step.last_targeted(unit)
-
-        if not enemies:
-            # No enemies to shoot at
-            return current_command
-
-        def melee_value(u: Unit):
-            val = 1 - u.shield_health_percentage
-            range = step.unit_values.real_range(unit, u)
-            if unit.distance_to(u) < range:
-                val += 2
-            if step.knowledge.enemy_race == Race.Terran and unit.is_structure and unit.build_progress < 1:
-                # if building isn't finished, focus on the possible scv instead
-                val -= 2
-            return val
-
-        value_func = melee_value
-        close_enemies = step.cache.enemy_in_range(unit.position, lookup)
-
-        if step.move_type == MoveType.Push:
-            # If Push, ignore targets behind us, unless we can hit them right now.
-            distance_to_target = unit.distance_to(current_command.target)
-
-            def valid_push_target(enemy):
-                if enemy.is_flying:
-                    return False
-                r = step.unit_values.ground_range(unit) + unit.radius + enemy.radius
-                behind = enemy.distance_to(current_command.target) > distance_to_target
-                return not behind or enemy.distance_to(unit) <= r
-
-            if distance_to_target > 3:
-                close_enemies = close_enemies.filter(valid_push_target)
-
-        best_target: Optional[Unit] = None
-        best_score: float = 0
-
-        for enemy in close_enemies:  # type: Unit
-            if enemy.type_id in ignored_types:
-                continue
-
-            if enemy.is_flying:
-                continue
-
-            pos: Point2 = enemy.position
-            score = value_func(enemy) + (1 - pos.distance_to(unit) / lookup)
-            if enemy.tag == last_target:
-                score += 1
-
-            if step.focus_fired.get(enemy.tag, 0) > enemy.health:
-                score *= 0.1
-
-            if score > best_score:
-                best_target = enemy
-                best_score = score
-
+        best_target = step.target_assignment.target(unit, current_command, prio, True)
         if best_target:
-            step.focus_fired[best_target.tag] = step.focus_fired.get(best_target.tag, 0)
             return Action(best_target, True)
 
         return current_command
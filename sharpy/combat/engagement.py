@@ -0,0 +1,81 @@
+from typing import List, TYPE_CHECKING
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+from sc2.ids.buff_id import BuffId
+from sc2.unit import Unit
+
+if TYPE_CHECKING:
+    from sharpy.managers.core import UnitValue
+
+# Enemies further away than this are never counted as closest enemies
+MAX_CLOSEST_DISTANCE = 1000
+
+
+class RangeArrays:
+    """Positions, ranges and radiuses of units as arrays for calculating ranges between all pairs of units."""
+
+    def __init__(self, unit_values: "UnitValue", units: List[Unit]):
+        count = len(units)
+        self.count = count
+
+        if count > 0:
+            self.positions = np.array([unit.position for unit in units], dtype=float)
+            ranges = np.array([unit_values.ranges(unit) for unit in units], dtype=float)
+        else:
+            self.positions = np.empty((0, 2))
+            ranges = np.empty((0, 2))
+
+        self.ground_range = ranges[:, 0]
+        self.air_range = ranges[:, 1]
+        self.radius = np.fromiter((unit.radius for unit in units), dtype=float, count=count)
+        self.is_flying = np.fromiter(
+            (unit.is_flying or unit.has_buff(BuffId.GRAVITONBEAM) for unit in units), dtype=bool, count=count
+        )
+
+    def real_ranges(self, other: "RangeArrays") -> np.ndarray:
+        """
+        Returns matrix of real ranges of these units against the other units, same as UnitValue.real_range.
+        Row is the index of the unit and column is the index of the other unit.
+        """
+        ranges = np.where(
+            other.is_flying[np.newaxis, :], self.air_range[:, np.newaxis], self.ground_range[:, np.newaxis]
+        )
+        radiuses = self.radius[:, np.newaxis] + other.radius[np.newaxis, :]
+        return np.where(ranges > 0, ranges + radiuses, ranges)
+
+
+class Engagement:
+    """
+    Distances and real ranges between all own and enemy units, calculated at once.
+    Gives the same results as checking every pair with distance_to and UnitValue.real_range.
+    """
+
+    def __init__(self, own: RangeArrays, enemies: RangeArrays):
+        self.own = own
+        self.enemies = enemies
+        # Rows are own units and columns are enemy units in all matrices
+        self.distances = cdist(own.positions, enemies.positions)
+        self.ranges = own.real_ranges(enemies)
+        self.enemy_ranges = enemies.real_ranges(own).T
+
+        # Own units that are in range of any enemy
+        self.engaged: np.ndarray = (self.distances < self.enemy_ranges).any(axis=1)
+        # Own units that have any enemy in range
+        self.can_engage: np.ndarray = (self.distances < self.ranges).any(axis=1)
+
+        if enemies.count > 0:
+            self.attack_range = float(self.ranges.mean()) if own.count > 0 else 0
+            self.enemy_attack_range = float(self.enemy_ranges.mean()) if own.count > 0 else 0
+            closest = np.argmin(self.distances, axis=1)
+            closest_distances = self.distances[np.arange(own.count), closest]
+            self.closest: np.ndarray = np.where(closest_distances < MAX_CLOSEST_DISTANCE, closest, -1)
+        else:
+            self.attack_range = 0
+            self.enemy_attack_range = 0
+            self.closest = np.full(own.count, -1, dtype=np.intp)
+
+    @staticmethod
+    def from_units(unit_values: "UnitValue", units: List[Unit], enemies: List[Unit]) -> "Engagement":
+        return Engagement(RangeArrays(unit_values, units), RangeArrays(unit_values, enemies))
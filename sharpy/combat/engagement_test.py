@@ -0,0 +1,60 @@
+from unittest import mock
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from sharpy.managers.core.unit_value import UnitValue
+from .engagement import Engagement
+
+
+def mock_unit(type_id: UnitTypeId, position, is_flying: bool) -> mock.Mock:
+    unit = mock.Mock(spec=Unit, type_id=type_id, position=Point2(position), radius=0.5, is_flying=is_flying)
+    unit.configure_mock(ground_range=5, air_range=9)
+    unit.has_buff.return_value = False
+    return unit
+
+
+def random_units(rng, count: int):
+    units = []
+    for _ in range(count):
+        flying = bool(rng.random() < 0.3)
+        type_id = UnitTypeId.VIKINGFIGHTER if flying else UnitTypeId.MARINE
+        units.append(mock_unit(type_id, rng.uniform(0, 20, 2), flying))
+    return units
+
+
+class TestEngagement:
+    def test_matches_pairwise_real_range(self):
+        unit_values = UnitValue()
+        rng = np.random.default_rng(0)
+        own = random_units(rng, 30)
+        enemies = random_units(rng, 25)
+
+        engagement = Engagement.from_units(unit_values, own, enemies)
+
+        for i, unit in enumerate(own):
+            engaged = any(
+                enemy.position.distance_to(unit.position) < unit_values.real_range(enemy, unit) for enemy in enemies
+            )
+            can_engage = any(
+                enemy.position.distance_to(unit.position) < unit_values.real_range(unit, enemy) for enemy in enemies
+            )
+            closest = min(range(len(enemies)), key=lambda j: enemies[j].position.distance_to(unit.position))
+            assert engagement.engaged[i] == engaged
+            assert engagement.can_engage[i] == can_engage
+            assert engagement.closest[i] == closest
+
+        ranges = [unit_values.real_range(unit, enemy) for unit in own for enemy in enemies]
+        enemy_ranges = [unit_values.real_range(enemy, unit) for unit in own for enemy in enemies]
+        assert engagement.attack_range == np.mean(ranges)
+        assert engagement.enemy_attack_range == np.mean(enemy_ranges)
+
+    def test_no_enemies(self):
+        own = random_units(np.random.default_rng(1), 3)
+        engagement = Engagement.from_units(UnitValue(), own, [])
+        assert not engagement.engaged.any()
+        assert not engagement.can_engage.any()
+        assert list(engagement.closest) == [-1, -1, -1]
+        assert engagement.attack_range == 0
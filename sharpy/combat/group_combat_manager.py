@@ -1,4 +1,5 @@
-from typing import List, Dict, Optional, Union
+import time
+from typing import List, Dict, Optional, Set, Tuple, Union
 
 from sharpy.combat import *
 from sharpy.general.extended_power import ExtendedPower
@@ -11,9 +12,13 @@ from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2, Point3
 from sc2.unit import Unit
 import numpy as np
-from sklearn.cluster import DBSCAN
+from sc2pathlib import MapType
+from sharpy.combat.unit_grouper import UnitGrouper
 
 ignored = {UnitTypeId.MULE, UnitTypeId.LARVA, UnitTypeId.EGG}
+retreat_move_types = {MoveType.DefensiveRetreat, MoveType.PanicRetreat}
+# Index of the waypoint in path that ground groups move to
+GROUP_PATH_INDEX = 14
 
 
 class GroupCombatManager(ManagerBase, ICombatManager):
@@ -25,12 +30,18 @@ class GroupCombatManager(ManagerBase, ICombatManager):
         self.default_rules.load_default_methods()
         self.default_rules.load_default_micro()
         self.enemy_group_distance = 7
+        self._own_grouper = UnitGrouper(self.enemy_group_distance)
+        self._enemy_grouper = UnitGrouper(self.enemy_group_distance)
+        # Groups by group id, kept across frames so that only changes need to be calculated
+        self._own_group_cache: Dict[int, CombatUnits] = {}
+        self._enemy_group_cache: Dict[int, CombatUnits] = {}
 
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
         self.cache: UnitCacheManager = self.knowledge.unit_cache
         self.pather: PathingManager = self.knowledge.pathing_manager
         self._tags: List[int] = []
+        self._waypoints: Dict[Tuple[CombatUnits, Point2, Optional[MapType]], Point2] = {}
         self.all_enemy_power = ExtendedPower(self.unit_values)
 
         await self.default_rules.start(knowledge)
@@ -41,7 +52,7 @@ class GroupCombatManager(ManagerBase, ICombatManager):
 
     @property
     def regroup_threshold(self) -> float:
-        """ Percentage 0 - 1 on how many of the attacking units should actually be together when attacking"""
+        """Percentage 0 - 1 on how many of the attacking units should actually be together when attacking"""
         return self.rules.regroup_percentage
 
     @property
@@ -60,11 +71,14 @@ class GroupCombatManager(ManagerBase, ICombatManager):
         return self.rules.generic_micro
 
     async def update(self):
+        self._prune_groups(self._own_group_cache, self._own_grouper.group_ids)
+        self._own_grouper.next_frame()
+
         self.enemy_groups: List[CombatUnits] = self.group_enemy_units()
         self.all_enemy_power.clear()
 
         for group in self.enemy_groups:  # type: CombatUnits
-            self.all_enemy_power.add_units(group.units)
+            self.all_enemy_power.add_power(group.power)
 
     async def post_update(self):
         pass
@@ -106,9 +120,25 @@ class GroupCombatManager(ManagerBase, ICombatManager):
             for i in range(0, len(sorted_list)):
                 sorted_list[i].debug_index = i
 
+        self.prefetch_paths(target, move_type)
         self.rules.handle_groups_func(self, target, move_type)
 
         self._tags.clear()
+        self._waypoints.clear()
+
+    def prefetch_paths(self, target: Point2, move_type: MoveType):
+        """
+        Finds paths for all ground groups to target with a single batch query when there are enough groups.
+        """
+        ground_groups = [group for group in self.own_groups if group.ground_units]
+        if len(ground_groups) < self.pather.batch_flow_field_size:
+            return
+
+        map_type = MapType.Ground if move_type in retreat_move_types else None
+        queries = [(group.center, target, map_type, GROUP_PATH_INDEX) for group in ground_groups]
+
+        for group, waypoint in zip(ground_groups, self.pather.find_paths(queries)):
+            self._waypoints[(group, target, map_type)] = waypoint
 
     def faster_group_should_regroup(self, group1: CombatUnits, group2: Optional[CombatUnits]) -> bool:
         if not group2:
@@ -134,10 +164,15 @@ class GroupCombatManager(ManagerBase, ICombatManager):
     def action_to(self, group: CombatUnits, target, move_type: MoveType, is_attack: bool):
         original_target = target
         if isinstance(target, Point2) and group.ground_units:
-            if move_type in {MoveType.DefensiveRetreat, MoveType.PanicRetreat}:
-                target = self.pather.find_influence_ground_path(group.center, target, 14)
+            map_type = MapType.Ground if move_type in retreat_move_types else None
+            waypoint = self._waypoints.get((group, target, map_type))
+
+            if waypoint is not None:
+                target = waypoint
+            elif map_type is not None:
+                target = self.pather.find_influence_ground_path(group.center, target, GROUP_PATH_INDEX)
             else:
-                target = self.pather.find_path(group.center, target, 14)
+                target = self.pather.find_path(group.center, target, GROUP_PATH_INDEX)
 
         own_unit_cache: Dict[UnitTypeId, Units] = {}
 
@@ -149,7 +184,9 @@ class GroupCombatManager(ManagerBase, ICombatManager):
 
             units.append(unit)
 
+        profiler = self.knowledge.profiler
         for type_id, type_units in own_unit_cache.items():
+            ns = time.perf_counter_ns()
             micro: MicroStep = self.unit_micros.get(type_id, self.generic_micro)
             micro.init_group(self.rules, group, type_units, self.enemy_groups, move_type, original_target)
             group_action = micro.group_solve_combat(type_units, Action(target, is_attack))
@@ -180,6 +217,9 @@ class GroupCombatManager(ManagerBase, ICombatManager):
                     pos3d = Point3((pos3d.x, pos3d.y, pos3d.z + 2))
                     self.ai._client.debug_text_world(status, pos3d, size=10)
 
+            if profiler:
+                profiler.add(f"Micro/{type(micro).__name__}", time.perf_counter_ns() - ns)
+
     def closest_group(
         self,
         start: Point2,
@@ -207,60 +247,61 @@ class GroupCombatManager(ManagerBase, ICombatManager):
         return group
 
     def group_own_units(self, units: Units) -> List[CombatUnits]:
-        groups: List[Units] = []
-
-        # import time
-        # ns_pf = time.perf_counter_ns()
-
-        numpy_vectors: List[np.ndarray] = []
-        for unit in units:
-            numpy_vectors.append(np.array([unit.position.x, unit.position.y]))
-
-        if numpy_vectors:
-            clustering = DBSCAN(eps=self.enemy_group_distance, min_samples=1, algorithm="kd_tree").fit(numpy_vectors)
-            # print(clustering.labels_)
-
-            for index in range(0, len(clustering.labels_)):
+        groups: List[CombatUnits] = []
+        count = len(units)
+        if count == 0:
+            return groups
+
+        positions = np.array([unit.position for unit in units], dtype=np.float32)
+        tags = np.fromiter((unit.tag for unit in units), dtype=np.uint64, count=count)
+        self._own_grouper.distance = self.enemy_group_distance
+
+        for group_id, indices in self._own_grouper.update(tags, positions):
+            group_units = Units([], self.ai)
+            for index in indices:
                 unit = units[index]
-                if unit.type_id in self.unit_values.combat_ignore:
-                    continue
-
-                label = clustering.labels_[index]
-
-                if label >= len(groups):
-                    groups.append(Units([unit], self.ai))
-                else:
-                    groups[label].append(unit)
-            # for label in clustering.labels_:
+                if unit.type_id not in self.unit_values.combat_ignore:
+                    group_units.append(unit)
 
-        # ns_pf = time.perf_counter_ns() - ns_pf
-        # print(f"Own unit grouping (v2) took {ns_pf / 1000 / 1000} ms. groups: {len(groups)} units: {len(units)}")
+            if group_units:
+                groups.append(self._combat_group(self._own_group_cache, group_id, group_units))
 
-        return [CombatUnits(u, self.knowledge) for u in groups]
+        return groups
 
     def group_enemy_units(self) -> List[CombatUnits]:
-        groups: List[Units] = []
+        groups: List[CombatUnits] = []
+        arrays = self.cache.enemy_arrays
+        if arrays.count == 0:
+            self._enemy_grouper.clear()
+            self._enemy_group_cache.clear()
+            return groups
+
+        units = arrays.units
+        self._enemy_grouper.distance = self.enemy_group_distance
+        self._enemy_grouper.next_frame()
+
+        for group_id, indices in self._enemy_grouper.update(arrays.tags, arrays.positions, arrays.tree):
+            group_units = Units([], self.ai)
+            for index in indices:
+                unit = units[index]
+                if unit.type_id not in self.unit_values.combat_ignore and unit.can_be_attacked:
+                    group_units.append(unit)
 
-        import time
+            if group_units:
+                groups.append(self._combat_group(self._enemy_group_cache, group_id, group_units))
 
-        ns_pf = time.perf_counter_ns()
+        self._prune_groups(self._enemy_group_cache, self._enemy_grouper.group_ids)
+        return groups
 
-        if self.cache.enemy_numpy_vectors:
-            clustering = DBSCAN(eps=self.enemy_group_distance, min_samples=1).fit(self.cache.enemy_numpy_vectors)
-            # print(clustering.labels_)
-            units = self.ai.all_enemy_units
-            for index in range(0, len(clustering.labels_)):
-                unit = units[index]
-                if unit.type_id in self.unit_values.combat_ignore or not unit.can_be_attacked:
-                    continue
-
-                label = clustering.labels_[index]
-
-                if label >= len(groups):
-                    groups.append(Units([unit], self.ai))
-                else:
-                    groups[label].append(unit)
-            # for label in clustering.labels_:
-        ns_pf = time.perf_counter_ns() - ns_pf
-        # print(f"Enemy unit grouping (v2) took {ns_pf / 1000 / 1000} ms. groups: {len(groups)}")
-        return [CombatUnits(u, self.knowledge) for u in groups]
+    def _combat_group(self, group_cache: Dict[int, CombatUnits], group_id: int, units: Units) -> CombatUnits:
+        group = group_cache.get(group_id)
+        if group is None:
+            group = CombatUnits(units, self.knowledge, group_id)
+            group_cache[group_id] = group
+        else:
+            group.update(units)
+        return group
+
+    def _prune_groups(self, group_cache: Dict[int, CombatUnits], group_ids: Set[int]):
+        for group_id in [group_id for group_id in group_cache if group_id not in group_ids]:
+            del group_cache[group_id]
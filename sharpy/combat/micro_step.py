@@ -6,6 +6,7 @@ from sharpy.combat.move_type import MoveType
 from sc2.ids.buff_id import BuffId
 from .action import Action
 from .combat_units import CombatUnits
+from .target_assignment import TargetAssignment
 
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
@@ -51,6 +52,7 @@ class MicroStep(ABC, Component):
         self.enemy_attack_range = 0
 
         self.focus_fired: Dict[int, float] = dict()
+        self.target_assignment = TargetAssignment(self)
 
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
@@ -69,6 +71,7 @@ class MicroStep(ABC, Component):
         self.rules = rules
 
         self.focus_fired.clear()
+        self.target_assignment.clear(units)
         self.group = group
         self.move_type = move_type
         self.original_target = original_target
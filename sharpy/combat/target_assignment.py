@@ -0,0 +1,230 @@
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+from sc2.data import Race
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit import Unit
+from sharpy.combat.action import Action
+from sharpy.combat.engagement import RangeArrays
+from sharpy.combat.move_type import MoveType
+
+if TYPE_CHECKING:
+    from sharpy.combat.micro_step import MicroStep
+
+ignored_types = {UnitTypeId.LARVA, UnitTypeId.EGG}
+
+changelings = {
+    UnitTypeId.CHANGELING,
+    UnitTypeId.CHANGELINGMARINE,
+    UnitTypeId.CHANGELINGMARINESHIELD,
+    UnitTypeId.CHANGELINGZEALOT,
+    UnitTypeId.CHANGELINGZERGLING,
+    UnitTypeId.CHANGELINGZERGLINGWINGS,
+}
+
+# melee, id of the priority dictionary, push target
+AssignmentKey = Tuple[bool, Optional[int], Optional[Point2]]
+
+
+class TargetScores:
+    """
+    Focus fire scores of all unit and enemy pairs, same scores as focus_fire and melee_focus_fire
+    calculate one unit at a time.
+    """
+
+    def __init__(
+        self,
+        step: "MicroStep",
+        units: List[Unit],
+        prio: Optional[Dict[UnitTypeId, int]],
+        melee: bool,
+        push_target: Optional[Point2],
+    ):
+        self.step = step
+        self.units = units
+        self.melee = melee
+        self.rows: Dict[int, int] = {unit.tag: index for index, unit in enumerate(units)}
+
+        own = RangeArrays(step.unit_values, units)
+        if melee:
+            lookups = own.ground_range + 3
+        else:
+            # Same as MicroStep.min_range
+            lookups = np.where(
+                own.air_range <= 0,
+                own.ground_range,
+                np.where(own.ground_range <= 0, own.air_range, np.minimum(own.ground_range, own.air_range)),
+            )
+            lookups = lookups + 3
+
+        self.enemies = self._candidates(own.positions, lookups)
+        enemies = RangeArrays(step.unit_values, self.enemies)
+        self.tags = np.fromiter((enemy.tag for enemy in self.enemies), dtype=np.uint64, count=enemies.count)
+        self.health = np.fromiter((enemy.health for enemy in self.enemies), dtype=float, count=enemies.count)
+        # Targets are chosen by is_flying alone, unlike ranges that also count units lifted by graviton beam as air
+        flying = np.fromiter((enemy.is_flying for enemy in self.enemies), dtype=bool, count=enemies.count)
+
+        distances = cdist(own.positions, enemies.positions)
+        valid = distances <= lookups[:, np.newaxis]
+        valid &= np.fromiter(
+            (enemy.type_id not in ignored_types for enemy in self.enemies), dtype=bool, count=enemies.count
+        )[np.newaxis, :]
+
+        if melee:
+            values = self._melee_values() + np.where(distances < own.real_ranges(enemies), 2, 0)
+            valid &= ~flying[np.newaxis, :]
+            last_target_bonus = 1
+        else:
+            values = self._values(prio)[np.newaxis, :]
+            valid &= np.fromiter((step.is_target(enemy) for enemy in self.enemies), dtype=bool, count=enemies.count)
+            valid &= np.where(
+                flying[np.newaxis, :], own.air_range[:, np.newaxis] > 0, own.ground_range[:, np.newaxis] > 0
+            )
+            last_target_bonus = 3
+
+        if push_target is not None and enemies.count > 0:
+            valid &= self._push_mask(own, enemies, flying, distances, lookups, push_target)
+
+        scores = values + (1 - distances / lookups[:, np.newaxis])
+        last_targets = [step.last_targeted(unit) for unit in units]
+        for row, last_target in enumerate(last_targets):
+            if last_target is not None:
+                scores[row, self.tags == last_target] += last_target_bonus
+
+        self.scores = np.where(valid, scores, -np.inf)
+
+    def _candidates(self, positions: np.ndarray, lookups: np.ndarray) -> List[Unit]:
+        """Enemies that are within lookup range of any of the units."""
+        if len(positions) == 0:
+            return []
+        center = positions.mean(axis=0)
+        radius = float(np.max(np.linalg.norm(positions - center, axis=1) + lookups))
+        cache = self.step.cache
+        units = cache.enemy_arrays.units
+        return [units[index] for index in cache.enemy_in_range_indices(Point2(center), radius)]
+
+    def _values(self, prio: Optional[Dict[UnitTypeId, int]]) -> np.ndarray:
+        unit_values = self.step.unit_values
+        values = []
+        for enemy in self.enemies:
+            if enemy.type_id in changelings:
+                values.append(1)
+            elif prio:
+                values.append(prio.get(enemy.type_id, -1) * (1 - enemy.shield_health_percentage))
+            else:
+                values.append(2 * unit_values.power_by_type(enemy.type_id, 1 - enemy.shield_health_percentage))
+        return np.array(values, dtype=float)
+
+    def _melee_values(self) -> np.ndarray:
+        values = np.array([1 - enemy.shield_health_percentage for enemy in self.enemies], dtype=float)
+        if self.step.knowledge.enemy_race == Race.Terran:
+            # if building isn't finished, focus on the possible scv instead
+            # Same as melee_focus_fire, which checks the attacking unit rather than the enemy
+            unfinished = np.array([unit.is_structure and unit.build_progress < 1 for unit in self.units], dtype=bool)
+            return values[np.newaxis, :] - np.where(unfinished, 2, 0)[:, np.newaxis]
+        return values[np.newaxis, :]
+
+    def _push_mask(
+        self,
+        own: RangeArrays,
+        enemies: RangeArrays,
+        flying: np.ndarray,
+        distances: np.ndarray,
+        lookups: np.ndarray,
+        push_target: Point2,
+    ) -> np.ndarray:
+        """Don't attack anything behind us unless it's in range."""
+        target = np.array([[push_target.x, push_target.y]])
+        distances_to_target = cdist(own.positions, target)[:, 0]
+        enemy_distances_to_target = cdist(enemies.positions, target)[:, 0]
+        behind = enemy_distances_to_target[np.newaxis, :] > distances_to_target[:, np.newaxis]
+
+        if self.melee:
+            ranges = own.ground_range[:, np.newaxis] + own.radius[:, np.newaxis] + enemies.radius[np.newaxis, :]
+            allowed = (~behind | (distances <= ranges)) & ~flying[np.newaxis, :]
+            # If we're close to the target we can attack behind
+            filtered = distances_to_target > 3
+        else:
+            ranges = np.where(flying[np.newaxis, :], own.air_range[:, np.newaxis], own.ground_range[:, np.newaxis])
+            allowed = ~behind | (distances <= ranges)
+            # If we're in range of the target we can attack behind
+            filtered = distances_to_target > lookups - 3
+
+        return allowed | ~filtered[:, np.newaxis]
+
+    def best_target(self, row: int, damage: np.ndarray) -> Optional[int]:
+        """Index of the enemy with best score for the unit, taking damage already focused on enemies into account."""
+        if len(self.enemies) == 0:
+            return None
+        scores = np.where(damage > self.health, self.scores[row] * 0.1, self.scores[row])
+        best = int(np.argmax(scores))
+        if scores[best] > 0:
+            return best
+        return None
+
+
+class TargetAssignment:
+    """
+    Assigns focus fire targets for all units of a micro step at once.
+
+    Scores for all unit and enemy pairs are calculated with the first target request of the frame. A unit gets its
+    target from the scores only when it asks for one, and only then its damage is added to focus_fired, so units that
+    do something else this frame, e.g. blink or back off, don't count as shooting at anything.
+    """
+
+    def __init__(self, step: "MicroStep"):
+        self.step = step
+        self.units: List[Unit] = []
+        self._scores: Dict[AssignmentKey, TargetScores] = {}
+        self._targets: Dict[Tuple[AssignmentKey, int], Optional[Unit]] = {}
+
+    def clear(self, units: List[Unit]):
+        """Starts assignment for new units of the step."""
+        self.units = units
+        self._scores.clear()
+        self._targets.clear()
+
+    def target(
+        self, unit: Unit, current_command: Action, prio: Optional[Dict[UnitTypeId, int]], melee: bool
+    ) -> Optional[Unit]:
+        """Focus fire target for the unit, None if there are no valid targets."""
+        push_target = None
+        if self.step.move_type == MoveType.Push:
+            push_target = current_command.target
+            if isinstance(push_target, Unit):
+                push_target = push_target.position
+
+        key: AssignmentKey = (melee, None if melee or prio is None else id(prio), push_target)
+        if (key, unit.tag) in self._targets:
+            return self._targets[(key, unit.tag)]
+
+        scores = self._scores.get(key)
+        if scores is None:
+            scores = TargetScores(self.step, self.units, prio, melee, push_target)
+            self._scores[key] = scores
+
+        if unit.tag not in scores.rows:
+            # Unit is not part of this step
+            scores = TargetScores(self.step, [unit], prio, melee, push_target)
+
+        target = self._assign(scores, scores.rows[unit.tag])
+        self._targets[(key, unit.tag)] = target
+        return target
+
+    def _assign(self, scores: TargetScores, row: int) -> Optional[Unit]:
+        """Best target for the unit on the row, adds damage of the unit to focus_fired."""
+        focus_fired = self.step.focus_fired
+        damage = np.fromiter((focus_fired.get(tag, 0) for tag in scores.tags.tolist()), dtype=float)
+        index = scores.best_target(row, damage)
+        if index is None:
+            return None
+
+        target = scores.enemies[index]
+        if scores.melee:
+            focus_fired[target.tag] = focus_fired.get(target.tag, 0)
+        else:
+            focus_fired[target.tag] = damage[index] + scores.units[row].calculate_damage_vs_target(target)[0]
+        return target
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from sc2.data import Race
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from sharpy.combat.action import Action
+from sharpy.combat.move_type import MoveType
+from sharpy.managers.core.unit_value import UnitValue
+from .target_assignment import TargetAssignment
+
+
+def mock_unit(tag: int, type_id: UnitTypeId, position, is_flying: bool = False) -> mock.Mock:
+    unit = mock.Mock(spec=Unit, tag=tag, type_id=type_id, position=Point2(position), radius=0.5, is_flying=is_flying)
+    unit.configure_mock(
+        health=40, shield_health_percentage=1, ground_range=5, air_range=5, is_structure=False, build_progress=1
+    )
+    unit.has_buff.return_value = False
+    unit.calculate_damage_vs_target.return_value = (30, 1, 5)
+    return unit
+
+
+def mock_step(enemies) -> mock.Mock:
+    step = mock.Mock()
+    step.unit_values = UnitValue()
+    step.cache.enemy_arrays.units = enemies
+    step.cache.enemy_in_range_indices = lambda position, range: [
+        i for i, enemy in enumerate(enemies) if enemy.position.distance_to(position) <= range
+    ]
+    step.knowledge.enemy_race = Race.Zerg
+    step.move_type = MoveType.Assault
+    step.focus_fired = {}
+    step.is_target.return_value = True
+    step.last_targeted.return_value = None
+    return step
+
+
+class TestTargetAssignment:
+    def test_damage_is_spread_to_avoid_overkill(self):
+        enemies = [mock_unit(100, UnitTypeId.ZERGLING, (5, 0)), mock_unit(101, UnitTypeId.ZERGLING, (5, 1))]
+        own = [mock_unit(i, UnitTypeId.MARINE, (0, i * 0.1)) for i in range(4)]
+        step = mock_step(enemies)
+        assignment = TargetAssignment(step)
+        assignment.clear(own)
+
+        targets = [assignment.target(unit, Action(Point2((10, 0)), True), None, False).tag for unit in own]
+
+        # 30 damage is not enough for 40 health, second shot kills and after that the other enemy is better
+        assert targets == [100, 100, 101, 101]
+        assert step.focus_fired == {100: 60, 101: 60}
+
+    def test_melee_ignores_flying_enemies(self):
+        enemies = [mock_unit(100, UnitTypeId.MUTALISK, (1, 0), is_flying=True)]
+        own = [mock_unit(1, UnitTypeId.ZEALOT, (0, 0))]
+        assignment = TargetAssignment(mock_step(enemies))
+        assignment.clear(own)
+
+        assert assignment.target(own[0], Action(Point2((10, 0)), True), None, True) is None
+
+    def test_only_units_asking_for_targets_add_damage(self):
+        enemies = [mock_unit(100, UnitTypeId.ZERGLING, (5, 0))]
+        own = [mock_unit(i, UnitTypeId.STALKER, (0, i * 0.1)) for i in range(4)]
+        step = mock_step(enemies)
+        assignment = TargetAssignment(step)
+        assignment.clear(own)
+
+        # Other units blink or back off instead of shooting
+        assert assignment.target(own[2], Action(Point2((10, 0)), True), None, False).tag == 100
+        assert assignment.target(own[2], Action(Point2((10, 0)), True), None, False).tag == 100
+        assert step.focus_fired == {100: 30}
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+
+def group_labels(positions: np.ndarray, distance: float, tree: Optional[cKDTree] = None) -> np.ndarray:
+    """
+    Labels connected groups of points, where points within distance of each other belong to the same group.
+    Gives the same groups as DBSCAN with min_samples=1.
+
+    :param positions: N x 2 array of positions
+    :param distance: maximum distance between two neighbouring points of a group
+    :param tree: optional tree already built from the positions
+    :return: array of N group labels from 0 onwards
+    """
+    count = len(positions)
+    if count == 0:
+        return np.empty(0, dtype=np.int32)
+    if tree is None:
+        tree = cKDTree(positions)
+
+    pairs = tree.query_pairs(distance, output_type="ndarray")
+    graph = coo_matrix((np.ones(len(pairs), dtype=bool), (pairs[:, 0], pairs[:, 1])), shape=(count, count))
+    _, labels = connected_components(graph, directed=False)
+    return labels.astype(np.int32)
+
+
+class UnitGrouper:
+    """
+    Groups units with connected components and keeps group ids stable across frames.
+
+    A group keeps the id that most of its units had last frame. When a group splits, the largest part keeps the id
+    and when groups merge, the merged group keeps the id of the largest previous group.
+    `update` can be called multiple times per frame for different units, call `next_frame` once at start of a frame.
+    """
+
+    def __init__(self, distance: float):
+        self.distance = distance
+        self._previous: Dict[int, int] = {}
+        self._tag_groups: Dict[int, int] = {}
+        self._used_ids: Set[int] = set()
+        self._next_id = 0
+
+    @property
+    def group_ids(self) -> Set[int]:
+        """Ids of the groups given out during the current frame."""
+        return self._used_ids
+
+    def next_frame(self):
+        self._previous = self._tag_groups
+        self._tag_groups = {}
+        self._used_ids = set()
+
+    def update(
+        self, tags: np.ndarray, positions: np.ndarray, tree: Optional[cKDTree] = None
+    ) -> List[Tuple[int, np.ndarray]]:
+        """
+        Groups units for current frame.
+
+        :param tags: unit tags
+        :param positions: N x 2 array of unit positions
+        :param tree: optional tree already built from the positions
+        :return: list of (group id, indices of units in group)
+        """
+        labels = group_labels(positions, self.distance, tree)
+        if len(labels) == 0:
+            return []
+
+        order = np.argsort(labels, kind="stable")
+        splits = np.flatnonzero(np.diff(labels[order])) + 1
+        components = np.split(order, splits)
+
+        # Count how many units of each component belonged to each previous group
+        votes: List[Tuple[int, int, int]] = []
+        previous = self._previous
+        for component_index, indices in enumerate(components):
+            counts: Dict[int, int] = {}
+            for tag in tags[indices].tolist():
+                group_id = previous.get(tag)
+                if group_id is not None:
+                    counts[group_id] = counts.get(group_id, 0) + 1
+            for group_id, count in counts.items():
+                votes.append((count, component_index, group_id))
+
+        # Largest overlaps get to keep their ids
+        votes.sort(reverse=True)
+        component_ids: Dict[int, int] = {}
+        used_ids = self._used_ids
+        for count, component_index, group_id in votes:
+            if component_index not in component_ids and group_id not in used_ids:
+                component_ids[component_index] = group_id
+                used_ids.add(group_id)
+
+        result: List[Tuple[int, np.ndarray]] = []
+        tag_groups = self._tag_groups
+        for component_index, indices in enumerate(components):
+            group_id = component_ids.get(component_index)
+            if group_id is None:
+                group_id = self._next_id
+                self._next_id += 1
+                used_ids.add(group_id)
+
+            for tag in tags[indices].tolist():
+                tag_groups[tag] = group_id
+            result.append((group_id, indices))
+
+        return result
+
+    def clear(self):
+        self._previous = {}
+        self._tag_groups = {}
+        self._used_ids = set()
@@ -0,0 +1,96 @@
+import numpy as np
+
+from .unit_grouper import UnitGrouper, group_labels
+
+
+def grouper_id_of(groups, tags, tag):
+    for group_id, indices in groups:
+        if tag in tags[indices].tolist():
+            return group_id
+    return None
+
+
+def groups_as_sets(groups):
+    return {group_id: set(indices.tolist()) for group_id, indices in groups}
+
+
+class TestUnitGrouper:
+    def test_points_within_distance_are_grouped(self):
+        positions = np.array([[0, 0], [5, 0], [10, 0], [30, 0], [30, 6]], dtype=np.float32)
+        labels = group_labels(positions, 7)
+
+        assert labels[0] == labels[1] == labels[2]
+        assert labels[3] == labels[4]
+        assert labels[0] != labels[3]
+
+    def test_distance_is_inclusive(self):
+        positions = np.array([[0, 0], [7, 0]], dtype=np.float32)
+        assert len(set(group_labels(positions, 7).tolist())) == 1
+
+    def test_no_units(self):
+        grouper = UnitGrouper(7)
+        assert grouper.update(np.empty(0, dtype=np.uint64), np.empty((0, 2), dtype=np.float32)) == []
+
+    def test_group_ids_persist_when_units_move(self):
+        grouper = UnitGrouper(7)
+        tags = np.array([1, 2, 3, 4], dtype=np.uint64)
+        first = grouper.update(tags, np.array([[0, 0], [1, 0], [50, 0], [51, 0]], dtype=np.float32))
+
+        # Units are listed in different order and have moved a bit
+        moved_tags = tags[::-1].copy()
+        grouper.next_frame()
+        second = grouper.update(moved_tags, np.array([[52, 0], [51, 0], [2, 0], [1, 0]], dtype=np.float32))
+
+        for group_id, indices in second:
+            for tag in moved_tags[indices].tolist():
+                assert grouper_id_of(first, tags, tag) == group_id
+
+    def test_largest_part_keeps_id_on_split(self):
+        grouper = UnitGrouper(7)
+        tags = np.array([1, 2, 3, 4], dtype=np.uint64)
+        first = grouper.update(tags, np.array([[0, 0], [1, 0], [2, 0], [3, 0]], dtype=np.float32))
+        original_id = first[0][0]
+
+        grouper.next_frame()
+        second = groups_as_sets(grouper.update(tags, np.array([[0, 0], [1, 0], [2, 0], [40, 0]], dtype=np.float32)))
+        assert second[original_id] == {0, 1, 2}
+        assert len(second) == 2
+
+    def test_merged_group_keeps_id_of_larger_group(self):
+        grouper = UnitGrouper(7)
+        tags = np.array([1, 2, 3, 4], dtype=np.uint64)
+        first = groups_as_sets(grouper.update(tags, np.array([[0, 0], [1, 0], [2, 0], [40, 0]], dtype=np.float32)))
+        larger_id = next(group_id for group_id, indices in first.items() if len(indices) == 3)
+
+        grouper.next_frame()
+        second = groups_as_sets(grouper.update(tags, np.array([[0, 0], [1, 0], [2, 0], [3, 0]], dtype=np.float32)))
+        assert list(second.keys()) == [larger_id]
+
+    def test_multiple_updates_in_frame_do_not_share_ids(self):
+        grouper = UnitGrouper(7)
+        tags = np.array([1, 2], dtype=np.uint64)
+        first = grouper.update(tags, np.array([[0, 0], [1, 0]], dtype=np.float32))
+
+        grouper.next_frame()
+        # Group has been split to two different updates, for example for attack and defense
+        attack = grouper.update(tags[:1], np.array([[0, 0]], dtype=np.float32))
+        defense = grouper.update(tags[1:], np.array([[1, 0]], dtype=np.float32))
+
+        assert attack[0][0] == first[0][0]
+        assert defense[0][0] != first[0][0]
+        assert grouper.group_ids == {attack[0][0], defense[0][0]}
+
+    def test_multiple_updates_in_frame_keep_ids_next_frame(self):
+        grouper = UnitGrouper(7)
+        attack_tags = np.array([1, 2], dtype=np.uint64)
+        defense_tags = np.array([3, 4], dtype=np.uint64)
+        positions = np.array([[0, 0], [1, 0]], dtype=np.float32)
+
+        attack = grouper.update(attack_tags, positions)
+        defense = grouper.update(defense_tags, positions + 50)
+
+        for _ in range(3):
+            grouper.next_frame()
+            # Later update of the frame must not forget the groups of the earlier update
+            assert grouper.update(attack_tags, positions)[0][0] == attack[0][0]
+            assert grouper.update(defense_tags, positions + 50)[0][0] == defense[0][0]
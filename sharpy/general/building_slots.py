@@ -0,0 +1,156 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from sc2.pixel_map import PixelMap
+from sc2.position import Point2
+from sc2.power_source import PowerSource
+from sc2.unit import Unit
+
+# Slot is occupied when a structure is closer than this to the slot position
+OCCUPIED_DISTANCE = 1
+# Creep is checked for this many cells starting from one cell below the floored slot position
+CREEP_SIZE = 5
+
+
+class BuildingSlots:
+    """
+    Occupancy, power field and creep coverage of building positions as arrays that are in the same order as the
+    positions, so that the next free slot can be found with a single array lookup.
+
+    Occupancy is updated only for slots near structures that were created, destroyed or moved since the last update.
+    """
+
+    def __init__(self, points: Optional[List[Point2]] = None):
+        self.points: List[Point2] = []
+        self.indices: Dict[Point2, int] = {}
+        self.positions = np.zeros((0, 2))
+        self.occupied = np.zeros(0, dtype=bool)
+
+        self._structures: Dict[int, Point2] = {}
+        self._structures_loop = -1
+        self._power_key: Optional[Tuple[Tuple[float, float, float], ...]] = None
+        self._powered = np.zeros(0, dtype=bool)
+        self._creep_loop = -1
+        self._on_creep = np.zeros(0, dtype=bool)
+        self._creep_x = np.zeros((0, CREEP_SIZE), dtype=int)
+        self._creep_y = np.zeros((0, CREEP_SIZE), dtype=int)
+
+        if points is not None:
+            self.set_points(points)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def set_points(self, points: List[Point2]):
+        """Sets slot positions, occupancy and coverage masks are recalculated for the new positions."""
+        self.points = list(points)
+        self.indices = {point: index for index, point in enumerate(self.points)}
+        self.positions = np.array([(point.x, point.y) for point in self.points], dtype=float).reshape(-1, 2)
+        corners = np.floor(self.positions).astype(int) - 1
+        offsets = np.arange(CREEP_SIZE)
+        self._creep_x = corners[:, 0:1] + offsets
+        self._creep_y = corners[:, 1:2] + offsets
+        self._power_key = None
+        self._creep_loop = -1
+
+        self.occupied = np.zeros(len(self.points), dtype=bool)
+        for position in self._structures.values():
+            self.occupied |= self._near(position)
+
+    def sync_points(self, points: List[Point2]):
+        """Updates slot positions if the list of points has been changed or reordered."""
+        if self.points != points:
+            self.set_points(points)
+
+    def _near(self, position: Point2) -> np.ndarray:
+        distances = np.hypot(self.positions[:, 0] - position.x, self.positions[:, 1] - position.y)
+        return distances < OCCUPIED_DISTANCE
+
+    def update_structures(self, structures: Iterable[Unit], game_loop: int):
+        """
+        Marks slots near new or moved structures as occupied and frees slots of destroyed or moved structures.
+        Structures are compared to the previous update only once per game loop.
+        """
+        if game_loop == self._structures_loop:
+            return
+        self._structures_loop = game_loop
+
+        current = {structure.tag: structure.position for structure in structures}
+        if current == self._structures:
+            return
+
+        previous = self._structures
+        self._structures = current
+        if not len(self.points):
+            return
+
+        freed = np.zeros(len(self.points), dtype=bool)
+        for tag, position in previous.items():
+            if current.get(tag) != position:
+                freed |= self._near(position)
+
+        if freed.any():
+            # Another structure might still occupy the freed slots
+            self.occupied &= ~freed
+            for position in current.values():
+                self.occupied[freed] |= self._near(position)[freed]
+
+        for tag, position in current.items():
+            if previous.get(tag) != position:
+                self.occupied |= self._near(position)
+
+    def powered(self, sources: List[PowerSource]) -> np.ndarray:
+        """Slots that are covered by any of the power sources, recalculated only when the sources change."""
+        key = tuple((source.position.x, source.position.y, source.radius) for source in sources)
+        if key != self._power_key:
+            self._power_key = key
+            self._powered = np.zeros(len(self.points), dtype=bool)
+            for x, y, radius in key:
+                self._powered |= np.hypot(self.positions[:, 0] - x, self.positions[:, 1] - y) <= radius
+        return self._powered
+
+    def on_creep(self, creep: PixelMap, game_loop: int) -> np.ndarray:
+        """Slots that have creep under the whole building, recalculated once per game loop."""
+        if game_loop != self._creep_loop:
+            self._creep_loop = game_loop
+            data = creep.data_numpy
+            height, width = data.shape
+            inside = (
+                (self._creep_x[:, 0] >= 0)
+                & (self._creep_y[:, 0] >= 0)
+                & (self._creep_x[:, -1] < width)
+                & (self._creep_y[:, -1] < height)
+            )
+            self._on_creep = np.zeros(len(self.points), dtype=bool)
+            if inside.any():
+                xs = self._creep_x[inside]
+                ys = self._creep_y[inside]
+                cells = data[ys[:, :, None], xs[:, None, :]]
+                self._on_creep[inside] = (cells != 0).all(axis=(1, 2))
+        return self._on_creep
+
+    def mask(self, points: Iterable[Point2]) -> np.ndarray:
+        """Slots that are in the points."""
+        result = np.zeros(len(self.points), dtype=bool)
+        for point in points:
+            index = self.indices.get(point)
+            if index is not None:
+                result[index] = True
+        return result
+
+    def distance_to_closest(self, units: Iterable[Union[Unit, Point2]]) -> np.ndarray:
+        """Distance from every slot to the closest of the units or positions, infinite when there are none."""
+        others = np.array([(unit.position.x, unit.position.y) for unit in units], dtype=float).reshape(-1, 2)
+        if not len(others):
+            return np.full(len(self.points), np.inf)
+        deltas = self.positions[:, None, :] - others[None, :, :]
+        return np.hypot(deltas[:, :, 0], deltas[:, :, 1]).min(axis=1)
+
+    def first(self, valid: np.ndarray, step: int = 1) -> Optional[Point2]:
+        """First slot where valid is True, only every step:th slot is considered."""
+        indices = np.flatnonzero(valid[::step])
+        if len(indices) == 0:
+            return None
+        # Negative steps start from the last slot
+        return self.points[int(np.arange(len(valid))[::step][indices[0]])]
@@ -0,0 +1,65 @@
+import numpy as np
+
+from s2clientprotocol import common_pb2
+from sc2.pixel_map import PixelMap
+from sc2.position import Point2
+from sc2.power_source import PowerSource
+
+from .building_slots import BuildingSlots
+
+
+class FakeStructure:
+    def __init__(self, tag: int, x: float, y: float):
+        self.tag = tag
+        self.position = Point2((x, y))
+
+
+def create_slots() -> BuildingSlots:
+    return BuildingSlots([Point2((x + 0.5, 10.5)) for x in range(0, 30, 3)])
+
+
+def creep_map(creep: np.ndarray) -> PixelMap:
+    proto = common_pb2.ImageData(bits_per_pixel=8, data=creep.astype(np.uint8).tobytes())
+    proto.size.x = creep.shape[1]
+    proto.size.y = creep.shape[0]
+    return PixelMap(proto)
+
+
+class TestBuildingSlots:
+    def test_occupied_follows_structures(self):
+        slots = create_slots()
+        slots.update_structures([FakeStructure(1, 0.5, 10.5), FakeStructure(2, 3.5, 10)], 1)
+        assert slots.first(~slots.occupied) == Point2((6.5, 10.5))
+
+        # Destroyed structure frees its slot, moved structure frees the old one and occupies the new one
+        slots.update_structures([FakeStructure(2, 9.5, 10.5)], 2)
+        assert np.flatnonzero(slots.occupied).tolist() == [3]
+        assert slots.first(~slots.occupied, 3) == Point2((0.5, 10.5))
+
+    def test_first_with_negative_step(self):
+        slots = create_slots()
+        valid = np.zeros(len(slots), dtype=bool)
+        valid[[2, 5, 7]] = True
+        assert slots.first(valid, -1) == Point2((21.5, 10.5))
+        # Slots 9, 6, 3 and 0 are considered
+        assert slots.first(valid, -3) is None
+        valid[6] = True
+        assert slots.first(valid, -3) == Point2((18.5, 10.5))
+        assert slots.first(valid, -2) == Point2((21.5, 10.5))
+
+    def test_reordered_points_keep_occupancy(self):
+        slots = create_slots()
+        slots.update_structures([FakeStructure(1, 0.5, 10.5)], 1)
+        slots.sync_points(list(reversed(slots.points)))
+        assert slots.occupied[-1] and slots.occupied.sum() == 1
+
+    def test_powered_and_creep(self):
+        slots = create_slots()
+        powered = slots.powered([PowerSource(Point2((5, 10)), 6.5, 1)])
+        assert np.flatnonzero(powered).tolist() == [0, 1, 2, 3]
+
+        creep = np.zeros((20, 20), dtype=bool)
+        creep[9:14, 5:10] = True
+        on_creep = slots.on_creep(creep_map(creep), 1)
+        # Slots near the map edge are never on creep
+        assert np.flatnonzero(on_creep).tolist() == [2]
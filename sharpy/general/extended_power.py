@@ -1,5 +1,6 @@
-from typing import Union, List, Set
+from typing import Dict, Optional, Union, List, Set
 
+import numpy as np
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.unit import Unit
 
@@ -42,6 +43,195 @@ siege = {
 }
 
 
+# Power fields in the order they are stored in arrays
+POWER_FIELDS = (
+    "power",
+    "air_presence",
+    "ground_presence",
+    "air_power",
+    "ground_power",
+    "melee_power",
+    "surround_power",
+    "siege_power",
+    "detectors",
+    "stealth_power",
+)
+POWER_INDEX = {name: index for index, name in enumerate(POWER_FIELDS)}
+
+
+class PowerValues:
+    """
+    Immutable power values, such as the power of a single unit.
+    Values can be added to and subtracted from ExtendedPower without allocating anything.
+    """
+
+    __slots__ = POWER_FIELDS
+
+    def __init__(
+        self,
+        power: float = 0,
+        air_presence: float = 0,
+        ground_presence: float = 0,
+        air_power: float = 0,
+        ground_power: float = 0,
+        melee_power: float = 0,
+        surround_power: float = 0,
+        siege_power: float = 0,
+        detectors: float = 0,
+        stealth_power: float = 0,
+    ):
+        set_value = object.__setattr__
+        set_value(self, "power", power)
+        set_value(self, "air_presence", air_presence)
+        set_value(self, "ground_presence", ground_presence)
+        set_value(self, "air_power", air_power)
+        set_value(self, "ground_power", ground_power)
+        set_value(self, "melee_power", melee_power)
+        set_value(self, "surround_power", surround_power)
+        set_value(self, "siege_power", siege_power)
+        set_value(self, "detectors", detectors)
+        set_value(self, "stealth_power", stealth_power)
+
+    @staticmethod
+    def from_array(values: np.ndarray) -> "PowerValues":
+        return PowerValues(*values.tolist())
+
+    def as_array(self) -> np.ndarray:
+        return np.array([getattr(self, name) for name in POWER_FIELDS])
+
+    def __setattr__(self, key, value):
+        raise AttributeError("PowerValues is immutable")
+
+    def __add__(self, other: "PowerValues") -> "PowerValues":
+        return PowerValues(*(getattr(self, name) + getattr(other, name) for name in POWER_FIELDS))
+
+    def __sub__(self, other: "PowerValues") -> "PowerValues":
+        return PowerValues(*(getattr(self, name) - getattr(other, name) for name in POWER_FIELDS))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PowerValues):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in POWER_FIELDS)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in POWER_FIELDS))
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)}" for name in POWER_FIELDS)
+        return f"PowerValues({values})"
+
+
+class PowerTable:
+    """
+    Power of every unit type as arrays indexed with UnitTypeId values.
+    Power of a unit is combat value * health percentage * multipliers + constants, which gives the same values as
+    ExtendedPower.add_unit.
+    """
+
+    def __init__(self, unit_data: Dict[UnitTypeId, "UnitData"]):
+        size = max(type_id.value for type_id in UnitTypeId) + 1
+        # Unknown unit types have combat value 1 and only count as ground presence
+        self.combat_values = np.ones(size)
+        self.multipliers = np.zeros((size, len(POWER_FIELDS)))
+        self.multipliers[:, POWER_INDEX["power"]] = 1
+        self.multipliers[:, POWER_INDEX["ground_presence"]] = 1
+        self.constants = np.zeros((size, len(POWER_FIELDS)))
+
+        for type_id, data in unit_data.items():
+            self.combat_values[type_id.value] = data.combat_value
+            self.multipliers[type_id.value] = self._multipliers(type_id, data.features)
+
+            if UnitFeature.ShootsAir in data.features and type_id == UnitTypeId.SENTRY:
+                # Exception to the rule due to weak attack
+                self.constants[type_id.value, POWER_INDEX["air_power"]] = 0.5
+            if UnitFeature.Detector in data.features:
+                self.constants[type_id.value, POWER_INDEX["detectors"]] = 1
+
+    def _multipliers(self, type_id: UnitTypeId, features: List[UnitFeature]) -> np.ndarray:
+        row = np.zeros(len(POWER_FIELDS))
+        row[POWER_INDEX["power"]] = 1
+
+        if UnitFeature.Flying in features:
+            row[POWER_INDEX["air_presence"]] = 1
+        else:
+            row[POWER_INDEX["ground_presence"]] = 1
+
+        if UnitFeature.HitsGround in features:
+            row[POWER_INDEX["ground_power"]] = 1
+            if type_id in melee:
+                row[POWER_INDEX["melee_power"]] = 1
+            if type_id in surround:
+                row[POWER_INDEX["surround_power"]] = 1
+        if UnitFeature.ShootsAir in features and type_id != UnitTypeId.SENTRY:
+            row[POWER_INDEX["air_power"]] = 1
+        if type_id in siege:
+            row[POWER_INDEX["siege_power"]] = 1
+        if UnitFeature.Cloak in features:
+            row[POWER_INDEX["stealth_power"]] = 1
+        return row
+
+    def combat_power(
+        self,
+        type_ids: np.ndarray,
+        health: np.ndarray,
+        shield: Optional[np.ndarray] = None,
+        max_health: Optional[np.ndarray] = None,
+        max_shield: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Combat power of every unit, same as UnitValue.power."""
+        current = np.asarray(health, dtype=float)
+        maximum = np.zeros(len(current)) if max_health is None else np.asarray(max_health, dtype=float)
+        if shield is not None:
+            current = current + shield
+        if max_shield is not None:
+            maximum = maximum + max_shield
+
+        health_percentage = np.ones(len(current))
+        has_health = maximum > 0
+        health_percentage[has_health] = 0.5 + 0.5 * current[has_health] / maximum[has_health]
+
+        power = self.combat_values[type_ids] * health_percentage
+        return power
+
+    def unit_powers(
+        self,
+        type_ids: np.ndarray,
+        health: np.ndarray,
+        shield: Optional[np.ndarray] = None,
+        max_health: Optional[np.ndarray] = None,
+        max_shield: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Power values of every unit as N x len(POWER_FIELDS) array.
+        Shields can be left out when they are already included in health and max health.
+        Units without max health are counted as full health.
+        """
+        power = self.combat_power(type_ids, health, shield, max_health, max_shield)
+        return power[:, np.newaxis] * self.multipliers[type_ids] + self.constants[type_ids]
+
+    def totals(
+        self,
+        type_ids: np.ndarray,
+        health: np.ndarray,
+        shield: Optional[np.ndarray] = None,
+        max_health: Optional[np.ndarray] = None,
+        max_shield: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Summed power values of all units as array of len(POWER_FIELDS)."""
+        power = self.combat_power(type_ids, health, shield, max_health, max_shield)
+        return power @ self.multipliers[type_ids] + self.constants[type_ids].sum(axis=0)
+
+    def unit_values(self, unit: Unit) -> PowerValues:
+        """Power values of a single unit."""
+        current = unit.health + unit.shield
+        maximum = unit.health_max + unit.shield_max
+        health_percentage = 0.5 + 0.5 * current / maximum if maximum > 0 else 1
+
+        type_id = unit.type_id.value
+        power = self.combat_values[type_id] * health_percentage
+        return PowerValues.from_array(power * self.multipliers[type_id] + self.constants[type_id])
+
+
 class ExtendedPower:
     def is_enough_for(self, enemies: "ExtendedPower", our_percentage: float = 1.1) -> bool:
         # reduce some variable from air / ground power so that we don't fight against 100 roach with
@@ -132,7 +322,7 @@ class ExtendedPower:
                     self.air_power += pwr
 
             if unit_type in siege:
-                self.siege_power = pwr
+                self.siege_power += pwr
 
             if UnitFeature.Cloak in features:
                 self.stealth_power += pwr
@@ -140,6 +330,85 @@ class ExtendedPower:
             if UnitFeature.Detector in features:
                 self.detectors += 1
 
+    def add_values(self, values: Union[PowerValues, "ExtendedPower"]):
+        self.power += values.power
+        self.air_presence += values.air_presence
+        self.ground_presence += values.ground_presence
+        self.air_power += values.air_power
+        self.ground_power += values.ground_power
+        self.melee_power += values.melee_power
+        self.surround_power += values.surround_power
+        self.siege_power += values.siege_power
+        self.detectors += values.detectors
+        self.stealth_power += values.stealth_power
+
+    def substract_values(self, values: Union[PowerValues, "ExtendedPower"]):
+        self.power -= values.power
+        self.air_presence -= values.air_presence
+        self.ground_presence -= values.ground_presence
+        self.air_power -= values.air_power
+        self.ground_power -= values.ground_power
+        self.melee_power -= values.melee_power
+        self.surround_power -= values.surround_power
+        self.siege_power -= values.siege_power
+        self.detectors -= values.detectors
+        self.stealth_power -= values.stealth_power
+
+    def add_array(self, values: np.ndarray):
+        """Adds values in POWER_FIELDS order."""
+        (
+            power,
+            air_presence,
+            ground_presence,
+            air_power,
+            ground_power,
+            melee_power,
+            surround_power,
+            siege_power,
+            detectors,
+            stealth_power,
+        ) = values.tolist()
+        self.power += power
+        self.air_presence += air_presence
+        self.ground_presence += ground_presence
+        self.air_power += air_power
+        self.ground_power += ground_power
+        self.melee_power += melee_power
+        self.surround_power += surround_power
+        self.siege_power += siege_power
+        self.detectors += detectors
+        self.stealth_power += stealth_power
+
+    def add_arrays(
+        self,
+        type_ids: np.ndarray,
+        health: np.ndarray,
+        shield: Optional[np.ndarray] = None,
+        max_health: Optional[np.ndarray] = None,
+        max_shield: Optional[np.ndarray] = None,
+    ):
+        """Adds power of units given as arrays of type id values and health, same as calling add_unit for each."""
+        if len(type_ids) > 0:
+            self.add_array(self.values.power_table.totals(type_ids, health, shield, max_health, max_shield))
+
+    @staticmethod
+    def from_arrays(
+        values: "UnitValue",
+        type_ids: np.ndarray,
+        health: np.ndarray,
+        shield: Optional[np.ndarray] = None,
+        max_health: Optional[np.ndarray] = None,
+        max_shield: Optional[np.ndarray] = None,
+    ) -> "ExtendedPower":
+        power = ExtendedPower(values)
+        power.add_arrays(type_ids, health, shield, max_health, max_shield)
+        return power
+
+    @property
+    def power_values(self) -> PowerValues:
+        """Current values as immutable PowerValues."""
+        return PowerValues(*(getattr(self, name) for name in POWER_FIELDS))
+
     def add_power(self, extended_power: "ExtendedPower"):
         self.power += extended_power.power
         self.air_presence += extended_power.air_presence
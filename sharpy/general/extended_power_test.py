@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from sc2.ids.unit_typeid import UnitTypeId
+
+from sharpy.managers.core.unit_value import UnitValue
+from .extended_power import POWER_FIELDS, ExtendedPower, PowerValues
+
+
+def assert_same_power(power: ExtendedPower, expected: ExtendedPower):
+    for name in POWER_FIELDS:
+        assert getattr(power, name) == pytest.approx(getattr(expected, name)), name
+
+
+class TestExtendedPower:
+    def test_from_arrays_matches_add_unit(self):
+        unit_values = UnitValue()
+        # Unit data types and a type without unit data
+        type_ids = list(unit_values.unit_data.keys()) + [UnitTypeId.BROODLING]
+        rng = np.random.default_rng(0)
+        max_health = rng.uniform(10, 500, len(type_ids))
+        health = max_health * rng.uniform(0, 1, len(type_ids))
+
+        expected = ExtendedPower(unit_values)
+        for type_id, current, maximum in zip(type_ids, health, max_health):
+            # Count works as health percentage for everything except constant values
+            expected.add_unit(type_id, 0.5 + 0.5 * current / maximum)
+
+        power = ExtendedPower.from_arrays(
+            unit_values, np.array([type_id.value for type_id in type_ids]), health, max_health=max_health
+        )
+        assert_same_power(power, expected)
+
+    def test_shields_are_added_to_health(self):
+        unit_values = UnitValue()
+        type_ids = np.array([UnitTypeId.STALKER.value, UnitTypeId.SENTRY.value])
+
+        power = ExtendedPower.from_arrays(
+            unit_values, type_ids, np.array([80, 40]), np.array([0, 40]), np.array([80, 40]), np.array([80, 40])
+        )
+        expected = ExtendedPower(unit_values)
+        expected.add_unit(UnitTypeId.STALKER, 0.75)
+        expected.add_unit(UnitTypeId.SENTRY, 1)
+        assert_same_power(power, expected)
+
+    def test_empty_arrays(self):
+        power = ExtendedPower.from_arrays(UnitValue(), np.array([], dtype=np.int32), np.array([]))
+        assert power.power == 0
+
+    def test_siege_power_is_summed(self):
+        unit_values = UnitValue()
+        power = ExtendedPower(unit_values)
+        power.add_unit(UnitTypeId.SIEGETANKSIEGED)
+        power.add_unit(UnitTypeId.COLOSSUS)
+
+        tank = ExtendedPower(unit_values)
+        tank.add_unit(UnitTypeId.SIEGETANKSIEGED)
+        colossus = ExtendedPower(unit_values)
+        colossus.add_unit(UnitTypeId.COLOSSUS)
+        assert power.siege_power == pytest.approx(tank.siege_power + colossus.siege_power)
+
+        power.substract_power(colossus)
+        assert power.siege_power == pytest.approx(tank.siege_power)
+
+    def test_values_can_be_added_and_substracted(self):
+        power = ExtendedPower(UnitValue())
+        values = PowerValues(power=2, ground_power=1, detectors=1)
+
+        power.add_values(values)
+        power.add_values(values)
+        power.substract_values(values)
+        assert power.power_values == values
+
+    def test_power_values_are_immutable(self):
+        values = PowerValues(power=1)
+        with pytest.raises(AttributeError):
+            values.power = 2
+        assert (values + values).power == 2
@@ -0,0 +1,264 @@
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy import ndimage
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from sc2.position import Point2
+from sc2pathlib.fallback import grid_graph, nearest_cell
+
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+# Incremental update recalculates the whole field instead when it would cover more than this share of cells
+FULL_UPDATE_SHARE = 0.5
+# Incremental update recalculates the whole field instead when shorter paths are still found after this many rounds
+MAX_UPDATE_ROUNDS = 8
+EIGHT_CONNECTED = np.ones((3, 3), dtype=bool)
+
+
+class FlowField:
+    """
+    Path distances from every cell to a single goal, calculated with one reverse search from the goal.
+    Any number of units heading to the goal can then look up their next waypoint without a path search.
+
+    When grid values change, update only recalculates the cells whose path to the goal can change.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        goal: Tuple[float, float],
+        influence: bool = False,
+        normal_influence: float = 1,
+    ):
+        """
+        :param values: grid values [x][y], 0 for cells that are not pathable
+        :param goal: destination of the paths
+        :param influence: use cell values as movement cost
+        :param normal_influence: cell value of pathable cells without any influence
+        """
+        self.goal = Point2(goal)
+        self.influence = influence
+        self.normal_influence = normal_influence
+        self.values = values
+        self.goal_cell: Optional[Tuple[int, int]] = None
+        self.distances = np.full(values.shape, np.inf, dtype=np.float32)
+        self._next: Optional[np.ndarray] = None
+        self._jumps: Dict[int, np.ndarray] = {}
+        # Flat index of the next cell on the shortest path for every cell, from the reverse search
+        self._parents = np.arange(values.size, dtype=np.int64)
+        self._calculate_all()
+
+    def _calculate_all(self):
+        graph, node_index = grid_graph(self.values, self.influence, self.normal_influence)
+        self.distances = np.full(self.values.shape, np.inf, dtype=np.float32)
+        self.goal_cell = nearest_cell(node_index >= 0, self.goal)
+        self._parents = np.arange(self.values.size, dtype=np.int64)
+        self._next = None
+        self._jumps.clear()
+
+        if self.goal_cell is not None:
+            # Reverse search: distance from any cell to the goal is the distance from goal in the transposed graph
+            node_distances, predecessors = dijkstra(
+                graph.transpose().tocsr(), directed=True, indices=node_index[self.goal_cell], return_predecessors=True
+            )
+            self.distances[node_index >= 0] = node_distances
+            cells = np.flatnonzero(node_index >= 0)
+            reached = predecessors >= 0
+            self._parents[cells[reached]] = cells[predecessors[reached]]
+
+    def update(self, values: np.ndarray) -> int:
+        """
+        Updates distances to new grid values.
+
+        Only cells whose shortest path to the goal enters a changed cell are recalculated, starting from the
+        distances of the cells around them. When that gives a shorter path to any of the surrounding cells, the cells
+        whose path goes through them and their neighbours are recalculated in the next round.
+
+        :return: number of cells recalculated
+        """
+        changed = values != self.values
+        if not changed.any():
+            self.values = values
+            return 0
+
+        previous_pathable = self.values > 0
+        self.values = values
+        pathable = values > 0
+
+        if nearest_cell(pathable, self.goal) != self.goal_cell:
+            self._calculate_all()
+            return values.size
+
+        width, height = values.shape
+        self.distances[~pathable] = np.inf
+        self._next = None
+        self._jumps.clear()
+        # Pathable cells are also corners of diagonal moves between their neighbours
+        changed |= ndimage.binary_dilation(pathable != previous_pathable, structure=EIGHT_CONNECTED)
+        region = self._passing(changed)
+        recalculated = 0
+
+        for _ in range(MAX_UPDATE_ROUNDS):
+            region[self.goal_cell] = False
+            recalculated += int(np.count_nonzero(region))
+            if recalculated > FULL_UPDATE_SHARE * values.size:
+                break
+
+            xs, ys = np.nonzero(region)
+            if len(xs) == 0:
+                return recalculated
+
+            # Window with the cells around the region that the new paths start from
+            x0 = max(0, int(xs.min()) - 1)
+            y0 = max(0, int(ys.min()) - 1)
+            window = (slice(x0, min(width, int(xs.max()) + 2)), slice(y0, min(height, int(ys.max()) + 2)))
+            improved = np.zeros(values.shape, dtype=bool)
+            improved[window] = self._update_window(window, region[window])
+
+            if not improved.any():
+                return recalculated
+            region = self._passing(ndimage.binary_dilation(improved, structure=EIGHT_CONNECTED))
+
+        self._calculate_all()
+        return values.size
+
+    def _update_window(self, window: Tuple[slice, slice], region: np.ndarray) -> np.ndarray:
+        """
+        Recalculates distances of region cells inside the window, using the other cells as starting points.
+        Returns the other cells in the window that got a shorter path.
+        """
+        graph, node_index = grid_graph(self.values[window], self.influence, self.normal_influence)
+        distances = self.distances[window]
+        count = graph.shape[0]
+        fixed = (node_index >= 0) & ~region
+        sources = fixed & np.isfinite(distances)
+
+        # Extra node connected to the fixed cells with their distances, offset by 1 as zero weights are not edges
+        reverse = graph.transpose().tocoo()
+        graph = csr_matrix(
+            (
+                np.concatenate((reverse.data, distances[sources].astype(np.float64) + 1)),
+                (
+                    np.concatenate((reverse.row, np.full(np.count_nonzero(sources), count))),
+                    np.concatenate((reverse.col, node_index[sources])),
+                ),
+            ),
+            shape=(count + 1, count + 1),
+        )
+        node_distances, predecessors = dijkstra(graph, directed=True, indices=count, return_predecessors=True)
+
+        new = np.full(distances.shape, np.inf)
+        new[node_index >= 0] = node_distances[:count] - 1
+        improved = np.zeros(distances.shape, dtype=bool)
+        # Tolerance for distances stored as float32
+        improved[fixed] = new[fixed] < distances[fixed] * (1 - 1e-5) - 1e-5
+        update = region | improved
+        distances[update] = new[update]
+
+        # Parents of the updated cells as flat indices of the whole grid
+        height = self.distances.shape[1]
+        xs, ys = np.nonzero(node_index >= 0)
+        cells = (xs + window[0].start) * height + ys + window[1].start
+        window_cells = np.zeros(distances.shape, dtype=np.int64)
+        window_cells[node_index >= 0] = cells
+        parents = np.full(distances.shape, -1, dtype=np.int64)
+        node_parents = predecessors[:count]
+        inside = (node_parents >= 0) & (node_parents < count)
+        parents[node_index >= 0] = np.where(inside, cells[np.where(inside, node_parents, 0)], -1)
+        parents = np.where(parents >= 0, parents, window_cells)
+        self._parents.reshape(self.distances.shape)[window][update] = parents[update]
+        return improved
+
+    def _passing(self, marks: np.ndarray) -> np.ndarray:
+        """Cells whose shortest path to the goal goes through any of the marked cells, including the marked cells."""
+        result = marks.ravel().copy()
+        jump = self._parents
+        while True:
+            result |= result[jump]
+            next_jump = jump[jump]
+            if np.array_equal(next_jump, jump):
+                return result.reshape(marks.shape)
+            jump = next_jump
+
+    @property
+    def next_cells(self) -> np.ndarray:
+        """
+        Flat index of the next cell towards goal for every cell.
+        Goal and cells without a path point to themselves.
+        """
+        if self._next is None:
+            self._next = self._calculate_next()
+        return self._next
+
+    def _calculate_next(self) -> np.ndarray:
+        width, height = self.distances.shape
+        padded = np.pad(self.distances, 1, constant_values=np.inf)
+        pathable = np.pad(self.values > 0, 1, constant_values=False)
+        best = self.distances.copy()
+        next_cells = np.arange(width * height, dtype=np.int64).reshape(width, height)
+        xs, ys = np.indices((width, height))
+
+        for dx, dy in NEIGHBOURS:
+            neighbour = padded[1 + dx : 1 + dx + width, 1 + dy : 1 + dy + height]
+            if dx and dy:
+                # No cutting corners
+                corners = (
+                    pathable[1 + dx : 1 + dx + width, 1 : 1 + height]
+                    & pathable[1 : 1 + width, 1 + dy : 1 + dy + height]
+                )
+                neighbour = np.where(corners, neighbour, np.inf)
+            closer = neighbour < best
+            best = np.where(closer, neighbour, best)
+            next_cells = np.where(closer, (xs + dx) * height + ys + dy, next_cells)
+
+        return next_cells.ravel()
+
+    def jump(self, steps: int) -> np.ndarray:
+        """Flat index of the cell that is steps along the path towards goal for every cell."""
+        result = self._jumps.get(steps)
+        if result is None:
+            result = np.arange(self.distances.size, dtype=np.int64)
+            power = self.next_cells
+            remaining = steps
+            while remaining > 0:
+                if remaining & 1:
+                    result = power[result]
+                remaining >>= 1
+                if remaining:
+                    power = power[power]
+            self._jumps[steps] = result
+        return result
+
+    def distance(self, start: Tuple[float, float]) -> float:
+        """Path distance from start to goal, inf when there is no path."""
+        cell = self._start_cell(start)
+        if cell is None:
+            return math.inf
+        return float(self.distances[cell])
+
+    def waypoint(self, start: Tuple[float, float], target_index: int) -> Optional[Point2]:
+        """
+        Cell that is target_index steps along the path from start towards goal.
+        Returns goal when goal is closer than that and None when there is no path.
+        """
+        cell = self._start_cell(start)
+        if cell is None:
+            return None
+
+        height = self.distances.shape[1]
+        index = self.jump(target_index)[cell[0] * height + cell[1]]
+        x, y = divmod(int(index), height)
+
+        if self.distances[x, y] <= 0 or (x, y) == self.goal_cell:
+            return self.goal
+        return Point2((x, y))
+
+    def _start_cell(self, start: Tuple[float, float]) -> Optional[Tuple[int, int]]:
+        x, y = int(start[0]), int(start[1])
+        width, height = self.distances.shape
+        if 0 <= x < width and 0 <= y < height and self.distances[x, y] < np.inf:
+            return x, y
+        # Start is inside a block or on an island, check nearby cells
+        return nearest_cell(self.distances < np.inf, start)
@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pytest
+from sc2pathlib.fallback import PathFind
+
+from .flow_field import FlowField
+
+
+def random_map():
+    rng = np.random.default_rng(5)
+    values = (rng.random((40, 30)) > 0.25).astype(np.float32)
+    values[0, :] = values[:, 0] = 0
+    goal = (20, 15)
+    values[goal] = 1
+    return values, goal
+
+
+class TestFlowField:
+    def test_distances_match_path_finder(self):
+        values, goal = random_map()
+        field = FlowField(values, (goal[0] + 0.5, goal[1] + 0.5))
+        path_find = PathFind(values)
+
+        for x, y in np.argwhere(values > 0)[::7].tolist():
+            path, distance = path_find.find_path((x, y), goal)
+            if path:
+                assert field.distance((x, y)) == pytest.approx(distance)
+            else:
+                assert field.distance((x, y)) == math.inf
+
+    def test_next_steps_follow_shortest_path(self):
+        values, goal = random_map()
+        field = FlowField(values, (goal[0] + 0.5, goal[1] + 0.5))
+        height = values.shape[1]
+
+        for x, y in np.argwhere(np.isfinite(field.distances))[::7].tolist():
+            if (x, y) == goal:
+                continue
+            nx, ny = divmod(int(field.next_cells[x * height + y]), height)
+            assert max(abs(nx - x), abs(ny - y)) == 1
+            step = math.hypot(nx - x, ny - y)
+            assert field.distances[nx, ny] + step == pytest.approx(field.distances[x, y])
+
+    def test_influence_is_movement_cost(self):
+        values = np.ones((10, 3), dtype=np.float32)
+        values[4, :] = 5
+        field = FlowField(values, (9.5, 1.5), influence=True)
+        # Cell 4 costs five times as much to enter
+        assert field.distance((0, 1)) == pytest.approx(13)
+
+    def test_update_matches_full_calculation(self):
+        rng = np.random.default_rng(7)
+        values = np.where(rng.random((30, 25)) > 0.2, 20, 0).astype(np.float32)
+        field = FlowField(values, (15.5, 12.5), True, 20)
+
+        for _ in range(20):
+            values = values.copy()
+            x, y = rng.integers(0, 28, 2)
+            kind = rng.integers(0, 3)
+            area = values[x : x + 3, y : y + 3]
+            if kind == 0:
+                area[area > 0] += 40
+            elif kind == 1:
+                area[:] = 0
+            else:
+                area[:] = 20
+            values[15, 12] = 20
+
+            field.update(values)
+            expected = FlowField(values, (15.5, 12.5), True, 20)
+            assert np.array_equal(np.isinf(field.distances), np.isinf(expected.distances))
+            finite = np.isfinite(expected.distances)
+            assert np.allclose(field.distances[finite], expected.distances[finite])
+
+    def test_update_without_changes(self):
+        values, goal = random_map()
+        field = FlowField(values, goal)
+        assert field.update(values.copy()) == 0
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Increase when stored artifacts change in a way that makes old caches invalid
+MAP_CACHE_VERSION = 1
+MAP_CACHE_FOLDER = os.path.join("data", "map_cache")
+MANIFEST_FILE = "manifest.json"
+
+
+def map_key(map_name: str, *grids: np.ndarray) -> str:
+    """Folder name for the map, unique for the map name and grid contents."""
+    sha = hashlib.sha1(map_name.encode("utf-8"))
+    for grid in grids:
+        grid = np.ascontiguousarray(grid)
+        sha.update(str((grid.shape, grid.dtype.str)).encode("utf-8"))
+        sha.update(grid.tobytes())
+    name = re.sub(r"[^A-Za-z0-9]+", "", map_name)[:40]
+    return f"{name}_{sha.hexdigest()[:16]}"
+
+
+def artifact_hash(*values: Any) -> str:
+    """Short hash of arrays and json serializable values that an artifact depends on."""
+    sha = hashlib.sha1()
+    for value in values:
+        if isinstance(value, np.ndarray):
+            value = np.ascontiguousarray(value)
+            sha.update(str((value.shape, value.dtype.str)).encode("utf-8"))
+            sha.update(value.tobytes())
+        else:
+            sha.update(json.dumps(value, sort_keys=True).encode("utf-8"))
+    return sha.hexdigest()[:16]
+
+
+class MapArtifactStore:
+    """
+    Results of map analysis saved on disk in a folder per map, so that they need to be calculated only once per map.
+
+    Arrays are saved as .npy files and loaded memory mapped, so loading is cheap until the data is actually used.
+    Other values must be json serializable and are saved in the manifest together with the cache version.
+    A manifest with a different version is ignored and overwritten as artifacts are put to the store.
+    Write errors disable saving but never raise, store without a folder never saves anything.
+    """
+
+    def __init__(self, folder: Optional[str]):
+        self.folder = folder
+        self.hits = 0
+        self.misses = 0
+        self.write_error: Optional[str] = None
+        self._values: Dict[str, Any] = {}
+        self._arrays: Dict[str, str] = {}
+        self._loaded: Dict[str, np.ndarray] = {}
+
+        if folder is not None:
+            self._read_manifest()
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.folder, MANIFEST_FILE), "r") as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return
+
+        if manifest.get("version") != MAP_CACHE_VERSION:
+            return
+        self._values = manifest.get("values", {})
+        self._arrays = manifest.get("arrays", {})
+
+    def _write_manifest(self):
+        manifest = {"version": MAP_CACHE_VERSION, "values": self._values, "arrays": self._arrays}
+        file_name = os.path.join(self.folder, MANIFEST_FILE)
+        temp_name = file_name + ".tmp"
+        with open(temp_name, "w") as handle:
+            json.dump(manifest, handle)
+        os.replace(temp_name, file_name)
+
+    @property
+    def can_save(self) -> bool:
+        return self.folder is not None and self.write_error is None
+
+    def get(self, name: str) -> Optional[Any]:
+        """Value saved with the name, None if there is no such value."""
+        value = self._values.get(name)
+        self._count(value is not None)
+        return value
+
+    def get_array(self, name: str) -> Optional[np.ndarray]:
+        """Read only, memory mapped array saved with the name, None if there is no such array."""
+        array = self._loaded.get(name)
+        if array is None:
+            file_name = self._arrays.get(name)
+            if file_name is not None:
+                try:
+                    array = np.load(os.path.join(self.folder, file_name), mmap_mode="r")
+                    self._loaded[name] = array
+                except (OSError, ValueError):
+                    array = None
+        self._count(array is not None)
+        return array
+
+    def put(self, name: str, value: Any):
+        self._values[name] = value
+        self._save()
+
+    def put_arrays(self, arrays: Dict[str, np.ndarray], values: Optional[Dict[str, Any]] = None):
+        """Saves multiple arrays and values, manifest is only written once."""
+        if self.can_save:
+            try:
+                os.makedirs(self.folder, exist_ok=True)
+                for name, array in arrays.items():
+                    file_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name) + ".npy"
+                    np.save(os.path.join(self.folder, file_name), np.ascontiguousarray(array))
+                    self._arrays[name] = file_name
+            except OSError as e:
+                self.write_error = str(e)
+
+        # Arrays are available for the rest of the game even when they couldn't be saved
+        for name, array in arrays.items():
+            copy = np.array(array)
+            copy.flags.writeable = False
+            self._loaded[name] = copy
+        if values:
+            self._values.update(values)
+        self._save()
+
+    def _save(self):
+        if not self.can_save:
+            return
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            self._write_manifest()
+        except OSError as e:
+            self.write_error = str(e)
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
@@ -0,0 +1,54 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from .map_artifact_store import MapArtifactStore, MANIFEST_FILE, map_key
+
+
+class TestMapArtifactStore:
+    def test_round_trip(self, tmp_path):
+        store = MapArtifactStore(str(tmp_path))
+        assert store.get("walls") is None
+        assert store.get_array("grid") is None
+
+        grid = np.arange(12, dtype=np.int16).reshape(3, 4)
+        store.put_arrays({"grid": grid}, {"walls": [[1.5, 2.5]]})
+
+        loaded = MapArtifactStore(str(tmp_path))
+        assert loaded.get("walls") == [[1.5, 2.5]]
+        array = loaded.get_array("grid")
+        assert isinstance(array, np.memmap)
+        assert np.array_equal(array, grid)
+        with pytest.raises(ValueError):
+            array[0, 0] = 5
+        assert loaded.hits == 2
+
+    def test_different_version_is_ignored(self, tmp_path):
+        store = MapArtifactStore(str(tmp_path))
+        store.put("walls", [])
+
+        file_name = os.path.join(str(tmp_path), MANIFEST_FILE)
+        with open(file_name, "r") as handle:
+            manifest = json.load(handle)
+        manifest["version"] = -1
+        with open(file_name, "w") as handle:
+            json.dump(manifest, handle)
+
+        assert MapArtifactStore(str(tmp_path)).get("walls") is None
+
+    def test_without_folder(self):
+        store = MapArtifactStore(None)
+        store.put_arrays({"grid": np.zeros(3)}, {"walls": []})
+        assert not store.can_save
+        assert store.get("walls") == []
+        assert np.array_equal(store.get_array("grid"), np.zeros(3))
+
+    def test_map_key(self):
+        grid = np.zeros((4, 4), dtype=np.uint8)
+        key = map_key("Ever Dream LE", grid)
+        assert key.startswith("EverDreamLE_")
+        assert key == map_key("Ever Dream LE", grid.copy())
+        grid[1, 1] = 1
+        assert key != map_key("Ever Dream LE", grid)
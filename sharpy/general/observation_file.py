@@ -0,0 +1,138 @@
+import gzip
+import json
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from s2clientprotocol import common_pb2, sc2api_pb2 as sc_pb
+
+# Increase when the record layout changes so that old files are rejected instead of misread
+OBSERVATION_FILE_VERSION = 1
+OBSERVATION_FOLDER = os.path.join("data", "observations")
+
+# Record kinds
+RECORD_HEADER = 1
+RECORD_GAME_DATA = 2
+RECORD_GAME_INFO = 3
+RECORD_PATHING_GRID = 4
+RECORD_OBSERVATION = 5
+RECORD_RESULT = 6
+
+_record_header = struct.Struct("<BI")
+
+
+class ObservationWriter:
+    """
+    Writes game data, game info and observations of a game as length prefixed protobuf records in a gzip file.
+
+    Pathing grid is written only when it changes, observations refer to the latest written pathing grid.
+    """
+
+    def __init__(self, file_name: str, compress_level: int = 1):
+        self.file_name = file_name
+        self.records = 0
+        self._file: Optional[BinaryIO] = gzip.open(file_name, "wb", compresslevel=compress_level)
+        self._pathing_data: Optional[bytes] = None
+
+    def write_header(self, **values: Any):
+        values["version"] = OBSERVATION_FILE_VERSION
+        self._write(RECORD_HEADER, json.dumps(values).encode("utf-8"))
+
+    def write_game_data(self, game_data: sc_pb.ResponseData):
+        self._write(RECORD_GAME_DATA, game_data.SerializeToString())
+
+    def write_game_info(self, game_info: sc_pb.ResponseGameInfo):
+        self._write(RECORD_GAME_INFO, game_info.SerializeToString())
+        self._pathing_data = game_info.start_raw.pathing_grid.data
+
+    def write_observation(self, observation: sc_pb.ResponseObservation, pathing_grid: common_pb2.ImageData):
+        if pathing_grid.data != self._pathing_data:
+            self._write(RECORD_PATHING_GRID, pathing_grid.SerializeToString())
+            self._pathing_data = pathing_grid.data
+        self._write(RECORD_OBSERVATION, observation.SerializeToString())
+
+    def write_result(self, result: int):
+        self._write(RECORD_RESULT, json.dumps({"result": result}).encode("utf-8"))
+
+    def _write(self, kind: int, payload: bytes):
+        self._file.write(_record_header.pack(kind, len(payload)))
+        self._file.write(payload)
+        self.records += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ObservationRecording:
+    """
+    Game recorded with ObservationWriter.
+
+    Observations are kept as serialized protobufs and parsed only when frames are iterated,
+    so that parsing can be kept out of measured time by iterating frames to a list first.
+    """
+
+    def __init__(self):
+        self.header: Dict[str, Any] = {}
+        self.game_data = sc_pb.ResponseData()
+        self.game_info = sc_pb.ResponseGameInfo()
+        self.result: Optional[int] = None
+        # Serialized observation and index to pathing grids for every frame
+        self._frames: List[Tuple[bytes, int]] = []
+        self._pathing_grids: List[common_pb2.ImageData] = []
+
+    @staticmethod
+    def load(file_name: str) -> "ObservationRecording":
+        recording = ObservationRecording()
+        with gzip.open(file_name, "rb") as handle:
+            for kind, payload in _read_records(handle):
+                recording._add_record(kind, payload)
+        if recording.header.get("version") != OBSERVATION_FILE_VERSION:
+            raise ValueError(f"Unsupported observation file version: {recording.header.get('version')}")
+        return recording
+
+    def _add_record(self, kind: int, payload: bytes):
+        if kind == RECORD_HEADER:
+            self.header = json.loads(payload.decode("utf-8"))
+        elif kind == RECORD_GAME_DATA:
+            self.game_data.ParseFromString(payload)
+        elif kind == RECORD_GAME_INFO:
+            self.game_info.ParseFromString(payload)
+            grid = common_pb2.ImageData()
+            grid.CopyFrom(self.game_info.start_raw.pathing_grid)
+            self._pathing_grids.append(grid)
+        elif kind == RECORD_PATHING_GRID:
+            grid = common_pb2.ImageData()
+            grid.ParseFromString(payload)
+            self._pathing_grids.append(grid)
+        elif kind == RECORD_OBSERVATION:
+            self._frames.append((payload, len(self._pathing_grids) - 1))
+        elif kind == RECORD_RESULT:
+            self.result = json.loads(payload.decode("utf-8"))["result"]
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def frames(self) -> Iterator[Tuple[sc_pb.ResponseObservation, common_pb2.ImageData]]:
+        """Observation and pathing grid for every recorded frame, first frame is the one seen on start."""
+        for payload, grid_index in self._frames:
+            observation = sc_pb.ResponseObservation()
+            observation.ParseFromString(payload)
+            yield observation, self._pathing_grids[grid_index]
+
+
+def _read_records(handle: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    while True:
+        try:
+            header = handle.read(_record_header.size)
+            if len(header) < _record_header.size:
+                return
+            kind, length = _record_header.unpack(header)
+            payload = handle.read(length)
+        except EOFError:
+            # File of a game that crashed while recording, records before the crash are still usable
+            return
+        if len(payload) < length:
+            return
+        yield kind, payload
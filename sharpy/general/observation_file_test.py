@@ -0,0 +1,138 @@
+import asyncio
+import gzip
+import os
+
+from s2clientprotocol import common_pb2, sc2api_pb2 as sc_pb
+
+from benchmarks.scene import SceneBot, scene_recording
+from sc2.bot_ai import BotAI
+from sc2.data import Result
+from sharpy.managers.extensions.observation_recorder import ObservationRecorder
+from sharpy.tools.observation_player import ObservationPlayer
+from .observation_file import ObservationRecording, ObservationWriter
+
+
+def grid(size: int, value: int, bits: int) -> common_pb2.ImageData:
+    image = common_pb2.ImageData(bits_per_pixel=bits, data=bytes([value]) * (size * size * bits // 8))
+    image.size.x = size
+    image.size.y = size
+    return image
+
+
+def game_info(size: int = 16) -> sc_pb.ResponseGameInfo:
+    info = sc_pb.ResponseGameInfo(map_name="Test Map")
+    info.start_raw.map_size.x = size
+    info.start_raw.map_size.y = size
+    info.start_raw.pathing_grid.CopyFrom(grid(size, 255, 1))
+    info.start_raw.placement_grid.CopyFrom(grid(size, 0, 1))
+    info.start_raw.terrain_height.CopyFrom(grid(size, 100, 8))
+    info.start_raw.playable_area.p1.x = size
+    info.start_raw.playable_area.p1.y = size
+    return info
+
+
+def observation(game_loop: int) -> sc_pb.ResponseObservation:
+    response = sc_pb.ResponseObservation()
+    response.observation.game_loop = game_loop
+    response.observation.player_common.minerals = 50 + game_loop
+    response.observation.raw_data.map_state.visibility.CopyFrom(grid(16, 0, 8))
+    response.observation.raw_data.map_state.creep.CopyFrom(grid(16, 0, 1))
+    return response
+
+
+def write_recording(file_name: str, frames: int):
+    writer = ObservationWriter(file_name)
+    writer.write_header(player_id=1, base_build=1, game_step=2)
+    writer.write_game_data(sc_pb.ResponseData())
+    info = game_info()
+    writer.write_game_info(info)
+    for index in range(frames):
+        pathing = info.start_raw.pathing_grid if index < 2 else grid(16, 0, 1)
+        writer.write_observation(observation(index * 2), pathing)
+    writer.write_result(Result.Victory.value)
+    writer.close()
+
+
+class StepCounterBot(BotAI):
+    def __init__(self):
+        self.minerals_seen = []
+
+    async def on_step(self, iteration: int):
+        self.minerals_seen.append(self.minerals)
+
+
+class RecordingBot(SceneBot):
+    def __init__(self, folder: str):
+        super().__init__()
+        self.recorder = ObservationRecorder(folder)
+
+    def configure_managers(self):
+        return [self.recorder]
+
+
+class TestObservationFile:
+    def test_round_trip(self, tmp_path):
+        file_name = os.path.join(tmp_path, "game.sc2obs.gz")
+        write_recording(file_name, 4)
+
+        recording = ObservationRecording.load(file_name)
+        assert recording.header["game_step"] == 2
+        assert recording.game_info.map_name == "Test Map"
+        assert recording.result == Result.Victory.value
+        frames = list(recording.frames())
+        assert [frame.observation.game_loop for frame, _ in frames] == [0, 2, 4, 6]
+        # Pathing grid is stored only when it changes
+        assert [pathing.data[0] for _, pathing in frames] == [255, 255, 0, 0]
+        assert len(recording._pathing_grids) == 2
+
+    def test_truncated_file(self, tmp_path):
+        file_name = os.path.join(tmp_path, "game.sc2obs.gz")
+        write_recording(file_name, 3)
+        with gzip.open(file_name, "rb") as handle:
+            data = handle.read()
+        with gzip.open(file_name, "wb") as handle:
+            handle.write(data[:-5])
+
+        recording = ObservationRecording.load(file_name)
+        assert recording.result is None
+        assert len(recording) == 3
+
+        # Compressed stream without an end marker
+        with open(file_name, "rb") as handle:
+            data = handle.read()
+        with open(file_name, "wb") as handle:
+            handle.write(data[: len(data) // 2])
+        assert len(ObservationRecording.load(file_name)) < 3
+
+    def test_player_feeds_frames_to_bot(self, tmp_path):
+        file_name = os.path.join(tmp_path, "game.sc2obs.gz")
+        write_recording(file_name, 4)
+        player = ObservationPlayer(ObservationRecording.load(file_name))
+        bot = StepCounterBot()
+
+        assert asyncio.run(player.play(bot)) == Result.Victory
+        # First frame is used for on_start
+        assert bot.minerals_seen == [52, 54, 56]
+        assert len(player.step_times) == 3
+        assert bot.game_info.pathing_grid[(0, 0)] == 0
+
+    def test_recorded_game_plays_back_the_same(self, tmp_path):
+        source = scene_recording(50, steps=3)
+        bot = RecordingBot(str(tmp_path))
+        assert asyncio.run(ObservationPlayer(source).play(bot)) == Result.Undecided
+        assert bot.recorder.write_error is None
+
+        files = os.listdir(tmp_path)
+        assert len(files) == 1
+        recording = ObservationRecording.load(os.path.join(tmp_path, files[0]))
+        assert recording.header["game_version"] == source.header["game_version"]
+        assert recording.header["base_build"] == source.header["base_build"]
+        assert recording.game_data == source.game_data
+        assert recording.game_info == source.game_info
+        assert recording.result == Result.Undecided.value
+        assert list(recording.frames()) == list(source.frames())
+
+        replayed = SceneBot()
+        asyncio.run(ObservationPlayer(recording).play(replayed))
+        assert replayed.state.game_loop == bot.state.game_loop
+        assert replayed.knowledge.version_manager.full_version == source.header["game_version"]
@@ -0,0 +1,163 @@
+import math
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+PathKey = Tuple[Hashable, Tuple[int, int], Tuple[int, int]]
+PathResult = Tuple[List[Tuple[int, int]], float]
+
+
+class CachedPath:
+    __slots__ = ("path", "distance", "cumulative", "cells", "bounds")
+
+    def __init__(self, path: List[Tuple[int, int]], distance: float):
+        self.path = path
+        self.distance = distance
+        self.cells: Dict[Tuple[int, int], int] = {}
+        self.cumulative: List[float] = [0.0]
+
+        total = 0.0
+        for i, cell in enumerate(path):
+            self.cells.setdefault(cell, i)
+            if i > 0:
+                previous = path[i - 1]
+                total += math.hypot(cell[0] - previous[0], cell[1] - previous[1])
+                self.cumulative.append(total)
+
+        xs = [cell[0] for cell in path]
+        ys = [cell[1] for cell in path]
+        self.bounds = (min(xs), min(ys), max(xs), max(ys))
+
+    def index_of(self, cell: Tuple[int, int]) -> Optional[int]:
+        """Index of the cell on the path."""
+        return self.cells.get(cell)
+
+    def suffix(self, index: int) -> PathResult:
+        length = self.cumulative[-1]
+        if length <= 0:
+            return self.path[index:], self.distance
+        return self.path[index:], self.distance * (1 - self.cumulative[index] / length)
+
+    def passes_area(self, x: int, y: int, x2: int, y2: int) -> bool:
+        """Does the path pass through cells within x <= cell x < x2 and y <= cell y < y2."""
+        if self.bounds[0] >= x2 or self.bounds[2] < x or self.bounds[1] >= y2 or self.bounds[3] < y:
+            return False
+        for cell in self.path:
+            if x <= cell[0] < x2 and y <= cell[1] < y2:
+                return True
+        return False
+
+
+class PathCache:
+    """
+    LRU cache for path finding results.
+
+    Paths are stored by map type and exact start and goal cells. When a start has no entry of its own, but lies
+    on a cached path to the same goal, the remaining part of that path is returned.
+    Results should be treated as read only.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: "OrderedDict[PathKey, CachedPath]" = OrderedDict()
+        self._by_goal: Dict[Tuple[Hashable, Tuple[int, int]], Set[PathKey]] = {}
+
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.suffix_hits + self.misses
+        if total == 0:
+            return 0
+        return (self.hits + self.suffix_hits) / total
+
+    @staticmethod
+    def cell(position: Tuple[float, float]) -> Tuple[int, int]:
+        # Same rounding as path finders use for start and end
+        return int(round(position[0])), int(round(position[1]))
+
+    def get(self, map_type: Hashable, start: Tuple[float, float], goal: Tuple[float, float]) -> Optional[PathResult]:
+        goal_key = self.cell(goal)
+        start_cell = self.cell(start)
+        key = (map_type, start_cell, goal_key)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.path, entry.distance
+
+        for other_key in self._by_goal.get((map_type, goal_key), ()):
+            entry = self._entries[other_key]
+            index = entry.index_of(start_cell)
+            if index is not None:
+                self._entries.move_to_end(other_key)
+                self.suffix_hits += 1
+                return entry.suffix(index)
+
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        map_type: Hashable,
+        start: Tuple[float, float],
+        goal: Tuple[float, float],
+        path: List[Tuple[int, int]],
+        distance: float,
+    ):
+        if len(path) < 1:
+            # No path, blockers could be removed at any time
+            return
+
+        goal_key = self.cell(goal)
+        key = (map_type, self.cell(start), goal_key)
+        self._entries[key] = CachedPath(path, distance)
+        self._entries.move_to_end(key)
+        self._by_goal.setdefault((map_type, goal_key), set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            old_key, _ = self._entries.popitem(last=False)
+            self._remove_goal_key(old_key)
+            self.evictions += 1
+
+    def invalidate_area(self, map_type: Hashable, x: int, y: int, x2: int, y2: int, margin: int = 1):
+        """Removes cached paths of the map type that pass within margin of the area."""
+        x -= margin
+        y -= margin
+        x2 += margin
+        y2 += margin
+        removed = [
+            key for key, entry in self._entries.items() if key[0] == map_type and entry.passes_area(x, y, x2, y2)
+        ]
+
+        for key in removed:
+            del self._entries[key]
+            self._remove_goal_key(key)
+        self.invalidations += len(removed)
+
+    def invalidate_map_type(self, map_type: Hashable):
+        """Removes all cached paths of the map type."""
+        removed = [key for key in self._entries if key[0] == map_type]
+        for key in removed:
+            del self._entries[key]
+            self._remove_goal_key(key)
+        self.invalidations += len(removed)
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._by_goal.clear()
+
+    def _remove_goal_key(self, key: PathKey):
+        goal_keys = self._by_goal.get((key[0], key[2]))
+        if goal_keys is not None:
+            goal_keys.discard(key)
+            if not goal_keys:
+                del self._by_goal[(key[0], key[2])]
@@ -0,0 +1,81 @@
+from .path_cache import PathCache
+
+straight_path = [(x, 10) for x in range(10, 31)]
+
+
+class TestPathCache:
+    def test_miss_then_hit(self):
+        cache = PathCache()
+        assert cache.get(0, (10.5, 10.5), (30.5, 10.5)) is None
+
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        assert cache.get(0, (10.4, 9.6), (30.5, 10.5)) == (straight_path, 20)
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_goal_is_exact_cell(self):
+        cache = PathCache()
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        assert cache.get(0, (10.5, 10.5), (31.5, 10.5)) is None
+
+    def test_cells_are_rounded_like_path_finders(self):
+        cache = PathCache()
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        # Path finder would start from cell (11, 10), which is on the path but not its start
+        path, distance = cache.get(0, (10.6, 10.4), (30.5, 10.5))
+        assert path == straight_path[1:]
+        assert distance == 19
+
+    def test_map_types_are_separate(self):
+        cache = PathCache()
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        assert cache.get(1, (10.5, 10.5), (30.5, 10.5)) is None
+
+    def test_start_on_path_returns_suffix(self):
+        cache = PathCache()
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        path, distance = cache.get(0, (20.5, 10.5), (30.5, 10.5))
+
+        assert path == straight_path[10:]
+        assert distance == 10
+        assert cache.suffix_hits == 1
+
+    def test_start_next_to_path_is_a_miss(self):
+        cache = PathCache()
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        # The shortest path from a neighbouring cell does not necessarily join the cached path
+        assert cache.get(0, (20.5, 11.5), (30.5, 10.5)) is None
+
+    def test_empty_path_is_not_cached(self):
+        cache = PathCache()
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), [], 0)
+        assert len(cache) == 0
+
+    def test_block_on_path_invalidates(self):
+        cache = PathCache()
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        cache.invalidate_area(0, 50, 50, 52, 52)
+        assert len(cache) == 1
+
+        cache.invalidate_area(0, 20, 10, 22, 12)
+        assert len(cache) == 0
+        assert cache.get(0, (20.5, 10.5), (30.5, 10.5)) is None
+
+    def test_invalidate_map_type(self):
+        cache = PathCache()
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        cache.put(1, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        cache.invalidate_map_type(0)
+        assert cache.get(0, (10.5, 10.5), (30.5, 10.5)) is None
+        assert cache.get(1, (10.5, 10.5), (30.5, 10.5)) is not None
+
+    def test_least_recently_used_is_evicted(self):
+        cache = PathCache(max_size=2)
+        cache.put(0, (10.5, 10.5), (30.5, 10.5), straight_path, 20)
+        cache.put(0, (10.5, 20.5), (30.5, 10.5), straight_path, 20)
+        cache.get(0, (10.5, 10.5), (30.5, 10.5))
+        cache.put(0, (10.5, 30.5), (30.5, 10.5), straight_path, 20)
+
+        assert cache.evictions == 1
+        assert cache.get(0, (10.5, 10.5), (30.5, 10.5)) is not None
+        assert cache.get(0, (10.5, 20.5), (30.5, 10.5)) is None
@@ -19,6 +19,7 @@ worker_types = {UnitTypeId.SCV, UnitTypeId.MULE, UnitTypeId.DRONE, UnitTypeId.PR
 if TYPE_CHECKING:
     from sharpy.knowledges import Knowledge
     from sharpy.managers.core import ZoneManager
+    from sharpy.general.zone_groups import ZoneGroups
 
 
 class ZoneResources(enum.Enum):
@@ -51,6 +52,8 @@ class Zone:
         self._is_enemys = False
 
         self.zone_index: int = 0
+        # Index of the zone in pathing grid zones, -1 if the zone isn't in the grid
+        self.grid_index: int = -1
         self.paths: Dict[int, Path] = dict()  # paths to other expansions as it is dictated in the .expansion_zones
         # Game time seconds when we have last had visibility on this zone.
         self.last_scouted_center: float = -1
@@ -194,7 +197,13 @@ class Zone:
         else:
             return ZoneResources.Empty
 
-    def update(self):
+    def update(self, own_groups: "ZoneGroups", enemy_groups: "ZoneGroups"):
+        """
+        Updates the zone for the current frame.
+
+        :param own_groups: own units grouped by zone
+        :param enemy_groups: enemy units grouped by zone, without the ones we can't fight against
+        """
         self.mineral_fields.clear()
         for mf in self._original_mineral_fields:
             new_mf = self.cache.mineral_fields.get(mf.position, None)
@@ -206,9 +215,8 @@ class Zone:
         self.assaulting_enemy_power.clear()
 
         # Own and enemy units are figured out in zone manager update.
-
-        # Only add units that we can fight against
-        self.known_enemy_units = self.known_enemy_units.filter(lambda x: x.cloak != 2)
+        self.our_units = self.cache.own_arrays.to_units(own_groups.indices(self.grid_index), self.ai)
+        self.known_enemy_units = self.cache.enemy_arrays.to_units(enemy_groups.indices(self.grid_index), self.ai)
         self.enemy_workers = self.known_enemy_units.of_type(worker_types)
         self.our_workers: Units = self.our_units.of_type(worker_types)
 
@@ -223,18 +231,17 @@ class Zone:
         if self.ai.is_visible(self.mineral_line_center):
             self.last_scouted_mineral_line = self.knowledge.ai.time
 
-        for unit in self.our_units:
-            # Our unit is inside the zone
-            self.our_power.add_unit(unit)
-
-        for unit in self.known_enemy_units:
-            # Enemy unit is inside the zone
-            self.known_enemy_power.add_unit(unit)
+        self.our_power.add_array(own_groups.power(self.grid_index))
+        self.known_enemy_power.add_array(enemy_groups.power(self.grid_index))
 
         if self.is_ours:
             self.calc_needs_evacuation()
-            self.assaulting_enemies: Units = self.cache.enemy_in_range(self.center_location, self.danger_radius)
-            self.assaulting_enemy_power.add_units(self.assaulting_enemies)
+            indices = self.cache.enemy_in_range_indices(self.center_location, self.danger_radius)
+            arrays = self.cache.enemy_arrays
+            self.assaulting_enemies: Units = arrays.to_units(indices, self.ai)
+            self.assaulting_enemy_power.add_arrays(
+                arrays.type_ids[indices], arrays.health_shield[indices], max_health=arrays.max_health_shield[indices]
+            )
         else:
             self.needs_evacuation = False
             self.assaulting_enemies.clear()
@@ -0,0 +1,72 @@
+from typing import Optional
+
+import numpy as np
+
+from sharpy.general.extended_power import POWER_FIELDS
+
+
+def sample_zones(zone_grid: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Zone indices of all positions with a single lookup.
+
+    :param zone_grid: int [x][y] array of zones from Sc2Map.zone_grid, zones start from 1 and 0 is no zone
+    :param positions: N x 2 array of positions
+    :return: zone index starting from 0 for every position, -1 for positions without a zone
+    """
+    if len(positions) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    cells = np.floor(positions).astype(np.intp)
+    inside = (
+        (cells[:, 0] >= 0)
+        & (cells[:, 0] < zone_grid.shape[0])
+        & (cells[:, 1] >= 0)
+        & (cells[:, 1] < zone_grid.shape[1])
+    )
+    zones = np.full(len(positions), -1, dtype=np.intp)
+    zones[inside] = zone_grid[cells[inside, 0], cells[inside, 1]].astype(np.intp) - 1
+    return zones
+
+
+class ZoneGroups:
+    """
+    Units of one side grouped by zone for a single frame.
+
+    Indices refer to the unit arrays the zones were calculated for and units of each zone are a slice of a single
+    sorted index array. Power values of units can be summed for all zones at once.
+    """
+
+    def __init__(self, zones: np.ndarray, zone_count: int, unit_powers: Optional[np.ndarray] = None):
+        """
+        :param zones: zone index of every unit, -1 for units that are not in any zone
+        :param zone_count: number of zones
+        :param unit_powers: N x len(POWER_FIELDS) array from PowerTable.unit_powers
+        """
+        self.zones = zones
+        self.zone_count = zone_count
+        self.order = np.argsort(zones, kind="stable")
+        in_zone = zones >= 0
+        self.counts = np.bincount(zones[in_zone], minlength=zone_count)
+        # Units without a zone are sorted first
+        self.starts = np.zeros(zone_count + 1, dtype=np.intp)
+        self.starts[0] = len(zones) - np.count_nonzero(in_zone)
+        self.starts[1:] = self.starts[0] + np.cumsum(self.counts)
+
+        self.powers = np.zeros((zone_count, len(POWER_FIELDS)))
+        if unit_powers is not None and np.any(in_zone):
+            for field in range(len(POWER_FIELDS)):
+                self.powers[:, field] = np.bincount(
+                    zones[in_zone], weights=unit_powers[in_zone, field], minlength=zone_count
+                )
+
+    def indices(self, zone_index: int) -> np.ndarray:
+        """Indices of units in the zone, in the same order as the units are in the unit arrays."""
+        if zone_index < 0 or zone_index >= self.zone_count:
+            return np.empty(0, dtype=np.intp)
+        return self.order[self.starts[zone_index] : self.starts[zone_index + 1]]
+
+    def power(self, zone_index: int) -> np.ndarray:
+        """Summed power values of units in the zone in POWER_FIELDS order."""
+        if zone_index < 0 or zone_index >= self.zone_count:
+            return np.zeros(len(POWER_FIELDS))
+        return self.powers[zone_index]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sc2.ids.unit_typeid import UnitTypeId
+
+from sharpy.managers.core.unit_value import UnitValue
+from .zone_groups import ZoneGroups, sample_zones
+
+
+class TestZoneGroups:
+    def test_sample_zones(self):
+        grid = np.zeros((10, 8), dtype=np.int16)
+        grid[:5, :] = 1
+        grid[5:, 4:] = 2
+        positions = np.array([[0.5, 0.5], [4.9, 7.9], [5.0, 4.0], [6.5, 1.5], [-1, 2], [10.2, 5]])
+
+        assert sample_zones(grid, positions).tolist() == [0, 0, 1, -1, -1, -1]
+        assert len(sample_zones(grid, np.empty((0, 2)))) == 0
+
+    def test_indices_by_zone(self):
+        groups = ZoneGroups(np.array([2, -1, 0, 2, 0, -1, 2]), 4)
+
+        assert groups.indices(0).tolist() == [2, 4]
+        assert groups.indices(1).tolist() == []
+        assert groups.indices(2).tolist() == [0, 3, 6]
+        assert groups.indices(3).tolist() == []
+        assert groups.indices(-1).tolist() == []
+
+    def test_power_matches_units_in_zone(self):
+        unit_values = UnitValue()
+        table = unit_values.power_table
+        type_ids = np.array(
+            [UnitTypeId.ZEALOT.value, UnitTypeId.STALKER.value, UnitTypeId.OBSERVER.value, UnitTypeId.PROBE.value]
+        )
+        health = np.array([150, 100, 70, 40], dtype=float)
+        max_health = np.array([150, 160, 70, 40], dtype=float)
+        zones = np.array([1, 0, 1, -1])
+
+        groups = ZoneGroups(zones, 2, table.unit_powers(type_ids, health, max_health=max_health))
+
+        for zone_index in range(2):
+            in_zone = zones == zone_index
+            expected = table.totals(type_ids[in_zone], health[in_zone], max_health=max_health[in_zone])
+            assert groups.power(zone_index) == pytest.approx(expected)
+        assert not np.any(groups.power(5))
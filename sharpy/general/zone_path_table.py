@@ -0,0 +1,152 @@
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from sc2.position import Point2
+from sharpy.general.flow_field import grid_graph, nearest_cell
+from sharpy.general.map_artifact_store import MapArtifactStore
+
+# Increase when path calculation changes to ignore old cached tables
+ZONE_PATH_VERSION = 1
+
+
+def location_key(location: Tuple[float, float]) -> Tuple[float, float]:
+    return round(float(location[0]), 1), round(float(location[1]), 1)
+
+
+def map_hash(values: np.ndarray, locations: Sequence[Tuple[float, float]]) -> str:
+    """Hash of the pathing grid and zone locations, paths between the zones only change when this changes."""
+    sha = hashlib.sha1()
+    grid = np.ascontiguousarray(values, dtype=np.float32)
+    sha.update(np.array(grid.shape, dtype=np.int32).tobytes())
+    sha.update(grid.tobytes())
+    sha.update(np.array(sorted(location_key(location) for location in locations), dtype=np.float64).tobytes())
+    return sha.hexdigest()[:20]
+
+
+class ZonePathTable:
+    """
+    Paths and path distances between all pairs of zones, calculated with a single search from every zone.
+
+    Paths are stored as one array of cells for pairs i < j, path from j to i is the reversed path.
+    Pairs without a path have an empty path and distance 0, same as PathFinder.find_path returns.
+    """
+
+    array_names = ("locations", "distances", "cells", "offsets")
+
+    def __init__(self, locations: np.ndarray, distances: np.ndarray, cells: np.ndarray, offsets: np.ndarray):
+        """
+        :param locations: Z x 2 array of zone locations
+        :param distances: Z x Z array of path distances
+        :param cells: K x 2 array of path cells of all paths
+        :param offsets: start of each path in cells for pairs i < j in row major order, with the total count last
+        """
+        self.locations = locations
+        self.distances = distances
+        self.cells = cells
+        self.offsets = offsets
+        self._indices: Dict[Tuple[float, float], int] = {
+            location_key(location): index for index, location in enumerate(locations.tolist())
+        }
+
+    @property
+    def count(self) -> int:
+        return len(self.locations)
+
+    def index(self, location: Tuple[float, float]) -> Optional[int]:
+        """Index of the zone at location, None if there is no zone there."""
+        return self._indices.get(location_key(location))
+
+    def _pair(self, i: int, j: int) -> int:
+        # Index of pair i < j when pairs are in row major order
+        return i * self.count - i * (i + 1) // 2 + j - i - 1
+
+    def distance(self, i: int, j: int) -> float:
+        return float(self.distances[i, j])
+
+    def path(self, i: int, j: int) -> Tuple[List[Tuple[int, int]], float]:
+        """Path from zone i to zone j in the same format as PathFinder.find_path."""
+        if i == j:
+            return [], 0.0
+        pair = self._pair(min(i, j), max(i, j))
+        cells = self.cells[self.offsets[pair] : self.offsets[pair + 1]]
+        if i > j:
+            cells = cells[::-1]
+        return [tuple(cell) for cell in cells.tolist()], self.distance(i, j)
+
+    @staticmethod
+    def calculate(values: np.ndarray, locations: Sequence[Tuple[float, float]]) -> "ZonePathTable":
+        """
+        Calculates paths between all zones without influence, same paths as PathFinder.find_path finds.
+
+        :param values: pathing grid values [x][y], 0 for cells that are not pathable
+        :param locations: zone locations
+        """
+        locations = np.array(sorted(location_key(location) for location in locations), dtype=np.float64)
+        count = len(locations)
+        graph, node_index = grid_graph(values)
+        pathable = node_index >= 0
+        node_cells = np.argwhere(pathable)
+
+        sources = []
+        for x, y in locations.tolist():
+            # PathFinder rounds start and end to closest cell
+            cell = nearest_cell(pathable, (round(x), round(y)))
+            sources.append(-1 if cell is None else int(node_index[cell]))
+
+        distances = np.zeros((count, count))
+        paths: List[np.ndarray] = []
+        # Paths are searched from zone i to zones j > i, last zone doesn't need a search of its own
+        valid = [i for i in range(count - 1) if sources[i] >= 0]
+        node_distances = np.full((count, len(node_cells)), np.inf)
+        predecessors = np.full((count, len(node_cells)), -9999, dtype=np.int32)
+
+        if valid and len(node_cells) > 0:
+            found_distances, found_predecessors = dijkstra(
+                graph, directed=True, indices=[sources[i] for i in valid], return_predecessors=True
+            )
+            node_distances[valid] = found_distances
+            predecessors[valid] = found_predecessors
+
+        for i in range(count):
+            for j in range(i + 1, count):
+                end = sources[j]
+                if sources[i] < 0 or end < 0 or not np.isfinite(node_distances[i, end]):
+                    paths.append(np.empty((0, 2), dtype=np.int16))
+                    continue
+
+                distances[i, j] = distances[j, i] = node_distances[i, end]
+                nodes = [end]
+                node = predecessors[i, end]
+                while node >= 0:
+                    nodes.append(node)
+                    node = predecessors[i, node]
+                paths.append(node_cells[nodes[::-1]].astype(np.int16))
+
+        offsets = np.zeros(len(paths) + 1, dtype=np.int32)
+        offsets[1:] = np.cumsum([len(path) for path in paths])
+        cells = np.concatenate(paths) if paths else np.empty((0, 2), dtype=np.int16)
+        return ZonePathTable(locations, distances, cells, offsets)
+
+    @staticmethod
+    def cached(
+        values: np.ndarray, locations: Sequence[Point2], store: Optional[MapArtifactStore] = None
+    ) -> Tuple["ZonePathTable", bool]:
+        """
+        Loads table for the grid and zone locations from the map artifact store, or calculates and puts it there.
+
+        :return: the table and whether it was loaded from the store
+        """
+        if store is None:
+            return ZonePathTable.calculate(values, locations), False
+
+        prefix = f"zone_paths_v{ZONE_PATH_VERSION}_{map_hash(values, locations)}"
+        arrays = [store.get_array(f"{prefix}_{name}") for name in ZonePathTable.array_names]
+        if all(array is not None for array in arrays):
+            return ZonePathTable(*arrays), True
+
+        table = ZonePathTable.calculate(values, locations)
+        store.put_arrays({f"{prefix}_{name}": getattr(table, name) for name in ZonePathTable.array_names})
+        return table, False
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from sc2pathlib.fallback import PathFind
+
+from .map_artifact_store import MapArtifactStore
+from .zone_path_table import ZonePathTable
+
+
+def random_map():
+    rng = np.random.default_rng(3)
+    values = (rng.random((60, 50)) > 0.25).astype(np.float32)
+    # Island that can't be reached
+    values[50:, :] = 0
+    values[54:58, 40:45] = 1
+    locations = [(float(x) + 0.5, float(y) + 0.5) for x, y in rng.integers(2, 45, (6, 2))]
+    locations.append((55.5, 42.5))
+    return values, locations
+
+
+class TestZonePathTable:
+    def test_distances_match_path_finder(self):
+        values, locations = random_map()
+        table = ZonePathTable.calculate(values, locations)
+        path_find = PathFind(values)
+
+        for a in locations:
+            for b in locations:
+                if a == b:
+                    continue
+                expected_path, expected_distance = path_find.find_path(
+                    (round(a[0]), round(a[1])), (round(b[0]), round(b[1]))
+                )
+                path, distance = table.path(table.index(a), table.index(b))
+
+                assert distance == pytest.approx(expected_distance)
+                if expected_path:
+                    assert path[0] == tuple(expected_path[0])
+                    assert path[-1] == tuple(expected_path[-1])
+                else:
+                    assert path == []
+
+    def test_reverse_path(self):
+        values, locations = random_map()
+        table = ZonePathTable.calculate(values, locations)
+        path, distance = table.path(0, 1)
+        reverse_path, reverse_distance = table.path(1, 0)
+        assert reverse_path == path[::-1]
+        assert reverse_distance == distance
+
+    def test_cached_on_disk(self, tmp_path):
+        values, locations = random_map()
+        table, loaded = ZonePathTable.cached(values, locations, MapArtifactStore(str(tmp_path)))
+        assert not loaded
+
+        # Zone order doesn't matter
+        cached, loaded = ZonePathTable.cached(values, locations[::-1], MapArtifactStore(str(tmp_path)))
+        assert loaded
+        assert np.array_equal(cached.distances, table.distances)
+        assert cached.path(2, 4) == table.path(2, 4)
+
+        values[0, 0] = 0 if values[0, 0] else 1
+        _, loaded = ZonePathTable.cached(values, locations, MapArtifactStore(str(tmp_path)))
+        assert not loaded
@@ -2,6 +2,7 @@ from abc import abstractmethod, ABC
 from typing import List, Optional
 
 from sc2.position import Point2
+from sharpy.general.building_slots import BuildingSlots
 
 
 class IBuildingSolver(ABC):
@@ -39,3 +40,15 @@ class IBuildingSolver(ABC):
     @abstractmethod
     def buildings3x3(self) -> List[Point2]:
         pass
+
+    @property
+    @abstractmethod
+    def slots2x2(self) -> BuildingSlots:
+        """Occupancy and coverage of buildings2x2 positions, updated with own structures of the current frame."""
+        pass
+
+    @property
+    @abstractmethod
+    def slots3x3(self) -> BuildingSlots:
+        """Occupancy and coverage of buildings3x3 positions, updated with own structures of the current frame."""
+        pass
@@ -1,5 +1,7 @@
 from abc import abstractmethod, ABC
-from typing import Optional, List, Union, Iterable, Dict, Tuple
+from typing import Optional, List, Union, Iterable, Dict, Tuple, TYPE_CHECKING
+
+import numpy as np
 
 from sc2.ids.effect_id import EffectId
 
@@ -10,6 +12,10 @@ from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
+if TYPE_CHECKING:
+    from sharpy.managers.core.unit_cache_manager import UnitArrays
+    from sharpy.managers.core.unit_count_index import UnitCountIndex
+
 
 class IUnitCache(ABC):
     @property
@@ -22,6 +28,24 @@ class IUnitCache(ABC):
     def enemy_unit_cache(self) -> Dict[UnitTypeId, Units]:
         pass
 
+    @property
+    @abstractmethod
+    def own_arrays(self) -> "UnitArrays":
+        """Columnar snapshot of `ai.all_own_units` for the current frame."""
+        pass
+
+    @property
+    @abstractmethod
+    def enemy_arrays(self) -> "UnitArrays":
+        """Columnar snapshot of `ai.all_enemy_units` for the current frame."""
+        pass
+
+    @property
+    @abstractmethod
+    def counts(self) -> "UnitCountIndex":
+        """Counts of own units by type, orders and lost units for the current frame."""
+        pass
+
     @property
     @abstractmethod
     def own_townhalls(self) -> Units:
@@ -79,3 +103,22 @@ class IUnitCache(ABC):
     @abstractmethod
     def enemy_in_range(self, position: Point2, range: Union[int, float], only_targetable=True) -> Units:
         pass
+
+    @abstractmethod
+    def own_in_range_indices(self, position: Point2, range: Union[int, float]) -> np.ndarray:
+        """Returns indices of own units within range, matching the order of `ai.all_own_units`."""
+        pass
+
+    @abstractmethod
+    def enemy_in_range_indices(
+        self, position: Point2, range: Union[int, float], only_targetable: Optional[bool] = None
+    ) -> np.ndarray:
+        """Returns indices of enemy units within range, matching the order of `ai.all_enemy_units`."""
+        pass
+
+    @abstractmethod
+    def enemy_in_range_mask(
+        self, position: Point2, range: Union[int, float], only_targetable: Optional[bool] = None
+    ) -> np.ndarray:
+        """Returns a boolean mask over `enemy_arrays` for enemy units within range."""
+        pass
@@ -1,5 +1,6 @@
 import logging
 import string
+import time
 from configparser import ConfigParser
 from typing import List, Optional, Callable, Type, Union
 
@@ -51,6 +52,8 @@ class Knowledge:
         self.log_manager: ILogManager = LogManager()
         # TODO: Remove references to these managers
         self.lag_handler: Optional[ILagHandler] = None
+        self.profiler: Optional[StepProfiler] = None
+        self.plan_tracker: Optional[PlanTracker] = None
         self.unit_values: Optional[IUnitValues] = None
         self.pathing_manager: Optional[PathingManager] = None
         self.zone_manager: Optional[ZoneManager] = None
@@ -148,6 +151,9 @@ class Knowledge:
         # TODO: Remove these
         self.unit_values = self.get_manager(IUnitValues)
         self.lag_handler = self.get_manager(ILagHandler)
+        self.profiler = self.get_manager(StepProfiler)
+        act_manager = self.get_manager(ActManager)
+        self.plan_tracker = act_manager.tracker if act_manager else None
         self.pathing_manager = self.get_manager(PathingManager)
         self.zone_manager = self.get_manager(IZoneManager)
         self.cooldown_manager = self.get_manager(CooldownManager)
@@ -170,15 +176,29 @@ class Knowledge:
         self.reserved_minerals = 0
         self.reserved_gas = 0
 
+        profiler = self.profiler
         for manager in self.managers:
-            await manager.update()
+            if profiler:
+                ns = time.perf_counter_ns()
+                await manager.update()
+                profiler.add_update(manager, time.perf_counter_ns() - ns)
+            else:
+                await manager.update()
 
     async def post_update(self):
+        profiler = self.profiler
         for manager in self.managers:
-            await manager.post_update()
+            if profiler:
+                ns = time.perf_counter_ns()
+                await manager.post_update()
+                profiler.add_post_update(manager, time.perf_counter_ns() - ns)
+            else:
+                await manager.post_update()
 
     def step_took(self, ns_step: float):
         """ Time taken in nanosecond for the current step to run. """
+        if self.profiler:
+            self.profiler.step_took(ns_step)
         if self.lag_handler:
             ms_step = ns_step / 1000 / 1000
             self.lag_handler.step_took(ms_step)
@@ -28,8 +28,10 @@ class KnowledgeBot(SkeletonBot, ABC):
         self.unit_cache = UnitCacheManager()
         self.unit_value = UnitValue()
         self.roles = UnitRoleManager()
+        self.map_cache_manager = MapCacheManager()
         self.pathing_manager = PathingManager()
         self.zone_manager = ZoneManager()
+        self.flow_field_manager = FlowFieldManager()
         self.building_solver = BuildingSolver()
         self.income_calculator = IncomeCalculator()
         self.cooldown_manager = CooldownManager()
@@ -39,6 +41,7 @@ class KnowledgeBot(SkeletonBot, ABC):
         self.previous_units_manager = PreviousUnitsManager()
         self.game_analyzer = GameAnalyzer()
         self.data_manager = DataManager()
+        self.step_profiler = StepProfiler()
 
     async def on_start(self):
         """Allows initializing the bot when the game data is available."""
@@ -51,8 +54,10 @@ class KnowledgeBot(SkeletonBot, ABC):
             self.unit_cache,
             self.unit_value,
             self.roles,
+            self.map_cache_manager,
             self.pathing_manager,
             self.zone_manager,
+            self.flow_field_manager,
             self.building_solver,
             self.income_calculator,
             self.cooldown_manager,
@@ -62,6 +67,7 @@ class KnowledgeBot(SkeletonBot, ABC):
             self.previous_units_manager,
             self.game_analyzer,
             self.data_manager,
+            self.step_profiler,
         ]
         if user_managers:
             managers.extend(user_managers)
@@ -1,10 +1,12 @@
 from .manager_base import ManagerBase
 from .act_manager import ActManager
+from .plan_tracker import PlanTracker, RequireInput
 from .gather_point_solver import GatherPointSolver
 from .log_manager import LogManager
 from .version_manager import VersionManager
 from .action_manager import ActionManager
 from .unit_cache_manager import UnitCacheManager
+from .map_cache_manager import MapCacheManager
 from .zone_manager import ZoneManager
 from .cooldown_manager import CooldownManager
 from .building_solver import BuildingSolver
@@ -12,6 +14,8 @@ from .income_calculator import IncomeCalculator
 from .unit_role_manager import UnitRoleManager
 from .lostunitsmanager import LostUnitsManager
 from .pathing_manager import PathingManager
+from .flow_field_manager import FlowFieldManager
 from .unit_value import UnitValue
+from .step_profiler import StepProfiler
 from .enemy_units_manager import EnemyUnitsManager
 from .previousunitsmanager import PreviousUnitsManager
@@ -4,6 +4,8 @@ from .manager_base import ManagerBase
 from typing import TYPE_CHECKING, Coroutine, Union, Callable
 
 from sharpy.interfaces import IPostStart
+from .plan_tracker import PlanTracker
+from sc2.data import Result
 
 if TYPE_CHECKING:
     from sharpy.knowledges import Knowledge
@@ -16,9 +18,11 @@ class ActManager(ManagerBase, IPostStart):
     def __init__(self, act_or_func: Union[Callable[[], Coroutine], "ActBase"]) -> None:
         super().__init__()
         self._act_or_func: Union[Callable[[], Coroutine], "ActBase"] = act_or_func
+        self.tracker = PlanTracker()
 
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
+        self.tracker.start(knowledge)
 
     async def post_start(self):
         if asyncio.iscoroutinefunction(self._act_or_func):
@@ -29,8 +33,12 @@ class ActManager(ManagerBase, IPostStart):
         await self.start_component(self._act, self.knowledge)
 
     async def update(self):
+        self.tracker.next_frame()
         await self._act.execute()
 
     async def post_update(self):
         if self.knowledge.debug:
             await self._act.debug_draw()
+
+    async def on_end(self, game_result: Result):
+        self.print(self.tracker.summary(), stats=False)
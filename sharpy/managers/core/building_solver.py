@@ -1,6 +1,7 @@
 import enum
 import logging
 import math
+import time
 from math import floor
 from typing import Dict, List, Optional, Tuple, Set
 
@@ -10,11 +11,14 @@ import sc2pathlib
 from sc2.data import Race
 from sharpy.constants import Constants
 from sharpy import sc2math
+from sharpy.general.building_slots import BuildingSlots
+from sharpy.general.map_artifact_store import MapArtifactStore, artifact_hash
 from sharpy.general.zone import Zone
 
 from sc2.client import Client
 
 from sharpy.managers.core.manager_base import ManagerBase
+from sharpy.managers.core.map_cache_manager import MapCacheManager
 from sc2.position import Point2, Point3
 from sharpy.general.extended_ramp import RampPosition
 
@@ -31,18 +35,26 @@ class WallType(enum.IntEnum):
     TerranMainDepots = 5
 
 
-def is_empty(cell: GridArea) -> bool:
-    return cell.Area == BuildArea.Empty
+# Checks and fills can be called with a cell, but BuildGrid handles them for whole rectangles at once
+is_empty = AreaCheck({BuildArea.Empty})
+is_free = AreaCheck({BuildArea.Empty, BuildArea.BuildingPadding})
+is_not_hard_wall = AreaCheck(set(BuildArea) - {BuildArea.NotBuildable, BuildArea.HighRock})
+fill_padding = AreaFill(BuildArea.BuildingPadding, replaceable={BuildArea.Empty})
 
+# Wall templates are matched with arrays only when the whole template is this far inside the map
+WALL_MARGIN = 8
+# Increase when solving changes to ignore solved grids in the map cache
+SOLVED_GRID_VERSION = 1
 
-def is_free(cell: GridArea) -> bool:
-    return cell.Area == BuildArea.Empty or cell.Area == BuildArea.BuildingPadding
 
-
-def fill_padding(cell: GridArea, point: Point2 = None) -> GridArea:
-    if cell.Area == BuildArea.Empty:
-        cell.Area = BuildArea.BuildingPadding
-    return cell
+def shifted(values: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    """Array where result[x][y] = values[x + dx][y + dy], False where that is outside the array."""
+    result = np.zeros(values.shape, dtype=bool)
+    width, height = values.shape
+    result[max(0, -dx) : min(width, width - dx), max(0, -dy) : min(height, height - dy)] = values[
+        max(0, dx) : min(width, width + dx), max(0, dy) : min(height, height + dy)
+    ]
+    return result
 
 
 class WallFinder:
@@ -67,11 +79,6 @@ class WallFinder:
         self.score = score
 
     def query(self, grid: BuildGrid, position: Point2, zone: ZoneArea):
-        def is_not_hard_wall(cell: GridArea) -> bool:
-            if cell.Area == BuildArea.NotBuildable or cell.Area == BuildArea.HighRock:
-                return False
-            return True
-
         # and cell.ZoneIndex == zone
 
         # Both checks need to match with hard wall
@@ -86,6 +93,22 @@ class WallFinder:
 
         return True
 
+    def matches(self, empty: np.ndarray, not_hard_wall: np.ndarray) -> np.ndarray:
+        """
+        Matches the wall template to every position at once, same as calling query for every position.
+
+        :param empty: 3x3 anchors of is_empty from BuildGrid.anchors
+        :param not_hard_wall: 3x3 anchors of is_not_hard_wall from BuildGrid.anchors
+        :return: bool [x][y] array for floored positions, only valid WALL_MARGIN or further from map edges
+        """
+        # 3x3 building at position p covers a rectangle that starts from floor(p) - 1
+        result = np.ones(empty.shape, dtype=bool)
+        for check in self.checks:
+            result &= ~shifted(not_hard_wall, int(check.x) - 1, int(check.y) - 1)
+        for building in self.buildings:
+            result &= shifted(empty, int(building.x) - 1, int(building.y) - 1)
+        return result
+
     def positions(self, position: Point2) -> List[Point2]:
         list = []
         for building in self.buildings:
@@ -106,6 +129,13 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
 
         self._wall3x3: List[Point2] = []
         self._wall2x2: List[Point2] = []
+        self._slots2x2 = BuildingSlots()
+        self._slots3x3 = BuildingSlots()
+        # Store for caching generated and solved grids, None to use the store of MapCacheManager
+        self.map_store: Optional[MapArtifactStore] = None
+        # Time it took to create the build grid and to solve building positions
+        self.grid_time_ms: float = 0
+        self.solve_time_ms: float = 0
 
         self.wall_finders_v = [
             # Pure vertical walls
@@ -196,14 +226,34 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
     def buildings5x5(self) -> List[Point2]:
         return []
 
+    @property
+    def slots2x2(self) -> BuildingSlots:
+        return self.updated_slots(self._slots2x2, self.buildings2x2)
+
+    @property
+    def slots3x3(self) -> BuildingSlots:
+        return self.updated_slots(self._slots3x3, self.buildings3x3)
+
+    def updated_slots(self, slots: BuildingSlots, points: List[Point2]) -> BuildingSlots:
+        # Building positions can be sorted by plans, slots follow their order
+        slots.sync_points(points)
+        slots.update_structures(self.ai.structures, self.ai.state.game_loop)
+        return slots
+
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
+        map_cache = knowledge.get_manager(MapCacheManager)
+        if self.map_store is None and map_cache:
+            self.map_store = map_cache.store
+
         if (len(self.zone_manager.expansion_zones) > 1):
-            self.grid = BuildGrid(self.knowledge)
+            start = time.perf_counter()
+            self.grid = BuildGrid(self.knowledge, self.map_store)
             self.base_ramp = self.zone_manager.expansion_zones[0].ramp
             self.color_zone(self.zone_manager.expansion_zones[0], ZoneArea.OwnMainZone)
             self.color_zone(self.zone_manager.expansion_zones[1], ZoneArea.OwnNaturalZone)
             self.color_zone(self.zone_manager.expansion_zones[2], ZoneArea.OwnThirdZone)
+            self.grid_time_ms = (time.perf_counter() - start) * 1000
 
     async def update(self):
         if self.knowledge.iteration == 0 and len(self.zone_manager.expansion_zones) > 0:
@@ -222,30 +272,24 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
                 client.debug_box_out(c1, c2)
 
             correction = Point2((0, 1))
-            for x in range(0, self.grid.width - 1):
-                for y in range(0, self.grid.height - 1):
-                    cell: GridArea = self.grid.get(x, y)
-                    color = None
-                    if cell.Area == BuildArea.Building:
-                        color = self.grid.building_color
-                    elif cell.Area == BuildArea.TownHall:
-                        color = self.grid.townhall_color
-                    elif cell.Area == BuildArea.Pylon:
-                        color = self.grid.pylon_color
-                    elif cell.Area == BuildArea.Mineral:
-                        color = self.grid.mineral_color
-                    elif cell.Area == BuildArea.Gas:
-                        color = self.grid.gas_color
-                    # elif cell.Area == BuildArea.Empty:
-                    #    color = self.grid.gas_color
-
-                    if color:
-                        z = self.knowledge.get_z(Point2((x, y)) + correction)
-                        c1 = Point3((x, y, z))
-                        c2 = Point3((x + 1, y + 1, z + 1))
-                        client.debug_box_out(c1, c2, color)
+            colors = {
+                BuildArea.Building: self.grid.building_color,
+                BuildArea.TownHall: self.grid.townhall_color,
+                BuildArea.Pylon: self.grid.pylon_color,
+                BuildArea.Mineral: self.grid.mineral_color,
+                BuildArea.Gas: self.grid.gas_color,
+            }
+            areas = self.grid.areas[: self.grid.width - 1, : self.grid.height - 1]
+
+            for x, y in np.argwhere(np.isin(areas, [area.value for area in colors])).tolist():
+                color = colors[self.grid.area(x, y)]
+                z = self.knowledge.get_z(Point2((x, y)) + correction)
+                c1 = Point3((x, y, z))
+                c2 = Point3((x + 1, y + 1, z + 1))
+                client.debug_box_out(c1, c2, color)
 
     async def solve_grid(self):
+        start = time.perf_counter()
         if self.wall_type == WallType.Auto:
             if self.knowledge.my_race == Race.Protoss:
                 if self.knowledge.enemy_race == Race.Terran:
@@ -257,21 +301,92 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
             elif self.knowledge.my_race == Race.Terran:
                 self.wall_type = WallType.TerranMainDepots
 
-        if self.wall_type == WallType.ProtossNaturalOneUnit:
-            if not await self.natural_wall():
+        key = self.solved_grid_key()
+        loaded = self.load_solved_grid(key)
+        if not loaded:
+            if self.wall_type == WallType.ProtossNaturalOneUnit:
+                if not await self.natural_wall():
+                    self.zerg_wall()
+            elif self.wall_type == WallType.ProtossMainProtoss:
+                self.protoss_wall()
+            elif self.wall_type == WallType.ProtossMainZerg:
                 self.zerg_wall()
-        elif self.wall_type == WallType.ProtossMainProtoss:
-            self.protoss_wall()
-        elif self.wall_type == WallType.ProtossMainZerg:
-            self.zerg_wall()
-        elif self.wall_type == WallType.TerranMainDepots:
-            self.terran_depot_wall()
+            elif self.wall_type == WallType.TerranMainDepots:
+                self.terran_depot_wall()
+
+            self.solve_buildings()
+            self.save_solved_grid(key)
 
-        self.solve_buildings()
+        self.solve_time_ms = (time.perf_counter() - start) * 1000
+        self.print(
+            f"Build grid {'loaded' if self.grid.loaded else 'created'} in {self.grid_time_ms:.1f} ms "
+            f"and {'loaded' if loaded else 'solved'} in {self.solve_time_ms:.1f} ms",
+            stats=False,
+        )
 
         if self.debug:
             self.grid.save("buildGrid.bmp")
 
+    def solved_grid_key(self) -> str:
+        """Key for the solved grid, solving gives the same result when the key is the same."""
+        locations = [zone.center_location for zone in self.zone_manager.expansion_zones[:3]]
+        locations.append(self.zone_manager.enemy_start_location)
+        digest = artifact_hash(
+            SOLVED_GRID_VERSION,
+            self.knowledge.my_race.value,
+            int(self.wall_type),
+            [[float(location.x), float(location.y)] for location in locations],
+            self.grid.areas,
+            self.grid.building_indices,
+            self.grid.zones,
+            self.grid.cliffs,
+        )
+        return f"solved_grid_{digest}"
+
+    def load_solved_grid(self, key: str) -> bool:
+        """Restores solved grid and building positions from the map cache, returns False if they aren't cached."""
+        if self.map_store is None:
+            return False
+        solution = self.map_store.get(key)
+        if solution is None:
+            return False
+        areas = self.map_store.get_array(f"{key}_areas")
+        building_indices = self.map_store.get_array(f"{key}_building_indices")
+        if areas is None or building_indices is None:
+            return False
+
+        self.grid.areas[:, :] = areas
+        self.grid.building_indices[:, :] = building_indices
+        self._building_positions = {
+            BuildArea(int(area)): [Point2(position) for position in positions]
+            for area, positions in solution["positions"].items()
+        }
+        self._wall2x2 = [Point2(position) for position in solution["wall2x2"]]
+        self._wall3x3 = [Point2(position) for position in solution["wall3x3"]]
+        self._zealot = None if solution["zealot"] is None else Point2(solution["zealot"])
+        return True
+
+    def save_solved_grid(self, key: str):
+        if self.map_store is None:
+            return
+
+        def point(position: Point2) -> List[float]:
+            return [float(position.x), float(position.y)]
+
+        solution = {
+            "positions": {
+                str(area.value): [point(position) for position in positions]
+                for area, positions in self._building_positions.items()
+            },
+            "wall2x2": [point(position) for position in self._wall2x2],
+            "wall3x3": [point(position) for position in self._wall3x3],
+            "zealot": None if self._zealot is None else point(self._zealot),
+        }
+        self.map_store.put_arrays(
+            {f"{key}_areas": self.grid.areas, f"{key}_building_indices": self.grid.building_indices},
+            {key: solution},
+        )
+
     def terran_depot_wall(self):
         main: Zone = self.zone_manager.own_main_zone
         if main.ramp.ramp.depot_in_middle:
@@ -312,70 +427,31 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
         if self.ai.start_location.y < self.ai.game_info.map_center.y:
             y_range = range(-18, 18)[::-1]
 
-        if self.knowledge.my_race == Race.Terran:
-            for x in x_range:
-                for y in y_range:
-                    pos = Point2((x + center.x, y + center.y))
-                    area: GridArea = self.grid[pos]
+        # Zones don't change while filling, so positions in the zone can be found beforehand
+        positions = self.zone_positions(center, zone_color, x_range, y_range)
 
-                    if area is None or area.ZoneIndex != zone_color:
-                        continue
-
-                    self.terran_massive_grid(pos)
-
-            for x in x_range:
-                for y in y_range:
-                    pos = Point2((x + center.x, y + center.y))
-                    area: GridArea = self.grid[pos]
-
-                    if area is None or area.ZoneIndex != zone_color:
-                        continue
+        if self.knowledge.my_race == Race.Terran:
+            for pos in self.candidates(positions, 7, 8):
+                self.terran_massive_grid(pos)
 
-                    self.terran_grid(pos)
+            for pos in self.candidates(positions, 6, 5):
+                self.terran_grid(pos)
         elif self.knowledge.my_race == Race.Protoss:
             if zone_color == ZoneArea.OwnMainZone:
-                for x in x_range:
-                    for y in y_range:
-                        pos = Point2((x + center.x, y + center.y))
-                        area: GridArea = self.grid[pos]
-
-                        if area is None or area.ZoneIndex != zone_color:
-                            continue
+                for pos in self.candidates(positions, 6, 9):
+                    self.massive_grid(pos)
 
-                        self.massive_grid(pos)
-
-            for x in x_range:
-                for y in y_range:
-                    pos = Point2((x + center.x, y + center.y))
-                    area: GridArea = self.grid[pos]
-
-                    if area is None or area.ZoneIndex != zone_color:
-                        continue
-
-                    action(pos)
+            for pos in self.candidates(positions, 2, 2):
+                action(pos)
         else:
             larva_padding = Rectangle(center.x, center.y - 3, 5, 1)
             self.grid.fill_rect(larva_padding, fill_padding)
 
-            for x in x_range:
-                for y in y_range:
-                    pos = Point2((x + center.x, y + center.y))
-                    area: GridArea = self.grid[pos]
-
-                    if area is None or area.ZoneIndex != zone_color:
-                        continue
-
-                    self.massive_zerg_grid(pos)
+            for pos in self.candidates(positions, 6, 6):
+                self.massive_zerg_grid(pos)
 
-            for x in x_range:
-                for y in y_range:
-                    pos = Point2((x + center.x, y + center.y))
-                    area: GridArea = self.grid[pos]
-
-                    if area is None or area.ZoneIndex != zone_color:
-                        continue
-
-                    self.zerg_grid(pos)
+            for pos in self.candidates(positions, 3, 3):
+                self.zerg_grid(pos)
 
             if zone_color == ZoneArea.OwnMainZone:
                 # sort building by their distance to our main withing the main zone
@@ -383,6 +459,27 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
                     key=lambda p: p.distance_to_point2(self.ai.start_location)
                 )
 
+    def zone_positions(self, center: Point2, zone_color: ZoneArea, x_range: range, y_range: range) -> List[Point2]:
+        """Positions around center that are in the zone, in the order of x_range and y_range."""
+        xs = np.array(x_range, dtype=np.int64) + int(center.x)
+        ys = np.array(y_range, dtype=np.int64) + int(center.y)
+        valid_x = (xs >= 0) & (xs < self.grid.width)
+        valid_y = (ys >= 0) & (ys < self.grid.height)
+        in_zone = np.zeros((len(xs), len(ys)), dtype=bool)
+        in_zone[np.ix_(valid_x, valid_y)] = self.grid.zones[np.ix_(xs[valid_x], ys[valid_y])] == zone_color.value
+
+        x_indices, y_indices = np.nonzero(in_zone)
+        return [Point2((x, y)) for x, y in zip(xs[x_indices].tolist(), ys[y_indices].tolist())]
+
+    def candidates(self, positions: List[Point2], width: int, height: int) -> List[Point2]:
+        """
+        Positions where a width x height rectangle is empty.
+        Filling only ever reduces empty cells, so positions that are left out could never be used, but the rest
+        still need to be checked when filling them in order.
+        """
+        anchors = self.grid.anchors(is_empty, width, height)
+        return [pos for pos in positions if anchors[pos.x, pos.y]]
+
     def massive_grid(self, pos):
         rect = Rectangle(pos.x, pos.y, 6, 9)
         unit_exit_rect = Rectangle(pos.x - 2, pos.y + 4, 2, 2)
@@ -574,6 +671,10 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
         zone_height = self.ai.get_terrain_height(center)
         wall: Optional[Tuple[int, Point2, Point2, List[Point2]]] = None
 
+        empty = self.grid.anchors(is_empty, 3, 3)
+        not_hard_wall = self.grid.anchors(is_not_hard_wall, 3, 3)
+        templates = [finder.matches(empty, not_hard_wall) for finder in wall_finders]
+
         for i in range(5, 15):
             for j in range(-15, 16):
                 lookup = center + search_vector * i + perpendicular * j
@@ -582,9 +683,19 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
                     # height doesn't match with zone height
                     continue
 
-                for finder in wall_finders:
+                x, y = floor(lookup.x), floor(lookup.y)
+                inside = (
+                    WALL_MARGIN <= x < self.grid.width - WALL_MARGIN
+                    and WALL_MARGIN <= y < self.grid.height - WALL_MARGIN
+                )
+
+                for finder, matches in zip(wall_finders, templates):
+                    if inside:
+                        found = matches[x, y]
+                    else:
+                        found = finder.query(self.grid, lookup, ZoneArea.OwnNaturalZone)
 
-                    if finder.query(self.grid, lookup, ZoneArea.OwnNaturalZone):
+                    if found:
                         pylon = lookup - 2.5 * search_vector
                         zealot = lookup + finder.zealot
                         gates = finder.positions(lookup)
@@ -683,12 +794,7 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
         else:
             building_index = -1
 
-        def filler(cell: GridArea):
-            if cell.Area == BuildArea.Empty or cell.Area == BuildArea.BuildingPadding:
-                cell.BuildingIndex = building_index
-                cell.Area = area
-            return cell
-
+        filler = AreaFill(area, building_index, {BuildArea.Empty, BuildArea.BuildingPadding})
         self.grid.fill_area(position, blocker_type, filler)
 
     def color_zone(self, zone: Zone, zone_type: ZoneArea):
@@ -697,15 +803,13 @@ class BuildingSolver(ManagerBase, IBuildingSolver):
         radius = zone.radius
         height = self.ai.get_terrain_height(center)
 
-        def fill_circle(cell: GridArea, point: Point2) -> GridArea:
-            if (
-                cell.Area == BuildArea.Empty
-                and height == self.ai.get_terrain_height(point)
-                and point.distance_to_point2(center) <= zone.radius
-            ):
-                cell.ZoneIndex = zone_type
-
-            return cell
-
         rect = Rectangle(center.x - radius, center.y - radius, radius * 2, radius * 2)
-        self.grid.fill_rect_func(rect, fill_circle)
+        slices = self.grid.rect_slices(rect)
+        if slices is None:
+            return
+
+        heights = np.swapaxes(self.ai.game_info.terrain_height.data_numpy, 0, 1)
+        xs, ys = np.ogrid[slices]
+        in_circle = (xs - center.x) ** 2 + (ys - center.y) ** 2 <= radius ** 2
+        mask = (self.grid.areas[slices] == BuildArea.Empty.value) & (heights[slices] == height) & in_circle
+        self.grid.zones[slices][mask] = zone_type.value
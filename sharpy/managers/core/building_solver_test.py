@@ -0,0 +1,38 @@
+import asyncio
+
+import numpy as np
+
+from benchmarks.scene import start_scene
+from sharpy.general.map_artifact_store import MapArtifactStore
+
+from .building_solver import BuildingSolver
+
+
+def start_solver(knowledge, folder: str) -> BuildingSolver:
+    solver = BuildingSolver()
+    solver.map_store = MapArtifactStore(folder)
+    asyncio.run(solver.start(knowledge))
+    return solver
+
+
+class TestSolvedGridCache:
+    def test_saved_grid_is_loaded_in_next_game(self, tmp_path):
+        knowledge = start_scene(50).knowledge
+        solver = start_solver(knowledge, str(tmp_path))
+        asyncio.run(solver.solve_grid())
+        assert solver.map_store.hits == 0
+        assert not solver.grid.loaded
+
+        # Same map in the next game, generated grid and the solution are loaded
+        loaded = start_solver(knowledge, str(tmp_path))
+        assert loaded.grid.loaded
+        assert np.array_equal(loaded.grid.cliffs, solver.grid.cliffs)
+        asyncio.run(loaded.solve_grid())
+        assert loaded.map_store.misses == 0
+        assert loaded.solved_grid_key() == solver.solved_grid_key()
+        assert np.array_equal(loaded.grid.areas, solver.grid.areas)
+        assert np.array_equal(loaded.grid.building_indices, solver.grid.building_indices)
+        assert loaded.buildings3x3 == solver.buildings3x3
+        assert loaded.buildings2x2 == solver.buildings2x2
+        assert loaded.wall3x3 == solver.wall3x3
+        assert loaded.zealot == solver.zealot
@@ -1,39 +1,168 @@
-from typing import Dict, List, Optional, Set
+import time
+from typing import Dict, List, Optional, Set, Tuple
 
+from sc2.data import Result
+from sc2.dicts.unit_abilities import UNIT_ABILITIES
 from sharpy.managers.core.manager_base import ManagerBase
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.ids.ability_id import AbilityId
 from sc2.unit import Unit
 from sc2.units import Units
 
+# Available abilities are queried again after this many game loops
+ABILITY_CACHE_LOOPS = 8
+# Unit types are queried for this many game loops after their abilities were last asked for
+ABILITY_DEMAND_LOOPS = 224
+# Abilities whose availability changes only with energy and orders of the unit, so results can be cached
+# until either changes. Game data has no cooldowns, other abilities are queried again every frame.
+ENERGY_ABILITIES: Set[AbilityId] = {
+    AbilityId.BLINDINGCLOUD_BLINDINGCLOUD,
+    AbilityId.BUILD_CREEPTUMOR_QUEEN,
+    AbilityId.EFFECT_ABDUCT,
+    AbilityId.EFFECT_ANTIARMORMISSILE,
+    AbilityId.EFFECT_CHRONOBOOSTENERGYCOST,
+    AbilityId.EFFECT_INJECTLARVA,
+    AbilityId.EFFECT_INTERFERENCEMATRIX,
+    AbilityId.FEEDBACK_FEEDBACK,
+    AbilityId.FORCEFIELD_FORCEFIELD,
+    AbilityId.FUNGALGROWTH_FUNGALGROWTH,
+    AbilityId.GUARDIANSHIELD_GUARDIANSHIELD,
+    AbilityId.NEURALPARASITE_NEURALPARASITE,
+    AbilityId.PARASITICBOMB_PARASITICBOMB,
+    AbilityId.PSISTORM_PSISTORM,
+    AbilityId.SPAWNCHANGELING_SPAWNCHANGELING,
+}
+# Combat abilities with cooldowns
+COOLDOWN_ABILITIES: Set[AbilityId] = {
+    AbilityId.ADEPTPHASESHIFT_ADEPTPHASESHIFT,
+    AbilityId.EFFECT_BLINK_STALKER,
+    AbilityId.EFFECT_CORROSIVEBILE,
+    AbilityId.EFFECT_PURIFICATIONNOVA,
+    AbilityId.EFFECT_SPAWNLOCUSTS,
+    AbilityId.EFFECT_TACTICALJUMP,
+    AbilityId.EFFECT_VOIDRAYPRISMATICALIGNMENT,
+    AbilityId.KD8CHARGE_KD8CHARGE,
+    AbilityId.LOCKON_LOCKON,
+    AbilityId.TRANSFUSION_TRANSFUSION,
+    AbilityId.YAMATO_YAMATOGUN,
+}
+# Unit types that can cast any of the above are always queried, so that the first is_ready call has an answer
+CASTER_TYPES: Set[UnitTypeId] = {
+    type_id
+    for type_id, abilities in UNIT_ABILITIES.items()
+    if abilities & ENERGY_ABILITIES or abilities & COOLDOWN_ABILITIES
+}
+
+# type, whole energy, order count
+UnitSignature = Tuple[UnitTypeId, int, int]
+# game loop of the query, unit signature at the query, available abilities
+AbilityEntry = Tuple[int, UnitSignature, List[AbilityId]]
+
 
 class CooldownManager(ManagerBase):
     """
     Global cooldown manager that is shared between all units.
     TODO: Rename to ability manager?
+
+    Available abilities are queried for CASTER_TYPES and for other unit types whose abilities have been asked for
+    with is_ready during the last ability_demand_loops game loops. All units that need a query are queried with
+    a single request per frame. Results are reused for ability_cache_loops game loops unless type, energy or orders
+    of the unit change. That applies only to unit types that have only been asked for abilities in ENERGY_ABILITIES,
+    units with abilities that have cooldowns or other requirements are queried every frame after they are asked for.
+    First is_ready call for a unit type not in CASTER_TYPES returns False, as the type is queried only on the next
+    frame.
     """
 
     def __init__(self):
         super().__init__()
         self.used_dict: Dict[int, Dict[AbilityId, float]] = dict()
         self.available_dict: Dict[int, List[AbilityId]] = dict()
+        self.ability_cache_loops = ABILITY_CACHE_LOOPS
+        self.ability_demand_loops = ABILITY_DEMAND_LOOPS
+        self._entries: Dict[int, AbilityEntry] = dict()
+        # Game loop when abilities of the unit type were last asked for
+        self._demanded_types: Dict[UnitTypeId, int] = dict()
+        # Game loop when abilities not in ENERGY_ABILITIES of the unit type were last asked for
+        self._uncached_types: Dict[UnitTypeId, int] = dict()
+        self._requested_tags: Set[int] = set()
+        self._uncached_tags: Set[int] = set()
+
+        # Units queried and time spent on the query on the last frame
+        self.units_queried = 0
+        self.query_time_ms: float = 0
+        self.units_queried_total = 0
+        self.units_cached_total = 0
+        self.queries_total = 0
+        self.query_time_ms_total: float = 0
         self.adept_to_shade: Dict[int, int] = dict()
         self.shade_to_adept: Dict[int, int] = dict()
         self._shade_tags_handled: Set[int] = set()
 
     async def update(self):
-        self.available_dict.clear()
-        if len(self.ai.all_own_units) < 1:
-            return
-        try:
-            result: List[List[AbilityId]] = await self.ai.get_available_abilities(self.ai.all_own_units)
-        except Exception as e:
-            self.print(f"Get available abilities failed: {e}")
-            return
-
-        for i in range(0, len(self.ai.all_own_units)):
-            self.available_dict[self.ai.all_own_units[i].tag] = result[i]
-
+        await self.update_abilities()
+        self.update_shades()
+
+    async def update_abilities(self):
+        game_loop = self.ai.state.game_loop
+        self.units_queried = 0
+        self.query_time_ms = 0
+
+        for tag in self._requested_tags:
+            unit = self.cache.by_tag(tag)
+            if unit is not None:
+                self._demanded_types[unit.type_id] = game_loop
+                if tag in self._uncached_tags:
+                    self._uncached_types[unit.type_id] = game_loop
+        self._requested_tags.clear()
+        self._uncached_tags.clear()
+
+        for demand in (self._demanded_types, self._uncached_types):
+            expired = [key for key, loop in demand.items() if game_loop - loop > self.ability_demand_loops]
+            for type_id in expired:
+                demand.pop(type_id)
+
+        units = self.cache.own(list(CASTER_TYPES.union(self._demanded_types)))
+        entries: Dict[int, AbilityEntry] = dict()
+        stale: List[Unit] = []
+
+        for unit in units:
+            entry = self._entries.get(unit.tag)
+            signature: UnitSignature = (unit.type_id, int(unit.energy), len(unit.orders))
+            if (
+                entry is None
+                or entry[1] != signature
+                or game_loop - entry[0] >= self.ability_cache_loops
+                or unit.type_id in self._uncached_types
+            ):
+                stale.append(unit)
+            else:
+                entries[unit.tag] = entry
+
+        if stale:
+            start = time.perf_counter()
+            try:
+                result: List[List[AbilityId]] = await self.ai.get_available_abilities(stale)
+            except Exception as e:
+                self.print(f"Get available abilities failed: {e}")
+                result = None
+
+            self.query_time_ms = (time.perf_counter() - start) * 1000
+            self.query_time_ms_total += self.query_time_ms
+            self.queries_total += 1
+
+            if result is not None:
+                self.units_queried = len(stale)
+                self.units_queried_total += len(stale)
+                for unit, abilities in zip(stale, result):
+                    signature = (unit.type_id, int(unit.energy), len(unit.orders))
+                    entries[unit.tag] = (game_loop, signature, abilities)
+
+        self.units_cached_total += len(units) - len(stale)
+        # Units that are dead or no longer needed are dropped here
+        self._entries = entries
+        self.available_dict = {tag: entry[2] for tag, entry in entries.items()}
+
+    def update_shades(self):
         shades = self.cache.own(UnitTypeId.ADEPTPHASESHIFT)
 
         if len(shades) == 0:
@@ -71,12 +200,22 @@ class CooldownManager(ManagerBase):
     async def post_update(self):
         pass
 
+    async def on_end(self, game_result: Result):
+        self.print(
+            f"Available abilities: {self.queries_total} queries for {self.units_queried_total} units "
+            f"in {self.query_time_ms_total:.1f} ms, {self.units_cached_total} cached results used",
+            stats=False,
+        )
+
     @property
     def time(self) -> float:
         return self.knowledge.ai.time
 
     def is_ready(self, unit_tag: int, ability: AbilityId, cooldown: Optional[float] = None) -> bool:
         if cooldown is None:
+            self._requested_tags.add(unit_tag)
+            if ability not in ENERGY_ABILITIES:
+                self._uncached_tags.add(unit_tag)
             return ability in self.available_dict.get(unit_tag, [])
 
         ability_dict = self.used_dict.get(unit_tag, None)
@@ -95,3 +234,9 @@ class CooldownManager(ManagerBase):
             self.used_dict[unit_tag] = ability_dict
 
         ability_dict[ability] = self.time
+        # Ability was used, so available abilities of the unit have likely changed
+        self._entries.pop(unit_tag, None)
+        abilities = self.available_dict.get(unit_tag)
+        if abilities is not None and ability in abilities:
+            # Not available for the rest of the frame
+            self.available_dict[unit_tag] = [available for available in abilities if available != ability]
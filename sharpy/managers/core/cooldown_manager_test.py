@@ -0,0 +1,128 @@
+import asyncio
+from typing import List
+from unittest import mock
+
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.unit import Unit
+
+from .cooldown_manager import CooldownManager
+
+
+def mock_unit(tag: int, type_id: UnitTypeId, energy: float = 50) -> mock.Mock:
+    return mock.Mock(spec=Unit, tag=tag, type_id=type_id, energy=energy, orders=[])
+
+
+def mock_ai() -> mock.Mock:
+    ai = mock.Mock()
+    ai.state.game_loop = 0
+    ai.time = 0
+    # Tags of the units in every query and abilities available to all units
+    ai.queried = []
+    ai.abilities = [AbilityId.FEEDBACK_FEEDBACK]
+
+    async def get_available_abilities(queried_units):
+        ai.queried.append([unit.tag for unit in queried_units])
+        return [list(ai.abilities) for _ in queried_units]
+
+    ai.get_available_abilities = get_available_abilities
+    return ai
+
+
+def create_manager(units: List[mock.Mock]) -> CooldownManager:
+    manager = CooldownManager()
+    manager.ai = mock_ai()
+    manager.cache = mock.Mock()
+    manager.cache.by_tag = lambda tag: next((unit for unit in units if unit.tag == tag), None)
+    manager.cache.own = lambda type_ids: [unit for unit in units if unit.type_id in type_ids]
+    manager.knowledge = mock.Mock()
+    manager.knowledge.ai = manager.ai
+    return manager
+
+
+def update(manager: CooldownManager, game_loop: int):
+    manager.ai.state.game_loop = game_loop
+    asyncio.run(manager.update_abilities())
+
+
+class TestCooldownManager:
+    def test_only_requested_types_are_queried(self):
+        units = [
+            mock_unit(1, UnitTypeId.WARPGATE),
+            mock_unit(2, UnitTypeId.WARPGATE),
+            mock_unit(3, UnitTypeId.ZEALOT),
+        ]
+        manager = create_manager(units)
+        manager.ai.abilities = [AbilityId.WARPGATETRAIN_ZEALOT]
+
+        update(manager, 0)
+        assert manager.ai.queried == []
+        # Type is queried only on the next frame
+        assert not manager.is_ready(1, AbilityId.WARPGATETRAIN_ZEALOT)
+
+        update(manager, 1)
+        assert manager.ai.queried == [[1, 2]]
+        assert manager.is_ready(2, AbilityId.WARPGATETRAIN_ZEALOT)
+        assert manager.units_queried == 2
+
+    def test_casters_are_ready_on_first_request(self):
+        units = [mock_unit(1, UnitTypeId.STALKER, energy=0), mock_unit(2, UnitTypeId.ZEALOT)]
+        manager = create_manager(units)
+        manager.ai.abilities = [AbilityId.EFFECT_BLINK_STALKER]
+
+        update(manager, 0)
+        assert manager.ai.queried == [[1]]
+        assert manager.is_ready(1, AbilityId.EFFECT_BLINK_STALKER)
+
+        # Casters are still queried after the demand window
+        manager.ai.queried.clear()
+        update(manager, manager.ability_demand_loops * 2)
+        assert manager.ai.queried == [[1]]
+        assert manager.is_ready(1, AbilityId.EFFECT_BLINK_STALKER)
+
+    def test_results_are_cached(self):
+        units = [mock_unit(1, UnitTypeId.HIGHTEMPLAR), mock_unit(2, UnitTypeId.HIGHTEMPLAR)]
+        manager = create_manager(units)
+        manager.is_ready(1, AbilityId.FEEDBACK_FEEDBACK)
+        update(manager, 0)
+        manager.ai.queried.clear()
+
+        update(manager, 2)
+        assert manager.ai.queried == []
+
+        units[1].energy = 51
+        update(manager, 4)
+        assert manager.ai.queried == [[2]]
+
+        update(manager, 4 + manager.ability_cache_loops)
+        assert manager.ai.queried == [[2], [1, 2]]
+
+    def test_cooldown_abilities_are_queried_every_frame(self):
+        manager = create_manager([mock_unit(1, UnitTypeId.STALKER, energy=0)])
+        manager.ai.abilities = [AbilityId.EFFECT_BLINK_STALKER]
+        manager.is_ready(1, AbilityId.EFFECT_BLINK_STALKER)
+        update(manager, 0)
+        assert manager.is_ready(1, AbilityId.EFFECT_BLINK_STALKER)
+
+        # Blink is used without energy or orders changing
+        manager.used_ability(1, AbilityId.EFFECT_BLINK_STALKER)
+        assert not manager.is_ready(1, AbilityId.EFFECT_BLINK_STALKER)
+        manager.ai.abilities = []
+        update(manager, 1)
+        assert not manager.is_ready(1, AbilityId.EFFECT_BLINK_STALKER)
+
+        # Cooldown expiry is seen on the next frame
+        manager.ai.abilities = [AbilityId.EFFECT_BLINK_STALKER]
+        update(manager, 2)
+        assert manager.is_ready(1, AbilityId.EFFECT_BLINK_STALKER)
+        assert manager.ai.queried == [[1], [1], [1]]
+
+    def test_demand_expires(self):
+        manager = create_manager([mock_unit(1, UnitTypeId.WARPGATE)])
+        manager.is_ready(1, AbilityId.WARPGATETRAIN_ZEALOT)
+        update(manager, 0)
+        manager.ai.queried.clear()
+
+        update(manager, manager.ability_demand_loops + 1)
+        assert manager.ai.queried == []
+        assert manager.available_dict == {}
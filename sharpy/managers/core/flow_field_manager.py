@@ -0,0 +1,165 @@
+from typing import Dict, Optional, Set, Tuple
+
+from sc2.data import Result
+from sc2.position import Point2
+from sc2pathlib import MapType
+
+from sharpy.general.flow_field import FlowField
+from sharpy.interfaces import IGatherPointSolver
+from .manager_base import ManagerBase
+from .pathing_manager import NORMAL_INFLUENCE
+
+# map type (None for terrain without influence), x, y
+FieldKey = Tuple[Optional[MapType], int, int]
+
+
+class FlowFieldManager(ManagerBase):
+    """
+    Caches flow fields for common destinations. Any number of units moving to a registered destination
+    get their next waypoint with a single lookup instead of a path search.
+
+    Enemy main, gather point and expansion zone centers are registered automatically, fields to expansion zones
+    are calculated on start. Other new fields are calculated in update, at most max_calculations_per_frame per frame,
+    and lookups fall back to path searches until then. Existing fields are updated incrementally every frame when
+    terrain or influence changes, so they are never older than the frame.
+    """
+
+    gather_point_solver: Optional[IGatherPointSolver]
+
+    def __init__(self):
+        super().__init__()
+        self.destinations: Dict[FieldKey, Point2] = {}
+        self.max_calculations_per_frame = 1
+        self._fields: Dict[FieldKey, FlowField] = {}
+        self._versions: Dict[FieldKey, int] = {}
+        self._auto_keys: Set[FieldKey] = set()
+
+        self.fields_calculated = 0
+        self.fields_updated = 0
+        self.cells_updated = 0
+        self.lookups = 0
+
+    async def start(self, knowledge: "Knowledge"):
+        await super().start(knowledge)
+        self.gather_point_solver = knowledge.get_manager(IGatherPointSolver)
+
+        # Zone centers are known on start, gather point needs other managers to be updated first
+        for zone in self.zone_manager.expansion_zones:
+            key = self.key(zone.center_location)
+            self.destinations[key] = zone.center_location
+            self._auto_keys.add(key)
+            self._calculate(key)
+
+    def key(self, destination: Point2, map_type: Optional[MapType] = None) -> FieldKey:
+        return map_type, int(destination.x), int(destination.y)
+
+    def register(self, destination: Point2, map_type: Optional[MapType] = None) -> FieldKey:
+        """
+        Registers destination for flow fields.
+        map_type None uses the terrain grid without influence, otherwise influence of the map type is used.
+        """
+        key = self.key(destination, map_type)
+        self.destinations.setdefault(key, destination)
+        self._auto_keys.discard(key)
+        return key
+
+    def unregister(self, destination: Point2, map_type: Optional[MapType] = None):
+        self._remove(self.key(destination, map_type))
+
+    def is_registered(self, destination: Point2, map_type: Optional[MapType] = None) -> bool:
+        return self.key(destination, map_type) in self.destinations
+
+    def field(self, destination: Point2, map_type: Optional[MapType] = None) -> Optional[FlowField]:
+        """Flow field to the destination, None if the destination is not registered or not yet calculated."""
+        return self._fields.get(self.key(destination, map_type))
+
+    def waypoint(
+        self, start: Point2, destination: Point2, target_index: int, map_type: Optional[MapType] = None
+    ) -> Optional[Point2]:
+        """
+        Position target_index steps along the path from start to destination, same as PathingManager.find_path.
+        Returns None if the destination is not registered or its field is not yet calculated.
+        """
+        field = self.field(destination, map_type)
+        if field is None:
+            return None
+
+        self.lookups += 1
+        waypoint = field.waypoint(start, target_index)
+        if waypoint is None or waypoint == field.goal:
+            return destination
+        return waypoint
+
+    async def update(self):
+        self._register_defaults()
+
+        for key, field in self._fields.items():
+            version = self._version(key[0])
+            if self._versions[key] != version:
+                cells = field.update(self.pather.grid_values(key[0]))
+                self._versions[key] = version
+                if cells:
+                    self.fields_updated += 1
+                    self.cells_updated += cells
+
+        pending = [key for key in self.destinations if key not in self._fields]
+        for key in pending[: self.max_calculations_per_frame]:
+            self._calculate(key)
+
+    def _version(self, map_type: Optional[MapType]) -> int:
+        if map_type is None:
+            return self.pather.terrain_version
+        return self.pather.influence_version
+
+    def _register_defaults(self):
+        wanted: Set[FieldKey] = set()
+        destinations: Dict[FieldKey, Point2] = {}
+
+        def add(destination: Point2, map_type: Optional[MapType] = None):
+            key = self.key(destination, map_type)
+            wanted.add(key)
+            destinations[key] = destination
+
+        for zone in self.zone_manager.expansion_zones:
+            add(zone.center_location)
+
+        enemy_main = self.zone_manager.enemy_start_location
+        if enemy_main is not None:
+            add(enemy_main)
+
+        if self.gather_point_solver is not None:
+            add(self.gather_point_solver.gather_point)
+            add(self.gather_point_solver.gather_point, MapType.Ground)
+
+        for key in self._auto_keys - wanted:
+            self._remove(key)
+
+        for key in wanted:
+            if key not in self.destinations:
+                self.destinations[key] = destinations[key]
+                self._auto_keys.add(key)
+
+    def _calculate(self, key: FieldKey) -> FlowField:
+        map_type = key[0]
+        values = self.pather.grid_values(map_type)
+        field = FlowField(values, self.destinations[key], map_type is not None, NORMAL_INFLUENCE)
+        self._fields[key] = field
+        self._versions[key] = self._version(map_type)
+        self.fields_calculated += 1
+        return field
+
+    def _remove(self, key: FieldKey):
+        self.destinations.pop(key, None)
+        self._fields.pop(key, None)
+        self._versions.pop(key, None)
+        self._auto_keys.discard(key)
+
+    async def post_update(self):
+        pass
+
+    async def on_end(self, game_result: Result):
+        self.print(
+            f"Flow fields: {self.fields_calculated} calculated, {self.fields_updated} updated with {self.cells_updated} "
+            f"cells, {self.lookups} lookups",
+            stats=False,
+        )
@@ -0,0 +1,71 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+from sc2.position import Point2
+from sc2pathlib import MapType
+
+from sharpy.general.flow_field import FlowField
+from .flow_field_manager import FlowFieldManager
+
+
+class FakePather:
+    def __init__(self):
+        self.values = np.full((30, 20), 20, dtype=np.float32)
+        self.values[0, :] = self.values[:, 0] = 0
+        self.terrain_version = 0
+        self.influence_version = 0
+
+    def grid_values(self, map_type):
+        return self.values.copy()
+
+
+async def start_manager(pather: FakePather) -> FlowFieldManager:
+    knowledge = mock.Mock()
+    knowledge.pathing_manager = pather
+    knowledge.zone_manager.expansion_zones = [mock.Mock(center_location=Point2((25.5, 15.5)))]
+    knowledge.zone_manager.enemy_start_location = None
+    knowledge.get_manager.return_value = None
+    manager = FlowFieldManager()
+    await manager.start(knowledge)
+    return manager
+
+
+class TestFlowFieldManager:
+    @pytest.mark.asyncio
+    async def test_zone_fields_are_calculated_on_start(self):
+        manager = await start_manager(FakePather())
+        assert manager.fields_calculated == 1
+        assert manager.waypoint(Point2((5.5, 15.5)), Point2((25.5, 15.5)), 4) == Point2((9, 15))
+
+    @pytest.mark.asyncio
+    async def test_new_fields_are_calculated_in_update(self):
+        manager = await start_manager(FakePather())
+        manager.register(Point2((5.5, 5.5)))
+        manager.register(Point2((5.5, 5.5)), MapType.Ground)
+        assert manager.waypoint(Point2((15.5, 5.5)), Point2((5.5, 5.5)), 4) is None
+
+        await manager.update()
+        assert manager.fields_calculated == 2
+        await manager.update()
+        assert manager.fields_calculated == 3
+        assert manager.waypoint(Point2((15.5, 5.5)), Point2((5.5, 5.5)), 4) == Point2((11, 5))
+
+    @pytest.mark.asyncio
+    async def test_influence_fields_are_updated_every_frame(self):
+        pather = FakePather()
+        manager = await start_manager(pather)
+        manager.register(Point2((5.5, 5.5)), MapType.Ground)
+        await manager.update()
+        field = manager.field(Point2((5.5, 5.5)), MapType.Ground)
+
+        for frame in range(1, 4):
+            pather.values[frame + 6, 1:12] = 100
+            pather.influence_version += 1
+            await manager.update()
+            expected = FlowField(pather.values, (5.5, 5.5), True, 20)
+            assert np.allclose(field.distances, expected.distances)
+
+        assert manager.fields_updated == 3
+        # Terrain field is not affected by influence
+        assert manager.fields_calculated == 2
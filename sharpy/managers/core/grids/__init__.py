@@ -6,3 +6,4 @@ from .build_grid import BuildGrid
 from .cliff import Cliff
 from .zone_area import ZoneArea
 from .rectangle import Rectangle
+from .area_check import AreaCheck, AreaFill
@@ -0,0 +1,63 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .build_area import BuildArea
+from .grid_area import GridArea
+
+# Offset that makes all BuildArea values valid indices to lookup tables
+AREA_OFFSET = -min(area.value for area in BuildArea)
+AREA_TABLE_SIZE = AREA_OFFSET + max(area.value for area in BuildArea) + 1
+
+
+def area_table(areas: Iterable[BuildArea]) -> np.ndarray:
+    """Boolean lookup table that is True for the areas, index with area value + AREA_OFFSET."""
+    table = np.zeros(AREA_TABLE_SIZE, dtype=bool)
+    for area in areas:
+        table[area.value + AREA_OFFSET] = True
+    return table
+
+
+class AreaCheck:
+    """
+    Cell check that passes when cell area is one of the areas.
+    Can be called with a cell like any check function, but BuildGrid checks whole rectangles at once with it.
+    """
+
+    def __init__(self, areas: Iterable[BuildArea]):
+        self.areas = frozenset(areas)
+        self.table = area_table(self.areas)
+
+    def __call__(self, cell: GridArea) -> bool:
+        return cell.Area in self.areas
+
+
+class AreaFill:
+    """
+    Cell filler that sets area and building index of cells, optionally only for cells that are one of the
+    replaceable areas. Can be called with a cell like any fill function, but BuildGrid fills whole rectangles at
+    once with it.
+    """
+
+    def __init__(
+        self,
+        area: BuildArea,
+        building_index: Optional[int] = None,
+        replaceable: Optional[Iterable[BuildArea]] = None,
+    ):
+        """
+        :param area: area to set
+        :param building_index: building index to set, None to keep current index
+        :param replaceable: areas that can be replaced, None to replace all areas
+        """
+        self.area = area
+        self.building_index = building_index
+        self.replaceable = None if replaceable is None else frozenset(replaceable)
+        self.table = None if self.replaceable is None else area_table(self.replaceable)
+
+    def __call__(self, cell: GridArea, point=None) -> GridArea:
+        if self.replaceable is None or cell.Area in self.replaceable:
+            cell.Area = self.area
+            if self.building_index is not None:
+                cell.BuildingIndex = self.building_index
+        return cell
@@ -1,5 +1,5 @@
 import string
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from s2clientprotocol.debug_pb2 import Color
 
@@ -10,24 +10,47 @@ from sc2.game_info import GameInfo
 from sc2.position import Point2, Point3
 from sc2.unit import Unit
 
+import numpy as np
+
 from sharpy import sc2math
+from sharpy.general.map_artifact_store import MapArtifactStore, artifact_hash
 from sharpy.general.rocks import *
+from .area_check import AREA_OFFSET, AREA_TABLE_SIZE, AreaCheck, AreaFill
 from .build_area import BuildArea
 from .cliff import Cliff
 from .grid import Grid
 from .grid_area import GridArea
 from .blocker_type import BlockerType
+from .rectangle import Rectangle
 from .zone_area import ZoneArea
 
 if TYPE_CHECKING:
     from sharpy.knowledges import *
 
+# Lookups from plane values to enums, BuildArea values can be negative and are indexed the same way
+build_areas = {area.value: area for area in BuildArea}
+zone_areas = {zone.value: zone for zone in ZoneArea}
+cliffs = {cliff.value: cliff for cliff in Cliff}
+# Planes that are generated from the map on start
+GENERATED_PLANES = ("areas", "building_indices", "zones", "cliffs")
+# Increase when generation or cliff solving changes to ignore generated grids in the map cache
+BUILD_GRID_VERSION = 1
+
 
 class BuildGrid(Grid):
-    def __init__(self, knowledge: "Knowledge"):
+    """
+    Build grid of the map.
+    Cells are stored in NumPy [x][y] planes for area, building index, zone and cliff instead of `GridArea` objects.
+    `get` returns a copy of the cell as `GridArea` and `set` writes it back.
+    Rectangle queries and fills with `AreaCheck` and `AreaFill` are done for the whole rectangle at once.
+    Generated and cliff solved planes are loaded from the map artifact store when the map has been seen before.
+    """
+
+    def __init__(self, knowledge: "Knowledge", store: Optional[MapArtifactStore] = None):
         """
 
         :type knowledge: Knowledge
+        :param store: map artifact store to load generated planes from and save them to, None to always generate
         """
         ai = knowledge.ai
         self.game_info: GameInfo = ai.game_info
@@ -35,8 +58,16 @@ class BuildGrid(Grid):
         # noinspection PyUnresolvedReferences
         self.knowledge = knowledge  # type: Knowledge
         self.zone_manager = knowledge.zone_manager
-        self.Generate(ai)
-        self.SolveCliffs(ai)
+        self.loaded = False
+
+        key = self.generated_key(ai) if store is not None else None
+        if key is not None:
+            self.loaded = self.load_generated(store, key)
+        if not self.loaded:
+            self.Generate(ai)
+            self.SolveCliffs(ai)
+            if key is not None:
+                store.put_arrays({f"{key}_{name}": getattr(self, name) for name in GENERATED_PLANES})
         self.townhall_color = Point3((200, 170, 55))
         self.building_color = Point3((255, 155, 55))
         self.pylon_color = Point3((55, 255, 200))
@@ -47,30 +78,118 @@ class BuildGrid(Grid):
         self.ramp_color = Point3((139, 0, 0))
         self.vision_blocker_color = Point3((139, 0, 80))
 
+    def create_data(self):
+        shape = (self.width, self.height)
+        self.areas = np.full(shape, BuildArea.NotBuildable.value, dtype=np.int16)
+        self.building_indices = np.full(shape, -1, dtype=np.int16)
+        self.zones = np.full(shape, ZoneArea.NoZone.value, dtype=np.uint8)
+        self.cliffs = np.full(shape, Cliff.No.value, dtype=np.uint8)
+        return None
+
     def get_default(self):
         return GridArea(BuildArea.NotBuildable)
 
+    def get(self, x: int, y: int) -> GridArea:
+        """Get copy of the cell at position, no checking for performance"""
+        cell = GridArea(build_areas[int(self.areas[x, y])])
+        cell.BuildingIndex = int(self.building_indices[x, y])
+        cell.ZoneIndex = zone_areas[int(self.zones[x, y])]
+        cell.Cliff = cliffs[int(self.cliffs[x, y])]
+        return cell
+
+    def set(self, x: int, y: int, value: GridArea):
+        self.areas[x, y] = value.Area.value
+        self.building_indices[x, y] = value.BuildingIndex
+        self.zones[x, y] = value.ZoneIndex.value
+        self.cliffs[x, y] = value.Cliff.value
+
+    def area(self, x: int, y: int) -> BuildArea:
+        return build_areas[int(self.areas[x, y])]
+
+    def zone(self, x: int, y: int) -> ZoneArea:
+        return zone_areas[int(self.zones[x, y])]
+
+    def query_rect(self, rect: Rectangle, check) -> bool:
+        if not isinstance(check, AreaCheck):
+            return super().query_rect(rect, check)
+
+        slices = self.rect_slices(rect)
+        if slices is None:
+            return True
+        return bool(check.table[self.areas[slices] + AREA_OFFSET].all())
+
+    def fill_rect(self, rect: Rectangle, func):
+        if not isinstance(func, AreaFill):
+            return super().fill_rect(rect, func)
+
+        slices = self.rect_slices(rect)
+        if slices is None:
+            return
+
+        if func.table is None:
+            self.areas[slices] = func.area.value
+            if func.building_index is not None:
+                self.building_indices[slices] = func.building_index
+        else:
+            areas = self.areas[slices]
+            mask = func.table[areas + AREA_OFFSET]
+            areas[mask] = func.area.value
+            if func.building_index is not None:
+                self.building_indices[slices][mask] = func.building_index
+
+    def anchors(self, check: AreaCheck, width: int, height: int) -> np.ndarray:
+        """
+        Finds all positions where query_rect(Rectangle(x, y, width, height), check) passes with a summed area table.
+        Cells outside the map pass the same way as they do in query_rect.
+
+        :return: bool [x][y] array of rectangle positions
+        """
+        fails = ~check.table[self.areas + AREA_OFFSET]
+        # query_rect never checks the last column and row
+        fails[-1, :] = False
+        fails[:, -1] = False
+
+        sums = np.zeros((self.width + 1, self.height + 1), dtype=np.int32)
+        sums[1:, 1:] = fails.cumsum(0, dtype=np.int32).cumsum(1, dtype=np.int32)
+        x = np.arange(self.width)
+        y = np.arange(self.height)
+        x2 = np.minimum(x + width, self.width)
+        y2 = np.minimum(y + height, self.height)
+
+        counts = sums[np.ix_(x2, y2)] - sums[np.ix_(x, y2)] - sums[np.ix_(x2, y)] + sums[np.ix_(x, y)]
+        return counts == 0
+
+    def generated_key(self, ai: BotAI) -> str:
+        """Key for the generated planes, generating gives the same planes when the key is the same."""
+        units = [
+            [unit.type_id.value, float(unit.position.x), float(unit.position.y)]
+            for unit in (*ai.destructables, *ai.mineral_field, *ai.vespene_geyser)
+        ]
+        locations = [
+            [float(zone.center_location.x), float(zone.center_location.y)] for zone in self.zone_manager.expansion_zones
+        ]
+        return f"build_grid_v{BUILD_GRID_VERSION}_{artifact_hash(sorted(units), sorted(locations))}"
+
+    def load_generated(self, store: MapArtifactStore, key: str) -> bool:
+        """Restores generated planes from the store, returns False if they aren't cached."""
+        arrays = [store.get_array(f"{key}_{name}") for name in GENERATED_PLANES]
+        if any(array is None or array.shape != (self.width, self.height) for array in arrays):
+            return False
+        for name, array in zip(GENERATED_PLANES, arrays):
+            getattr(self, name)[:, :] = array
+        return True
+
     def Generate(self, ai: BotAI):
         self.copy_build_map(self.game_info.placement_grid)
 
         for ramp in self.game_info.map_ramps:
             is_ramp = len(ramp.lower) != len(ramp.points)
+            area = BuildArea.Ramp if is_ramp else BuildArea.VisionBlocker
             for point in ramp.points:  # type: Point2
-                x = point.x
-                y = point.y
-                cell: GridArea = self.get(x, y)
-                if is_ramp:
-                    cell.Area = BuildArea.Ramp
-                else:
-                    cell.Area = BuildArea.VisionBlocker
-
-        def low_rock_filler(cell):
-            cell.Area = BuildArea.LowRock
-            return cell
-
-        def high_rock_filler(cell):
-            cell.Area = BuildArea.HighRock
-            return cell
+                self.areas[point.x, point.y] = area.value
+
+        low_rock_filler = AreaFill(BuildArea.LowRock)
+        high_rock_filler = AreaFill(BuildArea.HighRock)
 
         for low_blocker in ai.destructables:  # type: Unit
             type_id = low_blocker.type_id
@@ -84,25 +203,10 @@ class BuildGrid(Grid):
             if type_id in breakable_rocks_6x6:
                 self.fill_area(low_blocker.position, BlockerType.Building6x6, high_rock_filler)
 
-        def building_filler(cell):
-            cell.Area = BuildArea.TownHall
-            cell.BuildingIndex = 0
-            return cell
-
-        def mineral_filler(cell):
-            cell.Area = BuildArea.Mineral
-            cell.BuildingIndex = 0
-            return cell
-
-        def vespene_filler(cell):
-            cell.Area = BuildArea.Gas
-            cell.BuildingIndex = 0
-            return cell
-
-        def mining_filler(cell):
-            if cell.Area == BuildArea.Empty:
-                cell.Area = BuildArea.InMineralLine
-            return cell
+        building_filler = AreaFill(BuildArea.TownHall, 0)
+        mineral_filler = AreaFill(BuildArea.Mineral, 0)
+        vespene_filler = AreaFill(BuildArea.Gas, 0)
+        mining_filler = AreaFill(BuildArea.InMineralLine, replaceable={BuildArea.Empty})
 
         for zone in self.zone_manager.expansion_zones:
             self.fill_area(zone.center_location, BlockerType.Building5x5, building_filler)
@@ -126,61 +230,68 @@ class BuildGrid(Grid):
             i += 1
 
     def copy_build_map(self, buildGrid: PixelMap):
-        for x in range(0, buildGrid.width):
-            for y in range(0, buildGrid.height):
-                if buildGrid.is_set((x, y)):
-                    self.set(x, y, GridArea(BuildArea.Empty))
-                else:
-                    self.set(x, y, GridArea(BuildArea.NotBuildable))
+        placement = np.swapaxes(buildGrid.data_numpy, 0, 1) != 0
+        self.areas[:, :] = np.where(placement, BuildArea.Empty.value, BuildArea.NotBuildable.value)
 
     def SolveCliffs(self, ai: BotAI):
         maxDifference = 3
-        hMap = self.game_info.terrain_height
-        correction = Point2((0, 1))
-
-        x = 2
-        while x < self.width - 3:
-            y = 3
-            while y < self.height - 3:
-                pos = Point2((x, y))
-                h = hMap[pos + correction]
-                possibles = [
-                    Point2((x - 2, y - 2)),
-                    Point2((x + 2, y - 2)),
-                    Point2((x - 2, y + 2)),
-                    Point2((x + 2, y + 2)),
-                ]
-
-                for possible in possibles:
-                    # To ensure rounding errors don't drop it to previous pixel.
-                    middle = (possible + pos) * 0.500001
-                    cell_possible: GridArea = self[possible]
-                    cell_middle: GridArea = self[middle]
-
-                    if cell_possible.Area == BuildArea.Empty and cell_middle.Area == BuildArea.NotBuildable:
-                        h2 = hMap[possible + correction]
-                        difference = h - h2
-                        if abs(difference) > maxDifference:
-                            continue
-
-                        cell: GridArea = self.get(x, y)
-
-                        if difference < 0:
-                            if cell.Cliff == Cliff.HighCliff:
-                                cell.Cliff = Cliff.BothCliff
-                            else:
-                                cell.Cliff = Cliff.LowCliff
-                        if difference > 0:
-                            if cell.Cliff == Cliff.LowCliff:
-                                cell.Cliff = Cliff.BothCliff
-                            else:
-                                cell.Cliff = Cliff.HighCliff
-                y += 1
-            x += 1
+        heights = np.swapaxes(self.game_info.terrain_height.data_numpy, 0, 1).astype(np.int16)
+
+        # Cells x in [2, width - 3), y in [3, height - 3), height is read one cell above the cell
+        xs = slice(2, self.width - 3)
+        ys = slice(3, self.height - 3)
+        h = heights[2 : self.width - 3, 4 : self.height - 2]
+        cliff = self.cliffs[xs, ys]
+        empty = BuildArea.Empty.value
+        not_buildable = BuildArea.NotBuildable.value
+
+        # Same order as the possible positions were originally checked, the order matters for BothCliff
+        for dx, dy in ((-2, -2), (2, -2), (-2, 2), (2, 2)):
+            possible = self.areas[2 + dx : self.width - 3 + dx, 3 + dy : self.height - 3 + dy]
+            middle = self.areas[2 + dx // 2 : self.width - 3 + dx // 2, 3 + dy // 2 : self.height - 3 + dy // 2]
+            h2 = heights[2 + dx : self.width - 3 + dx, 4 + dy : self.height - 2 + dy]
+            difference = h - h2
+            valid = (possible == empty) & (middle == not_buildable) & (np.abs(difference) <= maxDifference)
+
+            low = valid & (difference < 0)
+            cliff[low] = np.where(cliff[low] == Cliff.HighCliff.value, Cliff.BothCliff.value, Cliff.LowCliff.value)
+            high = valid & (difference > 0)
+            cliff[high] = np.where(cliff[high] == Cliff.LowCliff.value, Cliff.BothCliff.value, Cliff.HighCliff.value)
 
     def save(self, filename: string):
         if self.knowledge.debug:
-            self.save_image(filename, self.select_color)
+            self.save_colors(filename, self.colors())
+
+    def colors(self) -> np.ndarray:
+        """Color value of every cell [x][y], same colors as `select_color` gives."""
+        area_colors = np.zeros(AREA_TABLE_SIZE, dtype=np.uint32)
+        has_color = np.zeros(AREA_TABLE_SIZE, dtype=bool)
+        for area, color in (
+            (BuildArea.Building, self.building_color),
+            (BuildArea.TownHall, self.townhall_color),
+            (BuildArea.Pylon, self.pylon_color),
+            (BuildArea.Mineral, self.mineral_color),
+            (BuildArea.Gas, self.gas_color),
+            (BuildArea.NotBuildable, self.not_buildable_color),
+            (BuildArea.Ramp, self.ramp_color),
+            (BuildArea.VisionBlocker, self.vision_blocker_color),
+            (BuildArea.LowRock, Point3((69, 69, 69))),
+            (BuildArea.HighRock, Point3((35, 35, 35))),
+            (BuildArea.Empty, self.empty_color),
+        ):
+            area_colors[area.value + AREA_OFFSET] = self.color_to_value(color)
+            has_color[area.value + AREA_OFFSET] = True
+
+        # Lowest priority first, later ones overwrite
+        colors = np.full(self.areas.shape, self.color_to_value(self.empty_color), dtype=np.uint32)
+        colors[self.zones == ZoneArea.OwnNaturalZone.value] = self.color_to_value(Point3((255, 255, 90)))
+        colors[self.zones == ZoneArea.OwnMainZone.value] = self.color_to_value(Point3((90, 255, 90)))
+        colors[self.cliffs == Cliff.LowCliff.value] = self.color_to_value(Point3((109, 109, 109)))
+        colors[self.cliffs == Cliff.BothCliff.value] = self.color_to_value(Point3((139, 139, 139)))
+        colors[self.cliffs == Cliff.HighCliff.value] = self.color_to_value(Point3((169, 169, 169)))
+
+        index = self.areas + AREA_OFFSET
+        return np.where(has_color[index], area_colors[index], colors)
 
     def select_color(self, cell: GridArea) -> Color:
         if cell.Area == BuildArea.Building:
@@ -1,6 +1,7 @@
 import math
 import os
 from abc import abstractmethod
+from typing import Optional, Tuple
 
 from s2clientprotocol.debug_pb2 import Color
 
@@ -13,8 +14,10 @@ class Grid:
     def __init__(self, width, height):
         self.height = height
         self.width = width
-        self.height = height
-        self._data = [[0 for y in range(height)] for x in range(width)]
+        self._data = self.create_data()
+
+    def create_data(self):
+        return [[0 for y in range(self.height)] for x in range(self.width)]
 
     def set(self, x: int, y: int, value):
         # print(f"{x},{y})")
@@ -56,6 +59,16 @@ class Grid:
                 return False
         return True
 
+    def rect_slices(self, rect: Rectangle) -> Optional[Tuple[slice, slice]]:
+        """Slices [x][y] for the part of rect that query and fill methods handle, None if there is none."""
+        minx = max(rect.x, 0)
+        miny = max(rect.y, 0)
+        maxx = min(rect.right, self.width - 1)
+        maxy = min(rect.bottom, self.height - 1)
+        if minx >= maxx or miny >= maxy:
+            return None
+        return slice(minx, maxx), slice(miny, maxy)
+
     def query_rect(self, rect: Rectangle, check) -> bool:
         minx = max(rect.x, 0)
         miny = max(rect.y, 0)
@@ -127,17 +140,20 @@ class Grid:
     def save_image(self, filename, color_func):
         import numpy as np
 
-        image_data = []
-        for y in range(0, self.height):
-            for x in range(0, self.width):
-                y_value = self.height - 1 - y
-                # print(f'{x}, {y_value}')
-                image_data.append(self.color_to_value(color_func(self.get(x, y_value))))
+        colors = np.zeros((self.width, self.height), dtype=np.uint32)
+        for x in range(0, self.width):
+            for y in range(0, self.height):
+                colors[x, y] = self.color_to_value(color_func(self.get(x, y)))
 
-        myarray = np.asarray(image_data, dtype=np.uint32)
+        self.save_colors(filename, colors)
+
+    def save_colors(self, filename, colors):
+        """Saves image of the grid from [x][y] array of color values."""
+        import numpy as np
         from PIL import Image
 
-        # databytes = np.packbits(myarray)
+        # Image rows go from top to bottom
+        myarray = np.ascontiguousarray(np.flipud(np.asarray(colors, dtype=np.uint32).T))
         im = Image.frombytes(mode="RGBA", size=tuple((self.width, self.height)), data=myarray)
 
         if not os.path.exists("data"):
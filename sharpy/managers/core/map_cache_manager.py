@@ -0,0 +1,50 @@
+import os
+from typing import Optional
+
+from sc2.data import Result
+from sharpy.general.map_artifact_store import MapArtifactStore, MAP_CACHE_FOLDER, map_key
+from .manager_base import ManagerBase
+
+
+class MapCacheManager(ManagerBase):
+    """
+    Provides the map artifact store for the current map, so other managers can load results of map analysis
+    from earlier games instead of calculating them again.
+
+    Store folder is selected by map name and terrain, pathing and placement grids at the start of the game.
+    Set folder to None to disable saving anything on disk.
+
+    Zones and chokes of the sc2pathlib map live inside the native map object and can't be restored from the store,
+    so they are still calculated on every start.
+    """
+
+    def __init__(self, folder: Optional[str] = MAP_CACHE_FOLDER):
+        super().__init__()
+        self.folder = folder
+        self.store = MapArtifactStore(None)
+
+    async def start(self, knowledge: "Knowledge"):
+        await super().start(knowledge)
+        if self.folder is None:
+            return
+
+        game_info = self.ai.game_info
+        key = map_key(
+            game_info.map_name,
+            game_info.terrain_height.data_numpy,
+            game_info.pathing_grid.data_numpy,
+            game_info.placement_grid.data_numpy,
+        )
+        self.store = MapArtifactStore(os.path.join(self.folder, key))
+
+    async def update(self):
+        pass
+
+    async def post_update(self):
+        pass
+
+    async def on_end(self, game_result: Result):
+        msg = f"Map cache: {self.store.hits} hits, {self.store.misses} misses"
+        if self.store.write_error:
+            msg += f", saving failed: {self.store.write_error}"
+        self.print(msg, stats=False)
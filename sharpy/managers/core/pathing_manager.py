@@ -1,10 +1,11 @@
+import enum
 import logging
-from typing import Dict, List, Tuple, Union
+from typing import Dict, Hashable, List, Optional, Tuple, Union
 
 import numpy as np
-from math import floor
+from math import floor, pi
 
-from sc2.data import Race
+from sc2.data import Race, Result
 from sc2.game_info import GameInfo
 from sc2.ids.effect_id import EffectId
 from sc2.position import Point2, Point3
@@ -14,20 +15,85 @@ from sc2.units import Units
 import sc2pathlib
 from sc2pathlib import MapType, Sc2Map
 from sharpy.general.extended_power import ExtendedPower
+from sharpy.general.flow_field import FlowField
+from sharpy.general.map_artifact_store import MapArtifactStore
+from sharpy.general.path_cache import PathCache
 from sharpy.general.rocks import *
 from .manager_base import ManagerBase
+from .map_cache_manager import MapCacheManager
 from sharpy.managers.core.unit_value import buildings_2x2, buildings_3x3, buildings_5x5
 from sharpy.sc2math import point_normalize
 
+# Enemy units need to move this far before their influence is moved on the map
+STAMP_MOVE_THRESHOLD = 0.5
+# Grid value for normal pathable terrain without any influence
+NORMAL_INFLUENCE = 20
+# Path queries sharing a goal use a single reverse search when there are at least this many of them
+BATCH_FLOW_FIELD_SIZE = 10
+
+# start, goal, map type (None for terrain without influence), target index
+PathQuery = Tuple[Point2, Point2, Optional[MapType], int]
+Block = Tuple[Point2, Tuple[int, int]]
+BlockKey = Tuple[UnitTypeId, Point2]
+# influence type, influence, range, secondary range
+InfluenceParams = Tuple[Tuple["InfluenceType", float, float, float], ...]
+Stamp = Tuple[Point2, InfluenceParams]
+
+
+class InfluenceType(enum.IntEnum):
+    Walk = 0
+    Tank = 1
+    PureGround = 2
+    Ground = 3
+    Air = 4
+    Both = 5
+
 
 class PathingManager(ManagerBase):
+    """
+    Maintains pathing grids and enemy influence.
+
+    Mineral fields, rocks and structures are blocked on the grids once and only changed when they appear or
+    disappear. Enemy units and effects are applied as stamps that are only updated when a unit moves more than
+    stamp_move_threshold. The native sc2pathlib can not remove influence, so any stamp change with it clears
+    influence and applies all stamps again. The fallback backend removes and adds the changed stamps only.
+
+    Paths without influence are cached in path_cache. They are invalidated when a block is added near them
+    or when any block of their map type is removed.
+    """
+
     map: Sc2Map
     path_finder_terrain: sc2pathlib.PathFinder
 
     def __init__(self):
         super().__init__()
+        self.flow_fields = None
         self.found_points = []
         self.found_points_air = []
+        self.stamp_move_threshold = STAMP_MOVE_THRESHOLD
+        self.incremental_influence = not sc2pathlib.NATIVE_BACKEND
+        self._terrain_blocks: Dict[BlockKey, List[Block]] = {}
+        self._map_blocks: Dict[BlockKey, List[Block]] = {}
+        self._stamps: Dict[Hashable, Stamp] = {}
+        self._map_flags: Tuple[bool, bool] = (False, False)
+        self._influence_dirty = True
+        self.map_cells = 0
+        self.path_cache = PathCache()
+        self.map_store: Optional[MapArtifactStore] = None
+        self._overlord_spots: Optional[List[Point2]] = None
+        self.batch_flow_field_size = BATCH_FLOW_FIELD_SIZE
+        # Increased whenever the terrain grid or the influence maps change
+        self.terrain_version = 0
+        self.influence_version = 0
+        self._grid_values: Dict[Optional[MapType], Tuple[int, np.ndarray]] = {}
+
+        # Grid cells touched by block and influence updates during the current frame, estimated from block sizes
+        # and influence ranges as the native backend does not report them
+        self.cells_estimated = 0
+        self.cells_estimated_total = 0
+        self.influence_frames = 0
+        self.influence_rebuilds = 0
+        self.influence_increments = 0
 
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
@@ -40,106 +106,226 @@ class PathingManager(ManagerBase):
             game_info.terrain_height.data_numpy,
             game_info.playable_area,
         )
+        self.map_cells = path_grid.width * path_grid.height
+        map_cache = knowledge.get_manager(MapCacheManager)
+        if map_cache:
+            self.map_store = map_cache.store
         if self.ai.start_location is not None:
             self.map.calculate_connections(self.ai.start_location)  # This is for checking dead warp zones
 
         _data = np.fmax(path_grid.data_numpy, placement_grid.data_numpy).T
         self.path_finder_terrain = sc2pathlib.PathFinder(_data)
-        self.path_finder_terrain.normalize_influence(20)
+        self.path_finder_terrain.normalize_influence(NORMAL_INFLUENCE)
+        # Minerals and rocks are known on start, so that terrain paths and flow fields are correct from the start
+        self.update_terrain_blocks()
+
+        from .flow_field_manager import FlowFieldManager
+
+        self.flow_fields: Optional[FlowFieldManager] = knowledge.get_manager(FlowFieldManager)
 
     @property
     def overlord_spots(self) -> List[Point2]:
-        points = []
-        for tuple_spot in self.map.overlord_spots:
-            points.append(Point2(tuple_spot))
-        # TODO: cache this
-        return points
+        if self._overlord_spots is None:
+            spots = None if self.map_store is None else self.map_store.get_array("overlord_spots")
+            if spots is None:
+                spots = np.array(self.map.overlord_spots, dtype=float).reshape(-1, 2)
+                if self.map_store is not None:
+                    self.map_store.put_arrays({"overlord_spots": spots})
+            self._overlord_spots = [Point2(spot) for spot in spots.tolist()]
+        return self._overlord_spots
 
     async def update(self):
+        self.cells_estimated = 0
         await self.update_influence()
+        self.cells_estimated_total += self.cells_estimated
+        self.influence_frames += 1
         self.found_points.clear()
         self.found_points_air.clear()
 
+    def invalidate_influence(self):
+        """
+        Clears and applies all influence again on next update.
+        Call this after modifying influence on the map outside of this manager.
+        """
+        self._influence_dirty = True
+
+    def rock_blocks(self, rock: Unit) -> List[Block]:
+        blocks: List[Block] = []
+        rock_type = rock.type_id
+        if rock.name == "MineralField450":
+            # Attempts to solve the issue with sc2 linux 4.10 vs Windows 4.11
+            blocks.append((rock.position, (2, 1)))
+        elif rock_type in breakable_rocks_2x2:
+            blocks.append((rock.position, (2, 2)))
+        elif rock_type in breakable_rocks_4x4:
+            blocks.append((rock.position, (4, 3)))
+            blocks.append((rock.position, (3, 4)))
+        elif rock_type in breakable_rocks_6x6:
+            blocks.append((rock.position, (6, 4)))
+            blocks.append((rock.position, (5, 5)))
+            blocks.append((rock.position, (4, 6)))
+        elif rock_type in breakable_rocks_4x2:
+            blocks.append((rock.position, (4, 2)))
+        elif rock_type in breakable_rocks_2x4:
+            blocks.append((rock.position, (2, 4)))
+        elif rock_type in breakable_rocks_6x2:
+            blocks.append((rock.position, (6, 2)))
+        elif rock_type in breakable_rocks_2x6:
+            blocks.append((rock.position, (2, 6)))
+        elif rock_type in breakable_rocks_diag_BLUR:
+            for y in range(-4, 6):
+                if y == -4:
+                    blocks.append((rock.position + Point2((y + 2, y)), (1, 1)))
+                elif y == 5:
+                    blocks.append((rock.position + Point2((y - 2, y)), (1, 1)))
+                elif y == -3:
+                    blocks.append((rock.position + Point2((y - 1, y)), (3, 1)))
+                elif y == 4:
+                    blocks.append((rock.position + Point2((y + 1, y)), (3, 1)))
+                else:
+                    blocks.append((rock.position + Point2((y, y)), (5, 1)))
+
+        elif rock_type in breakable_rocks_diag_ULBR:
+            for y in range(-4, 6):
+                if y == -4:
+                    blocks.append((rock.position + Point2((-y - 2, y)), (1, 1)))
+                elif y == 5:
+                    blocks.append((rock.position + Point2((-y + 2, y)), (1, 1)))
+                elif y == -3:
+                    blocks.append((rock.position + Point2((-y + 1, y)), (3, 1)))
+                elif y == 4:
+                    blocks.append((rock.position + Point2((-y - 1, y)), (3, 1)))
+                else:
+                    blocks.append((rock.position + Point2((-y, y)), (5, 1)))
+        return blocks
+
     def set_rocks(self, grid: Union[sc2pathlib.PathFinder, Sc2Map]):
         for rock in self.ai.destructables:  # type: Unit
-            rock_type = rock.type_id
-            if rock.name == "MineralField450":
-                # Attempts to solve the issue with sc2 linux 4.10 vs Windows 4.11
-                grid.create_block(rock.position, (2, 1))
-            elif rock_type in breakable_rocks_2x2:
-                grid.create_block(rock.position, (2, 2))
-            elif rock_type in breakable_rocks_4x4:
-                grid.create_block(rock.position, (4, 3))
-                grid.create_block(rock.position, (3, 4))
-            elif rock_type in breakable_rocks_6x6:
-                grid.create_block(rock.position, (6, 4))
-                grid.create_block(rock.position, (5, 5))
-                grid.create_block(rock.position, (4, 6))
-            elif rock_type in breakable_rocks_4x2:
-                grid.create_block(rock.position, (4, 2))
-            elif rock_type in breakable_rocks_2x4:
-                grid.create_block(rock.position, (2, 4))
-            elif rock_type in breakable_rocks_6x2:
-                grid.create_block(rock.position, (6, 2))
-            elif rock_type in breakable_rocks_2x6:
-                grid.create_block(rock.position, (2, 6))
-            elif rock_type in breakable_rocks_diag_BLUR:
-                for y in range(-4, 6):
-                    if y == -4:
-                        grid.create_block(rock.position + Point2((y + 2, y)), (1, 1))
-                    elif y == 5:
-                        grid.create_block(rock.position + Point2((y - 2, y)), (1, 1))
-                    elif y == -3:
-                        grid.create_block(rock.position + Point2((y - 1, y)), (3, 1))
-                    elif y == 4:
-                        grid.create_block(rock.position + Point2((y + 1, y)), (3, 1))
-                    else:
-                        grid.create_block(rock.position + Point2((y, y)), (5, 1))
-
-            elif rock_type in breakable_rocks_diag_ULBR:
-                for y in range(-4, 6):
-                    if y == -4:
-                        grid.create_block(rock.position + Point2((-y - 2, y)), (1, 1))
-                    elif y == 5:
-                        grid.create_block(rock.position + Point2((-y + 2, y)), (1, 1))
-                    elif y == -3:
-                        grid.create_block(rock.position + Point2((-y + 1, y)), (3, 1))
-                    elif y == 4:
-                        grid.create_block(rock.position + Point2((-y - 1, y)), (3, 1))
-                    else:
-                        grid.create_block(rock.position + Point2((-y, y)), (5, 1))
-
-    async def update_influence(self):
-        power = ExtendedPower(self.unit_values)
-        self.path_finder_terrain.reset()  # Reset
-        self.map.reset()  # Reset
-        self.map.enable_colossus_map(
-            self.knowledge.my_race == Race.Protoss and len(self.cache.own(UnitTypeId.COLOSSUS)) > 0
-        )
-        self.map.enable_reaper_map(self.knowledge.my_race == Race.Terran and len(self.cache.own(UnitTypeId.REAPER)) > 0)
+            for center, size in self.rock_blocks(rock):
+                grid.create_block(center, size)
 
-        positions = []
+    def static_blocks(self, include_structures: bool) -> Dict[BlockKey, List[Block]]:
+        blocks: Dict[BlockKey, List[Block]] = {}
 
         for mf in self.ai.mineral_field:  # type: Unit
             # In 4.8.5+ minerals are no longer visible in pathing grid unless player has vision
-            positions.append(mf.position)
+            blocks[(mf.type_id, mf.position)] = [(mf.position, (2, 1))]
 
-        self.path_finder_terrain.create_block(positions, (2, 1))
-        self.map.create_block(positions, (2, 1))
-
-        self.set_rocks(self.path_finder_terrain)
-        self.set_rocks(self.map)
-
-        for building in self.ai.structures + self.ai.enemy_structures:  # type: Unit
-            if building.type_id in buildings_2x2:
-                self.map.create_block(building.position, (2, 2))
-            elif building.type_id in buildings_3x3:
-                self.map.create_block(building.position, (3, 3))
-            elif building.type_id in buildings_5x5:
-                self.map.create_block(building.position, (5, 3))
-                self.map.create_block(building.position, (3, 5))
+        for rock in self.ai.destructables:  # type: Unit
+            rock_blocks = self.rock_blocks(rock)
+            if rock_blocks:
+                blocks[(rock.type_id, rock.position)] = rock_blocks
+
+        if include_structures:
+            for building in self.ai.structures + self.ai.enemy_structures:  # type: Unit
+                if building.type_id in buildings_2x2:
+                    blocks[(building.type_id, building.position)] = [(building.position, (2, 2))]
+                elif building.type_id in buildings_3x3:
+                    blocks[(building.type_id, building.position)] = [(building.position, (3, 3))]
+                elif building.type_id in buildings_5x5:
+                    blocks[(building.type_id, building.position)] = [
+                        (building.position, (5, 3)),
+                        (building.position, (3, 5)),
+                    ]
+        return blocks
+
+    def update_blocks(
+        self,
+        grid: Union[sc2pathlib.PathFinder, Sc2Map],
+        applied: Dict[BlockKey, List[Block]],
+        wanted: Dict[BlockKey, List[Block]],
+        map_type: Optional[MapType],
+    ) -> bool:
+        """
+        Creates and removes blocks on the grid to match wanted blocks.
+        Invalidates cached paths of the map type that are affected by the changes.
+        Returns True if the grid was changed.
+        """
+        removed = [key for key in applied if key not in wanted]
+        added = [key for key in wanted if key not in applied]
+
+        for key in removed:
+            for center, size in applied.pop(key):
+                grid.remove_block(center, size)
+                self.cells_estimated += size[0] * size[1]
+
+        if removed:
+            # Any cached path might have a shorter route through the opened cells, however far it went around them
+            self.path_cache.invalidate_map_type(map_type)
+            # Removing a block also opens cells that are covered by other overlapping blocks
+            removed_positions = [key[1] for key in removed]
+            for blocks in applied.values():
+                for center, size in blocks:
+                    if any(center.distance_to_point2(position) < 8 for position in removed_positions):
+                        grid.create_block(center, size)
+                        self.cells_estimated += size[0] * size[1]
+
+        for key in added:
+            blocks = wanted[key]
+            applied[key] = blocks
+            for center, size in blocks:
+                grid.create_block(center, size)
+                self.invalidate_paths(map_type, center, size, 1)
+                self.cells_estimated += size[0] * size[1]
+
+        return len(removed) > 0 or len(added) > 0
+
+    def invalidate_paths(self, map_type: Optional[MapType], center: Point2, size: Tuple[int, int], margin: int):
+        x = int(floor(center.x - size[0] / 2 + 0.5))
+        y = int(floor(center.y - size[1] / 2 + 0.5))
+        self.path_cache.invalidate_area(map_type, x, y, x + size[0], y + size[1], margin)
+
+    def influence_params(self, example_enemy: Unit, power: ExtendedPower) -> InfluenceParams:
+        params = []
+
+        if self.unit_values.can_shoot_air(example_enemy):
+            s_range = self.unit_values.air_range(example_enemy)
+
+            if example_enemy.type_id == UnitTypeId.CYCLONE:
+                s_range = 7
+
+            if example_enemy.is_structure:
+                params.append((InfluenceType.PureGround, power.air_power, s_range, s_range))
+            else:
+                params.append((InfluenceType.Air, power.air_power, s_range, s_range + 3))
+
+        if self.unit_values.can_shoot_ground(example_enemy):
+            s_range = self.unit_values.ground_range(example_enemy)
+            if example_enemy.type_id == UnitTypeId.CYCLONE:
+                s_range = 15  # lock on break range
+            if example_enemy.type_id == UnitTypeId.SIEGETANKSIEGED:
+                params.append((InfluenceType.Tank, power.ground_power, 2.5, 14.5))
+            elif s_range < 2:
+                params.append((InfluenceType.Walk, power.ground_power, 7, 7))
+            elif example_enemy.is_structure:
+                params.append((InfluenceType.PureGround, power.ground_power, s_range, s_range))
+            elif s_range < 5:
+                params.append((InfluenceType.PureGround, power.ground_power, s_range, 7))
+            else:
+                params.append((InfluenceType.PureGround, power.ground_power, s_range, s_range + 3))
+
+        return tuple(params)
+
+    def add_influence(self, points: List[Point2], params: InfluenceParams, sign: int = 1):
+        for influence_type, influence, range1, range2 in params:
+            influence *= sign
+            if influence_type == InfluenceType.Walk:
+                self.map.add_walk_influence(points, influence, range1)
+            elif influence_type == InfluenceType.Tank:
+                self.map.add_tank_influence(points, influence, range1, range2)
+            elif influence_type == InfluenceType.PureGround:
+                self.map.add_pure_ground_influence(points, influence, range1, range2)
+            elif influence_type == InfluenceType.Ground:
+                self.map.add_ground_influence(points, influence, range1, range2)
+            elif influence_type == InfluenceType.Air:
+                self.map.add_air_influence(points, influence, range1, range2)
+            else:
+                self.map.add_both_influence(points, influence, range1, range2)
+            self.cells_estimated += int(len(points) * pi * max(range1, range2) ** 2)
 
-        self.map.normalize_influence(20)
+    def enemy_stamps(self) -> Dict[Hashable, Stamp]:
+        power = ExtendedPower(self.unit_values)
+        stamps: Dict[Hashable, Stamp] = {}
 
         for enemy_type in self.cache.enemy_unit_cache:  # type: UnitTypeId
             enemies: Units = self.cache.enemy_unit_cache.get(enemy_type, Units([], self.ai))
@@ -149,34 +335,21 @@ class PathingManager(ManagerBase):
             example_enemy: Unit = enemies[0]
             power.clear()
             power.add_unit(enemy_type, 100)
+            params = self.influence_params(example_enemy, power)
+            if not params:
+                continue
 
-            if self.unit_values.can_shoot_air(example_enemy):
-                positions: List[Point2] = [unit.position for unit in enemies]  # need to be specified in both places
-                s_range = self.unit_values.air_range(example_enemy)
-
-                if example_enemy.type_id == UnitTypeId.CYCLONE:
-                    s_range = 7
-
-                if example_enemy.is_structure:
-                    self.map.add_pure_ground_influence(positions, power.air_power, s_range, s_range)
-                else:
-                    self.map.add_air_influence(positions, power.air_power, s_range, s_range + 3)
-
-            if self.unit_values.can_shoot_ground(example_enemy):
-                positions = [unit.position for unit in enemies]  # need to be specified in both places
-                s_range = self.unit_values.ground_range(example_enemy)
-                if example_enemy.type_id == UnitTypeId.CYCLONE:
-                    s_range = 15  # lock on break range
-                if example_enemy.type_id == UnitTypeId.SIEGETANKSIEGED:
-                    self.map.add_tank_influence(positions, power.ground_power)
-                elif s_range < 2:
-                    self.map.add_walk_influence(positions, power.ground_power, 7)
-                elif example_enemy.is_structure:
-                    self.map.add_pure_ground_influence(positions, power.ground_power, s_range, s_range)
-                elif s_range < 5:
-                    self.map.add_pure_ground_influence(positions, power.ground_power, s_range, 7)
-                else:
-                    self.map.add_pure_ground_influence(positions, power.ground_power, s_range, s_range + 3)
+            for enemy in enemies:  # type: Unit
+                position = enemy.position
+                previous = self._stamps.get(enemy.tag)
+                if (
+                    previous is not None
+                    and previous[1] == params
+                    and previous[0].distance_to_point2(position) < self.stamp_move_threshold
+                ):
+                    # Keep the influence where it is
+                    position = previous[0]
+                stamps[enemy.tag] = (position, params)
 
         # influence, radius, points, can it hit air?
         effect_dict: Dict[EffectId, Tuple[float, float, List[Point2], bool]] = dict()
@@ -209,17 +382,82 @@ class PathingManager(ManagerBase):
             if values is not None and effect.id not in effect_dict:
                 effect_dict[effect.id] = values
 
-        for effects in effect_dict.values():
-            if effects[3]:
-                self.map.add_both_influence(effects[2], effects[0], effects[1], effects[1] + 0.5)
-            else:
-                self.map.add_ground_influence(effects[2], effects[0], effects[1], effects[1] + 0.5)
+        for effect_id, effects in effect_dict.items():
+            influence_type = InfluenceType.Both if effects[3] else InfluenceType.Ground
+            params = ((influence_type, effects[0], effects[1], effects[1] + 0.5),)
+            for point in effects[2]:
+                stamps[(effect_id, point)] = (point, params)
 
         # batteries: Units = self.cache.own(UnitTypeId.SHIELDBATTERY).filter(lambda u: u.energy > 5)
         # if batteries:
         #     positions = map(lambda u: u.position, batteries)
         #     self.path_finder_air.add_influence(positions, -5, 6)
         #     self.path_finder_ground.add_influence(positions, -5, 6)
+        return stamps
+
+    def update_terrain_blocks(self):
+        if self.update_blocks(self.path_finder_terrain, self._terrain_blocks, self.static_blocks(False), None):
+            # Removed blocks are not necessarily restored to normal influence
+            self.path_finder_terrain.normalize_influence(NORMAL_INFLUENCE)
+            self.terrain_version += 1
+
+    async def update_influence(self):
+        map_flags = (
+            self.knowledge.my_race == Race.Protoss and len(self.cache.own(UnitTypeId.COLOSSUS)) > 0,
+            self.knowledge.my_race == Race.Terran and len(self.cache.own(UnitTypeId.REAPER)) > 0,
+        )
+        self.map.enable_colossus_map(map_flags[0])
+        self.map.enable_reaper_map(map_flags[1])
+
+        self.update_terrain_blocks()
+        blocks_changed = self.update_blocks(self.map, self._map_blocks, self.static_blocks(True), MapType.Ground)
+        stamps = self.enemy_stamps()
+
+        removed = [key for key, stamp in self._stamps.items() if stamps.get(key) != stamp]
+        added = [key for key, stamp in stamps.items() if self._stamps.get(key) != stamp]
+
+        if (
+            blocks_changed
+            or self._influence_dirty
+            or map_flags != self._map_flags
+            or ((removed or added) and not self.incremental_influence)
+        ):
+            self.influence_rebuilds += 1
+            self.influence_version += 1
+            self.map.normalize_influence(NORMAL_INFLUENCE)
+            self.cells_estimated += self.map_cells
+            grouped: Dict[InfluenceParams, List[Point2]] = {}
+            for position, params in stamps.values():
+                grouped.setdefault(params, []).append(position)
+            for params, positions in grouped.items():
+                self.add_influence(positions, params)
+        elif removed or added:
+            self.influence_increments += 1
+            self.influence_version += 1
+            for key in removed:
+                position, params = self._stamps[key]
+                self.add_influence([position], params, -1)
+            for key in added:
+                position, params = stamps[key]
+                self.add_influence([position], params)
+
+        self._stamps = stamps
+        self._map_flags = map_flags
+        self._influence_dirty = False
+
+    async def on_end(self, game_result: Result):
+        if self.influence_frames > 0:
+            self.print(
+                f"Influence: {self.influence_rebuilds} full updates, {self.influence_increments} incremental updates, "
+                f"{self.cells_estimated_total / self.influence_frames:.0f} cells estimated / frame",
+                stats=False,
+            )
+        cache = self.path_cache
+        self.print(
+            f"Path cache: {cache.hits} hits, {cache.suffix_hits} suffix hits, {cache.misses} misses, "
+            f"{cache.evictions} evictions, {cache.invalidations} invalidations, hit rate {cache.hit_rate:.0%}",
+            stats=False,
+        )
 
     async def post_update(self):
         if self.debug:
@@ -232,8 +470,24 @@ class PathingManager(ManagerBase):
                 point3 = Point3((point.x, point.y, z))
                 self.client.debug_box2_out(point3, 0.25)
 
+    def cached_path(
+        self, start: Point2, target: Point2, map_type: Optional[MapType] = None
+    ) -> Tuple[List[Tuple[int, int]], float]:
+        """
+        Finds a path without influence, using cached results when available.
+        map_type None uses the terrain grid, which does not include structures.
+        """
+        result = self.path_cache.get(map_type, start, target)
+        if result is None:
+            if map_type is None:
+                result = self.path_finder_terrain.find_path(start, target)
+            else:
+                result = self.map.find_path(map_type, start, target)
+            self.path_cache.put(map_type, start, target, result[0], result[1])
+        return result
+
     def walk_distance(self, start: Point2, target: Point2) -> float:
-        result = self.map.find_path(MapType.Ground, start, target)
+        result = self.cached_path(start, target, MapType.Ground)
         path = result[0]
 
         if len(path) < 1:
@@ -241,7 +495,11 @@ class PathingManager(ManagerBase):
         return result[1]
 
     def find_path(self, start: Point2, target: Point2, target_index: int = 20) -> Point2:
-        result = self.path_finder_terrain.find_path(start, target)
+        waypoint = self.flow_field_waypoint(start, target, target_index, None)
+        if waypoint is not None:
+            return waypoint
+
+        result = self.cached_path(start, target)
         path = result[0]
 
         if len(path) < 1:
@@ -256,6 +514,82 @@ class PathingManager(ManagerBase):
             self.found_points.extend(path)
         return Point2((target[0], target[1]))
 
+    def grid_values(self, map_type: Optional[MapType]) -> np.ndarray:
+        """
+        Current grid values as [x][y] array, 0 for cells that are not pathable.
+        map_type None returns the terrain grid, which does not include structures or influence.
+        The array is cached until the grid changes and is read only.
+        """
+        version = self.terrain_version if map_type is None else self.influence_version
+        cached = self._grid_values.get(map_type)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        if map_type is None:
+            data = self.path_finder_terrain.map
+        elif map_type == MapType.Air:
+            data = self.map.map.air_pathing
+        elif map_type == MapType.Reaper:
+            data = self.map.map.reaper_pathing
+        elif map_type == MapType.Colossus:
+            data = self.map.map.colossus_pathing
+        else:
+            data = self.map.map.ground_pathing
+        values = np.array(data, dtype=np.float32)
+        values.setflags(write=False)
+        self._grid_values[map_type] = (version, values)
+        return values
+
+    def flow_field_waypoint(
+        self, start: Point2, target: Point2, target_index: int, map_type: Optional[MapType]
+    ) -> Optional[Point2]:
+        """Waypoint from a cached flow field when target is a registered flow field destination."""
+        if self.flow_fields is None or not isinstance(target, Point2):
+            return None
+        return self.flow_fields.waypoint(start, target, target_index, map_type)
+
+    def find_paths(self, queries: List[PathQuery]) -> List[Point2]:
+        """
+        Finds next waypoints for multiple paths in one call.
+
+        Queries with map type None are solved like find_path, other queries with influence on the specified map like
+        find_influence_ground_path. When at least batch_flow_field_size queries share goal and map type,
+        a single reverse search is done from the goal instead of a path search for each query.
+
+        :return: waypoints in the same order as queries
+        """
+        results: List[Optional[Point2]] = [None] * len(queries)
+        batches: Dict[Tuple[Optional[MapType], int, int], List[int]] = {}
+
+        for i, query in enumerate(queries):
+            start, goal, map_type, target_index = query
+            waypoint = self.flow_field_waypoint(start, goal, target_index, map_type)
+            if waypoint is not None:
+                results[i] = waypoint
+                continue
+            batches.setdefault((query[2], int(goal.x), int(goal.y)), []).append(i)
+
+        for (map_type, _, _), indices in batches.items():
+            if len(indices) >= self.batch_flow_field_size:
+                goal = queries[indices[0]][1]
+                field = FlowField(self.grid_values(map_type), goal, map_type is not None, NORMAL_INFLUENCE)
+
+                for i in indices:
+                    start, target, _, target_index = queries[i]
+                    waypoint = field.waypoint(start, target_index)
+                    results[i] = target if waypoint is None or waypoint == field.goal else waypoint
+                    if self.debug and map_type is None:
+                        self.found_points.append(results[i])
+            else:
+                for i in indices:
+                    start, target, _, target_index = queries[i]
+                    if map_type is None:
+                        results[i] = self.find_path(start, target, target_index)
+                    else:
+                        results[i] = self.find_influence_ground_path(start, target, target_index, map_type)
+
+        return results
+
     def find_weak_influence_air(self, target: Point2, radius: float) -> Point2:
         pathing_result = self.map.lowest_influence_in_grid(MapType.Air, target, floor(radius))
         pos = pathing_result[0]
@@ -272,9 +606,13 @@ class PathingManager(ManagerBase):
         return Point2((pos[0], pos[1]))
 
     def find_influence_air_path(self, start: Point2, target: Point2) -> Point2:
+        target_index = 4
+        waypoint = self.flow_field_waypoint(start, target, target_index, MapType.Air)
+        if waypoint is not None:
+            return waypoint
+
         result = self.map.find_path_influence(MapType.Air, start, target)
         path = result[0]
-        target_index = 4
 
         if len(path) < 1:
             self.print(f"No path found {start}, {target}")
@@ -291,6 +629,10 @@ class PathingManager(ManagerBase):
     def find_influence_ground_path(
         self, start: Point2, target: Point2, target_index: int = 5, map_type: MapType = MapType.Ground
     ) -> Point2:
+        waypoint = self.flow_field_waypoint(start, target, target_index, map_type)
+        if waypoint is not None:
+            return waypoint
+
         result = self.map.find_path_influence(map_type, start, target)
         path = result[0]
 
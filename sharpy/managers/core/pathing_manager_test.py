@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import sc2pathlib
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+from .pathing_manager import PathingManager
+
+
+def create_manager(rock_gap: bool = False) -> PathingManager:
+    values = np.ones((30, 20), dtype=int)
+    values[0, :] = values[:, 0] = values[-1, :] = values[:, -1] = 0
+    # Wall with a gap at y = 16..17
+    values[15, :16] = 0
+    if rock_gap:
+        # Second gap at y = 2..5 that is closed by rocks
+        values[15, 2:6] = 1
+    manager = PathingManager()
+    manager.path_finder_terrain = sc2pathlib.PathFinder(values)
+    manager.path_finder_terrain.normalize_influence(20)
+    return manager
+
+
+class TestFindPaths:
+    def test_batched_waypoints_match_find_path(self):
+        manager = create_manager()
+        goal = Point2((25, 5))
+        starts = [Point2((x, y)) for x in range(2, 8) for y in range(2, 6)]
+        queries = [(start, goal, None, 5) for start in starts]
+
+        manager.batch_flow_field_size = len(queries) + 1
+        expected = manager.find_paths(queries)
+        manager.batch_flow_field_size = 2
+        waypoints = manager.find_paths(queries)
+
+        for start, waypoint, path_waypoint in zip(starts, waypoints, expected):
+            # Ties between equally long paths can be broken differently, but both waypoints are on a shortest path
+            distance = manager.cached_path(start, goal)[1]
+            for point in (waypoint, path_waypoint):
+                via = manager.cached_path(start, point)[1] + manager.cached_path(point, goal)[1]
+                assert via == pytest.approx(distance)
+
+    def test_grid_values_are_cached_per_terrain_version(self):
+        manager = create_manager()
+        values = manager.grid_values(None)
+        assert manager.grid_values(None) is values
+        assert not values.flags.writeable
+
+        manager.terrain_version += 1
+        assert manager.grid_values(None) is not values
+
+
+class TestPathCacheInvalidation:
+    def test_removed_block_invalidates_distant_detour(self):
+        manager = create_manager(rock_gap=True)
+        grid = manager.path_finder_terrain
+        rocks = (UnitTypeId.DESTRUCTIBLEROCK2X4VERTICAL, Point2((15, 4)))
+        applied = {}
+        manager.update_blocks(grid, applied, {rocks: [(Point2((15, 4)), (1, 4))]}, None)
+
+        start, goal = Point2((2, 3)), Point2((28, 3))
+        path, detour = manager.cached_path(start, goal)
+        # Detour through the upper gap never comes close to the rocks
+        assert min(abs(x - 15) + abs(y - 4) for x, y in path) > 8
+
+        manager.update_blocks(grid, applied, {}, None)
+        assert manager.cached_path(start, goal)[1] == pytest.approx(26)
+        assert detour > 26
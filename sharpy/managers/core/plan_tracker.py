@@ -0,0 +1,139 @@
+import enum
+from typing import Any, Dict, Optional
+
+from sharpy.interfaces import IEnemyUnitsManager, ILostUnitsManager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sharpy.knowledges import Knowledge
+
+
+class RequireInput(enum.Flag):
+    """Inputs that a requirement check depends on."""
+
+    Minerals = enum.auto()
+    Vespene = enum.auto()
+    Supply = enum.auto()
+    OwnUnits = enum.auto()
+    EnemyUnits = enum.auto()
+    Upgrades = enum.auto()
+    Time = enum.auto()
+
+
+INPUT_FLAGS = list(RequireInput)
+# Inputs that can change in the middle of a frame when acts spend resources
+LIVE_INPUTS = RequireInput.Minerals | RequireInput.Vespene | RequireInput.Supply
+
+
+class PlanTracker:
+    """
+    Tracks versions of the inputs that plan requirements depend on, so that requirement checks can be cached
+    until one of their inputs changes, and counts how many plan nodes are evaluated in each frame.
+    """
+
+    def __init__(self):
+        self.knowledge: Optional["Knowledge"] = None
+        self.enemy_units_manager: Optional[IEnemyUnitsManager] = None
+        self.lost_units_manager: Optional[ILostUnitsManager] = None
+        self.game_loop = -1
+
+        self._signatures: Dict[RequireInput, Any] = {}
+        self._versions: Dict[RequireInput, int] = {flag: 0 for flag in INPUT_FLAGS}
+        # Versions of inputs that only change between frames, cleared every frame
+        self._frame_versions: Dict[RequireInput, int] = {}
+
+        # Counts for the current frame
+        self.nodes = 0
+        self.checks = 0
+        self.cached_checks = 0
+        self.finished_skipped = 0
+
+        # Counts for the whole game
+        self.frames = 0
+        self.total_nodes = 0
+        self.max_nodes = 0
+        self.total_checks = 0
+        self.total_cached_checks = 0
+        self.total_finished_skipped = 0
+
+    def start(self, knowledge: "Knowledge"):
+        self.knowledge = knowledge
+        self.enemy_units_manager = knowledge.get_manager(IEnemyUnitsManager)
+        self.lost_units_manager = knowledge.get_manager(ILostUnitsManager)
+
+    def next_frame(self):
+        """Stores the counts of the previous frame and resets counts and input versions for a new frame."""
+        if self.game_loop >= 0:
+            self.frames += 1
+            self.total_nodes += self.nodes
+            self.max_nodes = max(self.max_nodes, self.nodes)
+            self.total_checks += self.checks
+            self.total_cached_checks += self.cached_checks
+            self.total_finished_skipped += self.finished_skipped
+
+        self.game_loop = self.knowledge.ai.state.game_loop
+        self.nodes = 0
+        self.checks = 0
+        self.cached_checks = 0
+        self.finished_skipped = 0
+        self._frame_versions.clear()
+
+    def version(self, inputs: RequireInput) -> int:
+        """
+        Combined version of the inputs. Versions of single inputs only grow,
+        so the combined version changes whenever any of the inputs changes.
+        """
+        version = self._frame_versions.get(inputs)
+        if version is not None:
+            return version
+
+        version = 0
+        for flag in INPUT_FLAGS:
+            if flag & inputs:
+                version += self._version(flag)
+
+        if not inputs & LIVE_INPUTS:
+            self._frame_versions[inputs] = version
+        return version
+
+    def _version(self, flag: RequireInput) -> int:
+        signature = self._signature(flag)
+        if signature != self._signatures.get(flag):
+            self._signatures[flag] = signature
+            self._versions[flag] += 1
+        return self._versions[flag]
+
+    def _signature(self, flag: RequireInput) -> Any:
+        ai = self.knowledge.ai
+        if flag == RequireInput.Minerals:
+            return ai.minerals
+        if flag == RequireInput.Vespene:
+            return ai.vespene
+        if flag == RequireInput.Supply:
+            return ai.supply_used, ai.supply_cap, ai.supply_workers
+        if flag == RequireInput.OwnUnits:
+            return self.knowledge.unit_cache.counts.version
+        if flag == RequireInput.EnemyUnits:
+            cache = self.knowledge.unit_cache
+            enemy_units = {type_id: len(units) for type_id, units in cache.enemy_unit_cache.items()}
+            known = None
+            if self.enemy_units_manager:
+                known = {count.enemy_type: count.count for count in self.enemy_units_manager.enemy_composition}
+            lost = None
+            if self.lost_units_manager:
+                lost = {
+                    type_id: len(units)
+                    for type_id, units in self.lost_units_manager.get_own_enemy_lost_units()[1].items()
+                }
+            return enemy_units, known, lost
+        if flag == RequireInput.Upgrades:
+            return len(ai.state.upgrades)
+        return ai.state.game_loop
+
+    def summary(self) -> str:
+        frames = max(1, self.frames)
+        return (
+            f"Plan nodes per frame: avg {self.total_nodes / frames:.1f} max {self.max_nodes}, "
+            f"checks evaluated {self.total_checks / frames:.1f} cached {self.total_cached_checks / frames:.1f}, "
+            f"finished nodes skipped {self.total_finished_skipped / frames:.1f}"
+        )
@@ -0,0 +1,67 @@
+import pytest
+
+from unittest import mock
+
+from sharpy.plans import Step
+from sharpy.plans.require import Minerals, Time, Once
+from .plan_tracker import PlanTracker
+
+
+async def start_tracked(knowledge_mock, *components):
+    tracker = PlanTracker()
+    tracker.start(knowledge_mock)
+    knowledge_mock.plan_tracker = tracker
+    for component in components:
+        await component.start(knowledge_mock)
+    return tracker
+
+
+class TestPlanTracker:
+    @pytest.mark.asyncio
+    async def test_check_is_cached_until_input_changes(self):
+        knowledge_mock = mock.Mock()
+        knowledge_mock.ai.state.game_loop = 224
+        knowledge_mock.ai.time = 10
+        requirement = Time(20)
+        tracker = await start_tracked(knowledge_mock, requirement)
+        tracker.next_frame()
+
+        assert not requirement.is_met()
+        assert not requirement.is_met()
+        assert tracker.checks == 1
+        assert tracker.cached_checks == 1
+
+        knowledge_mock.ai.state.game_loop = 470
+        knowledge_mock.ai.time = 21
+        tracker.next_frame()
+        assert requirement.is_met()
+        assert tracker.checks == 1
+
+    @pytest.mark.asyncio
+    async def test_live_inputs_are_checked_every_time(self):
+        knowledge_mock = mock.Mock()
+        knowledge_mock.ai.state.game_loop = 0
+        knowledge_mock.ai.minerals = 50
+        requirement = Minerals(100)
+        tracker = await start_tracked(knowledge_mock, requirement)
+        tracker.next_frame()
+
+        assert not requirement.is_met()
+        knowledge_mock.ai.minerals = 150
+        assert requirement.is_met()
+        assert tracker.checks == 2
+
+    @pytest.mark.asyncio
+    async def test_step_is_finished_with_monotonic_requirement(self):
+        knowledge_mock = mock.Mock()
+        knowledge_mock.ai.state.game_loop = 0
+        knowledge_mock.ai.minerals = 150
+        step = Step(Once(Minerals(100)), None)
+        tracker = await start_tracked(knowledge_mock, step)
+        tracker.next_frame()
+
+        assert await step.execute()
+        assert step.finished
+
+        knowledge_mock.ai.minerals = 0
+        assert step.requirement.is_met()
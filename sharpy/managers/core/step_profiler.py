@@ -0,0 +1,131 @@
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from sc2.data import Result
+from .manager_base import ManagerBase
+
+# Number of latest samples kept for each timed key
+PROFILER_SAMPLES = 1024
+STEP_KEY = "step"
+PERCENTILES = (50, 95, 99)
+
+
+class SampleRing:
+    """
+    Fixed-size ring buffer of nanosecond samples.
+    Percentiles are calculated from the latest samples, count, total and max from all samples.
+    """
+
+    def __init__(self, size: int = PROFILER_SAMPLES):
+        self.samples = np.zeros(size, dtype=np.int64)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns: int):
+        self.samples[self.count % len(self.samples)] = ns
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    @property
+    def latest(self) -> np.ndarray:
+        """Samples currently in the buffer, not in the order they were added."""
+        return self.samples[: min(self.count, len(self.samples))]
+
+    def percentiles(self, percentiles=PERCENTILES) -> List[float]:
+        if self.count == 0:
+            return [0.0 for _ in percentiles]
+        return np.percentile(self.latest, percentiles).tolist()
+
+
+class StepProfiler(ManagerBase):
+    """
+    Times manager updates, plan acts and micro steps for every step.
+
+    Time of every key is summed over a single step and added as one sample when the step ends,
+    so the percentiles describe time spent per step, not per call.
+    Act times include the time of their child acts.
+    Summary of the most expensive keys is printed at the end of the game.
+    """
+
+    def __init__(self, samples: int = PROFILER_SAMPLES, report_count: int = 25):
+        super().__init__()
+        self.sample_count = samples
+        self.report_count = report_count
+        self.rings: Dict[str, SampleRing] = {}
+        self._step: Dict[str, int] = {}
+        self._update_keys: Dict[ManagerBase, str] = {}
+        self._post_update_keys: Dict[ManagerBase, str] = {}
+
+    async def start(self, knowledge: "Knowledge"):
+        await super().start(knowledge)
+        for manager in knowledge.managers:
+            name = type(manager).__name__
+            self._update_keys[manager] = f"{name}.update"
+            self._post_update_keys[manager] = f"{name}.post_update"
+
+    async def update(self):
+        pass
+
+    async def post_update(self):
+        pass
+
+    def add(self, key: str, ns: int):
+        """Adds time taken in nanoseconds to the key for the current step."""
+        self._step[key] = self._step.get(key, 0) + ns
+
+    def add_update(self, manager: ManagerBase, ns: int):
+        self.add(self._update_keys.get(manager) or f"{type(manager).__name__}.update", ns)
+
+    def add_post_update(self, manager: ManagerBase, ns: int):
+        self.add(self._post_update_keys.get(manager) or f"{type(manager).__name__}.post_update", ns)
+
+    def wrap(self, key: str, func: Callable[[], Awaitable]) -> Callable[[], Awaitable]:
+        """Wraps a coroutine function without arguments, such as act execute, so that its time is added to key."""
+
+        async def timed():
+            ns = time.perf_counter_ns()
+            try:
+                return await func()
+            finally:
+                self.add(key, time.perf_counter_ns() - ns)
+
+        return timed
+
+    def step_took(self, ns_step: int):
+        """Ends the current step and adds the step samples to the ring buffers."""
+        self._ring(STEP_KEY).add(ns_step)
+        for key, ns in self._step.items():
+            self._ring(key).add(ns)
+        self._step.clear()
+
+    def _ring(self, key: str) -> SampleRing:
+        ring = self.rings.get(key)
+        if ring is None:
+            ring = SampleRing(self.sample_count)
+            self.rings[key] = ring
+        return ring
+
+    def summary(self) -> List[Tuple[str, int, float, List[float], float]]:
+        """
+        Key, sample count, mean, percentiles and max in milliseconds for every key,
+        sorted by total time with the whole step first.
+        """
+        result = []
+        for key, ring in sorted(self.rings.items(), key=lambda item: (item[0] != STEP_KEY, -item[1].total)):
+            if ring.count == 0:
+                continue
+            percentiles = [ns / 1e6 for ns in ring.percentiles()]
+            result.append((key, ring.count, ring.total / ring.count / 1e6, percentiles, ring.max / 1e6))
+        return result
+
+    async def on_end(self, game_result: Result):
+        percentile_names = " ".join(f"p{percentile}" for percentile in PERCENTILES)
+        self.print(f"Step profile (ms): count mean {percentile_names} max", stats=False)
+        for key, count, mean, percentiles, max_ms in self.summary()[: self.report_count + 1]:
+            values = " ".join(f"{value:.2f}" for value in percentiles)
+            self.print(f"{key}: {count} {mean:.2f} {values} {max_ms:.2f}", stats=False)
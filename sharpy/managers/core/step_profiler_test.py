@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from .step_profiler import SampleRing, StepProfiler, STEP_KEY
+
+
+class TestSampleRing:
+    def test_ring_keeps_latest_samples(self):
+        ring = SampleRing(4)
+        for ns in [100, 1, 2, 3, 4, 5]:
+            ring.add(ns)
+
+        assert sorted(ring.latest.tolist()) == [2, 3, 4, 5]
+        assert ring.count == 6
+        assert ring.total == 115
+        assert ring.max == 100
+        assert ring.percentiles((0, 100)) == [2, 5]
+
+    def test_empty_ring(self):
+        assert SampleRing(4).percentiles((50, 95)) == [0, 0]
+
+
+class TestStepProfiler:
+    def test_samples_are_summed_per_step(self):
+        profiler = StepProfiler(samples=8)
+        profiler.add("Micro/MicroStalkers", 1000)
+        profiler.add("Micro/MicroStalkers", 2000)
+        profiler.step_took(5000)
+        profiler.add("Micro/MicroStalkers", 4000)
+        profiler.step_took(6000)
+
+        ring = profiler.rings["Micro/MicroStalkers"]
+        assert ring.latest.tolist() == [3000, 4000]
+        assert profiler.rings[STEP_KEY].count == 2
+
+        summary = profiler.summary()
+        assert [key for key, *_ in summary] == [STEP_KEY, "Micro/MicroStalkers"]
+        key, count, mean, percentiles, max_ms = summary[1]
+        assert count == 2
+        assert mean == pytest.approx(0.0035)
+        assert max_ms == pytest.approx(0.004)
+
+    def test_wrap(self):
+        profiler = StepProfiler()
+
+        async def execute() -> bool:
+            return True
+
+        timed = profiler.wrap("BuildOrder", execute)
+        assert asyncio.run(timed())
+        assert profiler._step["BuildOrder"] > 0
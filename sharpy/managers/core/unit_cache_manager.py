@@ -5,21 +5,94 @@ from sc2.data import race_townhalls
 from sc2.ids.effect_id import EffectId
 from scipy.spatial.ckdtree import cKDTree
 
-from sharpy.interfaces import IUnitCache
+from sharpy.interfaces import IUnitCache, ILostUnitsManager
 from sc2.constants import FakeEffectID
 from sc2.game_state import EffectData
 from sc2.position import Point2
 from sc2.units import Units
 
 from sharpy.managers.core.manager_base import ManagerBase
+from sharpy.managers.core.unit_count_index import UnitCountIndex
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.unit import Unit
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from sc2.bot_ai import BotAI
     from sharpy.knowledges import Knowledge
 
 filter_units = {UnitTypeId.ADEPTPHASESHIFT, UnitTypeId.DISRUPTORPHASED, UnitTypeId.LARVA, UnitTypeId.EGG}
+filter_unit_values = np.array([type_id.value for type_id in filter_units], dtype=np.int32)
+
+
+def default_range_filter(unit: Unit) -> bool:
+    return unit.type_id not in filter_units
+
+
+class UnitArrays:
+    """
+    Columnar snapshot of units for a single frame.
+    Array indices match the indices of the source `Units`, which allows range queries and filters to run in NumPy
+    and `Units` to be created only when they are actually needed.
+    """
+
+    def __init__(self, units: Units, range_filter: Optional[Callable[[Unit], bool]] = None):
+        count = len(units)
+        self.units = units
+        self.count = count
+
+        if count > 0:
+            self.positions = np.array([unit.position for unit in units], dtype=np.float32)
+        else:
+            self.positions = np.empty((0, 2), dtype=np.float32)
+
+        self.radius = np.fromiter((unit.radius for unit in units), dtype=np.float32, count=count)
+        self.type_ids = np.fromiter((unit.type_id.value for unit in units), dtype=np.int32, count=count)
+        self.tags = np.fromiter((unit.tag for unit in units), dtype=np.uint64, count=count)
+        # Health and shields added together
+        self.health_shield = np.fromiter((unit.health + unit.shield for unit in units), dtype=np.float32, count=count)
+        self.max_health_shield = np.fromiter(
+            (unit.health_max + unit.shield_max for unit in units), dtype=np.float32, count=count
+        )
+        self.is_flying = np.fromiter((unit.is_flying for unit in units), dtype=bool, count=count)
+        self.is_cloaked = np.fromiter((unit.is_cloaked for unit in units), dtype=bool, count=count)
+        self.is_snapshot = np.fromiter((unit.is_snapshot for unit in units), dtype=bool, count=count)
+        self.targetable = np.fromiter((unit.can_be_attacked for unit in units), dtype=bool, count=count)
+        self.targetable |= self.is_snapshot
+
+        if range_filter is None:
+            self.range_mask = np.ones(count, dtype=bool)
+        elif range_filter is default_range_filter:
+            self.range_mask = ~np.isin(self.type_ids, filter_unit_values)
+        else:
+            self.range_mask = np.fromiter((range_filter(unit) for unit in units), dtype=bool, count=count)
+
+        self.targetable_range_mask = self.range_mask & self.targetable
+        self.tree: Optional[cKDTree] = cKDTree(self.positions) if count > 0 else None
+
+    def indices_in_range(
+        self, position: Point2, range: Union[int, float], mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Returns indices of units within range of the position, optionally filtered with a boolean mask."""
+        if self.tree is None:
+            return np.empty(0, dtype=np.intp)
+
+        indices = np.asarray(self.tree.query_ball_point((position[0], position[1]), range), dtype=np.intp)
+        if mask is not None:
+            return indices[mask[indices]]
+        return indices
+
+    def mask_in_range(
+        self, position: Point2, range: Union[int, float], mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Returns a boolean mask over all units that is true for units within range of the position."""
+        result = np.zeros(self.count, dtype=bool)
+        result[self.indices_in_range(position, range, mask)] = True
+        return result
+
+    def to_units(self, indices: Iterable[int], ai: "BotAI") -> Units:
+        source = self.units
+        return Units([source[index] for index in indices], ai)
 
 
 class UnitCacheManager(ManagerBase, IUnitCache):
@@ -41,13 +114,15 @@ class UnitCacheManager(ManagerBase, IUnitCache):
 
         self._effects_cache: Dict[Union[str, EffectId], List[Tuple[Point2, EffectData]]] = {}
 
-        self.own_numpy_vectors: List[np.ndarray] = []
-        self.enemy_numpy_vectors: List[np.ndarray] = []
+        self._own_arrays: Optional[UnitArrays] = None
+        self._enemy_arrays: Optional[UnitArrays] = None
         self._mineral_fields: Dict[Point2, Unit] = {}
+        self._counts = UnitCountIndex()
+        self.lost_units_manager: Optional[ILostUnitsManager] = None
 
         # Set this to false to provide cloaked units to zones and unit micro making use of enemy_in_range method.
         self.only_targetable_enemies_default: bool = True
-        self.range_filter: Optional[Callable[[], bool]] = lambda unit: unit.type_id not in filter_units
+        self.range_filter: Optional[Callable[[Unit], bool]] = default_range_filter
 
     @property
     def own_unit_cache(self) -> Dict[UnitTypeId, Units]:
@@ -57,6 +132,29 @@ class UnitCacheManager(ManagerBase, IUnitCache):
     def enemy_unit_cache(self) -> Dict[UnitTypeId, Units]:
         return self._enemy_unit_cache
 
+    @property
+    def own_arrays(self) -> UnitArrays:
+        """Columnar snapshot of `ai.all_own_units` for the current frame."""
+        return self._own_arrays
+
+    @property
+    def enemy_arrays(self) -> UnitArrays:
+        """Columnar snapshot of `ai.all_enemy_units` for the current frame."""
+        return self._enemy_arrays
+
+    @property
+    def counts(self) -> UnitCountIndex:
+        """Counts of own units by type, orders and lost units for the current frame."""
+        return self._counts
+
+    @property
+    def own_numpy_vectors(self) -> np.ndarray:
+        return self._own_arrays.positions
+
+    @property
+    def enemy_numpy_vectors(self) -> np.ndarray:
+        return self._enemy_arrays.positions
+
     @property
     def enemy_workers(self) -> Units:
         return self._enemy_workers
@@ -72,9 +170,13 @@ class UnitCacheManager(ManagerBase, IUnitCache):
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
         self.all_own: Units = Units([], self.ai)
+        self._own_arrays = UnitArrays(self.all_own)
+        self._enemy_arrays = UnitArrays(Units([], self.ai))
         self.empty_units: Units = Units([], self.ai)
         self._mineral_wall: Units = Units([], self.ai)
         self._enemy_workers: Units = Units([], self.ai)
+        self._counts.unit_values = self.unit_values
+        self.lost_units_manager = knowledge.get_manager(ILostUnitsManager)
 
     def by_tag(self, tag: int) -> Optional[Unit]:
         return self.tag_cache.get(tag, None)
@@ -124,37 +226,36 @@ class UnitCacheManager(ManagerBase, IUnitCache):
         enemy_townhall_types = race_townhalls[self.knowledge.enemy_race]
         return self.enemy(enemy_townhall_types)
 
-    def own_in_range(self, position: Point2, range: Union[int, float]) -> Units:
-        units = Units([], self.ai)
-        if self.own_tree is None:
-            return units
-
-        for index in self.own_tree.query_ball_point(np.array([position.x, position.y]), range):
-            units.append(self.all_own[index])
+    def own_in_range_indices(self, position: Point2, range: Union[int, float]) -> np.ndarray:
+        """Returns indices to `own_arrays` of own units within range."""
+        return self._own_arrays.indices_in_range(position, range)
 
-        return units
-
-    def enemy_in_range(
+    def enemy_in_range_indices(
         self, position: Point2, range: Union[int, float], only_targetable: Optional[bool] = None
-    ) -> Units:
+    ) -> np.ndarray:
+        """Returns indices to `enemy_arrays` of enemy units within range that pass the range filter."""
         if only_targetable is None:
             only_targetable = self.only_targetable_enemies_default
 
-        units = Units([], self.ai)
-        if self.enemy_tree is None:
-            return units
+        if only_targetable:
+            return self._enemy_arrays.indices_in_range(position, range, self._enemy_arrays.targetable_range_mask)
+        return self._enemy_arrays.indices_in_range(position, range, self._enemy_arrays.range_mask)
 
-        for index in self.enemy_tree.query_ball_point(np.array([position.x, position.y]), range):
-            units.append(self.ai.all_enemy_units[index])
+    def enemy_in_range_mask(
+        self, position: Point2, range: Union[int, float], only_targetable: Optional[bool] = None
+    ) -> np.ndarray:
+        """Returns a boolean mask over `enemy_arrays` for enemy units within range that pass the range filter."""
+        result = np.zeros(self._enemy_arrays.count, dtype=bool)
+        result[self.enemy_in_range_indices(position, range, only_targetable)] = True
+        return result
 
-        if only_targetable:
-            if self.range_filter is not None:
-                return units.filter(lambda x: self.range_filter(x) and (x.can_be_attacked or x.is_snapshot))
-            return units.filter(lambda x: x.can_be_attacked or x.is_snapshot)
+    def own_in_range(self, position: Point2, range: Union[int, float]) -> Units:
+        return self._own_arrays.to_units(self.own_in_range_indices(position, range), self.ai)
 
-        if self.range_filter is not None:
-            return units.filter(self.range_filter)
-        return units
+    def enemy_in_range(
+        self, position: Point2, range: Union[int, float], only_targetable: Optional[bool] = None
+    ) -> Units:
+        return self._enemy_arrays.to_units(self.enemy_in_range_indices(position, range, only_targetable), self.ai)
 
     async def update(self):
         self.update_minerals()
@@ -165,8 +266,6 @@ class UnitCacheManager(ManagerBase, IUnitCache):
         self.force_fields.clear()
         self._effects_cache.clear()
 
-        self.own_numpy_vectors = []
-        self.enemy_numpy_vectors = []
         self.all_own = self.ai.all_own_units
 
         for unit in self.all_own:
@@ -174,7 +273,6 @@ class UnitCacheManager(ManagerBase, IUnitCache):
             if units.amount == 0:
                 self._own_unit_cache[unit.type_id] = units
             units.append(unit)
-            self.own_numpy_vectors.append(np.array([unit.position.x, unit.position.y]))
 
         for unit in self.ai.all_enemy_units:
             if unit.is_memory:
@@ -184,21 +282,19 @@ class UnitCacheManager(ManagerBase, IUnitCache):
             if units.amount == 0:
                 self._enemy_unit_cache[unit.type_id] = units
             units.append(unit)
-            self.enemy_numpy_vectors.append(np.array([unit.position.x, unit.position.y]))
 
         for unit in self.ai.all_units:
             # Add all non-memory units to unit tag cache
             self.tag_cache[unit.tag] = unit
 
-        if len(self.own_numpy_vectors) > 0:
-            self.own_tree = cKDTree(self.own_numpy_vectors)
-        else:
-            self.own_tree = None
+        lost_units = self.lost_units_manager.get_own_enemy_lost_units()[0] if self.lost_units_manager else None
+        self._counts.update(self.ai.units, self.ai.structures, self.knowledge.my_worker_type, lost_units)
 
-        if len(self.enemy_numpy_vectors) > 0:
-            self.enemy_tree = cKDTree(self.enemy_numpy_vectors)
-        else:
-            self.enemy_tree = None
+        # Range filter is evaluated once per unit here instead of once per unit per range query
+        self._own_arrays = UnitArrays(self.all_own)
+        self._enemy_arrays = UnitArrays(self.ai.all_enemy_units, self.range_filter)
+        self.own_tree = self._own_arrays.tree
+        self.enemy_tree = self._enemy_arrays.tree
 
         for effect in self.ai.state.effects:
             effects = self._effects_cache.get(effect.id, [])
@@ -0,0 +1,73 @@
+from unittest import mock
+
+import numpy as np
+
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from .unit_cache_manager import UnitArrays, UnitCacheManager, default_range_filter
+
+
+def mock_unit(
+    tag: int,
+    type_id: UnitTypeId,
+    x: float,
+    y: float,
+    health: float = 40,
+    shield: float = 0,
+    can_be_attacked: bool = True,
+    is_snapshot: bool = False,
+) -> mock.Mock:
+    unit = mock.Mock(spec=Unit, tag=tag, type_id=type_id, position=Point2((x, y)), radius=0.5, is_flying=False)
+    unit.configure_mock(health=health, health_max=health, shield=shield, shield_max=shield)
+    unit.configure_mock(is_cloaked=not can_be_attacked, is_snapshot=is_snapshot, can_be_attacked=can_be_attacked)
+    return unit
+
+
+def create_units():
+    return [
+        mock_unit(1, UnitTypeId.ZEALOT, 10, 10, health=100, shield=50),
+        mock_unit(2, UnitTypeId.LARVA, 11, 10),
+        mock_unit(3, UnitTypeId.DARKTEMPLAR, 10, 12, can_be_attacked=False),
+        mock_unit(4, UnitTypeId.STALKER, 30, 30),
+        mock_unit(5, UnitTypeId.OBSERVER, 10, 11, can_be_attacked=False, is_snapshot=True),
+    ]
+
+
+class TestUnitArrays:
+    def test_columns(self):
+        arrays = UnitArrays(create_units(), default_range_filter)
+        assert arrays.count == 5
+        assert arrays.health_shield[0] == 150
+        assert arrays.max_health_shield[0] == 150
+        assert arrays.range_mask.tolist() == [True, False, True, True, True]
+        # Snapshots are targetable
+        assert arrays.targetable_range_mask.tolist() == [True, False, False, True, True]
+
+    def test_range_queries(self):
+        arrays = UnitArrays(create_units(), default_range_filter)
+        assert sorted(arrays.indices_in_range(Point2((10, 10)), 2.5).tolist()) == [0, 1, 2, 4]
+        assert sorted(arrays.indices_in_range(Point2((10, 10)), 2.5, arrays.targetable_range_mask).tolist()) == [0, 4]
+        assert arrays.mask_in_range(Point2((30, 30)), 1).tolist() == [False, False, False, True, False]
+
+    def test_empty(self):
+        arrays = UnitArrays([])
+        assert arrays.positions.shape == (0, 2)
+        assert len(arrays.indices_in_range(Point2((0, 0)), 10)) == 0
+
+
+class TestUnitCacheManagerRange:
+    def create_cache(self) -> UnitCacheManager:
+        cache = UnitCacheManager()
+        cache._enemy_arrays = UnitArrays(create_units(), default_range_filter)
+        return cache
+
+    def test_enemy_in_range_uses_targetable_default(self):
+        cache = self.create_cache()
+        assert sorted(cache.enemy_in_range_indices(Point2((10, 10)), 2.5).tolist()) == [0, 4]
+        assert sorted(cache.enemy_in_range_indices(Point2((10, 10)), 2.5, False).tolist()) == [0, 2, 4]
+
+        cache.only_targetable_enemies_default = False
+        mask = cache.enemy_in_range_mask(Point2((10, 10)), 2.5)
+        assert np.flatnonzero(mask).tolist() == [0, 2, 4]
@@ -0,0 +1,138 @@
+from typing import Dict, Iterable, List, Optional, Union
+
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from sharpy.interfaces import IUnitValues
+
+
+class UnitCountIndex:
+    """
+    Counts of own units for a single frame, built once by the unit cache so that plan acts and requirements
+    can count units in constant time instead of going through all own units on every check.
+
+    Orders are counted with the generic ability id of the order per type of the unit that has the order,
+    which means that units in eggs and cocoons are counted under the egg or cocoon type.
+    """
+
+    def __init__(self, unit_values: Optional[IUnitValues] = None):
+        self.unit_values = unit_values
+        self.ready_counts: Dict[UnitTypeId, int] = {}
+        self.not_ready_counts: Dict[UnitTypeId, int] = {}
+        # Non-structure units by real type, both ready and not ready
+        self.real_type_counts: Dict[UnitTypeId, int] = {}
+        self.order_counts: Dict[UnitTypeId, Dict[AbilityId, int]] = {}
+        self.build_progress: Dict[UnitTypeId, float] = {}
+        self.worker_order_targets: Dict[AbilityId, List[Union[Point2, int]]] = {}
+        # Lost units by real type
+        self.lost_counts: Dict[UnitTypeId, int] = {}
+        # Increased whenever any of the counts is different from the previous frame
+        self.version = 0
+
+    def update(
+        self,
+        units: Iterable[Unit],
+        structures: Iterable[Unit],
+        worker_type: Optional[UnitTypeId] = None,
+        lost_units: Optional[Dict[UnitTypeId, list]] = None,
+    ):
+        previous = self._snapshot()
+        self.ready_counts = {}
+        self.not_ready_counts = {}
+        self.real_type_counts = {}
+        self.order_counts = {}
+        self.build_progress = {}
+        self.worker_order_targets = {}
+        self.lost_counts = {}
+
+        for unit in units:
+            type_id = unit.type_id
+            self._add(unit, type_id)
+            real_type = self.unit_values.real_type(type_id) if self.unit_values else type_id
+            self.real_type_counts[real_type] = self.real_type_counts.get(real_type, 0) + 1
+
+            if type_id == worker_type:
+                for order in unit.orders:
+                    if order.ability is None:
+                        continue
+                    self.worker_order_targets.setdefault(order.ability.id, []).append(order.target)
+
+        for unit in structures:
+            self._add(unit, unit.type_id)
+
+        if lost_units:
+            for type_id, lost in lost_units.items():
+                self.lost_counts[type_id] = len(lost)
+
+        if self._snapshot() != previous:
+            self.version += 1
+
+    def _snapshot(self) -> tuple:
+        return (
+            self.ready_counts,
+            self.not_ready_counts,
+            self.real_type_counts,
+            self.order_counts,
+            self.build_progress,
+            self.worker_order_targets,
+            self.lost_counts,
+        )
+
+    def _add(self, unit: Unit, type_id: UnitTypeId):
+        if unit.is_ready:
+            self.ready_counts[type_id] = self.ready_counts.get(type_id, 0) + 1
+        else:
+            self.not_ready_counts[type_id] = self.not_ready_counts.get(type_id, 0) + 1
+            self.build_progress[type_id] = max(self.build_progress.get(type_id, 0), unit.build_progress)
+
+        orders = unit.orders
+        if orders:
+            type_orders = self.order_counts.get(type_id)
+            if type_orders is None:
+                type_orders = self.order_counts[type_id] = {}
+            for order in orders:
+                if order.ability is None:
+                    continue
+                ability_id = order.ability.id
+                type_orders[ability_id] = type_orders.get(ability_id, 0) + 1
+
+    def ready(self, unit_type: UnitTypeId) -> int:
+        return self.ready_counts.get(unit_type, 0)
+
+    def not_ready(self, unit_type: UnitTypeId) -> int:
+        return self.not_ready_counts.get(unit_type, 0)
+
+    def amount(self, unit_type: Union[UnitTypeId, Iterable[UnitTypeId]]) -> int:
+        """Count of both ready and not ready units of the specified type(s)."""
+        if isinstance(unit_type, UnitTypeId):
+            return self.ready_counts.get(unit_type, 0) + self.not_ready_counts.get(unit_type, 0)
+        return sum(self.amount(single_type) for single_type in unit_type)
+
+    def real_amount(self, real_type: UnitTypeId) -> int:
+        """Count of non-structure units that have the specified real type."""
+        return self.real_type_counts.get(real_type, 0)
+
+    def ordered(self, ability_id: AbilityId, unit_type: Union[UnitTypeId, Iterable[UnitTypeId]]) -> int:
+        """Count of orders with the ability in units of the specified type(s)."""
+        if isinstance(unit_type, UnitTypeId):
+            return self.order_counts.get(unit_type, {}).get(ability_id, 0)
+        return sum(self.ordered(ability_id, single_type) for single_type in unit_type)
+
+    def in_eggs(self, ability_id: AbilityId) -> int:
+        """Count of units that are hatching from eggs with the creation ability."""
+        return self.ordered(ability_id, UnitTypeId.EGG)
+
+    def max_build_progress(self, unit_type: UnitTypeId) -> float:
+        """Highest build progress of not ready units of the type, 0 when there are none."""
+        return self.build_progress.get(unit_type, 0)
+
+    def worker_targets(self, ability_id: AbilityId) -> List[Union[Point2, int]]:
+        """Targets of worker orders with the ability."""
+        return self.worker_order_targets.get(ability_id, [])
+
+    def lost(self, unit_type: UnitTypeId, real_type: bool = True) -> int:
+        if real_type and self.unit_values:
+            unit_type = self.unit_values.real_type(unit_type)
+        return self.lost_counts.get(unit_type, 0)
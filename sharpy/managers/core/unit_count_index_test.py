@@ -0,0 +1,77 @@
+from typing import List, Optional
+from unittest import mock
+
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from .unit_count_index import UnitCountIndex
+from .unit_value import UnitValue
+
+
+def mock_order(ability_id: AbilityId, target=None) -> mock.Mock:
+    order = mock.Mock(target=target)
+    order.ability.id = ability_id
+    return order
+
+
+def mock_unit(type_id: UnitTypeId, build_progress: float = 1, orders: Optional[List[mock.Mock]] = None) -> mock.Mock:
+    return mock.Mock(
+        spec=Unit, type_id=type_id, build_progress=build_progress, is_ready=build_progress == 1, orders=orders or []
+    )
+
+
+def create_index() -> UnitCountIndex:
+    units = [
+        mock_unit(UnitTypeId.SIEGETANK),
+        mock_unit(UnitTypeId.SIEGETANKSIEGED),
+        mock_unit(UnitTypeId.SCV, orders=[mock_order(AbilityId.TERRANBUILD_SUPPLYDEPOT, Point2((10, 12)))]),
+        mock_unit(UnitTypeId.EGG, orders=[mock_order(AbilityId.LARVATRAIN_ZERGLING)]),
+    ]
+    structures = [
+        mock_unit(UnitTypeId.FACTORY, orders=[mock_order(AbilityId.FACTORYTRAIN_SIEGETANK)]),
+        mock_unit(UnitTypeId.FACTORY, 0.25),
+        mock_unit(UnitTypeId.FACTORY, 0.5),
+    ]
+    index = UnitCountIndex(UnitValue())
+    index.update(units, structures, UnitTypeId.SCV, {UnitTypeId.SIEGETANK: [object(), object()]})
+    return index
+
+
+class TestUnitCountIndex:
+    def test_counts_by_type(self):
+        index = create_index()
+        assert index.ready(UnitTypeId.FACTORY) == 1
+        assert index.not_ready(UnitTypeId.FACTORY) == 2
+        assert index.amount([UnitTypeId.FACTORY, UnitTypeId.SCV]) == 4
+        assert index.max_build_progress(UnitTypeId.FACTORY) == 0.5
+        # Structures are not counted by real type
+        assert index.real_amount(UnitTypeId.SIEGETANK) == 2
+        assert index.real_amount(UnitTypeId.FACTORY) == 0
+
+    def test_orders(self):
+        index = create_index()
+        assert index.ordered(AbilityId.FACTORYTRAIN_SIEGETANK, UnitTypeId.FACTORY) == 1
+        assert index.ordered(AbilityId.FACTORYTRAIN_SIEGETANK, UnitTypeId.STARPORT) == 0
+        assert index.in_eggs(AbilityId.LARVATRAIN_ZERGLING) == 1
+        assert index.worker_targets(AbilityId.TERRANBUILD_SUPPLYDEPOT) == [Point2((10, 12))]
+
+    def test_lost_and_reset(self):
+        index = create_index()
+        assert index.lost(UnitTypeId.SIEGETANKSIEGED) == 2
+        assert index.lost(UnitTypeId.SIEGETANKSIEGED, real_type=False) == 0
+
+        index.update([], [])
+        assert index.amount(UnitTypeId.FACTORY) == 0
+        assert index.lost(UnitTypeId.SIEGETANK) == 0
+
+    def test_version_changes_with_counts(self):
+        index = create_index()
+        version = index.version
+        index.update([mock_unit(UnitTypeId.SIEGETANK)], [])
+        assert index.version == version + 1
+        index.update([mock_unit(UnitTypeId.SIEGETANK)], [])
+        assert index.version == version + 1
+        index.update([mock_unit(UnitTypeId.SIEGETANK, 0.5)], [])
+        assert index.version == version + 2
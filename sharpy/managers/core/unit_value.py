@@ -1,5 +1,5 @@
 import logging
-from typing import Union, Optional, List, Callable
+from typing import Union, Optional, List, Callable, Dict, Tuple
 
 from sc2.data import Race, race_townhalls
 from sharpy.general.unit_feature import UnitFeature
@@ -7,7 +7,7 @@ from sc2.constants import *
 from sc2.unit import Unit
 from sc2.units import Units
 from .manager_base import ManagerBase
-from sharpy.general.extended_power import ExtendedPower
+from sharpy.general.extended_power import ExtendedPower, PowerTable, PowerValues
 from sharpy.interfaces import IUnitValues
 from sharpy.managers.core.version_manager import GameVersion
 
@@ -91,6 +91,9 @@ REVERSE_MORPHS_DICT = {
 
 
 class UnitData:
+    # Incremented whenever any UnitData or UnitDataDict changes, tables created from unit data compare it
+    version = 0
+
     def __init__(
         self,
         minerals: int,
@@ -111,6 +114,43 @@ class UnitData:
         else:
             self.features: List[UnitFeature] = features
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Features are expected to be replaced with a new list, changes inside the list are not seen
+        UnitData.version += 1
+
+
+class UnitDataDict(dict):
+    """Unit data by type id that increments UnitData.version when unit types are added, replaced or removed."""
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        UnitData.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        UnitData.version += 1
+
+    def pop(self, *args):
+        UnitData.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        UnitData.version += 1
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        UnitData.version += 1
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        UnitData.version += 1
+
+    def clear(self):
+        super().clear()
+        UnitData.version += 1
+
 
 class UnitValue(ManagerBase, IUnitValues):
     _my_worker_type: UnitTypeId
@@ -466,6 +506,10 @@ class UnitValue(ManagerBase, IUnitValues):
         }
 
         self.gas_miners = {UnitTypeId.ASSIMILATOR, UnitTypeId.EXTRACTOR, UnitTypeId.REFINERY}
+        self._power_table: Optional[PowerTable] = None
+        self._power_table_version = 0
+        # Ground and air range by type for types without custom range, cleared every frame
+        self._type_ranges: Dict[UnitTypeId, Tuple[float, float]] = {}
 
         self.detectors: List[UnitTypeId] = []
         for unit_data_key in self.unit_data:
@@ -473,6 +517,30 @@ class UnitValue(ManagerBase, IUnitValues):
             if UnitFeature.Detector in unit_data.features:
                 self.detectors.append(unit_data_key)
 
+    @property
+    def power_table(self) -> PowerTable:
+        """
+        Power of all unit types as arrays, created from unit_data on first use.
+        UnitData.version is checked once per frame in update and the table is created again when unit data changed.
+        Call reset_power_table after changing unit_data to use the changes immediately.
+        """
+        if self._power_table is None:
+            self._power_table = PowerTable(self.unit_data)
+            self._power_table_version = UnitData.version
+        return self._power_table
+
+    def reset_power_table(self):
+        self._power_table = None
+
+    @property
+    def unit_data(self) -> Dict[UnitTypeId, UnitData]:
+        return self._unit_data
+
+    @unit_data.setter
+    def unit_data(self, unit_data: Dict[UnitTypeId, UnitData]):
+        self._unit_data = UnitDataDict(unit_data)
+        UnitData.version += 1
+
     @property
     def enemy_worker_type(self) -> Optional[UnitTypeId]:
         if self._enemy_worker_type is None:
@@ -545,7 +613,9 @@ class UnitValue(ManagerBase, IUnitValues):
         self._my_worker_type = self.get_worker_type(knowledge.ai.race)
 
     async def update(self):
-        pass
+        self._type_ranges.clear()
+        if self._power_table is not None and UnitData.version != self._power_table_version:
+            self.reset_power_table()
 
     async def post_update(self):
         pass
@@ -630,6 +700,10 @@ class UnitValue(ManagerBase, IUnitValues):
 
         return self.power_by_type(unit.type_id, health_percentage)
 
+    def power_values(self, unit: Unit) -> PowerValues:
+        """Returns all power values of the unit, taking into account it's known health and shields."""
+        return self.power_table.unit_values(unit)
+
     def power_by_type(self, type_id: UnitTypeId, health_percentage: float = 1) -> float:
         unit_value = self.unit_data.get(type_id, None)
         if unit_value is not None:
@@ -648,6 +722,21 @@ class UnitValue(ManagerBase, IUnitValues):
             return func(unit)
         return unit.air_range
 
+    def ranges(self, unit: Unit) -> Tuple[float, float]:
+        """
+        Returns ground and air range of the unit, same as ground_range and air_range.
+        Ranges of types without custom range functions only depend on the type and are calculated once per frame.
+        """
+        type_id = unit.type_id
+        if type_id in self._ground_range_dict or type_id in self._air_range_dict:
+            return self.ground_range(unit), self.air_range(unit)
+
+        ranges = self._type_ranges.get(type_id)
+        if ranges is None:
+            ranges = (unit.ground_range, unit.air_range)
+            self._type_ranges[type_id] = ranges
+        return ranges
+
     def can_shoot_air(self, unit: Unit) -> bool:
         return self.air_range(unit) > 0
 
@@ -1,6 +1,8 @@
+import asyncio
+
 from sc2.ids.unit_typeid import UnitTypeId
 
-from .unit_value import UnitValue
+from .unit_value import UnitData, UnitValue
 
 
 class TestUnitValue:
@@ -27,3 +29,23 @@ class TestUnitValue:
         assert not unit_value.is_townhall(UnitTypeId.BARRACKS)
         assert not unit_value.is_townhall(UnitTypeId.GATEWAY)
         assert not unit_value.is_townhall(UnitTypeId.SPAWNINGPOOL)
+
+    def test_power_table_follows_unit_data_changes(self):
+        unit_value = UnitValue()
+        stalker = UnitTypeId.STALKER.value
+        assert unit_value.power_table.combat_values[stalker] == unit_value.unit_data[UnitTypeId.STALKER].combat_value
+
+        unit_value.unit_data[UnitTypeId.STALKER].combat_value = 10
+        unit_value.unit_data[UnitTypeId.BROODLING] = UnitData(0, 0, 0, 0.5)
+        asyncio.run(unit_value.update())
+        assert unit_value.power_table.combat_values[stalker] == 10
+        assert unit_value.power_table.combat_values[UnitTypeId.BROODLING.value] == 0.5
+
+        table = unit_value.power_table
+        asyncio.run(unit_value.update())
+        assert unit_value.power_table is table
+
+        unit_value.unit_data.pop(UnitTypeId.BROODLING)
+        asyncio.run(unit_value.update())
+        assert unit_value.power_table is not table
+        assert unit_value.power_table.combat_values[UnitTypeId.BROODLING.value] == 1
@@ -1,21 +1,28 @@
 import enum
 import logging
 import sys
+import time
 from typing import Dict, List, Optional
 
-import sc2pathlib
 from sc2.unit import Unit
 from sharpy import sc2math
+from sharpy.general.flow_field import FlowField
 from sharpy.general.path import Path
+from sharpy.general.map_artifact_store import MapArtifactStore
+from sharpy.general.zone_groups import ZoneGroups, sample_zones
+from sharpy.general.zone_path_table import ZonePathTable
 from sharpy.interfaces import IZoneManager
 from sc2.game_info import Ramp
 from sc2.units import Units
+from sharpy.managers.core.map_cache_manager import MapCacheManager
 from sharpy.managers.core.pathing_manager import PathingManager
+from sharpy.managers.core.unit_cache_manager import UnitArrays
 
 from sharpy.managers.core.manager_base import ManagerBase
 from sharpy.general.zone import Zone
 from sc2.position import Point2, Point3
 import numpy as np
+from scipy.spatial.distance import cdist
 
 
 class MapName(enum.Enum):
@@ -145,6 +152,16 @@ class ZoneManager(ManagerBase, IZoneManager):
         self.found_enemy_start: Optional[Point2] = None
         self._enemy_zones: List[Zone] = []
         self._our_zones: List[Zone] = []
+        # Store for caching paths between zones, None to always calculate them
+        self.map_store: Optional[MapArtifactStore] = None
+        self._path_table: Optional[ZonePathTable] = None
+        # Terrain version of the pathing grid the path table was built for
+        self._path_table_version: Optional[int] = None
+        # Zone of every map cell and the zones in the order they are numbered in it
+        self._zone_grid: Optional[np.ndarray] = None
+        self._grid_zones: List[Zone] = []
+        # Distances to positions that are not zones, by position, cleared when zones are sorted
+        self._distance_fields: Dict[Point2, FlowField] = {}
 
     @property
     def expansion_zones(self) -> List[Zone]:
@@ -174,6 +191,9 @@ class ZoneManager(ManagerBase, IZoneManager):
         height_hash: int = np.sum(knowledge.ai.game_info.terrain_height.data_numpy)
         self.map = recognize_map(self.ai.game_info.map_name, height_hash)
         self.print(f"Map set to: {self.map} from name: {self.ai.game_info.map_name} and hash: {height_hash}.")
+        map_cache = knowledge.get_manager(MapCacheManager)
+        if map_cache:
+            self.map_store = map_cache.store
         self.init_zones()
         self.set_pathing_zones()
 
@@ -185,6 +205,11 @@ class ZoneManager(ManagerBase, IZoneManager):
             for zone in self.zone_manager.expansion_zones:
                 expansion_locations_list.append(zone.center_location)
             pather.map.calculate_zones(expansion_locations_list)
+            # Zones in the pathing grid are numbered in this order, which stays the same when zones are sorted again
+            self._grid_zones = list(self.zone_manager.expansion_zones)
+            for index, zone in enumerate(self._grid_zones):
+                zone.grid_index = index
+            self._zone_grid = pather.map.zone_grid()
 
     def init_zones(self):
         if len(self.ai._expansion_positions_list) == 0:
@@ -204,17 +229,56 @@ class ZoneManager(ManagerBase, IZoneManager):
 
         self._expansion_zones = list(self.zones.values())
 
+        self.init_path_table()
         self._sort_expansion_zones()
         self._zones_truly_sorted = self.enemy_start_location_found
         self.zone_sorted_by = self.enemy_start_location
 
+    def init_path_table(self):
+        """Loads or calculates paths between all zones for the current terrain grid."""
+        pather = self.knowledge.get_manager(PathingManager)
+        if pather is None or not self._expansion_zones:
+            return
+        if self._path_table is not None and self._path_table_version == pather.terrain_version:
+            # Grid hasn't changed since the table was built
+            return
+
+        start_time = time.perf_counter()
+        locations = [zone.center_location for zone in self._expansion_zones]
+        self._path_table, loaded = ZonePathTable.cached(pather.grid_values(None), locations, self.map_store)
+        self._path_table_version = pather.terrain_version
+        self._distance_fields.clear()
+        self.print(
+            f"Zone paths {'loaded' if loaded else 'calculated'} in {(time.perf_counter() - start_time) * 1000:.1f} ms",
+            stats=False,
+            log_level=logging.DEBUG,
+        )
+
     def _path_distance(self, start: Point2, end: Point2) -> float:
-        path = Path(self.knowledge.pathing_manager.path_finder_terrain.find_path(start, end))
-        if path.distance > 0:
-            return path.distance
+        table = self._path_table
+        if table is not None:
+            start_index = table.index(start)
+            end_index = table.index(end)
+            if start_index is not None and end_index is not None:
+                distance = table.distance(start_index, end_index)
+            else:
+                # Single reverse search from end gives distances from all zones
+                field = self._distance_fields.get(end)
+                if field is None:
+                    field = FlowField(self.knowledge.pathing_manager.grid_values(None), end)
+                    self._distance_fields[end] = field
+                distance = field.distance(start)
+                if distance == np.inf:
+                    distance = 0
+        else:
+            distance = Path(self.knowledge.pathing_manager.cached_path(start, end)).distance
+
+        if distance > 0:
+            return distance
         return start.distance_to(end)  # Failsafe
 
     def _sort_expansion_zones(self):
+        self._distance_fields.clear()
         self._expansion_zones.sort(key=self._zone_distance_to_start)
         own_main = self._expansion_zones[0]
         self._expansion_zones.remove(own_main)
@@ -288,13 +352,18 @@ class ZoneManager(ManagerBase, IZoneManager):
 
     def init_zone_pathing(self):
         """ Init zone pathing. This needs to be run after all managers have properly started. """
-        pf: sc2pathlib.PathFinder = self.knowledge.pathing_manager.path_finder_terrain
+        # Terrain grid includes minerals and rocks now
+        self.init_path_table()
+        table = self._path_table
+        if table is None:
+            # No pathing manager, zones have no paths
+            return
+
         zone_count = len(self._expansion_zones)
+        indices = [table.index(zone.center_location) for zone in self._expansion_zones]
         for i in range(0, zone_count):
             for j in range(i + 1, zone_count):
-                path_data = pf.find_path(
-                    self._expansion_zones[i].center_location, self._expansion_zones[j].center_location
-                )
+                path_data = table.path(indices[i], indices[j])
                 self._expansion_zones[i].paths[j] = Path(path_data)
                 self._expansion_zones[j].paths[i] = Path(path_data, True)
 
@@ -399,11 +468,11 @@ class ZoneManager(ManagerBase, IZoneManager):
         if self.knowledge.iteration == 0 and self._expansion_zones:
             self.init_zone_pathing()
 
-        self.update_own_units_zones()
-        self.update_enemy_units_zones()
+        own_groups = self.update_own_units_zones()
+        enemy_groups = self.update_enemy_units_zones()
 
         for zone in self.zones.values():  # type: Zone
-            zone.update()
+            zone.update(own_groups, enemy_groups)
             if zone.is_ours:
                 self._our_zones.append(zone)
             if zone.is_enemys:
@@ -416,119 +485,65 @@ class ZoneManager(ManagerBase, IZoneManager):
             self.zone_sorted_by = self.enemy_start_location
             self._sort_expansion_zones()
 
-    def update_own_units_zones(self):
-        # Figure out all the zones the units are set in
-        tags_in_zones: Dict[int, List[int]] = {}
-
-        for zone in self._expansion_zones:
-            # Clear zones
-            zone.our_units.clear()
-
-        unknown_tags = set()
+    def update_own_units_zones(self) -> ZoneGroups:
+        """Groups own units by the zone they are in."""
+        arrays = self.cache.own_arrays
+        return self._group_units(arrays, np.ones(arrays.count, dtype=bool), None)
+
+    def update_enemy_units_zones(self) -> ZoneGroups:
+        """Groups enemy units by the zone they are in."""
+        arrays = self.cache.enemy_arrays
+        # Only add units that we can fight against
+        valid = np.fromiter((unit.cloak != 2 for unit in arrays.units), dtype=bool, count=arrays.count)
+        # Same units as enemy_in_range would return for the zone
+        if self.cache.only_targetable_enemies_default:
+            range_mask = arrays.targetable_range_mask
+        else:
+            range_mask = arrays.range_mask
+        return self._group_units(arrays, valid, range_mask)
 
-        for unit in self.ai.all_own_units:
-            zone_index = self.pather.map.get_zone(unit.position) - 1
-            if zone_index < 0:
-                # No zone detected, what to do now?
-                unknown_tags.add(unit.tag)
-            else:
-                zone = self._expansion_zones[zone_index]
-                zone.our_units.append(unit)
-                tags_in_zones[unit.tag] = [zone_index]
-
-        for tag in unknown_tags:
-            # Create empty arrays for easy code later
-            tags_in_zones[tag] = []
-
-        for zone in self._expansion_zones:
-            units = self.cache.own_in_range(zone.center_location, zone.radius)
-            for unit in units:
-                if unit.tag in unknown_tags:
-                    # Registering zone here
-                    tags_in_zones[unit.tag].append(zone.zone_index)
-                    zone.our_units.append(unit)
-
-        for tag, zone_indices in tags_in_zones.items():
-            if len(zone_indices) > 1:
-                # the unit is registered in multiple zones, let's make it be in only one zone
-                unit = self.cache.by_tag(tag)
-                best_d: Optional[float] = None
-                best_index = None
-                for zone_index in zone_indices:
-                    zone = self._expansion_zones[zone_index]
-                    d = unit.distance_to(zone.center_location)
-                    # structures in the same zone are at the same height, units walking in ramps need also accounting
-                    height_difference = abs(zone.height - self.ai.get_terrain_height(unit))
-                    d += 10 * height_difference
-                    if zone.is_neutral:
-                        # We'll want to count units as being in relevant zones if possible
-                        d += 5
-
-                    if best_d is None or d < best_d:
-                        best_index = zone_index
-                        best_d = d
-
-                for zone_index in zone_indices:
-                    if zone_index != best_index:
-                        # Remove the unit from other zones
-                        self._expansion_zones[zone_index].our_units.remove(unit)
-
-    def update_enemy_units_zones(self):
-        # Figure out all the zones the units are set in
-        tags_in_zones: Dict[int, List[int]] = {}
-
-        for zone in self._expansion_zones:
-            # Clear zones
-            zone.known_enemy_units.clear()
-
-        unknown_tags = set()
-
-        for unit in self.ai.all_enemy_units:
-            zone_index = self.pather.map.get_zone(unit.position) - 1
-            if zone_index < 0:
-                # No zone detected, what to do now?
-                unknown_tags.add(unit.tag)
-            else:
-                zone = self._expansion_zones[zone_index]
-                zone.known_enemy_units.append(unit)
-                tags_in_zones[unit.tag] = [zone_index]
-
-        for tag in unknown_tags:
-            # Create empty arrays for easy code later
-            tags_in_zones[tag] = []
-
-        for zone in self._expansion_zones:
-            units = self.cache.enemy_in_range(zone.center_location, zone.radius)
-            for unit in units:
-                if unit.tag in unknown_tags:
-                    # Registering zone here
-                    tags_in_zones[unit.tag].append(zone.zone_index)
-                    zone.known_enemy_units.append(unit)
-
-        for tag, zone_indices in tags_in_zones.items():
-            if len(zone_indices) > 1:
-                # the unit is registered in multiple zones, let's make it be in only one zone
-                unit = self.cache.by_tag(tag)
-                best_d: Optional[float] = None
-                best_index = None
-                for zone_index in zone_indices:
-                    zone = self._expansion_zones[zone_index]
-                    d = unit.distance_to(zone.center_location)
-                    # structures in the same zone are at the same height, units walking in ramps need also accounting
-                    height_difference = abs(zone.height - self.ai.get_terrain_height(unit))
-                    d += 10 * height_difference
-                    if zone.is_neutral:
-                        # We'll want to count units as being in relevant zones if possible
-                        d += 5
-
-                    if best_d is None or d < best_d:
-                        best_index = zone_index
-                        best_d = d
-
-                for zone_index in zone_indices:
-                    if zone_index != best_index:
-                        # Remove the unit from other zones
-                        self._expansion_zones[zone_index].known_enemy_units.remove(unit)
+    def _group_units(self, arrays: UnitArrays, valid: np.ndarray, range_mask: Optional[np.ndarray]) -> ZoneGroups:
+        zones = self._grid_zones
+        if self._zone_grid is None:
+            unit_zones = np.full(arrays.count, -1, dtype=np.intp)
+        else:
+            unit_zones = sample_zones(self._zone_grid, arrays.positions)
+        unit_zones[~valid] = -1
+
+        unknown = np.flatnonzero((unit_zones < 0) & valid)
+        if len(unknown) > 0 and zones:
+            # No zone detected, register the unit to the best zone it is in range of
+            positions = arrays.positions[unknown]
+            centers = np.array([zone.center_location for zone in zones])
+            radius = np.array([zone.radius for zone in zones])
+            distances = cdist(positions, centers)
+            in_range = distances <= radius[np.newaxis, :]
+            if range_mask is not None:
+                in_range &= range_mask[unknown, np.newaxis]
+
+            # structures in the same zone are at the same height, units walking in ramps need also accounting
+            zone_heights = np.array([zone.height for zone in zones])
+            height_differences = np.abs(zone_heights[np.newaxis, :] - self._terrain_heights(positions)[:, np.newaxis])
+            scores = distances + 10 * height_differences
+            # We'll want to count units as being in relevant zones if possible
+            scores += np.array([5 if zone.is_neutral else 0 for zone in zones])[np.newaxis, :]
+            scores[~in_range] = np.inf
+
+            found = in_range.any(axis=1)
+            unit_zones[unknown[found]] = np.argmin(scores[found], axis=1)
+
+        powers = self.knowledge.unit_values.power_table.unit_powers(
+            arrays.type_ids, arrays.health_shield, max_health=arrays.max_health_shield
+        )
+        return ZoneGroups(unit_zones, len(zones), powers)
+
+    def _terrain_heights(self, positions: np.ndarray) -> np.ndarray:
+        """Terrain heights of positions, same as BotAI.get_terrain_height."""
+        heights = self.ai.game_info.terrain_height.data_numpy
+        cells = np.floor(positions).astype(np.intp)
+        xs = np.clip(cells[:, 0], 0, heights.shape[1] - 1)
+        ys = np.clip(cells[:, 1], 0, heights.shape[0] - 1)
+        return heights[ys, xs].astype(float)
 
     # endregion
 
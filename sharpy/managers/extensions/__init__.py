@@ -8,3 +8,4 @@ from .archon import ArchonManager
 from .heat_map import HeatMapManager
 from .custom_func_manager import CustomFuncManager
 from .enemy_vision_manager import EnemyVisionManager
+from .observation_recorder import ObservationRecorder
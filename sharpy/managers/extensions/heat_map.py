@@ -1,68 +1,121 @@
 import math
 from typing import List, Optional, Tuple
 
-import sc2
-from sharpy.general.extended_power import ExtendedPower
+import numpy as np
+from scipy.spatial.distance import cdist
+
 from sharpy.interfaces import IUnitCache, IUnitValues
 from sharpy.managers.core import ManagerBase
-from sharpy.managers.core import UnitCacheManager
 from sharpy.tools import IntervalFunc
 from sc2.pixel_map import PixelMap
 from sc2.position import Point2
-from sc2.unit import Unit
 
 SLOT_SIZE = 5
+# Heat areas are linked to zones whose center is closer than this at the same terrain height
+ZONE_DISTANCE = 15
+# Stealth heat is only added when we have ground units or buildings this close to the stealthed unit
+STEALTH_DETECT_RANGE = 12
+
+
+class HeatGrid:
+    """
+    Heat and stealth heat of map slots as [y][x] arrays, same layout as grids in game info.
+    Slot at [y][x] covers map cells from x * slot_size and y * slot_size onwards.
+    """
+
+    def __init__(self, width: int, height: int, slot_size: int = SLOT_SIZE):
+        self.slot_size = slot_size
+        self.slots_w = int(math.ceil(width / slot_size))
+        self.slots_h = int(math.ceil(height / slot_size))
+        self.heat = np.zeros((self.slots_h, self.slots_w))
+        self.stealth_heat = np.zeros((self.slots_h, self.slots_w))
+
+        xs = np.arange(self.slots_w) * slot_size
+        ys = np.arange(self.slots_h) * slot_size
+        center_x = (xs + np.minimum(xs + slot_size, width - 1)) / 2.0
+        center_y = (ys + np.minimum(ys + slot_size, height - 1)) / 2.0
+        # Centers of all slots as [y][x] x 2 array
+        self.centers = np.stack(np.meshgrid(center_x, center_y), axis=-1)
+
+    def slots(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Slot y and x indices of positions, positions outside the map are clamped to the closest slot."""
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        cells = np.floor(np.asarray(positions, dtype=float) / self.slot_size).astype(np.intp)
+        return np.clip(cells[:, 1], 0, self.slots_h - 1), np.clip(cells[:, 0], 0, self.slots_w - 1)
+
+    def center(self, y: int, x: int) -> Point2:
+        return Point2(self.centers[y, x].tolist())
+
+    def center_cells(self) -> np.ndarray:
+        """
+        Map cells of slot centers as [y][x] x 2 int array.
+        Centers are rounded with Point2.rounded, same as get_terrain_height and the heat areas before HeatGrid.
+        """
+        cells = [[Point2(center).rounded for center in row] for row in self.centers.tolist()]
+        return np.array(cells, dtype=np.intp).reshape(self.centers.shape)
+
+    def add_heat(self, positions: np.ndarray, values: np.ndarray):
+        np.add.at(self.heat, self.slots(positions), values)
+
+    def add_stealth_heat(self, positions: np.ndarray, value: float):
+        np.add.at(self.stealth_heat, self.slots(positions), value)
+
+    def decay(self, time_change: float, visible: np.ndarray):
+        """
+        Cools down heat of all slots, heat of visible slots cools down faster.
+
+        :param time_change: seconds since the last decay
+        :param visible: bool [y][x] array of slots that are currently visible
+        """
+        stealth = self.stealth_heat
+        hot = stealth > 0
+        stealth[hot] = np.minimum(2, np.maximum(0, (stealth[hot] - time_change) * (1 - time_change * 0.5)))
+
+        heat = self.heat
+        visible_heat = np.maximum(0, (heat - time_change * 0.02) * (1 - time_change * 0.5))
+        hidden_heat = np.maximum(0, (heat - time_change * 0.01) * (1 - time_change * 0.25))
+        self.heat = np.where(heat > 0, np.where(visible, visible_heat, hidden_heat), heat)
+
+    def hottest(self, values: np.ndarray, count: int, mask: Optional[np.ndarray] = None) -> List[Tuple[Point2, float]]:
+        """
+        Centers and values of up to count slots with highest positive values, hottest first.
+
+        :param values: heat or stealth_heat
+        :param mask: optional bool [y][x] array of slots to include
+        """
+        flat = values.ravel()
+        valid = flat > 0
+        if mask is not None:
+            valid &= mask.ravel()
+        indices = np.flatnonzero(valid)
+        if len(indices) > count:
+            indices = indices[np.argpartition(-flat[indices], count - 1)[:count]]
+        # Stable sort keeps slots with the same value in row order
+        indices = indices[np.argsort(-flat[indices], kind="stable")]
+
+        result = []
+        for index in indices.tolist():
+            y, x = divmod(index, self.slots_w)
+            result.append((self.center(y, x), float(flat[index])))
+        return result
 
 
-class HeatArea:
-    def __init__(self, knowledge: "Knowledge", x: int, y: int, x2: int, y2: int):
-        self.ai = knowledge.ai
-        self.knowledge = knowledge
-        self.bottom_left_x = x
-        self.bottom_left_y = y
-        self.top_right_x = x2
-        self.top_right_y = y2
-        self.center = Point2(((x + x2) / 2.0, (y + y2) / 2.0))
-        self._x, self._y = self.center.rounded
-        self.zone: Optional["Zone"] = None
-        self.heat: float = 0
-        self.stealth_heat: float = 0
-        self.last_enemy_power = ExtendedPower(knowledge.unit_values)
-        zone_manager = knowledge.zone_manager
-
-        d2 = 15
-        for zone in zone_manager.expansion_zones:
-            if zone.center_location.distance_to(self.center) < d2:
-                if self.ai.get_terrain_height(zone.center_location) == self.ai.get_terrain_height(self.center):
-                    # if zone == self.zone_manager.own_main_zone:
-                    #     print("MAIN ZONE")
-                    self.zone = zone
-
-    def update(self, time_change: float):
-        if self.stealth_heat > 0:
-            self.stealth_heat = min(2, max(0, (self.stealth_heat - time_change) * (1 - time_change * 0.5)))
-
-        if self.heat > 0:
-            if self.is_visible():
-                self.heat = max(0, (self.heat - time_change * 0.02) * (1 - time_change * 0.5))
-            else:
-                self.heat = max(0, (self.heat - time_change * 0.01) * (1 - time_change * 0.25))
-
-        self.heat += self.last_enemy_power.power * time_change
-        self.last_enemy_power.clear()
-
-    def is_visible(self) -> bool:
-        # TODO: Check all corners?
-        return self.ai.state.visibility.data_numpy[self._y, self._x] == 2
+class HeatMapManager(ManagerBase):
+    """
+    Keeps track of where enemy units have been seen recently as heat, and of stealthed enemy units as stealth heat.
 
+    Heat of map slots is stored in HeatGrid arrays and updated for all slots at once,
+    so the cost of an update depends on unit count rather than slot size.
+    """
 
-class HeatMapManager(ManagerBase):
     cache: IUnitCache
     unit_values: IUnitValues
     updater: IntervalFunc
 
-    def __init__(self) -> None:
+    def __init__(self, slot_size: int = SLOT_SIZE) -> None:
         super().__init__()
+        self.slot_size = slot_size
 
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
@@ -72,20 +125,47 @@ class HeatMapManager(ManagerBase):
 
     def init_heat_map(self, knowledge: "Knowledge"):
         grid: PixelMap = knowledge.ai._game_info.placement_grid
-        height = grid.height
-        width = grid.width
-
-        self.slots_w = int(math.ceil(width / SLOT_SIZE))
-        self.slots_h = int(math.ceil(height / SLOT_SIZE))
-        self.heat_areas: List[HeatArea] = []
-        for y in range(0, self.slots_h):
-            for x in range(0, self.slots_w):
-                x2 = min(x * SLOT_SIZE + SLOT_SIZE, width - 1)
-                y2 = min(y * SLOT_SIZE + SLOT_SIZE, height - 1)
-                self.heat_areas.append(HeatArea(knowledge, x * SLOT_SIZE, y * SLOT_SIZE, x2, y2))
+        self.grid = HeatGrid(grid.width, grid.height, self.slot_size)
+        self.slots_w = self.grid.slots_w
+        self.slots_h = self.grid.slots_h
+
+        # Visibility of each slot is checked from the cell at the slot center
+        cells = self.grid.center_cells()
+        self._visibility_x = cells[:, :, 0]
+        self._visibility_y = cells[:, :, 1]
+
+        self.zones: List["Zone"] = list(knowledge.zone_manager.expansion_zones)
+        self.slot_zones = self._solve_slot_zones()
         self.last_update = 0
         self.last_quick_update = 0
 
+    def _solve_slot_zones(self) -> np.ndarray:
+        """Index to zones for every slot, -1 for slots that are not linked to any zone."""
+        slot_zones = np.full((self.slots_h, self.slots_w), -1, dtype=np.intp)
+        if not self.zones:
+            return slot_zones
+
+        heights = self.ai.game_info.terrain_height.data_numpy
+        slot_heights = heights[self._visibility_y, self._visibility_x]
+        zone_centers = np.array([zone.center_location for zone in self.zones])
+        distances = cdist(self.grid.centers.reshape(-1, 2), zone_centers).reshape(self.slots_h, self.slots_w, -1)
+
+        for index, zone in enumerate(self.zones):
+            # Last matching zone wins
+            zone_height = self.ai.get_terrain_height(zone.center_location)
+            slot_zones[(distances[:, :, index] < ZONE_DISTANCE) & (slot_heights == zone_height)] = index
+        return slot_zones
+
+    @property
+    def heat(self) -> np.ndarray:
+        """Heat of all slots as [y][x] array."""
+        return self.grid.heat
+
+    @property
+    def stealth_heat(self) -> np.ndarray:
+        """Stealth heat of all slots as [y][x] array."""
+        return self.grid.stealth_heat
+
     async def update(self):
         self.__stealth_update()
         self.updater.execute()
@@ -95,52 +175,70 @@ class HeatMapManager(ManagerBase):
 
     def __stealth_update(self):
         time_change = self.ai.time - self.last_quick_update
-
-        for unit in self.ai.all_enemy_units:  # type: Unit
-            if unit.is_cloaked or unit.is_burrowed:
-                own_close = self.cache.own_in_range(unit.position, 12).not_flying
-                area = self.get_zone(unit.position)
-                if own_close:
-                    # Only add to stealth heat if we have a ground unit or building nearby
-                    # Stealthed units cannot attack air
-                    area.stealth_heat += 1 * time_change
-
-    def get_zone(self, position: Point2) -> HeatArea:
-        x_int = min(self.slots_w, max(0, math.floor(position.x / SLOT_SIZE)))
-        y_int = min(self.slots_h, max(0, math.floor(position.y / SLOT_SIZE)))
-        return self.heat_areas[x_int + y_int * self.slots_w]
+        enemies = self.ai.all_enemy_units
+        stealthed = [unit.position for unit in enemies if unit.is_cloaked or unit.is_burrowed]
+        if not stealthed:
+            return
+
+        own = self.cache.own_arrays
+        ground = own.positions[~own.is_flying]
+        if len(ground) == 0:
+            return
+
+        # Only add to stealth heat if we have a ground unit or building nearby
+        # Stealthed units cannot attack air
+        positions = np.array(stealthed, dtype=float)
+        detected = np.min(cdist(positions, ground), axis=1) <= STEALTH_DETECT_RANGE
+        self.grid.add_stealth_heat(positions[detected], 1 * time_change)
+
+    def slot(self, position: Point2) -> Tuple[int, int]:
+        """Slot y and x indices of the position."""
+        ys, xs = self.grid.slots(np.array([[position.x, position.y]]))
+        return int(ys[0]), int(xs[0])
+
+    def visible_slots(self) -> np.ndarray:
+        """Bool [y][x] array of slots that are currently visible."""
+        return self.ai.state.visibility.data_numpy[self._visibility_y, self._visibility_x] == 2
 
     def __real_update(self):
         time_change = self.ai.time - self.last_update
         self.last_update = self.ai.time
 
-        for unit in self.ai.enemy_units:
-            area = self.get_zone(unit.position)
-            area.last_enemy_power.add_unit(unit)
-
-        for zone in self.heat_areas:
-            zone.update(time_change)
+        units = self.ai.enemy_units
+        count = len(units)
+        if count > 0:
+            positions = np.array([unit.position for unit in units], dtype=float)
+            type_ids = np.fromiter((unit.type_id.value for unit in units), dtype=np.int32, count=count)
+            health = np.fromiter((unit.health + unit.shield for unit in units), dtype=float, count=count)
+            max_health = np.fromiter((unit.health_max + unit.shield_max for unit in units), dtype=float, count=count)
+            power = self.knowledge.unit_values.power_table.combat_power(type_ids, health, max_health=max_health)
+        else:
+            positions = np.empty((0, 2))
+            power = np.empty(0)
+
+        # Heat decays first and enemies seen since the last update are added after that
+        self.grid.decay(time_change, self.visible_slots())
+        self.grid.add_heat(positions, power * time_change)
+
+    def hottest_slots(self, count: int) -> List[Tuple[Point2, float]]:
+        """Centers and heat of up to count hottest slots, hottest first."""
+        return self.grid.hottest(self.grid.heat, count)
+
+    def zone_heat(self, zone: "Zone") -> float:
+        """Total heat of slots linked to the zone."""
+        if zone not in self.zones:
+            return 0
+        return float(self.grid.heat[self.slot_zones == self.zones.index(zone)].sum())
 
     def get_stealth_hotspot(self) -> Optional[Tuple[Point2, float]]:
-        top_heat_position: Point2 = None
-        top_value = 0
-        for heat_area in self.heat_areas:
-            if heat_area.stealth_heat > top_value:
-                top_heat_position = heat_area.center
-                top_value = heat_area.stealth_heat
-
-        if top_heat_position is None:
+        hottest = self.grid.hottest(self.grid.stealth_heat, 1)
+        if not hottest:
             return None
-
-        return top_heat_position, top_value
+        return hottest[0]
 
     def get_zones_hotspot(self, zones: List["Zone"]) -> Optional[Point2]:
-        top_heat_area = None
-        top_value = 0
-        for heat_area in self.heat_areas:
-            value = heat_area.heat
-            if heat_area.zone in zones and value > 0 and (top_heat_area is None or value > top_value):
-                top_value = value
-                top_heat_area = heat_area
-
-        return top_heat_area
+        indices = [index for index, zone in enumerate(self.zones) if zone in zones]
+        hottest = self.grid.hottest(self.grid.heat, 1, np.isin(self.slot_zones, indices))
+        if not hottest:
+            return None
+        return hottest[0][0]
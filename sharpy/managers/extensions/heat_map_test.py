@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from sc2.position import Point2
+
+from .heat_map import HeatGrid
+
+
+def old_decay(heat: float, stealth_heat: float, time_change: float, visible: bool):
+    # Heat area update before heat was stored in arrays
+    if stealth_heat > 0:
+        stealth_heat = min(2, max(0, (stealth_heat - time_change) * (1 - time_change * 0.5)))
+    if heat > 0:
+        if visible:
+            heat = max(0, (heat - time_change * 0.02) * (1 - time_change * 0.5))
+        else:
+            heat = max(0, (heat - time_change * 0.01) * (1 - time_change * 0.25))
+    return heat, stealth_heat
+
+
+class TestHeatGrid:
+    def test_slots(self):
+        grid = HeatGrid(22, 13, 5)
+        assert (grid.slots_h, grid.slots_w) == (3, 5)
+        assert grid.center(0, 0) == (2.5, 2.5)
+        # Last slot is cut at the map edge
+        assert grid.center(2, 4) == (20.5, 11)
+
+        ys, xs = grid.slots(np.array([[0, 0], [7.5, 12.9], [40, -3]]))
+        assert ys.tolist() == [0, 2, 0]
+        assert xs.tolist() == [0, 1, 4]
+
+    def test_center_cells_are_rounded_like_points(self):
+        grid = HeatGrid(22, 13, 5)
+        cells = grid.center_cells()
+        for y in range(grid.slots_h):
+            for x in range(grid.slots_w):
+                assert tuple(cells[y, x]) == grid.center(y, x).rounded
+
+    def test_decay_matches_heat_areas(self):
+        grid = HeatGrid(20, 10, 5)
+        rng = np.random.default_rng(1)
+        grid.heat[:] = rng.random(grid.heat.shape) * 3 - 0.5
+        grid.stealth_heat[:] = rng.random(grid.heat.shape) * 3 - 0.5
+        visible = rng.random(grid.heat.shape) > 0.5
+        expected = [
+            old_decay(heat, stealth, 0.5, bool(seen))
+            for heat, stealth, seen in zip(grid.heat.ravel(), grid.stealth_heat.ravel(), visible.ravel())
+        ]
+
+        grid.decay(0.5, visible)
+
+        assert grid.heat.ravel().tolist() == pytest.approx([heat for heat, _ in expected])
+        assert grid.stealth_heat.ravel().tolist() == pytest.approx([stealth for _, stealth in expected])
+
+    def test_hottest(self):
+        grid = HeatGrid(20, 10, 5)
+        grid.add_heat(np.array([[1, 1], [2, 2], [12, 7], [18, 1]]), np.array([1, 2, 5, 4]))
+
+        assert grid.heat[0, 0] == 3
+        assert grid.hottest(grid.heat, 2) == [((12.5, 7.0), 5), ((17.0, 2.5), 4)]
+
+        mask = np.zeros(grid.heat.shape, dtype=bool)
+        mask[0, :2] = True
+        assert grid.hottest(grid.heat, 5, mask) == [((2.5, 2.5), 3)]
+        assert grid.hottest(grid.stealth_heat, 1) == []
@@ -1,8 +1,10 @@
 from collections import deque
 from typing import Dict, Set, Deque, List, Optional
 
+import numpy as np
+from scipy.spatial.distance import cdist
+
 from sc2.data import Race
-from sc2.position import Point2
 from sharpy.events import UnitDestroyedEvent
 from sharpy.interfaces import IMemoryManager
 from sharpy.managers.core import ManagerBase
@@ -28,6 +30,100 @@ BURROWED_ALIAS: Set[UnitTypeId] = {
     UnitTypeId.WIDOWMINEBURROWED,
     UnitTypeId.ZERGLINGBURROWED,
 }
+BURROWED_ALIAS_VALUES = np.array([type_id.value for type_id in BURROWED_ALIAS], dtype=np.int32)
+
+
+class MemoryStore:
+    """
+    Columnar store of remembered enemy units with one row for each tag.
+    Rows are in the order units were first seen and are looked up by tag with `rows`.
+    """
+
+    def __init__(self):
+        self.rows: Dict[int, int] = {}
+        self.tags = np.empty(0, dtype=np.uint64)
+        self.type_ids = np.empty(0, dtype=np.int32)
+        self.positions = np.empty((0, 2))
+        # Game loop when the unit was last seen
+        self.last_seen = np.empty(0, dtype=np.int64)
+        self.is_flying = np.empty(0, dtype=bool)
+        self.burrowed = np.empty(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def __contains__(self, tag: int) -> bool:
+        return tag in self.rows
+
+    def update(self, units: List[Unit], game_loop: int):
+        """Adds units or updates their rows with current data."""
+        count = len(units)
+        if count == 0:
+            return
+
+        rows = np.fromiter((self.rows.get(unit.tag, -1) for unit in units), dtype=np.intp, count=count)
+        positions = np.array([unit.position for unit in units], dtype=float)
+        type_ids = np.fromiter((unit.type_id.value for unit in units), dtype=np.int32, count=count)
+        is_flying = np.fromiter((unit.is_flying for unit in units), dtype=bool, count=count)
+        burrowed = np.fromiter((unit.is_burrowed for unit in units), dtype=bool, count=count)
+
+        known = rows >= 0
+        known_rows = rows[known]
+        self.positions[known_rows] = positions[known]
+        self.type_ids[known_rows] = type_ids[known]
+        self.is_flying[known_rows] = is_flying[known]
+        self.burrowed[known_rows] = burrowed[known]
+        self.last_seen[known_rows] = game_loop
+
+        new = ~known
+        if np.any(new):
+            start = len(self.tags)
+            tags = np.fromiter((unit.tag for unit in units), dtype=np.uint64, count=count)[new]
+            self.tags = np.concatenate((self.tags, tags))
+            self.type_ids = np.concatenate((self.type_ids, type_ids[new]))
+            self.positions = np.concatenate((self.positions, positions[new]))
+            self.last_seen = np.concatenate((self.last_seen, np.full(len(tags), game_loop, dtype=np.int64)))
+            self.is_flying = np.concatenate((self.is_flying, is_flying[new]))
+            self.burrowed = np.concatenate((self.burrowed, burrowed[new]))
+            for index, tag in enumerate(tags.tolist()):
+                self.rows[tag] = start + index
+
+    def remove(self, mask: np.ndarray):
+        """Removes rows where mask is true."""
+        if not np.any(mask):
+            return
+        keep = ~mask
+        self.tags = self.tags[keep]
+        self.type_ids = self.type_ids[keep]
+        self.positions = self.positions[keep]
+        self.last_seen = self.last_seen[keep]
+        self.is_flying = self.is_flying[keep]
+        self.burrowed = self.burrowed[keep]
+        self.rows = {tag: index for index, tag in enumerate(self.tags.tolist())}
+
+    def remove_tags(self, tags: Set[int]):
+        if tags:
+            self.remove(np.isin(self.tags, np.fromiter(tags, dtype=np.uint64, count=len(tags))))
+
+    def cells_visible(self, visibility: np.ndarray) -> np.ndarray:
+        """
+        True for rows where all four cells around the last known position are visible.
+
+        :param visibility: visibility grid data_numpy, 2 is visible
+        """
+        height, width = visibility.shape
+        cells = self.positions.astype(np.intp)
+        visible = np.ones(len(cells), dtype=bool)
+        for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            xs = np.clip(cells[:, 0] + dx, 0, width - 1)
+            ys = np.clip(cells[:, 1] + dy, 0, height - 1)
+            visible &= visibility[ys, xs] == 2
+        return visible
+
+    def expired(self, game_loop: int, expire_air: float, expire_ground: float) -> np.ndarray:
+        """True for rows whose unit hasn't been seen for longer than expire time in seconds."""
+        age = (game_loop - self.last_seen) / 22.4
+        return age > np.where(self.is_flying, expire_air, expire_ground)
 
 
 class MemoryManager(ManagerBase, IMemoryManager):
@@ -35,6 +131,9 @@ class MemoryManager(ManagerBase, IMemoryManager):
 
     Structures are ignored because they have two tags. One for the real building and another
     for the building's snapshot when under fog of war.
+
+    Last known positions are kept in a columnar MemoryStore, so that expiration and visibility of all
+    remembered units are checked with a few array operations.
     """
 
     detectors: Set[UnitTypeId]
@@ -50,6 +149,10 @@ class MemoryManager(ManagerBase, IMemoryManager):
         self._archive_units_by_tag: Dict[int, Deque[Unit]] = dict()
         self._tags_destroyed: Set[int] = set()
         self.unit_dict: Dict[int, Deque[Unit]] = dict()
+        self.store = MemoryStore()
+        # Destroyed tags that are removed from store on next update
+        self._removed_tags: Set[int] = set()
+        self._ghost_units: Optional[Units] = None
         self.expire_air = 60  # Time in seconds when snapshot expires
         self.expire_ground = 360  # Time in seconds when snapshot expires
 
@@ -66,8 +169,12 @@ class MemoryManager(ManagerBase, IMemoryManager):
         knowledge.register_on_unit_destroyed_listener(self.on_unit_destroyed)
 
     async def update(self):
-        detectors = None
         self.unit_dict.clear()
+        store = self.store
+        store.remove_tags(self._removed_tags)
+        self._removed_tags.clear()
+        game_loop = self.ai.state.game_loop
+        seen: List[Unit] = []
 
         # Iterate all currently visible enemy units.
         # self.ai.enemy_units is used here because it does not include memory lane units
@@ -91,59 +198,53 @@ class MemoryManager(ManagerBase, IMemoryManager):
                 self._memory_units_by_tag[unit.tag] = snaps
 
             self.unit_dict[unit.tag] = unit
+            seen.append(unit)
 
-        memory_tags_to_remove = list()
+        store.update(seen, game_loop)
 
-        for unit_tag in self._memory_units_by_tag:
-            if self.is_unit_visible(unit_tag):
-                continue
+        not_seen = store.last_seen != game_loop
+        expired = not_seen & store.expired(game_loop, self.expire_air, self.expire_ground)
+        # We see that the unit is no longer there.
+        gone = not_seen & ~expired & store.cells_visible(self.ai.state.visibility.data_numpy)
 
-            snap = self.get_latest_snapshot(unit_tag)
-            points: List[Point2] = []
-            points.append(Point2((int(snap.position.x), int(snap.position.y))))
-            points.append(Point2((int(snap.position.x + 1), int(snap.position.y))))
-            points.append(Point2((int(snap.position.x), int(snap.position.y + 1))))
-            points.append(Point2((int(snap.position.x + 1), int(snap.position.y + 1))))
-
-            visible = True
-
-            for point in points:
-                if not self.ai.is_visible(point):
-                    visible = False
-
-            expired = self.check_expiration(snap)
-
-            if expired:
-                self.clear_unit_cache(memory_tags_to_remove, unit_tag)
-            elif visible:
-                # We see that the unit is no longer there.
-                if (snap.type_id in BURROWED_ALIAS or snap.is_burrowed) and unit_tag not in self._tags_destroyed:
-                    if detectors is None:
-                        detectors = self.cache.own(self.detectors)
-
-                    if detectors.closer_than(11, snap.position):
-                        self.clear_unit_cache(memory_tags_to_remove, unit_tag)
-                    else:
-                        # For burrowed units, let's change the snapshot
-                        snap._proto.is_burrowed = True
-                        # snap._proto.unit_type = BURROWED_ALIAS.get(snap.type_id, snap.type_id).value  # int value
-                        # todo: what are the ramifications of removing this? Does a different cache need to be busted?
-                        # snap.cache.clear()
-                else:
-                    self.clear_unit_cache(memory_tags_to_remove, unit_tag)
-
-        for tag in memory_tags_to_remove:
-            self._memory_units_by_tag.pop(tag)
-
-        memory_units = self.ghost_units
-
-        # Merge enemy data with memories
-        self.ai.enemy_units = self.ai.enemy_units + memory_units
-        self.ai.all_enemy_units = self.ai.all_enemy_units + memory_units
-
-    def clear_unit_cache(self, memory_tags_to_remove, unit_tag):
-        memory_tags_to_remove.append(unit_tag)
-        snaps = self._memory_units_by_tag.get(unit_tag)
+        burrowed = store.burrowed | np.isin(store.type_ids, BURROWED_ALIAS_VALUES)
+        if not self._tags_destroyed:
+            hidden = gone & burrowed
+        else:
+            destroyed = np.fromiter(self._tags_destroyed, dtype=np.uint64, count=len(self._tags_destroyed))
+            hidden = gone & burrowed & ~np.isin(store.tags, destroyed)
+
+        if np.any(hidden):
+            detectors = self.cache.own(self.detectors)
+            if detectors:
+                detector_positions = np.array([detector.position for detector in detectors], dtype=float)
+                detected = np.zeros(len(store), dtype=bool)
+                detected[hidden] = np.min(cdist(store.positions[hidden], detector_positions), axis=1) < 11
+                hidden &= ~detected
+
+            for tag in store.tags[hidden & ~store.burrowed].tolist():
+                # For burrowed units, let's change the snapshot
+                snap = self.get_latest_snapshot(tag)
+                snap._proto.is_burrowed = True
+                # snap._proto.unit_type = BURROWED_ALIAS.get(snap.type_id, snap.type_id).value  # int value
+                # todo: what are the ramifications of removing this? Does a different cache need to be busted?
+                # snap.cache.clear()
+            store.burrowed[hidden] = True
+
+        remove = expired | (gone & ~hidden)
+        for tag in store.tags[remove].tolist():
+            self.clear_unit_cache(tag)
+        store.remove(remove)
+
+        memory_units = Units([self.get_latest_snapshot(tag) for tag in store.tags[not_seen[~remove]].tolist()], self.ai)
+        self._ghost_units = memory_units
+
+        # Merge enemy data with memories, the lists are extended in place instead of creating new ones
+        self.ai.enemy_units.extend(memory_units)
+        self.ai.all_enemy_units.extend(memory_units)
+
+    def clear_unit_cache(self, unit_tag: int):
+        snaps = self._memory_units_by_tag.pop(unit_tag)
         self._archive_units_by_tag[unit_tag] = snaps
 
     async def post_update(self):
@@ -156,17 +257,12 @@ class MemoryManager(ManagerBase, IMemoryManager):
     @property
     def ghost_units(self) -> Units:
         """Returns latest snapshot for all units that we know of but which are currently not visible."""
-        memory_units = Units([], self.ai)
-
-        for tag in self._memory_units_by_tag:
-            if self.is_unit_visible(tag):
-                continue
-
-            snap = self.get_latest_snapshot(tag)
-            memory_units.append(snap)
-
-        return memory_units
-        # return memory_units.visible
+        if self._ghost_units is None:
+            tags = [tag for tag in self.store.tags.tolist() if tag in self._memory_units_by_tag]
+            self._ghost_units = Units(
+                [self.get_latest_snapshot(tag) for tag in tags if not self.is_unit_visible(tag)], self.ai
+            )
+        return self._ghost_units
 
     def get_latest_snapshot(self, unit_tag: int) -> Unit:
         """Returns the latest snapshot of a unit. Throws KeyError if unit_tag is not found."""
@@ -181,7 +277,9 @@ class MemoryManager(ManagerBase, IMemoryManager):
     def on_unit_destroyed(self, event: UnitDestroyedEvent):
         """Call this when a unit is destroyed, to make sure that the unit is erased from memory."""
         # Remove the unit from frozen dictionaries.
-        self._memory_units_by_tag.pop(event.unit_tag, None)
+        if self._memory_units_by_tag.pop(event.unit_tag, None) is not None:
+            self._removed_tags.add(event.unit_tag)
+            self._ghost_units = None
         self._archive_units_by_tag.pop(event.unit_tag, None)
         self._tags_destroyed.add(event.unit_tag)
 
@@ -0,0 +1,49 @@
+from unittest import mock
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from .memory_manager import MemoryStore
+
+
+def mock_unit(tag: int, position, type_id=UnitTypeId.ZERGLING, is_flying=False, is_burrowed=False) -> mock.Mock:
+    return mock.Mock(
+        spec=Unit, tag=tag, position=Point2(position), type_id=type_id, is_flying=is_flying, is_burrowed=is_burrowed
+    )
+
+
+class TestMemoryStore:
+    def test_update_and_remove(self):
+        store = MemoryStore()
+        store.update([mock_unit(10, (1, 2)), mock_unit(11, (3, 4), UnitTypeId.MUTALISK, True)], 100)
+        store.update([mock_unit(11, (5, 6), UnitTypeId.MUTALISK, True), mock_unit(12, (7, 8))], 200)
+
+        assert store.tags.tolist() == [10, 11, 12]
+        assert store.last_seen.tolist() == [100, 200, 200]
+        assert store.positions[store.rows[11]].tolist() == [5, 6]
+        assert store.is_flying.tolist() == [False, True, False]
+
+        store.remove_tags({10})
+        assert 10 not in store
+        assert store.rows == {11: 0, 12: 1}
+        assert store.positions.tolist() == [[5, 6], [7, 8]]
+
+    def test_expired(self):
+        store = MemoryStore()
+        store.update([mock_unit(1, (1, 1)), mock_unit(2, (1, 1), is_flying=True)], 0)
+
+        assert store.expired(int(22.4 * 61), 60, 360).tolist() == [False, True]
+        assert store.expired(int(22.4 * 361), 60, 360).tolist() == [True, True]
+
+    def test_cells_visible(self):
+        visibility = np.full((10, 10), 2, dtype=np.uint8)
+        # Cell at x = 5, y = 3 is not visible
+        visibility[3, 5] = 1
+        store = MemoryStore()
+        store.update(
+            [mock_unit(1, (4.5, 2.5)), mock_unit(2, (5.5, 3.5)), mock_unit(3, (1.5, 1.5)), mock_unit(4, (9.5, 9.5))], 0
+        )
+
+        assert store.cells_visible(visibility).tolist() == [False, False, True, True]
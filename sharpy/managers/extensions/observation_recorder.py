@@ -0,0 +1,89 @@
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.data import Result
+from sharpy.general.observation_file import ObservationWriter, OBSERVATION_FOLDER
+from sharpy.managers.core.manager_base import ManagerBase
+
+
+class ObservationRecorder(ManagerBase):
+    """
+    Records game data, game info and the observation of every step to a file,
+    so that the game can be played back offline with ObservationPlayer for profiling and benchmarks.
+
+    Not included in KnowledgeBot by default, add it in configure_managers when needed.
+    Write errors stop the recording but never crash the bot.
+    """
+
+    def __init__(self, folder: str = OBSERVATION_FOLDER, compress_level: int = 1):
+        super().__init__()
+        self.folder = folder
+        self.compress_level = compress_level
+        self.writer: Optional[ObservationWriter] = None
+        self.write_error: Optional[str] = None
+
+    async def start(self, knowledge: "Knowledge"):
+        await super().start(knowledge)
+        # Game data is not kept as a protobuf in BotAI, so it needs to be requested again
+        response = await self.client._execute(
+            data=sc_pb.RequestData(ability_id=True, unit_type_id=True, upgrade_id=True, buff_id=True, effect_id=True)
+        )
+
+        map_name = re.sub(r"[^A-Za-z0-9]+", "", self.ai.game_info.map_name)[:40]
+        file_name = os.path.join(self.folder, f"{map_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.sc2obs.gz")
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            self.writer = ObservationWriter(file_name, self.compress_level)
+            self.writer.write_header(
+                player_id=self.ai.player_id,
+                base_build=self.ai.base_build,
+                game_version=self.knowledge.version_manager.full_version,
+                game_step=self.client.game_step,
+                map_name=self.ai.game_info.map_name,
+                bot=self.ai.name,
+            )
+            self.writer.write_game_data(response.data)
+            self.writer.write_game_info(self.ai.game_info._proto)
+        except OSError as e:
+            self._stop(e)
+        self._record_step()
+
+    async def update(self):
+        self._record_step()
+
+    async def post_update(self):
+        pass
+
+    def _record_step(self):
+        if self.writer is None:
+            return
+        try:
+            self.writer.write_observation(self.ai.state.response_observation, self.ai.game_info.pathing_grid._proto)
+        except OSError as e:
+            self._stop(e)
+
+    def _stop(self, error: OSError):
+        self.write_error = str(error)
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except OSError:
+                pass
+            self.writer = None
+
+    async def on_end(self, game_result: Result):
+        if self.writer is not None:
+            try:
+                self.writer.write_result(game_result.value)
+                self.writer.close()
+                self.print(f"Recorded {self.writer.records} records to {self.writer.file_name}", stats=False)
+            except OSError as e:
+                self.write_error = str(e)
+            self.writer = None
+
+        if self.write_error:
+            self.print(f"Recording failed: {self.write_error}", stats=False)
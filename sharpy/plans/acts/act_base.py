@@ -13,6 +13,7 @@ from sc2.unit import Unit, UnitOrder
 from sc2.unit_command import UnitCommand
 from sc2.constants import EQUIVALENTS_FOR_TECH_PROGRESS
 from sharpy.interfaces import ILostUnitsManager
+from sharpy.managers.core.plan_tracker import PlanTracker
 from sharpy.managers.core.roles import UnitTask
 
 build_commands = {
@@ -65,6 +66,9 @@ build_commands = {
 
 class ActBase(Component, ABC):
     lost_units_manager: ILostUnitsManager
+    tracker: Optional[PlanTracker] = None
+    # True when the act is complete and will stay complete, plan lists skip finished acts without executing them
+    finished: bool = False
 
     async def debug_draw(self):
         if self.debug:
@@ -73,6 +77,11 @@ class ActBase(Component, ABC):
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
         self.lost_units_manager = self.knowledge.get_required_manager(ILostUnitsManager)
+        self.tracker = knowledge.plan_tracker
+        profiler = knowledge.profiler
+        if profiler is not None and "execute" not in self.__dict__:
+            # Times execute of this act with the act key
+            self.execute = profiler.wrap(self.key, self.execute)
 
     async def debug_actions(self):
         pass
@@ -94,11 +103,8 @@ class ActBase(Component, ABC):
         creation_ability: AbilityId = self.ai._game_data.units[unit_type.value].creation_ability
 
         # Workers ordered to build
-        for worker in self.ai.workers:  # type: Unit
-            for order in worker.orders:  # type: UnitOrder
-                if order.ability.id == creation_ability.id:
-                    p2: Point2 = Point2.from_proto(order.target)
-                    positions.append(p2)
+        for target in self.cache.counts.worker_targets(creation_ability.id):
+            positions.append(Point2.from_proto(target))
 
         # Already building structures
         # Avoid counting structures twice for Terran SCVs.
@@ -146,35 +152,34 @@ class ActBase(Component, ABC):
     ) -> int:
         """Calculates how many buildings there are already, including pending structures."""
         count = 0
-
-        type_count = self.cache.own(unit_type)
+        counts = self.cache.counts
 
         if include_not_ready and include_pending:
             count += self.unit_pending_count(unit_type)
-            count += type_count.ready.amount
+            count += counts.ready(unit_type)
         elif include_not_ready and not include_pending:
-            count += type_count.amount
+            count += counts.amount(unit_type)
         elif not include_not_ready and include_pending:
             count += self.unit_pending_count(unit_type)
-            count += type_count.amount - type_count.not_ready.amount
+            count += counts.ready(unit_type)
         else:
             # Only and only ready
-            count += type_count.ready.amount
+            count += counts.ready(unit_type)
 
         count = self.related_count(count, unit_type)
 
         if include_killed:
-            count += self.lost_units_manager.own_lost_type(unit_type, real_type=False)
+            count += counts.lost(unit_type, real_type=False)
             related = EQUIVALENTS_FOR_TECH_PROGRESS.get(unit_type, None)
             if related:
                 for related_type in related:
-                    count += self.lost_units_manager.own_lost_type(related_type, real_type=False)
+                    count += counts.lost(related_type, real_type=False)
 
         return count
 
     def related_count(self, count, unit_type):
         if unit_type in EQUIVALENTS_FOR_TECH_PROGRESS:
-            count += self.cache.own(EQUIVALENTS_FOR_TECH_PROGRESS[unit_type]).amount
+            count += self.cache.counts.amount(EQUIVALENTS_FOR_TECH_PROGRESS[unit_type])
         return count
 
     def get_worker_builder(
@@ -1,3 +1,5 @@
+from typing import Dict, List
+
 from sc2.data import Race
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.unit import Unit
@@ -7,6 +9,10 @@ from .act_base import ActBase
 from sharpy.interfaces import ILostUnitsManager, IIncomeCalculator
 
 REACTORS = {UnitTypeId.BARRACKSREACTOR, UnitTypeId.FACTORYREACTOR, UnitTypeId.STARPORTREACTOR, UnitTypeId.REACTOR}
+BUILDER_TYPES: Dict[UnitTypeId, List[UnitTypeId]] = {
+    UnitTypeId.COMMANDCENTER: [UnitTypeId.COMMANDCENTER, UnitTypeId.ORBITALCOMMAND, UnitTypeId.PLANETARYFORTRESS],
+    UnitTypeId.HATCHERY: [UnitTypeId.HATCHERY, UnitTypeId.LAIR, UnitTypeId.HIVE],
+}
 
 
 class ActUnit(ActBase):
@@ -32,33 +38,22 @@ class ActUnit(ActBase):
         await super().start(knowledge)
         self.income_calculator = self.knowledge.get_required_manager(IIncomeCalculator)
 
+    @property
+    def builder_types(self) -> List[UnitTypeId]:
+        """Returns types of structures that can build the unit."""
+        return BUILDER_TYPES.get(self.from_building, [self.from_building])
+
     @property
     def builders(self) -> Units:
         """Returns available builder structures."""
-        building: Unit
-        _builders = self.cache.own(self.from_building).copy()
-        if self.from_building is UnitTypeId.COMMANDCENTER:
-            if self.cache.own(UnitTypeId.ORBITALCOMMAND).exists:
-                for building in self.cache.own(UnitTypeId.ORBITALCOMMAND):
-                    _builders.append(building)
-                for building in self.cache.own(UnitTypeId.PLANETARYFORTRESS):
-                    _builders.append(building)
-        if self.from_building is UnitTypeId.HATCHERY:
-            if self.cache.own(UnitTypeId.LAIR).exists:
-                for building in self.cache.own(UnitTypeId.LAIR):
-                    _builders.append(building)
-            if self.cache.own(UnitTypeId.HIVE).exists:
-                for building in self.cache.own(UnitTypeId.HIVE):
-                    _builders.append(building)
-
-        return _builders
+        builder_types = self.builder_types
+        if len(builder_types) == 1:
+            return self.cache.own(self.from_building).copy()
+        return self.cache.own(builder_types)
 
     def get_unit_count(self) -> int:
-        count = 0
-
-        for unit in self.ai.units:
-            if self.knowledge.unit_values.real_type(unit.type_id) == self.unit_type:
-                count += 1
+        counts = self.cache.counts
+        count = counts.real_amount(self.unit_type)
 
         if self.unit_type == self.knowledge.my_worker_type:
             count = max(count, self.ai.supply_workers)
@@ -66,7 +61,7 @@ class ActUnit(ActBase):
         ability = self.ai._game_data.units[self.unit_type.value].creation_ability
 
         if self.knowledge.my_race == Race.Zerg:
-            pending = sum([o.ability.id == ability.id for u in self.cache.own(UnitTypeId.EGG) for o in u.orders])
+            pending = counts.in_eggs(ability.id)
             if self.unit_type == UnitTypeId.ZERGLING:
                 count += pending * 2
             else:
@@ -75,7 +70,7 @@ class ActUnit(ActBase):
         if self.unit_type == self.knowledge.my_worker_type:
             count = max(self.ai.supply_workers, count)
 
-        count += sum([o.ability and o.ability.id == ability.id for u in self.builders for o in u.orders])
+        count += counts.ordered(ability.id, self.builder_types)
 
         return count
 
@@ -90,9 +85,11 @@ class ActUnit(ActBase):
 
         unit_data = self.ai._game_data.units[self.unit_type.value]
         cost = self.ai._game_data.calculate_ability_cost(unit_data.creation_ability)
+        builders = self.builders
+        ready_builders = builders.ready
 
-        if self.builders.ready.exists and self.knowledge.can_afford(unit_data.creation_ability):
-            for builder in self.builders.ready:
+        if ready_builders.exists and self.knowledge.can_afford(unit_data.creation_ability):
+            for builder in ready_builders:
                 if self.has_order_ready(builder) and not builder.is_flying:
                     if builder.tag in self.ai.unit_tags_received_action:
                         # Skip to next builder
@@ -111,7 +108,7 @@ class ActUnit(ActBase):
         elif self.priority:
             unit_data = self.ai._game_data.units[self.unit_type.value]
 
-            if self.builders.not_ready.exists:
+            if builders.not_ready.exists:
                 cost = self.ai._game_data.calculate_ability_cost(unit_data.creation_ability)
                 mineral_income = self.income_calculator.mineral_income
                 gas_income = self.income_calculator.gas_income
@@ -131,7 +128,7 @@ class ActUnit(ActBase):
                 if time_wait >= until_ready:
                     self.knowledge.reserve(cost.minerals, cost.vespene)
             else:
-                if self.builders.idle:
+                if builders.idle:
                     # TODO: Start reserving resources while building previous one
                     self.knowledge.reserve(cost.minerals, cost.vespene)
         return False
@@ -1,11 +1,14 @@
 from math import floor
-from typing import Optional, Set
+from typing import Optional
+
+import numpy as np
 
 from sc2.data import Race
 from sc2.ids.ability_id import AbilityId
 from sc2.pixel_map import PixelMap
 from sharpy.sc2math import to_new_ticks
 
+from sharpy.general.building_slots import BuildingSlots
 from sharpy.managers.core.roles import UnitTask
 from sharpy.utils import map_to_point2s_center
 from sc2.ids.unit_typeid import UnitTypeId
@@ -255,70 +258,54 @@ class GridBuilding(ActBuilding):
 
     def position_protoss(self, count) -> Optional[Point2]:
         is_pylon = self.unit_type == UnitTypeId.PYLON
-        buildings = self.ai.structures
-        matrix = self.ai.state.psionic_matrix
-        future_position = None
-
         iterator = self.get_iterator(is_pylon, count)
 
         if is_pylon:
-            for point in self.building_solver.buildings2x2[::iterator]:
-                if not buildings.closer_than(1, point):
-                    return point
-        else:
-            pylons = self.cache.own(UnitTypeId.PYLON).not_ready
-            for point in self.building_solver.buildings3x3[::iterator]:
-                if not self.allow_wall:
-                    if point in self.building_solver.wall3x3:
-                        continue
-                if not buildings.closer_than(1, point) and matrix.covers(point):
-                    return point
+            slots = self.building_solver.slots2x2
+            return slots.first(~slots.occupied, iterator)
 
-                if future_position is None and pylons and point.distance_to_closest(pylons) <= 7:
-                    future_position = point
-
-        return future_position
+        slots = self.building_solver.slots3x3
+        allowed = self.allowed_slots(slots)
+        powered = slots.powered(self.ai.state.psionic_matrix.sources)
+        position = slots.first(allowed & ~slots.occupied & powered, iterator)
+        if position is None:
+            position = self.future_position(slots, allowed, iterator)
+        return position
 
     def position_zerg(self, count) -> Optional[Point2]:
-        buildings = self.ai.structures
-        creep = self.ai.state.creep
-        future_position = None
-
-        for point in self.building_solver.buildings3x3:
-            if not buildings.closer_than(1, point) and self.is_on_creep(creep, point):
-                return point
-
-        return future_position
+        slots = self.building_solver.slots3x3
+        return slots.first(~slots.occupied & slots.on_creep(self.ai.state.creep, self.ai.state.game_loop))
 
     def position_terran(self, count) -> Optional[Point2]:
         is_depot = self.unit_type == UnitTypeId.SUPPLYDEPOT
-        buildings = self.ai.structures
-        future_position = None
 
         if is_depot:
-            for point in self.building_solver.buildings2x2:
-                if not buildings.closer_than(1, point):
-                    return point
-        else:
-            pylons = self.cache.own(UnitTypeId.PYLON).not_ready
-            reserved_landing_locations: Set[Point2] = set(self.building_solver.structure_target_move_location.values())
-            for point in self.building_solver.buildings3x3:
-                if not self.allow_wall:
-                    if point in self.building_solver.wall3x3:
-                        continue
-                # If a structure is landing here from AddonSwap() then dont use this location
-                if point in reserved_landing_locations:
-                    continue
-                # If this location has a techlab or reactor next to it, then don't create a new structure here
-                if point in self.building_solver.free_addon_locations:
-                    continue
-                if not buildings.closer_than(1, point):
-                    return point
-
-                if future_position is None and pylons and point.distance_to_closest(pylons) <= 7:
-                    future_position = point
-
-        return future_position
+            slots = self.building_solver.slots2x2
+            return slots.first(~slots.occupied)
+
+        slots = self.building_solver.slots3x3
+        allowed = self.allowed_slots(slots)
+        # If a structure is landing here from AddonSwap() then dont use this location
+        allowed &= ~slots.mask(self.building_solver.structure_target_move_location.values())
+        # If this location has a techlab or reactor next to it, then don't create a new structure here
+        allowed &= ~slots.mask(self.building_solver.free_addon_locations)
+
+        position = slots.first(allowed & ~slots.occupied)
+        if position is None:
+            position = self.future_position(slots, allowed)
+        return position
+
+    def allowed_slots(self, slots: BuildingSlots) -> np.ndarray:
+        if self.allow_wall:
+            return np.ones(len(slots), dtype=bool)
+        return ~slots.mask(self.building_solver.wall3x3)
+
+    def future_position(self, slots: BuildingSlots, allowed: np.ndarray, iterator: int = 1) -> Optional[Point2]:
+        """First allowed slot that will be powered by a pylon that is not yet ready."""
+        pylons = self.cache.own(UnitTypeId.PYLON).not_ready
+        if not pylons:
+            return None
+        return slots.first(allowed & (slots.distance_to_closest(pylons) <= 7), iterator)
 
     def get_iterator(self, is_pylon, count):
         if self.iterator is None:
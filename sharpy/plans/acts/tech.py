@@ -68,7 +68,8 @@ class Tech(ActBase):
             self.from_buildings = {self._from_building}
 
     async def execute(self) -> bool:
-        if not self.enabled:
+        if not self.enabled or self.upgrade_type in self.ai.state.upgrades:
+            self.finished = True
             return True
 
         builders = self.cache.own(self.from_buildings).ready
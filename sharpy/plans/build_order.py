@@ -285,9 +285,21 @@ class BuildOrder(ActBase):
             await self.start_component(order, knowledge)
 
     async def execute(self) -> bool:
+        tracker = self.tracker
+        if tracker is not None:
+            tracker.nodes += 1
+
         result = True
+        finished = True
         for order in self.orders:
+            if order.finished:
+                if tracker is not None:
+                    tracker.finished_skipped += 1
+                continue
+
             if not await order.execute():
                 result = False
+            finished = finished and order.finished
 
+        self.finished = finished
         return result
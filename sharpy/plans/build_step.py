@@ -52,17 +52,26 @@ class Step(ActBase):
             await self.start_component(self.skip_until, knowledge)
 
     async def execute(self) -> bool:
-        if self.skip is not None and self.skip.check():
+        if self.tracker is not None:
+            self.tracker.nodes += 1
+
+        if self.skip is not None and self.skip.is_met():
+            self.finished = self.skip.monotonic
             return True
-        if self.skip_until is not None and not self.skip_until.check():
+        if self.skip_until is not None and not self.skip_until.is_met():
             return True
-        if self.requirement is not None and not self.requirement.check():
+        if self.requirement is not None and not self.requirement.is_met():
             return False
 
+        # Requirement is met and stays met, step is finished when the action is
+        requirement_stays = self.requirement is None or self.requirement.monotonic
         if self.action is None:
+            self.finished = requirement_stays
             return True
 
-        return await self.action.execute()
+        result = await self.action.execute()
+        self.finished = result and requirement_stays and self.action.finished
+        return result
 
     def set_scouts(self, scouts: List[Unit]):
         if self.action is not None:
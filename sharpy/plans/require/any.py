@@ -3,6 +3,7 @@ from typing import List, Callable, Union
 
 from sharpy.plans.require.methods import merge_to_require
 from sharpy.plans.require import RequireBase
+from sharpy.plans.require.require_base import combined_inputs
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -38,10 +39,12 @@ class Any(RequireBase):
 
         for condition in self.conditions:
             await self.start_component(condition, knowledge)
+        self.inputs = combined_inputs(self.conditions)
+        self.monotonic = all(condition.monotonic for condition in self.conditions)
 
     def check(self) -> bool:
         for condition in self.conditions:
-            if condition.check():
+            if condition.is_met():
                 return True
 
         return False
@@ -1,6 +1,6 @@
 from typing import List
 
-from sharpy.plans.require.require_base import RequireBase
+from sharpy.plans.require.require_base import RequireBase, combined_inputs
 
 
 class Count(RequireBase):
@@ -16,11 +16,13 @@ class Count(RequireBase):
         await super().start(knowledge)
         for condition in self.conditions:
             await self.start_component(condition, knowledge)
+        self.inputs = combined_inputs(self.conditions)
+        self.monotonic = all(condition.monotonic for condition in self.conditions)
 
     def check(self) -> bool:
         amount = 0
         for condition in self.conditions:
-            if condition.check():
+            if condition.is_met():
                 amount += 1
 
         return amount >= self.count
@@ -2,6 +2,7 @@ import warnings
 
 from sc2.ids.unit_typeid import UnitTypeId
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
@@ -10,6 +11,8 @@ class EnemyBuildingExists(RequireBase):
     Checks if enemy has units of the type based on the information we have seen.
     """
 
+    inputs = RequireInput.EnemyUnits
+
     def __init__(self, unit_type: UnitTypeId, count: int = 1):
         assert unit_type is not None and isinstance(unit_type, UnitTypeId)
         assert count is not None and isinstance(count, int)
@@ -3,6 +3,7 @@ import warnings
 from sc2.ids.unit_typeid import UnitTypeId
 from sharpy.interfaces import IEnemyUnitsManager
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
@@ -13,6 +14,8 @@ class EnemyUnitExists(RequireBase):
 
     enemy_units_manager: IEnemyUnitsManager
 
+    inputs = RequireInput.EnemyUnits
+
     def __init__(self, unit_type: UnitTypeId, count: int = 1):
         assert unit_type is not None and isinstance(unit_type, UnitTypeId)
         assert count is not None and isinstance(count, int)
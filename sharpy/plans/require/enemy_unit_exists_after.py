@@ -1,6 +1,7 @@
 from sc2.ids.unit_typeid import UnitTypeId
 from sharpy.interfaces import IEnemyUnitsManager, ILostUnitsManager
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
@@ -12,6 +13,8 @@ class EnemyUnitExistsAfter(RequireBase):
     enemy_units_manager: IEnemyUnitsManager
     lost_units_manager: ILostUnitsManager
 
+    inputs = RequireInput.EnemyUnits
+
     def __init__(self, unit_type: UnitTypeId, count: int = 1):
         assert unit_type is not None and isinstance(unit_type, UnitTypeId)
         assert count is not None and isinstance(count, int)
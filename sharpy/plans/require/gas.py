@@ -2,12 +2,15 @@ import warnings
 
 import sc2
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
 class Gas(RequireBase):
     """Require that a specific number of minerals are "in the bank"."""
 
+    inputs = RequireInput.Vespene
+
     def __init__(self, vespene_requirement: int):
         assert vespene_requirement is not None and isinstance(vespene_requirement, int)
         super().__init__()
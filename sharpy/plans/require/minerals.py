@@ -1,10 +1,13 @@
 import warnings
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
 class Minerals(RequireBase):
     """Require that a specific number of minerals are "in the bank"."""
 
+    inputs = RequireInput.Minerals
+
     def __init__(self, mineral_requirement: int):
         assert mineral_requirement is not None and isinstance(mineral_requirement, int)
         super().__init__()
@@ -11,6 +11,8 @@ if TYPE_CHECKING:
 class Once(RequireBase):
     """Check passes if condition has ever been true."""
 
+    monotonic = True
+
     def __init__(self, condition: Union[RequireBase, Callable[["Knowledge"], bool]]):
         super().__init__()
 
@@ -22,12 +24,13 @@ class Once(RequireBase):
     async def start(self, knowledge: "Knowledge"):
         await super().start(knowledge)
         await self.start_component(self.condition, knowledge)
+        self.inputs = self.condition.inputs
 
     def check(self) -> bool:
         if self.triggered:
             return True
 
-        if self.condition.check():
+        if self.condition.is_met():
             self.triggered = True
             return True
 
@@ -1,11 +1,60 @@
 from abc import abstractmethod
+from typing import List, Optional
+
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.acts import ActBase
 
 
 class RequireBase(ActBase):
+    # Inputs that check depends on, None when they are not known and check is evaluated every time
+    inputs: Optional[RequireInput] = None
+    # True when check can never return False after it has once returned True
+    monotonic: bool = False
+
+    _checked_version: int = -1
+    _checked_result: bool = False
+
     async def execute(self) -> bool:
-        return self.check()
+        result = self.is_met()
+        if result and self.monotonic:
+            self.finished = True
+        return result
 
     @abstractmethod
     def check(self) -> bool:
         pass
+
+    def is_met(self) -> bool:
+        """
+        Result of check, cached until one of the declared inputs changes.
+        Plan steps and lists use this instead of calling check directly.
+        """
+        if self.monotonic and self._checked_result:
+            return True
+
+        tracker = self.tracker
+        if tracker is None or self.inputs is None:
+            if tracker is not None:
+                tracker.checks += 1
+            self._checked_result = self.check()
+            return self._checked_result
+
+        version = tracker.version(self.inputs)
+        if version == self._checked_version:
+            tracker.cached_checks += 1
+            return self._checked_result
+
+        tracker.checks += 1
+        self._checked_version = version
+        self._checked_result = self.check()
+        return self._checked_result
+
+
+def combined_inputs(conditions: List[RequireBase]) -> Optional[RequireInput]:
+    """Inputs of all the conditions, None when inputs of any of the conditions are not known."""
+    inputs = RequireInput(0)
+    for condition in conditions:
+        if condition.inputs is None:
+            return None
+        inputs |= condition.inputs
+    return inputs
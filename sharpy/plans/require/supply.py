@@ -1,6 +1,7 @@
 import enum
 import warnings
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
@@ -11,6 +12,8 @@ class SupplyType(enum.Enum):
 
 
 class Supply(RequireBase):
+    inputs = RequireInput.Supply
+
     def __init__(self, supply_amount: int, supply_type: SupplyType = SupplyType.All):
         assert supply_amount is not None and isinstance(supply_amount, int)
         super().__init__()
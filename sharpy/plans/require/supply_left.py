@@ -1,9 +1,12 @@
 import warnings
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
 class SupplyLeft(RequireBase):
+    inputs = RequireInput.Supply
+
     def __init__(self, supply_amount: int):
         assert supply_amount is not None and isinstance(supply_amount, int)
         super().__init__()
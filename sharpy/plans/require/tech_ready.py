@@ -2,6 +2,7 @@ import warnings
 
 from sc2.ids.upgrade_id import UpgradeId
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
@@ -17,6 +18,10 @@ class TechReady(RequireBase):
 
         self.name = upgrade
         self.percentage = percentage
+        if percentage >= 1:
+            # Research progress is only known from orders, but finished upgrades stay finished
+            self.inputs = RequireInput.Upgrades
+            self.monotonic = True
 
     def check(self) -> bool:
         if self.ai.already_pending_upgrade(self.name) >= self.percentage:
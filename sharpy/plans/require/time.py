@@ -1,9 +1,13 @@
 import warnings
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
 class Time(RequireBase):
+    inputs = RequireInput.Time
+    monotonic = True
+
     def __init__(self, time_in_seconds: float):
         assert time_in_seconds is not None and (isinstance(time_in_seconds, int) or isinstance(time_in_seconds, float))
         super().__init__()
@@ -3,10 +3,13 @@ import warnings
 import sc2
 from sc2.ids.unit_typeid import UnitTypeId
 
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
 class UnitExists(RequireBase):
+    inputs = RequireInput.OwnUnits
+
     def __init__(
         self,
         unit_type: UnitTypeId,
@@ -1,11 +1,14 @@
 import warnings
 from sc2.ids.unit_typeid import UnitTypeId
+from sharpy.managers.core.plan_tracker import RequireInput
 from sharpy.plans.require.require_base import RequireBase
 
 
 class UnitReady(RequireBase):
     """Condition for how many units must be ready. Used mostly for buildings."""
 
+    inputs = RequireInput.OwnUnits
+
     def __init__(self, unit_type: UnitTypeId, count: float = 1):
         assert unit_type is not None and isinstance(unit_type, UnitTypeId)
         super().__init__()
@@ -15,10 +18,5 @@ class UnitReady(RequireBase):
 
     def check(self) -> bool:
         count = self.get_count(self.unit_type, False, include_not_ready=False)
-        build_progress = 0
-
-        for unit in self.cache.own(self.unit_type).not_ready:
-            build_progress = max(build_progress, unit.build_progress)
-
-        count += build_progress
+        count += self.cache.counts.max_build_progress(self.unit_type)
         return count >= self.count
@@ -23,9 +23,21 @@ class SequentialList(SubActs):
         super().__init__(orders, *argv)
 
     async def execute(self) -> bool:
+        tracker = self.tracker
+        if tracker is not None:
+            tracker.nodes += 1
+
+        finished = True
         for order in self.orders:
+            if order.finished:
+                if tracker is not None:
+                    tracker.finished_skipped += 1
+                continue
+
             result = await order.execute()
             if not result:
                 return result
+            finished = finished and order.finished
 
+        self.finished = finished
         return True
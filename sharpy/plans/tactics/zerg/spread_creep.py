@@ -4,7 +4,7 @@ from typing import Optional
 from sc2.ids.ability_id import AbilityId
 from sharpy.interfaces import IBuildingSolver
 from sharpy.managers.core import BuildingSolver
-from sharpy.managers.core.grids import BlockerType, BuildArea
+from sharpy.managers.core.grids import AreaCheck, BlockerType, BuildArea
 from sharpy.plans.acts import ActBase
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
@@ -23,7 +23,7 @@ CREEP_TUMOR_MAX_RANGE = 8  # not sure about this
 # * avoid blocking own hatchery locations with creep tumors
 
 tumors = {UnitTypeId.CREEPTUMOR, UnitTypeId.CREEPTUMORBURROWED, UnitTypeId.CREEPTUMORQUEEN}
-areas = {BuildArea.Empty, BuildArea.Ramp, BuildArea.BuildingPadding}
+areas = AreaCheck({BuildArea.Empty, BuildArea.Ramp, BuildArea.BuildingPadding})
 
 
 class SpreadCreep(ActBase):
@@ -87,9 +87,9 @@ class SpreadCreep(ActBase):
             distance = distance_interval[0] + random.random() * (distance_interval[1] - distance_interval[0])
             next_pos = pos.towards_with_random_angle(towards, distance).rounded
 
-            if self.building_solver.grid.query_area(
-                next_pos, BlockerType.Building1x1, lambda g: g.Area in areas
-            ) and self.ai.has_creep(next_pos):
+            if self.building_solver.grid.query_area(next_pos, BlockerType.Building1x1, areas) and self.ai.has_creep(
+                next_pos
+            ):
 
                 if not close_tumors or close_tumors.closest_distance_to(next_pos) > 3:
                     return next_pos
@@ -103,9 +103,9 @@ class SpreadCreep(ActBase):
             distance = distance_interval[0] + random.random() * (distance_interval[1] - distance_interval[0])
             next_pos = tumor.position.towards_with_random_angle(towards, distance).rounded
 
-            if self.building_solver.grid.query_area(
-                next_pos, BlockerType.Building1x1, lambda g: g.Area in areas
-            ) and self.ai.has_creep(next_pos):
+            if self.building_solver.grid.query_area(next_pos, BlockerType.Building1x1, areas) and self.ai.has_creep(
+                next_pos
+            ):
 
                 close_tumors = self.cache.own_in_range(next_pos, 3).of_type(tumors)
                 if not close_tumors:
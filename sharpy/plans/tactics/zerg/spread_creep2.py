@@ -6,7 +6,7 @@ from sc2.ids.ability_id import AbilityId
 from sc2.units import Units
 from sharpy.interfaces import IBuildingSolver
 from sharpy.managers.core import BuildingSolver
-from sharpy.managers.core.grids import BlockerType, BuildArea
+from sharpy.managers.core.grids import AreaCheck, BlockerType, BuildArea
 from sharpy.plans.acts import ActBase
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
@@ -32,7 +32,7 @@ CREEP_TARGET_INTERVAL = 10
 #       -> create creep tumors if all hatcheries are already injected and there's enough energy for another round?
 
 tumors = {UnitTypeId.CREEPTUMOR, UnitTypeId.CREEPTUMORBURROWED, UnitTypeId.CREEPTUMORQUEEN}
-areas = {BuildArea.Empty, BuildArea.Ramp, BuildArea.BuildingPadding}
+areas = AreaCheck({BuildArea.Empty, BuildArea.Ramp, BuildArea.BuildingPadding})
 
 
 class SpreadCreepV2(ActBase):
@@ -243,5 +243,5 @@ class SpreadCreepV2(ActBase):
             position not in self.tumor_used_locations
             and self.ai.has_creep(position)
             and position not in self.reserved_expansion_positions
-            and self.building_solver.grid.query_area(position, BlockerType.Building1x1, lambda g: g.Area in areas)
+            and self.building_solver.grid.query_area(position, BlockerType.Building1x1, areas)
         )
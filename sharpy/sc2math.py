@@ -186,14 +186,15 @@ def unit_geometric_median(units: Units, accuracy=0.5) -> Point2:
     return Point2(result)
 
 
-def geometric_median(X, eps=1e-5):
+def geometric_median(X, eps=1e-5, initial=None):
     """
     Calculates geometric median based on points
     :param X: 2D numpy array / matrix
     :param eps: epsilon for accuracy
+    :param initial: optional starting guess, such as the median of the previous frame
     :return: numpy array with 2 floats
     """
-    y = np.mean(X, 0)
+    y = np.mean(X, 0) if initial is None else np.asarray(initial, dtype=float)
 
     for i in range(30):  # Just to make sure that no endless loops happen
         D = cdist(X, [y])
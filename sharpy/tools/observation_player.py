@@ -0,0 +1,148 @@
+import time
+from typing import List, Optional
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.bot_ai import BotAI
+from sc2.client import Client
+from sc2.data import ActionResult, Result, Status
+from sc2.game_data import GameData
+from sc2.game_info import GameInfo
+from sc2.game_state import GameState
+from sharpy.general.observation_file import ObservationRecording
+
+
+class ReplayClient(Client):
+    """
+    Client that answers every request with an empty response instead of talking to a SC2 process.
+
+    Queries return neutral answers: no paths, no valid placements and no available abilities.
+    Game data requests are answered with the recorded game data, so that a played game can be recorded again.
+    Actions are counted and dropped, so recorded observations never react to the commands of the bot.
+    """
+
+    def __init__(
+        self,
+        game_step: int,
+        base_build: int = -1,
+        game_version: str = "",
+        game_data: Optional[sc_pb.ResponseData] = None,
+    ):
+        # Websocket is never used as all requests are answered locally
+        super().__init__(ws=self)
+        self.game_step = game_step
+        self.base_build = base_build
+        self.game_version = game_version
+        self.game_data = game_data
+        self._status = Status.in_game
+        self.requests = 0
+        self.actions_sent = 0
+
+    async def _execute(self, **kwargs) -> sc_pb.Response:
+        self.requests += 1
+        if "action" in kwargs:
+            self.actions_sent += len(kwargs["action"].actions)
+        response = sc_pb.Response()
+        if "data" in kwargs and self.game_data is not None:
+            response.data.CopyFrom(self.game_data)
+        return response
+
+    async def ping(self) -> sc_pb.Response:
+        # Version of the recorded game, so that version specific enum and upgrade changes match the recording
+        self.requests += 1
+        response = sc_pb.Response()
+        response.ping.base_build = max(0, self.base_build)
+        response.ping.game_version = self.game_version
+        return response
+
+    async def query_pathing(self, start, end) -> Optional[float]:
+        self.requests += 1
+        return None
+
+    async def query_pathings(self, zipped_list) -> List[float]:
+        self.requests += 1
+        return [0.0 for _ in zipped_list]
+
+    async def _query_building_placement_fast(self, ability, positions, ignore_resources: bool = True) -> List[bool]:
+        self.requests += 1
+        return [False for _ in positions]
+
+    async def query_building_placement(self, ability, positions, ignore_resources: bool = True) -> List[ActionResult]:
+        self.requests += 1
+        return [ActionResult.Error for _ in positions]
+
+    async def query_available_abilities(self, units, ignore_resource_requirements: bool = False):
+        self.requests += 1
+        if not isinstance(units, list):
+            return []
+        return [[] for _ in units]
+
+    async def query_available_abilities_with_tag(self, units, ignore_resource_requirements: bool = False):
+        self.requests += 1
+        return {unit.tag: set() for unit in units}
+
+
+class ObservationPlayer:
+    """
+    Plays a recorded game through a bot without SC2, the same way python-sc2 runs a game.
+
+    Bot receives the recorded observations in order regardless of the commands it gives,
+    which makes the results useful for profiling and benchmarks, but not for testing how the game would go.
+    """
+
+    def __init__(self, recording: ObservationRecording, max_steps: Optional[int] = None):
+        self.recording = recording
+        self.max_steps = max_steps
+        self.client: Optional[ReplayClient] = None
+        # Time taken by every step in milliseconds, including python-sc2 events and after step
+        self.step_times: List[float] = []
+        self.start_time: float = 0
+
+    async def play(self, ai: BotAI) -> Result:
+        header = self.recording.header
+        # Parse observations before starting to keep parsing out of the measured times
+        frames = list(self.recording.frames())
+        if self.max_steps is not None:
+            frames = frames[: self.max_steps + 1]
+        if not frames:
+            raise ValueError("Recording has no observations")
+
+        self.client = ReplayClient(
+            header.get("game_step", 4),
+            header.get("base_build", -1),
+            header.get("game_version", ""),
+            self.recording.game_data,
+        )
+        game_info_response = sc_pb.Response()
+        game_info_response.game_info.CopyFrom(self.recording.game_info)
+
+        ns = time.perf_counter_ns()
+        ai._initialize_variables()
+        ai._prepare_start(
+            self.client,
+            header["player_id"],
+            GameInfo(self.recording.game_info),
+            GameData(self.recording.game_data),
+            realtime=False,
+            base_build=header.get("base_build", -1),
+        )
+        observation, pathing_grid = frames[0]
+        game_info_response.game_info.start_raw.pathing_grid.CopyFrom(pathing_grid)
+        ai._prepare_step(GameState(observation), game_info_response)
+        await ai.on_before_start()
+        ai._prepare_first_step()
+        await ai.on_start()
+        self.start_time = (time.perf_counter_ns() - ns) / 1e6
+
+        for iteration, (observation, pathing_grid) in enumerate(frames[1:]):
+            ns = time.perf_counter_ns()
+            game_info_response.game_info.start_raw.pathing_grid.CopyFrom(pathing_grid)
+            ai._prepare_step(GameState(observation), game_info_response)
+            await ai.issue_events()
+            await ai.on_step(iteration)
+            await ai._after_step()
+            self.step_times.append((time.perf_counter_ns() - ns) / 1e6)
+
+        result = Result(self.recording.result) if self.recording.result is not None else Result.Undecided
+        await ai.on_end(result)
+        return result
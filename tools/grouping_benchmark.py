@@ -0,0 +1,90 @@
+"""
+Script to benchmark combat unit grouping.
+
+Compares connected components grouping used by GroupCombatManager to the DBSCAN clustering it replaced, with
+randomly clustered armies of different sizes. DBSCAN is only measured when scikit-learn is installed.
+
+Usage: python tools/grouping_benchmark.py [--units 20 100 300] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+# Set working dir to root of repository.
+script_path = Path(os.path.abspath(__file__))
+assert script_path.parent.stem == "tools", "`This script expects to be in tools folder under repository root.`"
+os.chdir(script_path.parent.parent)
+sys.path.insert(0, os.getcwd())
+
+from scipy.spatial import cKDTree  # noqa: E402
+
+from sharpy.combat.unit_grouper import UnitGrouper, group_labels  # noqa: E402
+
+GROUP_DISTANCE = 7
+
+
+def clustered_positions(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Units spread around a handful of army centers on a 176x176 map."""
+    centers = rng.uniform(20, 156, size=(max(1, count // 25), 2))
+    picks = centers[rng.integers(0, len(centers), size=count)]
+    return (picks + rng.normal(0, 4, size=(count, 2))).astype(np.float32)
+
+
+def measure(label: str, func: Callable[[], object], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<36} {elapsed * 1000:10.3f} ms")
+    return elapsed
+
+
+def same_partition(labels_a: np.ndarray, labels_b: np.ndarray) -> bool:
+    pairs = set(zip(labels_a.tolist(), labels_b.tolist()))
+    return len(pairs) == len(set(labels_a.tolist())) == len(set(labels_b.tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark combat unit grouping")
+    parser.add_argument("--units", type=int, nargs="+", default=[20, 100, 300], help="Unit counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=200, help="Repeats per measurement")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        from sklearn.cluster import DBSCAN
+    except ImportError:
+        DBSCAN = None
+        print("scikit-learn is not installed, benchmarking connected components only")
+    else:
+        print(f"scikit-learn import: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = np.random.default_rng(0)
+
+    for count in args.units:
+        positions = clustered_positions(count, rng)
+        tags = np.arange(count, dtype=np.uint64)
+        tree = cKDTree(positions)
+        grouper = UnitGrouper(GROUP_DISTANCE)
+        print(f"{count} units")
+
+        components = measure("connected components", lambda: group_labels(positions, GROUP_DISTANCE), args.repeat)
+        measure("connected components, shared tree", lambda: group_labels(positions, GROUP_DISTANCE, tree), args.repeat)
+        measure("UnitGrouper.update", lambda: grouper.update(tags, positions, tree), args.repeat)
+
+        if DBSCAN is not None:
+            dbscan = DBSCAN(eps=GROUP_DISTANCE, min_samples=1)
+            elapsed = measure("DBSCAN", lambda: dbscan.fit(positions), args.repeat)
+            labels = group_labels(positions, GROUP_DISTANCE)
+            same = same_partition(labels, dbscan.fit(positions).labels_)
+            print(f"  DBSCAN / connected components: {elapsed / components:.1f}x, same groups: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Script to benchmark a bot on recorded observations without SC2.
+
+Plays observation files recorded with ObservationRecorder through a fresh bot instance and prints step time
+percentiles. Bots built on KnowledgeBot also print the StepProfiler summary of every manager and act at the end.
+
+Usage: python tools/observation_benchmark.py <recording.sc2obs.gz> [...] [--bot dummies.protoss.macro_stalkers:MacroStalkers]
+       [--steps N] [--skip N]
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Set working dir to root of repository.
+script_path = Path(os.path.abspath(__file__))
+assert script_path.parent.stem == "tools", "`This script expects to be in tools folder under repository root.`"
+os.chdir(script_path.parent.parent)
+sys.path.insert(0, os.getcwd())
+
+from sharpy.general.observation_file import ObservationRecording  # noqa: E402
+from sharpy.tools.observation_player import ObservationPlayer  # noqa: E402
+
+
+def create_bot(bot_path: str):
+    module_name, class_name = bot_path.split(":")
+    bot_type = getattr(importlib.import_module(module_name), class_name)
+    return bot_type()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a bot on recorded observations")
+    parser.add_argument("files", nargs="+", help="Observation files to play")
+    parser.add_argument("--bot", default="dummies.protoss.macro_stalkers:MacroStalkers", help="module:BotClass")
+    parser.add_argument("--steps", type=int, default=None, help="Maximum number of steps to play per file")
+    parser.add_argument("--skip", type=int, default=0, help="Steps left out of the statistics from the start")
+    args = parser.parse_args()
+
+    for file_name in args.files:
+        start = time.perf_counter()
+        recording = ObservationRecording.load(file_name)
+        print(f"{file_name}: {len(recording)} frames, loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        player = ObservationPlayer(recording, args.steps)
+        result = asyncio.run(player.play(create_bot(args.bot)))
+
+        times = np.array(player.step_times[args.skip :])
+        print(f"  result {result.name}, on start {player.start_time:.1f} ms, {len(times)} steps")
+        if len(times):
+            p50, p95, p99 = np.percentile(times, (50, 95, 99))
+            print(f"  step ms: mean {times.mean():.2f} p50 {p50:.2f} p95 {p95:.2f} p99 {p99:.2f} max {times.max():.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Script to benchmark the sc2pathlib backends.
+
+Runs the same path queries and influence updates with the pure Python / NumPy fallback and, when it can be loaded
+on this platform, the native sc2pathlib build. Map data is read from the pickled maps in the python-sc2 submodule
+(python-sc2/test/pickle_data) when available, otherwise a synthetic map is used.
+
+Usage: python tools/sc2pathlib_benchmark.py [map name filter] [--queries N]
+"""
+
+import argparse
+import lzma
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+# Set working dir to root of repository.
+script_path = Path(os.path.abspath(__file__))
+assert script_path.parent.stem == "tools", "`This script expects to be in tools folder under repository root.`"
+os.chdir(script_path.parent.parent)
+sys.path.insert(0, os.getcwd())
+sys.path.insert(1, os.path.join(os.getcwd(), "python-sc2"))
+
+from sc2pathlib import fallback  # noqa: E402
+
+try:
+    from sc2pathlib import sc2pathlib as native  # noqa: E402
+except ImportError:
+    native = None
+
+pickle_folder = Path("python-sc2") / "test" / "pickle_data"
+
+
+def load_maps(name_filter: str) -> List[Tuple[str, np.ndarray, np.ndarray, np.ndarray]]:
+    """Returns list of (name, pathing, placement, height) grids in [x][y] order."""
+    maps = []
+    if pickle_folder.exists():
+        from sc2.game_info import GameInfo
+
+        for path in sorted(pickle_folder.glob("*.xz")):
+            if name_filter and name_filter.lower() not in path.stem.lower():
+                continue
+            with lzma.open(path, "rb") as f:
+                raw_game_data, raw_game_info, raw_observation = pickle.load(f)
+            game_info = GameInfo(raw_game_info.game_info)
+            maps.append(
+                (
+                    path.stem,
+                    np.swapaxes(game_info.pathing_grid.data_numpy, 0, 1),
+                    np.swapaxes(game_info.placement_grid.data_numpy, 0, 1),
+                    np.swapaxes(game_info.terrain_height.data_numpy, 0, 1),
+                )
+            )
+
+    if not maps:
+        print(f"No pickled maps found in {pickle_folder}, using a synthetic map")
+        maps.append(("synthetic",) + synthetic_map())
+    return maps
+
+
+def synthetic_map(size: int = 176) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Two plateaus connected by ramps with scattered obstacles."""
+    rng = np.random.default_rng(1)
+    pathing = np.ones((size, size), dtype=np.uint8)
+    pathing[:4, :] = pathing[-4:, :] = pathing[:, :4] = pathing[:, -4:] = 0
+    height = np.full((size, size), 100, dtype=np.uint8)
+    height[: size // 2, :] = 140
+    wall = size // 2
+    pathing[wall - 1 : wall + 1, :] = 0
+    for ramp in (size // 4, size // 2, 3 * size // 4):
+        pathing[wall - 1 : wall + 1, ramp - 2 : ramp + 2] = 1
+    for x, y in rng.integers(8, size - 8, size=(60, 2)):
+        pathing[x - 2 : x + 2, y - 2 : y + 2] = 0
+    return pathing, pathing.copy(), height
+
+
+def random_queries(pathing: np.ndarray, count: int) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    rng = np.random.default_rng(0)
+    cells = np.argwhere(pathing > 0)
+    picks = cells[rng.integers(0, len(cells), size=(count, 2))]
+    return [((int(a[0]), int(a[1])), (int(b[0]), int(b[1]))) for a, b in picks]
+
+
+def measure(label: str, func: Callable[[], object], repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<32} {elapsed * 1000:10.2f} ms")
+    return elapsed
+
+
+def benchmark_backend(name: str, backend, pathing, placement, height, queries) -> List[float]:
+    print(f" {name}")
+    results = []
+    width, length = pathing.shape
+    path_find = None
+    sc2_map = None
+
+    def create():
+        nonlocal path_find, sc2_map
+        path_find = backend.PathFind(np.fmax(pathing, placement).tolist())
+        sc2_map = backend.Map(pathing.tolist(), placement.tolist(), height.tolist(), 0, 0, width, length)
+
+    results.append(measure("create", create))
+
+    def paths():
+        for start, end in queries:
+            path_find.find_path(start, end)
+
+    results.append(measure(f"find_path x{len(queries)}", paths))
+
+    def influence_paths():
+        for start, end in queries:
+            sc2_map.find_path(0, start, end, False, True, 1, None, None)
+
+    points = [query[0] for query in queries[:50]]
+
+    def influence():
+        sc2_map.reset()
+        sc2_map.normalize_influence(20)
+        sc2_map.add_influence_fading(1, points, 50, 5, 8)
+
+    results.append(measure(f"influence reset + {len(points)} units", influence, 10))
+    results.append(measure(f"influence find_path x{len(queries)}", influence_paths))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sc2pathlib backends")
+    parser.add_argument("map", nargs="?", default="", help="Filter for pickled map names")
+    parser.add_argument("--queries", type=int, default=50, help="Number of path queries per map")
+    args = parser.parse_args()
+
+    if native is None:
+        print("Native sc2pathlib can not be loaded on this platform, benchmarking fallback only")
+
+    for name, pathing, placement, height in load_maps(args.map):
+        print(f"Map {name} {pathing.shape[0]}x{pathing.shape[1]}")
+        queries = random_queries(np.fmax(pathing, placement), args.queries)
+        fallback_results = benchmark_backend("fallback", fallback, pathing, placement, height, queries)
+        if native is not None:
+            native_results = benchmark_backend("native", native, pathing, placement, height, queries)
+            ratios = ", ".join(f"{f / max(n, 1e-9):.1f}x" for f, n in zip(fallback_results, native_results))
+            print(f" fallback / native: {ratios}")
+
+
+if __name__ == "__main__":
+    main()